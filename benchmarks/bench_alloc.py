@@ -0,0 +1,104 @@
+"""
+Memory allocated per register read, fresh ctypes objects against the pool.
+
+Traces the allocations of many reads with :mod:`tracemalloc`: the wrappers
+as written before, encoding the port name and creating new out-parameters
+on every call, against the wrappers of NKTP_DLL using the encoded port
+names and the out-parameters of the thread.
+
+Without a DLL the ctypes functions are replaced by Python functions filling
+the out-parameters, so the argument conversion of ctypes itself is not
+counted. With ``--port`` the real DLL is called (Windows)::
+
+    python benchmarks/bench_alloc.py --calls 100000
+    python benchmarks/bench_alloc.py --port COM4 --address 15
+"""
+import argparse
+from ctypes import c_ubyte, c_ushort, create_string_buffer
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nkt_tools.NKTP_DLL as nkt  # noqa: E402
+from nkt_tools import _hooks  # noqa: E402
+
+
+def _read_u16(port, devId, regId, value, index):
+    """Stand-in of the DLL function, filling the out-parameter."""
+    value.value = 245
+    return 0
+
+
+def _read(port, devId, regId, data, size, index):
+    """Stand-in of the DLL function, filling the out-parameters."""
+    size.value = 2
+    return 0
+
+
+def before_u16(portname, devId, regId, index):
+    """registerReadU16 as written before the pool."""
+    _readValue = c_ushort(0)
+    result = nkt._registerReadU16(portname.encode(
+        'ascii'), devId, regId, _readValue, index)
+    return result, _readValue.value
+
+
+def before_raw(portname, devId, regId, index):
+    """registerRead as written before the pool."""
+    _readSize = c_ubyte(255)
+    _readData = create_string_buffer(_readSize.value)
+    result = nkt._registerRead(portname.encode(
+        'ascii'), devId, regId, _readData, _readSize, index)
+    return result, _readData.raw[:_readSize.value]
+
+
+def traced(function, args, calls):
+    """Return (bytes kept, peak bytes) of `calls` calls of `function`."""
+    function(*args)  # Binds the DLL function, encodes the port name
+    loop = [args] * calls
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    for arguments in loop:
+        function(*arguments)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current - start, peak - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=100000)
+    parser.add_argument('--port', help='real DLL port, e.g. COM4')
+    parser.add_argument('--address', type=int, default=15)
+    parser.add_argument('--register', type=lambda text: int(text, 0),
+                        default=0x11)
+    args = parser.parse_args()
+
+    # Only the wrappers of NKTP_DLL, none of the layers installed on import
+    for _, _, layer in list(_hooks._layers):
+        _hooks.remove(layer)
+    if args.port is None:
+        nkt._registerReadU16 = _read_u16
+        nkt._registerRead = _read
+        portname = 'COM1'
+    else:
+        portname = args.port
+        nkt.openPorts(portname, 0, 0)
+
+    call = (portname, args.address, args.register, -1)
+    print('%d reads, bytes kept / peak bytes' % args.calls)
+    for name, before, pooled in (('registerReadU16', before_u16,
+                                  nkt.registerReadU16),
+                                 ('registerRead', before_raw,
+                                  nkt.registerRead)):
+        print('%-16s before %6d / %6d   pooled %6d / %6d'
+              % (name, *traced(before, call, args.calls),
+                 *traced(pooled, call, args.calls)))
+    if args.port is not None:
+        nkt.closePorts(portname)
+
+
+if __name__ == '__main__':
+    main()
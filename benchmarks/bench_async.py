@@ -0,0 +1,68 @@
+"""
+N lasers polled from one event loop against one after the other.
+
+Every laser is an Extreme on its own pty stand-in (see :mod:`loopback`) that
+answers after a fixed delay, mimicking the round trip of a real bus. Each
+round reads the power level of all lasers, blocking one laser at a time and
+concurrently with ``asyncio.gather`` over ``aread_power_level``::
+
+    python benchmarks/bench_async.py --devices 8 --delay 0.002
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+from bench_interbus import EXTREME_REGISTERS  # noqa: E402
+from loopback import PtyBus  # noqa: E402
+
+
+def blocking(lasers, rounds):
+    """Return seconds per round reading all lasers one after the other."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for laser in lasers:
+            laser.power_level
+    return (time.perf_counter() - start) / rounds
+
+
+async def concurrent(lasers, rounds):
+    """Return seconds per round reading all lasers concurrently."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(*[laser.aread_power_level() for laser in lasers])
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--devices', type=int, default=8)
+    parser.add_argument('--delay', type=float, default=0.002,
+                        help='Answer delay of the stand-in bus in seconds.')
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    from nkt_tools.extreme import Extreme
+
+    buses = [PtyBus(EXTREME_REGISTERS, args.delay)
+             for _ in range(args.devices)]
+    try:
+        lasers = [Extreme(bus.portname) for bus in buses]
+        sequential = blocking(lasers, args.rounds)
+        gathered = asyncio.run(concurrent(lasers, args.rounds))
+    finally:
+        for bus in buses:
+            bus.close()
+
+    print('%d lasers, %.1f ms bus delay'
+          % (args.devices, args.delay * 1e3))
+    print('blocking, one by one: %8.2f ms/round' % (sequential * 1e3))
+    print('asyncio.gather:       %8.2f ms/round' % (gathered * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Batched register reads against one typed call per register.
+
+Reads the registers behind Extreme.test_read_funcs once with the typed
+NKTP_DLL functions, one call per register as the device classes do, and
+once with :func:`nkt_tools.batch.read_many`::
+
+    python benchmarks/bench_batch.py
+    python benchmarks/bench_batch.py --backend dll --port COM4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_interbus import EXTREME_REGISTERS  # noqa: E402
+
+# (register, type) read by Extreme.test_read_funcs and print_status
+ITEMS = [(0x6B, 'U8'), (0x11, 'S16'), (0x30, 'U8'), (0x16, 'U8'),
+         (0x32, 'U16'), (0x34, 'U16'), (0x36, 'U8'), (0x37, 'U16'),
+         (0x38, 'U16'), (0x39, 'U16'), (0x66, 'U16')]
+
+
+def sequential(nkt, portname, repeats):
+    """Typed read per register, return seconds per batch."""
+    calls = [(getattr(nkt, 'registerRead' + dtype), register)
+             for register, dtype in ITEMS]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for function, register in calls:
+            result, _ = function(portname, 15, register, -1)
+    return (time.perf_counter() - start) / repeats
+
+
+def batched(read_many, portname, repeats):
+    """read_many per batch, return seconds per batch."""
+    items = [(15, register, dtype) for register, dtype in ITEMS]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        read_many(portname, items)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--backend', default='interbus',
+                        choices=['dll', 'interbus'])
+    parser.add_argument('--port', help='Port with an Extreme at address 15.'
+                        ' A pty stand-in is used if omitted.')
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ['NKTP_BACKEND'] = args.backend
+    import nkt_tools.NKTP_DLL as nkt
+    from nkt_tools.batch import read_many
+
+    bus = None
+    portname = args.port
+    if portname is None:
+        if args.backend == 'dll':
+            parser.error('--port is required for the dll backend')
+        from loopback import PtyBus
+        bus = PtyBus(EXTREME_REGISTERS)
+        portname = bus.portname
+
+    try:
+        batched(read_many, portname, 1)  # Import numpy outside the timing
+        closed = sequential(nkt, portname, args.repeats)
+        batch = batched(read_many, portname, args.repeats)
+        nkt.openPorts(portname, 0, 0)
+        opened = sequential(nkt, portname, args.repeats)
+        open_batch = batched(read_many, portname, args.repeats)
+        nkt.closePorts(portname)
+    finally:
+        if bus is not None:
+            bus.close()
+
+    print('backend: %s, port: %s, %d registers per batch'
+          % (args.backend, portname, len(ITEMS)))
+    print('typed calls, port closed: %8.1f us/batch' % (closed * 1e6))
+    print('read_many,   port closed: %8.1f us/batch' % (batch * 1e6))
+    print('typed calls, port open:   %8.1f us/batch' % (opened * 1e6))
+    print('read_many,   port open:   %8.1f us/batch' % (open_batch * 1e6))
+
+
+if __name__ == '__main__':
+    main()
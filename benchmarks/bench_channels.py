@@ -0,0 +1,91 @@
+"""
+RF driver channels one register at a time against read/write_channels.
+
+Reads all channels and retunes two of them on a simulated RF driver (see
+:mod:`nkt_tools.simulator`) answering after `--latency` seconds:
+
+* per channel: get_wavelength, get_amplitude and get_modulation of every
+  channel, then set_wavelength and set_amplitude of every channel, as a
+  script using the single channel methods would.
+* bulk: :meth:`RFDriver.read_channels` and
+  :meth:`RFDriver.write_channels`, which writes the changed channels only.
+
+With ``--arrays`` the simulated module answers a read of the first register
+of each channel array with all eight channels::
+
+    python benchmarks/bench_channels.py --latency 0.001
+    python benchmarks/bench_channels.py --latency 0.001 --arrays
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+import numpy as np  # noqa: E402
+
+from nkt_tools import simulator  # noqa: E402
+from nkt_tools.rfdriver import RFDriver  # noqa: E402
+
+
+class ArrayRFDriver(simulator.SimulatedRFDriver):
+    """RF driver answering 0x90, 0xB0 and 0xC0 with all eight channels."""
+
+    def read(self, register):
+        if register in (0x90, 0xB0, 0xC0):
+            return b''.join(super(ArrayRFDriver, self).read(register + channel)
+                            for channel in range(8))
+        return super().read(register)
+
+
+def per_channel(driver, wavelengths, amplitudes):
+    for channel in range(8):
+        driver.get_wavelength(channel)
+        driver.get_amplitude(channel)
+        driver.get_modulation(channel)
+    for channel in range(8):
+        driver.set_wavelength(channel, wavelengths[channel])
+        driver.set_amplitude(channel, amplitudes[channel])
+
+
+def bulk(driver, wavelengths, amplitudes):
+    driver.read_channels()
+    driver.write_channels(wavelengths, amplitudes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--latency', type=float, default=0.001,
+                        help='seconds per telegram')
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--arrays', action='store_true',
+                        help='module reads whole channel arrays')
+    args = parser.parse_args()
+
+    module = (ArrayRFDriver if args.arrays
+              else simulator.SimulatedRFDriver)()
+    bus = simulator.simulate('SIM1', module, latency=args.latency)
+    driver = RFDriver(bus.portname, module.address)
+    wavelengths = np.linspace(450, 600, 8)
+    amplitudes = np.full(8, 50.0)
+
+    print('latency %.1f ms, %s' % (args.latency * 1e3, 'channel arrays'
+                                   if args.arrays else 'one register each'))
+    for label, operation in (('per channel', per_channel), ('bulk', bulk)):
+        operation(driver, wavelengths, amplitudes)  # Start from the same state
+        telegrams = bus.telegrams
+        start = time.perf_counter()
+        for repeat in range(args.repeats):
+            wavelengths[repeat % 2] += 1 if repeat % 4 < 2 else -1
+            operation(driver, wavelengths, amplitudes)
+        elapsed = (time.perf_counter() - start) / args.repeats
+        print('%-12s %8.2f ms %8.1f telegrams'
+              % (label, elapsed * 1e3,
+                 (bus.telegrams - telegrams) / args.repeats))
+    bus.detach()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Python overhead of a register property, hand-written against RegisterField.
+
+The register functions of NKTP_DLL are replaced by a layer answering every
+read at once (see :mod:`nkt_tools._hooks`), so only the Python code of the
+property itself is timed. The hand-written property is the code the
+Extreme used before its registers were declared as fields::
+
+    python benchmarks/bench_fields.py --calls 200000
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nkt_tools.NKTP_DLL as nkt  # noqa: E402
+from nkt_tools import _hooks  # noqa: E402
+from nkt_tools.fields import RegisterDevice, RegisterField  # noqa: E402
+
+
+def _answer(name, function):
+    """Layer answering all typed reads with 245, without a backend."""
+    if name.startswith('registerRead') and name != 'registerRead':
+        def read(portname, devId, regId, index):
+            return 0, 245
+        return read
+    return function
+
+
+class HandWritten:
+    """Properties as written before the fields."""
+
+    def __init__(self):
+        self._portname = 'COM1'
+        self._module_address = 15
+
+    portname = property(lambda self: self._portname)
+    module_address = property(lambda self: self._module_address)
+
+    @property
+    def inlet_temperature(self):
+        register_address = 0x11
+        comm_result, value = nkt.registerReadS16(self.portname,
+                                                 self.module_address,
+                                                 register_address, -1)
+        self._inlet_temperature = value / 10
+        return self._inlet_temperature
+
+    @property
+    def pulse_picker_ratio(self):
+        register_address = 0x34
+        comm_result, ratio = nkt.registerReadU16(self.portname,
+                                                 self.module_address,
+                                                 register_address, -1)
+        self._pulse_picker_ratio = ratio
+        return self._pulse_picker_ratio
+
+
+class Declared(RegisterDevice):
+    """The same registers as fields."""
+
+    def __init__(self):
+        self._portname = 'COM1'
+        self._module_address = 15
+
+    inlet_temperature = RegisterField(0x11, 'S16', scale=0.1, readonly=True)
+    pulse_picker_ratio = RegisterField(0x34, 'U16', readonly=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=200000)
+    args = parser.parse_args()
+
+    # Only the answering layer, none of the layers installed on import
+    for _, _, layer in list(_hooks._layers):
+        _hooks.remove(layer)
+    _hooks.install(_answer, 0)
+
+    print('%d reads per property, ns per read' % args.calls)
+    for name in ('inlet_temperature', 'pulse_picker_ratio'):
+        times = []
+        for device in (HandWritten(), Declared()):
+            assert getattr(device, name) in (24.5, 245)
+            times.append(min(timeit.repeat('device.%s' % name,
+                                           globals={'device': device},
+                                           number=args.calls, repeat=5))
+                         / args.calls * 1e9)
+        print('%-20s hand-written %6.0f   field %6.0f' % (name, *times))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Startup cost of importing the nkt_tools modules.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter
+for every module and reports the cumulative import time of the module
+itself, plus the wall time of the whole interpreter compared to an empty
+``python -c pass``. Importing must not print anything, so any output on
+stdout is reported as well.
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['nkt_tools.NKTP_DLL', 'nkt_tools.extreme', 'nkt_tools.varia',
+           'nkt_tools.select', 'nkt_tools.rfdriver', 'nkt_tools.basik']
+
+
+def run(code, repeats):
+    """Return (best wall time, stdout, stderr) of `code` in a subprocess."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)  # Time cached bytecode
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                                  code], capture_output=True, text=True,
+                                 env=env)
+        best = min(best, time.perf_counter() - start)
+    return best, process.stdout, process.stderr
+
+
+def cumulative_us(stderr, module):
+    """Cumulative import time of `module` from -X importtime output."""
+    for line in stderr.splitlines():
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    return None
+
+
+def main(repeats=5):
+    baseline, _, _ = run('pass', repeats)
+    print('%-22s %12s %12s  %s' % ('module', 'import [ms]', 'extra [ms]',
+                                   'stdout'))
+    for module in MODULES:
+        wall, stdout, stderr = run('import %s' % module, repeats)
+        import_us = cumulative_us(stderr, module)
+        print('%-22s %12s %12.1f  %r' % (
+            module, '-' if import_us is None else '%.1f' % (import_us / 1e3),
+            (wall - baseline) * 1e3, stdout))
+
+
+if __name__ == '__main__':
+    main()
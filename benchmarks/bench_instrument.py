@@ -0,0 +1,71 @@
+"""
+Cost of the instrumentation layer, and what it shows for get_channels.
+
+Times register reads through :mod:`nkt_tools.NKTP_DLL` against a simulated
+RF driver (see :mod:`nkt_tools.simulator`) without and with
+:func:`nkt_tools.instrument.enable`, then counts the calls and bytes of one
+``RFDriver.get_channels``::
+
+    python benchmarks/bench_instrument.py --calls 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+import nkt_tools.NKTP_DLL as nkt  # noqa: E402
+from nkt_tools import instrument, simulator  # noqa: E402
+from nkt_tools.rfdriver import RFDriver  # noqa: E402
+
+
+def per_call(calls, portname, address):
+    """Return the seconds per registerReadU16 of the amplitude 0xB0."""
+    read = nkt.registerReadU16
+    start = time.perf_counter()
+    for _ in range(calls):
+        read(portname, address, 0xB0, -1)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    module = simulator.SimulatedRFDriver()
+    bus = simulator.simulate('SIM1', module)
+    nkt.openPorts(bus.portname, 0, 0)
+    address = module.address
+
+    per_call(1000, bus.portname, address)  # Warm up
+    disabled = per_call(args.calls, bus.portname, address)
+    instrument.enable()
+    enabled = per_call(args.calls, bus.portname, address)
+    instrument.disable()
+    print('registerReadU16: %.2f us disabled, %.2f us enabled'
+          ' (+%.2f us per call)' % (disabled * 1e6, enabled * 1e6,
+                                    (enabled - disabled) * 1e6))
+
+    driver = RFDriver(bus.portname, address)
+    instrument.reset()
+    instrument.enable()
+    driver.get_channels(verbose=0)
+    instrument.disable()
+    snapshot = instrument.snapshot()
+    print('get_channels: %d calls, %d bytes read, on %d registers'
+          % (sum(stats['calls'] for stats in snapshot.values()),
+             sum(stats['bytes_read'] for stats in snapshot.values()),
+             len(snapshot)))
+    slowest = max(snapshot.items(), key=lambda item: item[1]['p99'])
+    print('slowest register 0x%02X: p50 %.1f us, p99 %.1f us'
+          % (slowest[0][2], slowest[1]['p50'] * 1e6,
+             slowest[1]['p99'] * 1e6))
+    nkt.closePorts(bus.portname)
+    bus.detach()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Per call latency of the register functions on a recorded Extreme workload.
+
+Runs the same sequence of register calls through :mod:`nkt_tools.NKTP_DLL`
+and reports the mean time per call. By default the interbus backend talks to
+a pty stand-in (see :mod:`loopback`), so the benchmark runs without hardware.
+To compare against the DLL, run it on Windows with a laser attached::
+
+    python benchmarks/bench_interbus.py --backend dll --port COM4
+    python benchmarks/bench_interbus.py --backend interbus --port COM4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Polling loop recorded from Extreme.test_read_funcs plus a power update:
+# (function, register, value)
+WORKLOAD = [
+    ('registerReadU8', 0x6B, None),
+    ('registerReadS16', 0x11, None),
+    ('registerReadU8', 0x30, None),
+    ('registerReadU8', 0x16, None),
+    ('registerRead', 0x32, None),
+    ('registerReadU16', 0x34, None),
+    ('registerReadU8', 0x36, None),
+    ('registerReadU16', 0x37, None),
+    ('registerReadU16', 0x38, None),
+    ('registerReadU16', 0x39, None),
+    ('registerReadU16', 0x66, None),
+    ('registerWriteU16', 0x37, 500),
+]
+EXTREME_REGISTERS = {
+    (15, 0x11): (245).to_bytes(2, 'little'),
+    (15, 0x16): b'\x01',
+    (15, 0x30): b'\x00',
+    (15, 0x32): b'\x02\x00',
+    (15, 0x34): (1).to_bytes(2, 'little'),
+    (15, 0x36): b'\x00',
+    (15, 0x37): (500).to_bytes(2, 'little'),
+    (15, 0x38): (1000).to_bytes(2, 'little'),
+    (15, 0x39): (0).to_bytes(2, 'little'),
+    (15, 0x61): b'\x60',
+    (15, 0x66): (0x0002).to_bytes(2, 'little'),
+    (15, 0x6B): b'\x00',
+}
+
+
+def run(nkt, portname, repeats):
+    """Run the workload `repeats` times, return seconds per call."""
+    calls = [(getattr(nkt, name), register, value)
+             for name, register, value in WORKLOAD]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for function, register, value in calls:
+            if value is None:
+                result, _ = function(portname, 15, register, -1)
+            else:
+                result = function(portname, 15, register, value, -1)
+            if result:
+                raise RuntimeError(nkt.RegisterResultTypes(result))
+    return (time.perf_counter() - start) / (repeats * len(calls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--backend', default='interbus',
+                        choices=['dll', 'interbus'])
+    parser.add_argument('--port', help='Port with an Extreme at address 15.'
+                        ' A pty stand-in is used if omitted.')
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ['NKTP_BACKEND'] = args.backend
+    import nkt_tools.NKTP_DLL as nkt
+
+    bus = None
+    portname = args.port
+    if portname is None:
+        if args.backend == 'dll':
+            parser.error('--port is required for the dll backend')
+        from loopback import PtyBus
+        bus = PtyBus(EXTREME_REGISTERS)
+        portname = bus.portname
+
+    try:
+        dedicated = run(nkt, portname, max(1, args.repeats // 10))
+        nkt.openPorts(portname, 0, 0)
+        opened = run(nkt, portname, args.repeats)
+        nkt.closePorts(portname)
+    finally:
+        if bus is not None:
+            bus.close()
+
+    print('backend: %s, port: %s, %d calls per workload'
+          % (args.backend, portname, len(WORKLOAD)))
+    print('dedicated (port closed): %8.1f us/call' % (dedicated * 1e6))
+    print('port kept open:          %8.1f us/call' % (opened * 1e6))
+
+
+if __name__ == '__main__':
+    main()
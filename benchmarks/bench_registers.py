@@ -0,0 +1,55 @@
+"""
+Parsing the register files against loading the compiled register maps.
+
+Every round builds the register maps of all module types, once by parsing
+``manuals/Register Files`` and once from the compiled module
+``nkt_tools/_register_maps.py`` (imported once, as on a warm start)::
+
+    python benchmarks/bench_registers.py --rounds 20
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from nkt_tools import registers  # noqa: E402
+
+DIRECTORY = os.path.join(ROOT, 'manuals', 'Register Files')
+
+
+def parsed(rounds):
+    """Return seconds per round parsing all register files."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        registers.parse_directory(DIRECTORY)
+    return (time.perf_counter() - start) / rounds
+
+
+def loaded(rounds):
+    """Return seconds per round building all maps from the compiled module."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        registers._maps.clear()
+        for module_type in registers.module_types():
+            registers.load(module_type)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    registers.module_types()  # Import the compiled module outside the timing
+    maps = registers.parse_directory(DIRECTORY)
+    count = sum(len(regmap) for regmap in maps.values())
+    print('%d module types, %d registers' % (len(maps), count))
+    print('parse register files: %8.3f ms' % (parsed(args.rounds) * 1e3))
+    print('load compiled maps:   %8.3f ms' % (loaded(args.rounds) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Record an Extreme session, then replay a million-operation trace from it.
+
+Records the polling workload of ``bench_interbus.py`` against the pty
+stand-in (see :mod:`loopback`) with :class:`nkt_tools.trace.Recorder`,
+repeats the recorded operations into a trace of `--operations` operations
+and replays it through the register functions with
+:class:`nkt_tools.trace.Replay`, without latency and then with the recorded
+latency::
+
+    python benchmarks/bench_replay.py --operations 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+import nkt_tools.NKTP_DLL as nkt  # noqa: E402
+from nkt_tools import trace  # noqa: E402
+
+from bench_interbus import EXTREME_REGISTERS, WORKLOAD  # noqa: E402
+from loopback import PtyBus  # noqa: E402
+
+
+def record(path, repeats):
+    """Record `repeats` runs of the workload, return the operations."""
+    with PtyBus(EXTREME_REGISTERS) as bus:
+        nkt.openPorts(bus.portname, 0, 0)
+        with trace.Recorder(path):
+            for _ in range(repeats):
+                for name, register, value in WORKLOAD:
+                    function = getattr(nkt, name)
+                    if value is None:
+                        function(bus.portname, 15, register, -1)
+                    else:
+                        function(bus.portname, 15, register, value, -1)
+        nkt.closePorts(bus.portname)
+    return list(trace.read(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--operations', type=int, default=1000000)
+    parser.add_argument('--scaled', type=int, default=2000,
+                        help='operations replayed with recorded latency')
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp()
+    recorded = record(os.path.join(folder, 'session.trace'), 20)
+    print('recorded %d operations, mean latency %.1f us'
+          % (len(recorded), sum(op.latency for op in recorded)
+             / len(recorded) * 1e6))
+
+    path = os.path.join(folder, 'million.trace')
+    start = time.perf_counter()
+    with trace.TraceWriter(path) as writer:
+        for number in range(args.operations):
+            writer.write(*recorded[number % len(recorded)])
+    print('wrote %d operations in %.2f s, %.1f bytes per operation'
+          % (args.operations, time.perf_counter() - start,
+             os.path.getsize(path) / args.operations))
+
+    start = time.perf_counter()
+    replay = trace.Replay(path, scale=0)
+    print('loaded in %.2f s' % (time.perf_counter() - start))
+
+    count = len(recorded)
+    with replay:
+        # Functions looked up once the replay layer is installed
+        operations = [(getattr(nkt, op.name), op.portname, op.args,
+                       op.response) for op in recorded]
+        start = time.perf_counter()
+        for number in range(args.operations):
+            function, portname, arguments, response = \
+                operations[number % count]
+            if function(portname, *arguments) != response:
+                raise RuntimeError('%r diverged from the trace'
+                                   % (recorded[number % count],))
+        elapsed = time.perf_counter() - start
+    print('replayed %d operations in %.2f s: %.0f operations/s, %.2f us each'
+          % (args.operations, elapsed, args.operations / elapsed,
+             elapsed / args.operations * 1e6))
+
+    replay.rewind()
+    replay.scale = 1.0
+    expected = sum(recorded[number % count].latency
+                   for number in range(args.scaled))
+    with replay:
+        start = time.perf_counter()
+        operations = [(getattr(nkt, op.name), op.portname, op.args)
+                      for op in recorded]
+        for number in range(args.scaled):
+            function, portname, arguments = operations[number % count]
+            function(portname, *arguments)
+        elapsed = time.perf_counter() - start
+    print('replayed %d operations at recorded latency in %.2f s '
+          '(recorded %.2f s)' % (args.scaled, elapsed, expected))
+
+    for name in os.listdir(folder):
+        os.remove(os.path.join(folder, name))
+    os.rmdir(folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Load test of the device server.
+
+Serves `--ports` simulated buses (see :mod:`nkt_tools.simulator`), each
+with an Extreme, a Varia, a Select, an RF driver and a BASIK, from a
+:class:`nkt_tools.server.Server`, and runs `--clients` client processes for
+`--seconds`. Every request of a client is a batch of `--batch` property
+reads of random devices, a fraction `--writes` of them a set_power instead.
+Prints the requests and calls per second, the latency percentiles of the
+requests and the reads the server coalesced::
+
+    python benchmarks/bench_server.py --clients 8 --batch 4
+    python benchmarks/bench_server.py --ports 4 --latency 0.0005
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+import numpy as np  # noqa: E402
+
+from nkt_tools import server, simulator  # noqa: E402
+from nkt_tools.discovery import Registry, scan_port  # noqa: E402
+
+READS = {'Extreme': ('inlet_temperature', 'power_level', 'emission_state'),
+         'Varia': ('short_setpoint', 'long_setpoint', 'monitor_input'),
+         'Select': ('monitor_1_readout', 'monitor_2_readout'),
+         'BASIK': ('temperature',)}
+"""Properties read per device class."""
+
+
+def client(address, seconds, batch, writes, seed, results):
+    generator = random.Random(seed)
+    with server.Client(address) as connection:
+        devices = [(name, api['class'])
+                   for name, api in connection.devices().items()
+                   if api['class'] in READS]
+        latencies = []
+        failures = 0
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            calls = []
+            for _ in range(batch):
+                name, cls = generator.choice(devices)
+                if cls == 'Extreme' and generator.random() < writes:
+                    calls.append((name, 'call', 'set_power',
+                                  [generator.randrange(20, 60)]))
+                else:
+                    calls.append((name, 'get',
+                                  generator.choice(READS[cls])))
+            start = time.perf_counter()
+            values = connection.batch(calls)
+            latencies.append(time.perf_counter() - start)
+            failures += sum(isinstance(value, server.RemoteError)
+                            for value in values)
+    results.put((latencies, failures))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ports', type=int, default=2)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=4,
+                        help='calls per request')
+    parser.add_argument('--writes', type=float, default=0.05,
+                        help='fraction of the Extreme calls writing')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds per telegram')
+    args = parser.parse_args()
+
+    modules = []
+    for number in range(args.ports):
+        portname = 'SIM%d' % (number + 1)
+        simulator.simulate(portname, simulator.SimulatedExtreme(),
+                           simulator.SimulatedVaria(),
+                           simulator.SimulatedSelect(),
+                           simulator.SimulatedRFDriver(),
+                           simulator.SimulatedBASIK(), latency=args.latency)
+        modules.extend(scan_port(portname))
+    address = os.path.join(tempfile.mkdtemp(), 'nkt.sock')
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    with server.Server(Registry(modules).devices(), address) as service:
+        processes = [context.Process(target=client, args=(
+            address, args.seconds, args.batch, args.writes, number, results))
+            for number in range(args.clients)]
+        for process in processes:
+            process.start()
+        collected = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        stats = dict(service.stats)
+
+    latencies = np.concatenate([latency for latency, _ in collected])
+    failures = sum(failed for _, failed in collected)
+    print('%d ports, %d clients, %d calls per request, latency %.1f us'
+          % (args.ports, args.clients, args.batch, args.latency * 1e6))
+    print('requests: %d (%.0f/s)   calls: %d (%.0f/s)   failed: %d'
+          % (len(latencies), len(latencies) / args.seconds,
+             stats['calls'], stats['calls'] / args.seconds, failures))
+    print('latency p50 %.2f ms, p90 %.2f ms, p99 %.2f ms, max %.2f ms'
+          % tuple(np.percentile(latencies, [50, 90, 99, 100]) * 1e3))
+    print('coalesced reads: %d (%.1f%% of the calls)'
+          % (stats['coalesced'], 100 * stats['coalesced']
+             / max(stats['calls'], 1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Readers of a shared memory segment against a publisher writing it.
+
+Publishes two registers of a simulated Extreme (see
+:mod:`nkt_tools.simulator`) whose content changes with every sample, always
+both to the same value, at `--rate` samples per second with a
+:class:`nkt_tools.shared.Publisher`. `--readers` processes then take
+snapshots for `--seconds` as fast as they can. Prints the snapshots per
+second and time per snapshot of every reader, the retries the seqlock
+caused and the torn snapshots (the two values differing), which must be 0::
+
+    python benchmarks/bench_shared.py --readers 4 --rate 1000
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+from nkt_tools import shared, simulator, telemetry  # noqa: E402
+
+
+class CountingExtreme(simulator.SimulatedExtreme):
+    """Extreme whose registers 0x37 and 0x38 count the reads of 0x37."""
+
+    reads = 0
+
+    def read(self, register):
+        if register == 0x37:
+            self.reads = (self.reads + 1) % 1000
+        if register in (0x37, 0x38):
+            return self.reads.to_bytes(2, 'little')
+        return super().read(register)
+
+
+def reader(name, seconds, results):
+    with shared.Reader(name) as segment:
+        snapshot = segment.snapshot
+        count = torn = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            values = snapshot()
+            torn += values['power_level'] != values['current_level']
+            count += 1
+        elapsed = time.perf_counter() - start
+        results.put((count / elapsed, segment.retries, torn))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--rate', type=float, default=1000.0,
+                        help='samples published per second')
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    module = CountingExtreme()
+    bus = simulator.simulate('SIM1', module)
+    columns = [telemetry.Column('power_level', bus.portname, module.address,
+                                0x37, 'U16'),
+               telemetry.Column('current_level', bus.portname,
+                                module.address, 0x38, 'U16'),
+               telemetry.Column('status_bits', bus.portname, module.address,
+                                0x66, 'U16')]
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    with shared.Publisher(columns, rate=args.rate) as publisher:
+        processes = [context.Process(target=reader, args=(
+            publisher.name, args.seconds, results))
+            for _ in range(args.readers)]
+        for process in processes:
+            process.start()
+        for number, process in enumerate(processes):
+            rate, retries, torn = results.get()
+            print('reader %d: %9.0f snapshots/s %6.2f us, %d retries,'
+                  ' %d torn' % (number, rate, 1e6 / rate, retries, torn))
+        for process in processes:
+            process.join()
+    print('published %d samples, %d skipped' % (publisher.published,
+                                                publisher.missed))
+    bus.detach()
+
+
+if __name__ == '__main__':
+    main()
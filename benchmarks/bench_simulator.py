@@ -0,0 +1,133 @@
+"""
+Load test of the device classes against simulated buses.
+
+Attaches `--ports` simulated buses (see :mod:`nkt_tools.simulator`), each
+with an Extreme, a Varia, a Select, an RF driver and a BASIK, and drives the
+unmodified device classes on every port from one thread per port for
+`--seconds`: property reads, verified setpoint writes and bit updates.
+Prints the operations and telegrams per second and the errors injected and
+seen by the device classes::
+
+    python benchmarks/bench_simulator.py --ports 8 --latency 0.0005
+    python benchmarks/bench_simulator.py --busy 0.01 --crc 0.001
+"""
+import argparse
+from collections import Counter
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+import nkt_tools.NKTP_DLL as nkt  # noqa: E402
+from nkt_tools import simulator  # noqa: E402
+from nkt_tools.basik import BASIK  # noqa: E402
+from nkt_tools.extreme import Extreme  # noqa: E402
+from nkt_tools.rfdriver import RFDriver  # noqa: E402
+from nkt_tools.select import Select  # noqa: E402
+from nkt_tools.varia import Varia  # noqa: E402
+
+
+def workload(portname):
+    """Return the operations run on one port, as callables."""
+    laser = Extreme(portname)
+    varia = Varia(portname, simulator.SimulatedVaria.default_address)
+    select = Select(portname, simulator.SimulatedSelect.default_address)
+    driver = RFDriver(portname, simulator.SimulatedRFDriver.default_address)
+    basik = BASIK(portname, simulator.SimulatedBASIK.default_address)
+    counter = [0]
+
+    def setpoints():
+        counter[0] += 1
+        laser.set_power(40 + counter[0] % 20, verify=True)
+        varia.long_setpoint = 550 + counter[0] % 50
+        driver.set_amplitude(counter[0] % 8, counter[0] % 100, verify=True)
+
+    return [lambda: laser.emission_state,
+            lambda: laser.inlet_temperature,
+            lambda: laser.power_level,
+            lambda: varia.short_setpoint,
+            lambda: varia.monitor_input,
+            lambda: select.monitor_1_readout,
+            lambda: driver.get_wavelength(counter[0] % 8),
+            lambda: basik.temperature,
+            lambda: basik.update_setup(set=counter[0] % 2 * 0x10,
+                                       unset=(counter[0] + 1) % 2 * 0x10),
+            setpoints]
+
+
+def drive(portname, seconds, results):
+    """Run the workload of `portname` until `seconds` have passed."""
+    operations = workload(portname)
+    count = 0
+    failures = Counter()
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        for operation in operations:
+            try:
+                operation()
+            except (ConnectionError, ValueError) as error:
+                failures[type(error).__name__] += 1
+            count += 1
+    results[portname] = count, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ports', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds per telegram')
+    parser.add_argument('--busy', type=float, default=0.0,
+                        help='probability of a busy answer')
+    parser.add_argument('--timeout', type=float, default=0.0,
+                        help='probability of no answer')
+    parser.add_argument('--crc', type=float, default=0.0,
+                        help='probability of a CRC error')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    buses = []
+    for number in range(args.ports):
+        portname = 'SIM%d' % (number + 1)
+        buses.append(simulator.simulate(
+            portname, simulator.SimulatedExtreme(),
+            simulator.SimulatedVaria(), simulator.SimulatedSelect(),
+            simulator.SimulatedRFDriver(), simulator.SimulatedBASIK(),
+            latency=args.latency, busy=args.busy, timeout=args.timeout,
+            crc=args.crc, seed=args.seed + number))
+        nkt.openPorts(portname, 0, 0)
+
+    results = {}
+    threads = [threading.Thread(target=drive, args=(bus.portname,
+                                                    args.seconds, results))
+               for bus in buses]
+    for bus in buses:
+        bus.telegrams = 0
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    operations = sum(count for count, _ in results.values())
+    telegrams = sum(bus.telegrams for bus in buses)
+    injected = sum((bus.errors for bus in buses), Counter())
+    failures = sum((failures for _, failures in results.values()), Counter())
+    print('%d ports, %.1f s, latency %.1f us'
+          % (args.ports, elapsed, args.latency * 1e6))
+    print('operations: %d (%.0f/s)   telegrams: %d (%.0f/s)'
+          % (operations, operations / elapsed, telegrams,
+             telegrams / elapsed))
+    print('injected errors: %s' % (dict(injected) or 'none'))
+    print('raised by the device classes: %s' % (dict(failures) or 'none'))
+    for bus in buses:
+        nkt.closePorts(bus.portname)
+        bus.detach()
+
+
+if __name__ == '__main__':
+    main()
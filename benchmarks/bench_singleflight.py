@@ -0,0 +1,84 @@
+"""
+Bus transactions of concurrent identical reads, with and without sharing.
+
+Runs `--threads` dashboard threads against a simulated Extreme (see
+:mod:`nkt_tools.simulator`) answering after `--latency` seconds, each
+reading ``emission_state`` and the 0x66 status bits in a loop for
+`--seconds`, once as they are and once with
+:func:`nkt_tools.singleflight.enable`. The dispatcher serializes the port
+in both runs. Prints the reads per second, the telegrams on the bus and
+the transactions saved::
+
+    python benchmarks/bench_singleflight.py --threads 8 --latency 0.001
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+import nkt_tools.NKTP_DLL as nkt  # noqa: E402
+from nkt_tools import dispatch, simulator, singleflight  # noqa: E402
+from nkt_tools.extreme import Extreme  # noqa: E402
+
+
+def dashboard(laser, seconds, counts):
+    reads = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        laser.emission_state
+        nkt.deviceGetStatusBits(laser.portname, laser.module_address)
+        reads += 2
+    counts.append(reads)
+
+
+def run(laser, bus, threads, seconds):
+    """Return the reads and telegrams of `threads` dashboards."""
+    counts = []
+    workers = [threading.Thread(target=dashboard,
+                                args=(laser, seconds, counts))
+               for _ in range(threads)]
+    telegrams = bus.telegrams
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(counts), bus.telegrams - telegrams
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--latency', type=float, default=0.001,
+                        help='seconds per telegram')
+    args = parser.parse_args()
+
+    bus = simulator.simulate('SIM1', simulator.SimulatedExtreme(),
+                             latency=args.latency)
+    laser = Extreme(bus.portname)
+    dispatch.enable()
+    print('%d threads, latency %.1f ms' % (args.threads, args.latency * 1e3))
+    for label in ('unshared', 'singleflight'):
+        if label == 'singleflight':
+            singleflight.enable()
+        reads, telegrams = run(laser, bus, args.threads, args.seconds)
+        print('%-12s %8.0f reads/s %8d telegrams %6.2f reads/telegram'
+              % (label, reads / args.seconds, telegrams,
+                 reads / max(telegrams, 1)))
+    stats = singleflight.stats()
+    print('transactions %d, saved %d' % (stats['transactions'],
+                                         stats['saved']))
+    for (portname, devId, regId), saved in sorted(
+            stats['saved_by_register'].items()):
+        print('  %s %d 0x%02X: %d saved' % (portname, devId, regId, saved))
+    singleflight.disable()
+    dispatch.disable()
+    bus.detach()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Device snapshots against reading the properties one at a time.
+
+Simulates `--ports` buses (see :mod:`nkt_tools.simulator`), each with an
+Extreme, a Varia, a Select and an RF driver answering after `--latency`
+seconds, with the cache enabled. Reads all fields of every device
+`--repeat` times, once property by property, once with
+:meth:`~nkt_tools.fields.RegisterDevice.snapshot` per device and once with
+:func:`nkt_tools.fields.snapshot_many`. Prints the time and telegrams per
+round::
+
+    python benchmarks/bench_snapshot.py --ports 4 --latency 0.001
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+from nkt_tools import cache, simulator  # noqa: E402
+from nkt_tools.discovery import Registry, scan_port  # noqa: E402
+from nkt_tools.fields import RegisterDevice, snapshot_many  # noqa: E402
+
+
+def properties(devices):
+    return [{name: getattr(device, name) for name in device.fields()}
+            for device in devices]
+
+
+def snapshots(devices):
+    return [device.snapshot() for device in devices]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ports', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.001,
+                        help='seconds per telegram')
+    args = parser.parse_args()
+
+    buses = []
+    modules = []
+    for number in range(args.ports):
+        portname = 'SIM%d' % (number + 1)
+        buses.append(simulator.simulate(
+            portname, simulator.SimulatedExtreme(),
+            simulator.SimulatedVaria(), simulator.SimulatedSelect(),
+            simulator.SimulatedRFDriver(), latency=args.latency))
+        modules.extend(scan_port(portname))
+    devices = [device for device in Registry(modules).devices()
+               if isinstance(device, RegisterDevice)]
+    cache.enable()
+    print('%d devices on %d ports, latency %.1f ms'
+          % (len(devices), args.ports, args.latency * 1e3))
+    for label, read in (('properties', properties), ('snapshot', snapshots),
+                        ('snapshot_many', snapshot_many)):
+        read(devices)  # Fill the cache
+        telegrams = sum(bus.telegrams for bus in buses)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            read(devices)
+        elapsed = (time.perf_counter() - start) / args.repeat
+        telegrams = (sum(bus.telegrams for bus in buses)
+                     - telegrams) / args.repeat
+        print('%-14s %8.1f ms %6.0f telegrams per round'
+              % (label, elapsed * 1e3, telegrams))
+    cache.disable()
+    for bus in buses:
+        bus.detach()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Telemetry logger against a loop over the Extreme properties.
+
+Logs inlet temperature, power level, current level and status bits of a
+simulated Extreme (see :mod:`nkt_tools.simulator`) at `--rate` samples per
+second for `--seconds`, once with a loop reading the properties and
+appending them to lists, and once with a
+:class:`nkt_tools.telemetry.Logger`, spilling to `--path` if given. Prints
+the samples taken per second and the memory still allocated at the end, as
+traced by :mod:`tracemalloc`. The loop catches up on late samples in bursts,
+the Logger skips samples more than a period late and counts them::
+
+    python benchmarks/bench_telemetry.py --rate 1000 --seconds 10
+    python benchmarks/bench_telemetry.py --path /tmp/extreme.parquet
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['NKTP_BACKEND'] = 'interbus'
+
+import nkt_tools.NKTP_DLL as nkt  # noqa: E402
+from nkt_tools import simulator, telemetry  # noqa: E402
+from nkt_tools.extreme import Extreme  # noqa: E402
+
+
+def property_loop(laser, rate, seconds, path, capacity):
+    """Return the samples taken, and the lists they were appended to."""
+    times, temperatures, powers, currents, status = [], [], [], [], []
+    period = 1 / rate
+    deadline = time.monotonic()
+    end = deadline + seconds
+    while deadline < end:
+        times.append(time.monotonic_ns())
+        temperatures.append(laser.inlet_temperature)
+        powers.append(laser.power_level)
+        currents.append(laser.current_level)
+        status.append(nkt.registerReadU16(laser.portname, 15, 0x66, -1)[1])
+        deadline += period
+        time.sleep(max(0, deadline - time.monotonic()))
+    return len(times), (times, temperatures, powers, currents, status)
+
+
+def logger(laser, rate, seconds, path, capacity):
+    """Return the samples taken by a Logger, and the logger."""
+    columns = telemetry.fields(laser, 'inlet_temperature', 'power_level',
+                               'current_level', ('status_bits', 0x66, 'U16'))
+    log = telemetry.Logger(columns, rate=rate, capacity=capacity, path=path,
+                           chunk=capacity // 4)
+    with log:
+        time.sleep(seconds)
+    return log.written, log
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    samples, data = function(*args)  # Kept alive until measured
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    missed = getattr(data, 'missed', 0)
+    del data
+    return samples / elapsed, missed, allocated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rate', type=float, default=1000.0,
+                        help='samples per second')
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--capacity', type=int, default=100000)
+    parser.add_argument('--path', help='.parquet or .h5 file to spill to')
+    args = parser.parse_args()
+
+    bus = simulator.simulate('SIM1', simulator.SimulatedExtreme())
+    laser = Extreme(bus.portname)
+    nkt.openPorts(bus.portname, 0, 0)
+    print('%g samples/s for %g s, traced by tracemalloc'
+          % (args.rate, args.seconds))
+    for label, function in (('properties', property_loop),
+                            ('Logger', logger)):
+        rate, missed, allocated = measure(function, laser, args.rate,
+                                          args.seconds, args.path,
+                                          args.capacity)
+        print('%-10s %8.0f samples/s %6d skipped %9.1f kB allocated'
+              % (label, rate, missed, allocated / 1e3))
+    nkt.closePorts(bus.portname)
+    bus.detach()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Set-and-verify and read-modify-write, separate calls against registerWriteRead.
+
+Times a verified setpoint write and a verified update of the BASIK setup
+bits (register 0x31) with the register functions of
+:mod:`nkt_tools.NKTP_DLL`:
+
+* separate: write, then read back (set), read, write and read back (update),
+  as the setters did before.
+* write/read: one registerWriteRead (set), one read and one
+  registerWriteRead, or the read only if no bit changes (update), as the
+  setters do with ``verify_writes``.
+
+Interbus itself has no combined write/read telegram, so the number of
+telegrams only drops where an update changes nothing. Every call saved is
+one port opening in dedicated mode and one trip through the layers (e.g.
+the dispatcher thread).
+
+By default the interbus backend talks to a pty stand-in (see
+:mod:`loopback`) answering after `--delay` seconds::
+
+    python benchmarks/bench_verify.py --delay 0.001
+    python benchmarks/bench_verify.py --backend dll --port COM4 --address 1
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASIK_REGISTERS = {
+    (1, 0x31): (0x0008).to_bytes(2, 'little'),  # Setup
+    (1, 0x61): b'\x33',
+}
+
+WL_MODULATION_INTERNAL = 0x10
+
+
+def toggle(repeat):
+    """(set, unset) switching internal modulation on and off."""
+    return ((WL_MODULATION_INTERNAL, 0) if repeat % 2
+            else (0, WL_MODULATION_INTERNAL))
+
+
+def keep(repeat):
+    """(set, unset) setting a bit which is already set."""
+    return 0x0008, 0
+
+
+def separate_set(nkt, portname, address, value):
+    nkt.registerWriteU16(portname, address, 0x31, value, -1)
+    return nkt.registerReadU16(portname, address, 0x31, -1)[1] == value
+
+
+def combined_set(nkt, portname, address, value):
+    return nkt.registerWriteReadU16(portname, address, 0x31, value,
+                                    -1)[1] == value
+
+
+def separate_update(nkt, portname, address, bits):
+    set, unset = bits
+    setup = nkt.registerReadU16(portname, address, 0x31, -1)[1]
+    value = (setup | set) & ~unset
+    nkt.registerWriteU16(portname, address, 0x31, value, -1)
+    return nkt.registerReadU16(portname, address, 0x31, -1)[1] == value
+
+
+def combined_update(nkt, portname, address, bits):
+    set, unset = bits
+    setup = nkt.registerReadU16(portname, address, 0x31, -1)[1]
+    value = (setup | set) & ~unset
+    if value == setup:
+        return True
+    return nkt.registerWriteReadU16(portname, address, 0x31, value,
+                                    -1)[1] == value
+
+
+def run(nkt, operation, portname, address, repeats, argument):
+    """Return (seconds, calls) per operation."""
+    calls = [0]
+    functions = {}
+    for name in ('registerReadU16', 'registerWriteU16',
+                 'registerWriteReadU16'):
+        def counted(*args, function=getattr(nkt, name)):
+            calls[0] += 1
+            return function(*args)
+        functions[name] = counted
+    counting = type(nkt)('counting')
+    vars(counting).update(functions)
+
+    start = time.perf_counter()
+    for repeat in range(repeats):
+        value = argument(repeat)
+        if not operation(counting, portname, address, value):
+            raise RuntimeError('Register 0x31 did not read back %r' % value)
+    return (time.perf_counter() - start) / repeats, calls[0] / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--backend', default='interbus',
+                        choices=['dll', 'interbus'])
+    parser.add_argument('--port', help='Port with a BASIK at `address`.'
+                        ' A pty stand-in is used if omitted.')
+    parser.add_argument('--address', type=int, default=1)
+    parser.add_argument('--delay', type=float, default=0.0005,
+                        help='answer delay of the stand-in in seconds')
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ['NKTP_BACKEND'] = args.backend
+    import nkt_tools.NKTP_DLL as nkt
+
+    bus = None
+    portname = args.port
+    if portname is None:
+        if args.backend == 'dll':
+            parser.error('--port is required for the dll backend')
+        from loopback import PtyBus
+        bus = PtyBus(BASIK_REGISTERS, delay=args.delay)
+        portname = bus.portname
+
+    rows = []
+    try:
+        for mode in ('dedicated', 'open'):
+            if mode == 'open':
+                nkt.openPorts(portname, 0, 0)
+            repeats = args.repeats // 10 if mode == 'dedicated' \
+                else args.repeats
+            for label, operation, argument in (
+                    ('set, separate', separate_set,
+                     lambda repeat: repeat % 2 * 0x200 + 8),
+                    ('set, write/read', combined_set,
+                     lambda repeat: repeat % 2 * 0x200 + 8),
+                    ('update, separate', separate_update, toggle),
+                    ('update, write/read', combined_update, toggle),
+                    ('no change, separate', separate_update, keep),
+                    ('no change, write/read', combined_update, keep)):
+                telegrams = bus.telegrams if bus else 0
+                seconds, calls = run(nkt, operation, portname, args.address,
+                                     max(1, repeats), argument)
+                telegrams = ((bus.telegrams - telegrams) / max(1, repeats)
+                             if bus else float('nan'))
+                rows.append((mode, label, seconds, calls, telegrams))
+            if mode == 'open':
+                nkt.closePorts(portname)
+    finally:
+        if bus is not None:
+            bus.close()
+
+    print('backend: %s, port: %s' % (args.backend, portname))
+    print('%-10s %-22s %10s %8s %10s'
+          % ('port', 'operation', 'us/op', 'calls', 'telegrams'))
+    for mode, label, seconds, calls, telegrams in rows:
+        print('%-10s %-22s %10.1f %8.1f %10.1f'
+              % (mode, label, seconds * 1e6, calls, telegrams))
+
+
+if __name__ == '__main__':
+    main()
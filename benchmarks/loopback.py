@@ -0,0 +1,93 @@
+"""
+Pty based stand-in for NKT modules, used by the benchmarks.
+
+:class:`PtyBus` opens a pseudo terminal and answers Interbus telegrams on it
+like a bus with the given modules would. The slave side of the pty is a
+regular serial device, so it can be handed to the interbus backend as a
+portname.
+"""
+import os
+import select
+import threading
+import time
+import tty
+
+from nkt_tools import interbus
+
+
+class PtyBus:
+    """Answer Interbus telegrams from an in-memory register table."""
+
+    def __init__(self, registers, delay=0.0):
+        """
+        Open the pty and start answering telegrams.
+
+        Parameters
+        ----------
+        registers : dict
+            {(module address, register): bytes} initial register content.
+            Every address appearing in the table answers, unknown registers
+            on those addresses are nacked.
+        delay : float, optional
+            Seconds to wait before each answer, to mimic the transfer time
+            and module latency of a real bus. 0 by default.
+        """
+        self.registers = dict(registers)
+        self.delay = delay
+        self.addresses = {address for address, _ in self.registers}
+        self.telegrams = 0  # Number of telegrams answered
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.portname = os.ttyname(self._slave)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stop answering and close the pty."""
+        self._running = False
+        self._thread.join()
+        os.close(self._master)
+        os.close(self._slave)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _answer(self, telegram):
+        request = interbus.decode_telegram(telegram)
+        if request is None:
+            return None
+        dest, source, msg_type, register, data = request
+        if dest not in self.addresses:
+            return None  # Nobody home, the host times out
+        key = (dest, register)
+        if key not in self.registers:
+            msg_type, data = interbus.NACK, b''
+        elif msg_type == interbus.READ:
+            msg_type, data = interbus.DATAGRAM, self.registers[key]
+        elif msg_type == interbus.WRITE:
+            self.registers[key] = bytes(data)
+            msg_type, data = interbus.ACK, b''
+        else:
+            msg_type, data = interbus.NACK, b''
+        self.telegrams += 1
+        return interbus.encode_telegram(source, dest, msg_type, register,
+                                        data)
+
+    def _serve(self):
+        buffer = b''
+        while self._running:
+            ready, _, _ = select.select([self._master], [], [], 0.05)
+            if not ready:
+                continue
+            buffer += os.read(self._master, 4096)
+            while b'\n' in buffer:
+                telegram, buffer = buffer.split(b'\n', 1)
+                response = self._answer(telegram + b'\n')
+                if response is not None:
+                    if self.delay:
+                        time.sleep(self.delay)
+                    os.write(self._master, response)
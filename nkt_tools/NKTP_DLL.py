@@ -1,24 +1,179 @@
 """Imports NKT Photonics DLL to use for accessing equipment.
-This file is taken as is from NKT with very minor updates"""
+This file is taken as is from NKT with very minor updates
+
+The backend is selected with the NKTP_BACKEND environment variable when this
+module is imported:
+
+* ``dll`` (default): NKTPDLL.dll through ctypes (Windows only).
+* ``interbus``: pure-Python Interbus telegrams over a serial port, see
+  :mod:`nkt_tools.interbus`. Works on any OS with pyserial installed.
+"""
 # Testing
 import ctypes
 import os
+import threading
 from ctypes import (c_ubyte, c_short, c_ushort, c_long, c_ulong, c_ulonglong,
                     c_longlong, c_byte, c_void_p, c_float, c_double, c_char,
-                    c_char_p, POINTER, CFUNCTYPE, create_string_buffer, byref)
+                    c_char_p, POINTER, CFUNCTYPE, create_string_buffer, byref,
+                    string_at)
 from collections import namedtuple
+from enum import IntEnum
+
+NKTP_BACKEND = os.environ.get('NKTP_BACKEND', 'dll').lower()
+if NKTP_BACKEND not in ('dll', 'interbus'):
+    raise ValueError('Unknown NKTP_BACKEND %r, use "dll" or "interbus"'
+                     % NKTP_BACKEND)
+
+# The DLL, x86 or x64 depending on the interpreter, is loaded on first use and
+# every function prototype is only bound when it is called the first time, so
+# importing this module has no side effects and costs next to nothing.
+# Set NKTP_SDK_PATH to use the DLL from an installed SDK instead of the copy
+# shipped with nkt_tools.
+dllFolder = os.environ.get('NKTP_SDK_PATH', os.path.dirname(__file__))
+NKTPDLL = None
+
+
+def _library():
+    """Load NKTPDLL.dll on first use and return it."""
+    global NKTPDLL
+    if NKTPDLL is None:
+        if NKTP_BACKEND != 'dll':
+            raise NotImplementedError('NKTPDLL is not used by the %s backend'
+                                      % NKTP_BACKEND)
+        arch = 'x86' if ctypes.sizeof(ctypes.c_voidp) == 4 else 'x64'
+        NKTPDLL = ctypes.cdll.LoadLibrary(
+            os.path.join(dllFolder, 'NKTPDLL', arch, 'NKTPDLL.dll'))
+    return NKTPDLL
+
+
+class _LazyFunction:
+    """
+    Placeholder for a DLL function, bound to the DLL when first called.
+
+    On the first call the real ctypes function replaces the placeholder in
+    the module namespace (under the name '_' + name), so later calls go
+    straight to the DLL without any indirection.
+    """
+
+    __slots__ = ('_name', '_restype', '_argtypes', '_function')
+
+    def __init__(self, name, restype, argtypes):
+        self._name = name
+        self._restype = restype
+        self._argtypes = argtypes
+        self._function = None
+
+    def __call__(self, *args):
+        if self._function is None:
+            try:
+                library = _library()
+            except NotImplementedError:
+                raise NotImplementedError(
+                    '%s is not available with the %s backend'
+                    % (self._name, NKTP_BACKEND)) from None
+            prototype = CFUNCTYPE(self._restype, *self._argtypes)
+            self._function = prototype((self._name, library))
+            globals()['_' + self._name] = self._function
+        return self._function(*args)
+
+    def __repr__(self):
+        return '<unbound NKTPDLL function %s>' % self._name
+
+
+def _bind(name, restype, *argtypes):
+    """Declare the DLL function `name`, bound lazily on first call."""
+    return _LazyFunction(name, restype, argtypes)
+
+
+# The register and device wrappers below run in tight polling loops. Instead
+# of encoding the port name and allocating fresh ctypes out-parameters on
+# every call, they use the name encoded once per port and out-parameters
+# allocated once per thread. Values are copied out of the buffers before a
+# wrapper returns, so the buffers are free again for the next call.
+class _Buffers(threading.local):
+    """Out-parameters of the DLL functions, one set per thread."""
+
+    def __init__(self):
+        self.u8 = c_ubyte()
+        self.s8 = c_byte()
+        self.u16 = c_ushort()
+        self.s16 = c_short()
+        self.u32 = c_ulong()
+        self.s32 = c_long()
+        self.u64 = c_ulonglong()
+        self.s64 = c_longlong()
+        self.f32 = c_float()
+        self.f64 = c_double()
+        self.size = c_ubyte()
+        self.data = create_string_buffer(255)
+        self.view = memoryview(self.data).cast('B')
+
+
+_out = _Buffers()
+
+
+class PortHandle:
+    """
+    Port name encoded once, with raw reads into pooled storage.
+
+    Get the handle of a port with :func:`port_handle`. The wrappers of this
+    module use the same handles, so any port name is only encoded once.
+    """
+
+    __slots__ = ('portname', 'encoded')
+
+    def __init__(self, portname):
+        self.portname = portname
+        self.encoded = portname.encode('ascii')
 
-# Try preloading the OS related DLL, x86 or x64.
-# Alternatively copy the correct version into your script folder.
+    def read_raw(self, devId, regId, index=-1):
+        """
+        Read a register into the buffer of the calling thread (DLL backend).
 
-# dllFolder = os.environ.get('NKTP_SDK_PATH',r'C:\NKTP_SDK')
-dllFolder = os.path.dirname(__file__)
-if (ctypes.sizeof(ctypes.c_voidp) == 4):
-    print('Loading x86 DLL from:', dllFolder + r'\NKTPDLL\x86\NKTPDLL.dll')
-    NKTPDLL = ctypes.cdll.LoadLibrary(dllFolder + r'\NKTPDLL\x86\NKTPDLL.dll')
-else:
-    print('Loading x64 DLL from:', dllFolder + r'\NKTPDLL\x64\NKTPDLL.dll')
-    NKTPDLL = ctypes.cdll.LoadLibrary(dllFolder + r'\NKTPDLL\x64\NKTPDLL.dll')
+        Like :func:`registerRead`, without copying the content into new
+        bytes.
+
+        Returns
+        -------
+        tuple
+            (RegisterResultTypes, memoryview). The view is only valid until
+            the next call of the same thread, copy it to keep the content.
+        """
+        size = _out.size
+        size.value = 255
+        result = _registerRead(self.encoded, devId, regId, _out.data, size,
+                               index)
+        return result, _out.view[:size.value if not result else 0]
+
+    def __repr__(self):
+        return '<PortHandle %s>' % self.portname
+
+
+_handles = {}  # portname > PortHandle
+
+
+def port_handle(portname):
+    """Return the :class:`PortHandle` of `portname`, created once per name."""
+    handle = _handles.get(portname)
+    if handle is None:
+        handle = _handles.setdefault(portname, PortHandle(portname))
+    return handle
+
+
+def _string(result, buffer, size):
+    """Return the zero terminated string in the first `size` bytes."""
+    if result:
+        return b''
+    data = string_at(buffer, size.value)
+    end = data.find(b'\x00')
+    return data if end < 0 else data[:end]
+
+
+def _encoded(portname):
+    try:
+        return _handles[portname].encoded
+    except KeyError:
+        return port_handle(portname).encoded
 
 
 def PortResultTypes(result):
@@ -247,8 +402,8 @@ class tParamSetStruct(ctypes.Structure):
 #
 # extern "C" NKTPDLL_EXPORT void getAllPorts(char *portnames, unsigned short *maxLen);
 # typedef void (__cdecl *GetAllPortsFuncPtr)(char *portnames, unsigned short *maxLen);
-_getAllPorts = CFUNCTYPE(None, POINTER(c_char), POINTER(
-    c_ushort))(('getAllPorts', NKTPDLL))
+_getAllPorts = _bind('getAllPorts', None, POINTER(c_char), POINTER(
+    c_ushort))
 
 
 def getAllPorts():
@@ -264,8 +419,8 @@ def getAllPorts():
 #
 # extern "C" NKTPDLL_EXPORT void getOpenPorts(char *portnames, unsigned short *maxLen);
 # typedef void (__cdecl *GetOpenPortsFuncPtr)(char *portnames, unsigned short *maxLen);
-_getOpenPorts = CFUNCTYPE(None, POINTER(c_char), POINTER(
-    c_ushort))(('getOpenPorts', NKTPDLL))
+_getOpenPorts = _bind('getOpenPorts', None, POINTER(c_char), POINTER(
+    c_ushort))
 
 
 def getOpenPorts():
@@ -292,8 +447,8 @@ pointToPointPortData = namedtuple(
 #
 # extern "C" NKTPDLL_EXPORT P2PPortResultTypes pointToPointPortAdd(const char *portname, const char *hostAddress, const unsigned short hostPort, const char *clientAddress, const unsigned short clientPort, const unsigned char protocol, const unsigned char msTimeout);
 # typedef P2PPortResultTypes (__cdecl *PointToPointPortAddFuncPtr)(const char *portname, const char *hostAddress, const unsigned short hostPort, const char *clientAddress, const unsigned short clientPort, const unsigned char protocol, const unsigned char msTimeout);
-_pointToPointPortAdd = CFUNCTYPE(c_ubyte, c_char_p, c_char_p, c_ushort,
-                                 c_char_p, c_ushort, c_ubyte, c_ubyte)(('pointToPointPortAdd', NKTPDLL))
+_pointToPointPortAdd = _bind('pointToPointPortAdd', c_ubyte, c_char_p, c_char_p, c_ushort,
+                                 c_char_p, c_ushort, c_ubyte, c_ubyte)
 
 
 def pointToPointPortAdd(portname, portdata):
@@ -316,8 +471,8 @@ def pointToPointPortAdd(portname, portdata):
 #
 # extern "C" NKTPDLL_EXPORT P2PPortResultTypes pointToPointPortGet(const char *portname, char *hostAddress, unsigned char *hostMaxLen, unsigned short *hostPort, char *clientAddress, unsigned char *clientMaxLen, unsigned short *clientPort, unsigned char *protocol, unsigned char *msTimeout);
 # typedef P2PPortResultTypes (__cdecl *PointToPointPortGetFuncPtr)(const char *portname, char *hostAddress, unsigned char *hostMaxLen, unsigned short *hostPort, char *clientAddress, unsigned char *clientMaxLen, unsigned short *clientPort, unsigned char *protocol, unsigned char *msTimeout);
-_pointToPointPortGet = CFUNCTYPE(c_ubyte, c_char_p, POINTER(c_char), POINTER(c_ubyte), POINTER(c_ushort), POINTER(
-    c_char), POINTER(c_ubyte), POINTER(c_ushort), POINTER(c_ubyte), POINTER(c_ubyte))(('pointToPointPortGet', NKTPDLL))
+_pointToPointPortGet = _bind('pointToPointPortGet', c_ubyte, c_char_p, POINTER(c_char), POINTER(c_ubyte), POINTER(c_ushort), POINTER(
+    c_char), POINTER(c_ubyte), POINTER(c_ushort), POINTER(c_ubyte), POINTER(c_ubyte))
 
 
 # , hostAddress, hostPort, clientAddress, clientPort, protocol, msTimeout):
@@ -341,8 +496,7 @@ def pointToPointPortGet(portname):
 #
 # extern "C" NKTPDLL_EXPORT P2PPortResultTypes pointToPointPortDel(const char *portname);
 # typedef P2PPortResultTypes (__cdecl *PointToPointPortDelFuncPtr)(const char *portname);
-_pointToPointPortDel = CFUNCTYPE(c_ubyte, c_char_p)(
-    ('pointToPointPortDel', NKTPDLL))
+_pointToPointPortDel = _bind('pointToPointPortDel', c_ubyte, c_char_p)
 
 
 def pointToPointPortDel(portname):
@@ -362,8 +516,8 @@ def pointToPointPortDel(portname):
 #
 # extern "C" NKTPDLL_EXPORT PortResultTypes openPorts(const char *portnames, const char autoMode, const char liveMode);
 # typedef PortResultTypes (__cdecl *OpenPortsFuncPtr)(const char *portnames, const char autoMode, const char liveMode);
-_openPorts = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte,
-                       c_ubyte)(('openPorts', NKTPDLL))
+_openPorts = _bind('openPorts', c_ubyte, c_char_p, c_ubyte,
+                       c_ubyte)
 
 
 def openPorts(portnames, autoMode, liveMode):
@@ -377,7 +531,7 @@ def openPorts(portnames, autoMode, liveMode):
 #
 # extern "C" NKTPDLL_EXPORT PortResultTypes closePorts(const char *portnames);
 # typedef PortResultTypes (__cdecl *ClosePortsFuncPtr)(const char *portnames);
-_closePorts = CFUNCTYPE(c_ubyte, c_char_p)(('closePorts', NKTPDLL))
+_closePorts = _bind('closePorts', c_ubyte, c_char_p)
 
 
 def closePorts(portnames):
@@ -389,8 +543,7 @@ def closePorts(portnames):
 #                       \arg 1 the busscanning is set to legacy mode and fixes the masterId at address 66(0x42). Some older modules does not accept masterIds other than 66(ox42).
 # extern "C" NKTPDLL_EXPORT void setLegacyBusScanning(const char legacyScanning);
 # typedef void (__cdecl *SetLegacyBusScanningFuncPtr)(const char legacyScanning);
-_setLegacyBusScanning = CFUNCTYPE(None, c_ubyte)(
-    ('setLegacyBusScanning', NKTPDLL))
+_setLegacyBusScanning = _bind('setLegacyBusScanning', None, c_ubyte)
 
 
 def setLegacyBusScanning(legacyScanning):
@@ -401,7 +554,7 @@ def setLegacyBusScanning(legacyScanning):
 # \return An unsigned char, with legacyScanning status. 0 the busscanning is currently in normal mode. 1 the busscanning is currently in legacy mode.
 # extern "C" NKTPDLL_EXPORT unsigned char getLegacyBusScanning();
 # typedef unsigned char (__cdecl *GetLegacyBusScanningFuncPtr)();
-_getLegacyBusScanning = CFUNCTYPE(c_ubyte)(('getLegacyBusScanning', NKTPDLL))
+_getLegacyBusScanning = _bind('getLegacyBusScanning', c_ubyte)
 
 
 def getLegacyBusScanning():
@@ -415,8 +568,8 @@ def getLegacyBusScanning():
 #
 # extern "C" NKTPDLL_EXPORT PortResultTypes getPortStatus(const char *portname, PortStatusTypes *portStatus);
 # typedef PortResultTypes (__cdecl *getPortStatusFuncPtr)(const char *portname, PortStatusTypes *portStatus);
-_getPortStatus = CFUNCTYPE(c_ubyte, c_char_p, POINTER(
-    c_ubyte))(('getPortStatus', NKTPDLL))
+_getPortStatus = _bind('getPortStatus', c_ubyte, c_char_p, POINTER(
+    c_ubyte))
 
 
 def getPortStatus(portname):
@@ -432,8 +585,8 @@ def getPortStatus(portname):
 #
 # extern "C" NKTPDLL_EXPORT PortResultTypes getPortErrorMsg(const char *portname, char *errorMessage, unsigned short *maxLen);
 # typedef PortResultTypes (__cdecl *getPortErrorMsgFuncPtr)(const char *portname, char *errorMessage, unsigned short *maxLen);
-_getPortErrorMsg = CFUNCTYPE(c_ubyte, c_char_p, POINTER(
-    c_char), POINTER(c_ushort))(('getPortErrorMsg', NKTPDLL))
+_getPortErrorMsg = _bind('getPortErrorMsg', c_ubyte, c_char_p, POINTER(
+    c_char), POINTER(c_ushort))
 
 
 def getPortErrorMsg(portname):
@@ -463,18 +616,17 @@ def getPortErrorMsg(portname):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerRead(const char *portname, const unsigned char devId, const unsigned char regId, void *readData, unsigned char *readSize, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadFuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, void *readData, unsigned char *readSize, const short index);
-_registerRead = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_char), POINTER(c_ubyte), c_short)(('registerRead', NKTPDLL))
+_registerRead = _bind('registerRead', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_char), POINTER(c_ubyte), c_short)
 
 
 def registerRead(portname, devId, regId, index):
-    _readSize = c_ubyte(255)
-    _readData = create_string_buffer(_readSize.value)
-    result = _registerRead(portname.encode('ascii'), devId,
+    _readSize = _out.size
+    _readSize.value = 255
+    _readData = _out.data
+    result = _registerRead(_encoded(portname), devId,
                            regId, _readData, _readSize, index)
-    if result != 0:
-        _readSize = c_ubyte(0)
-    return result, _readData.raw[:_readSize.value]
+    return result, string_at(_readData, _readSize.value if not result else 0)
 
 
 # \brief Reads an unsigned char (8bit) register value and returns the result in value.
@@ -488,14 +640,13 @@ def registerRead(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadU8(const char *portname, const unsigned char devId, const unsigned char regId, unsigned char *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadU8FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, unsigned char *value, const short index);
-_registerReadU8 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_ubyte), c_short)(('registerReadU8', NKTPDLL))
+_registerReadU8 = _bind('registerReadU8', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_ubyte), c_short)
 
 
 def registerReadU8(portname, devId, regId, index):
-    _readValue = c_ubyte(0)
-    result = _registerReadU8(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.u8
+    result = _registerReadU8(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -510,14 +661,13 @@ def registerReadU8(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadS8(const char *portname, const unsigned char devId, const unsigned char regId, signed char *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadS8FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, signed char *value, const short index);
-_registerReadS8 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_byte), c_short)(('registerReadS8', NKTPDLL))
+_registerReadS8 = _bind('registerReadS8', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_byte), c_short)
 
 
 def registerReadS8(portname, devId, regId, index):
-    _readValue = c_byte(0)
-    result = _registerReadS8(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.s8
+    result = _registerReadS8(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -532,14 +682,13 @@ def registerReadS8(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadU16(const char *portname, const unsigned char devId, const unsigned char regId, unsigned short *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadU16FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, unsigned short *value, const short index);
-_registerReadU16 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_ushort), c_short)(('registerReadU16', NKTPDLL))
+_registerReadU16 = _bind('registerReadU16', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_ushort), c_short)
 
 
 def registerReadU16(portname, devId, regId, index):
-    _readValue = c_ushort(0)
-    result = _registerReadU16(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.u16
+    result = _registerReadU16(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -554,14 +703,13 @@ def registerReadU16(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadS16(const char *portname, const unsigned char devId, const unsigned char regId, signed short *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadS16FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, signed short *value, const short index);
-_registerReadS16 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_short), c_short)(('registerReadS16', NKTPDLL))
+_registerReadS16 = _bind('registerReadS16', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_short), c_short)
 
 
 def registerReadS16(portname, devId, regId, index):
-    _readValue = c_short(0)
-    result = _registerReadS16(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.s16
+    result = _registerReadS16(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -576,14 +724,13 @@ def registerReadS16(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadU32(const char *portname, const unsigned char devId, const unsigned char regId, unsigned long *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadU32FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, unsigned long *value, const short index);
-_registerReadU32 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_ulong), c_short)(('registerReadU32', NKTPDLL))
+_registerReadU32 = _bind('registerReadU32', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_ulong), c_short)
 
 
 def registerReadU32(portname, devId, regId, index):
-    _readValue = c_ulong(0)
-    result = _registerReadU32(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.u32
+    result = _registerReadU32(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -598,14 +745,13 @@ def registerReadU32(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadS32(const char *portname, const unsigned char devId, const unsigned char regId, signed long *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadS32FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, signed long *value, const short index);
-_registerReadS32 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_long), c_short)(('registerReadS32', NKTPDLL))
+_registerReadS32 = _bind('registerReadS32', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_long), c_short)
 
 
 def registerReadS32(portname, devId, regId, index):
-    _readValue = c_long(0)
-    result = _registerReadS32(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.s32
+    result = _registerReadS32(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -620,14 +766,13 @@ def registerReadS32(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadU64(const char *portname, const unsigned char devId, const unsigned char regId, unsigned long long *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadU64FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, unsigned long long *value, const short index);
-_registerReadU64 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_ulonglong), c_short)(('registerReadU64', NKTPDLL))
+_registerReadU64 = _bind('registerReadU64', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_ulonglong), c_short)
 
 
 def registerReadU64(portname, devId, regId, index):
-    _readValue = c_ulonglong(0)
-    result = _registerReadU64(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.u64
+    result = _registerReadU64(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -642,14 +787,13 @@ def registerReadU64(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadS64(const char *portname, const unsigned char devId, const unsigned char regId, signed long long *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadS64FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, signed long long *value, const short index);
-_registerReadS64 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_longlong), c_short)(('registerReadS64', NKTPDLL))
+_registerReadS64 = _bind('registerReadS64', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_longlong), c_short)
 
 
 def registerReadS64(portname, devId, regId, index):
-    _readValue = c_longlong(0)
-    result = _registerReadS64(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.s64
+    result = _registerReadS64(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -664,14 +808,13 @@ def registerReadS64(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadF32(const char *portname, const unsigned char devId, const unsigned char regId, float *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadF32FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, float *value, const short index);
-_registerReadF32 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_float), c_short)(('registerReadF32', NKTPDLL))
+_registerReadF32 = _bind('registerReadF32', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_float), c_short)
 
 
 def registerReadF32(portname, devId, regId, index):
-    _readValue = c_float(0)
-    result = _registerReadF32(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.f32
+    result = _registerReadF32(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -686,14 +829,13 @@ def registerReadF32(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadF64(const char *portname, const unsigned char devId, const unsigned char regId, double *value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadF64FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, double *value, const short index);
-_registerReadF64 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_double), c_short)(('registerReadF64', NKTPDLL))
+_registerReadF64 = _bind('registerReadF64', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_double), c_short)
 
 
 def registerReadF64(portname, devId, regId, index):
-    _readValue = c_double(0)
-    result = _registerReadF64(portname.encode(
-        'ascii'), devId, regId, _readValue, index)
+    _readValue = _out.f64
+    result = _registerReadF64(_encoded(portname), devId, regId, _readValue, index)
     return result, _readValue.value
 
 
@@ -709,16 +851,17 @@ def registerReadF64(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerReadAscii(const char *portname, const unsigned char devId, const unsigned char regId, char *readStr, unsigned char *maxLen, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterReadAsciiFuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, char *readStr, unsigned char *maxLen, const short index);
-_registerReadAscii = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_char), POINTER(c_ubyte), c_short)(('registerReadAscii', NKTPDLL))
+_registerReadAscii = _bind('registerReadAscii', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_char), POINTER(c_ubyte), c_short)
 
 
 def registerReadAscii(portname, devId, regId, index):
-    _readSize = c_ubyte(255)
-    _readData = create_string_buffer(_readSize.value)
-    result = _registerReadAscii(portname.encode(
-        'ascii'), devId, regId, _readData, _readSize, index)
-    return result, _readData.value
+    _readSize = _out.size
+    _readSize.value = 255
+    _readData = _out.data
+    result = _registerReadAscii(_encoded(
+        portname), devId, regId, _readData, _readSize, index)
+    return result, _string(result, _readData, _readSize)
 
 
 # *******************************************************************************************************
@@ -741,12 +884,12 @@ def registerReadAscii(portname, devId, regId, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWrite(const char *portname, const unsigned char devId, const unsigned char regId, const void *writeData, const unsigned char writeSize, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteFuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const void *writeData, const unsigned char writeSize, const short index);
-_registerWrite = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_char), c_ubyte, c_short)(('registerWrite', NKTPDLL))
+_registerWrite = _bind('registerWrite', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_char), c_ubyte, c_short)
 
 
 def registerWrite(portname, devId, regId, writeData, writeSize, index):
-    return _registerWrite(portname.encode('ascii'), devId, regId, writeData, writeSize, index)
+    return _registerWrite(_encoded(portname), devId, regId, writeData, writeSize, index)
 
 
 # \brief Writes an unsigned char (8bit) register value.
@@ -760,12 +903,11 @@ def registerWrite(portname, devId, regId, writeData, writeSize, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteU8(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned char value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteU8FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned char value, const short index);
-_registerWriteU8 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ubyte, c_short)(
-    ('registerWriteU8', NKTPDLL))
+_registerWriteU8 = _bind('registerWriteU8', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ubyte, c_short)
 
 
 def registerWriteU8(portname, devId, regId, value, index):
-    return _registerWriteU8(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteU8(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes a signed char (8bit) register value.
@@ -780,12 +922,11 @@ def registerWriteU8(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteS8(const char *portname, const unsigned char devId, const unsigned char regId, const signed char value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteS8FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const signed char value, const short index);
-_registerWriteS8 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_byte, c_short)(
-    ('registerWriteS8', NKTPDLL))
+_registerWriteS8 = _bind('registerWriteS8', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_byte, c_short)
 
 
 def registerWriteS8(portname, devId, regId, value, index):
-    return _registerWriteS8(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteS8(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes an unsigned short (16bit) register value.
@@ -799,12 +940,11 @@ def registerWriteS8(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteU16(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned short value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteU16FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned short value, const short index);
-_registerWriteU16 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ushort, c_short)(
-    ('registerWriteU16', NKTPDLL))
+_registerWriteU16 = _bind('registerWriteU16', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ushort, c_short)
 
 
 def registerWriteU16(portname, devId, regId, value, index):
-    return _registerWriteU16(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteU16(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes a signed short (16bit) register value.
@@ -818,12 +958,11 @@ def registerWriteU16(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteS16(const char *portname, const unsigned char devId, const unsigned char regId, const signed short value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteS16FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const signed short value, const short index);
-_registerWriteS16 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_short, c_short)(
-    ('registerWriteS16', NKTPDLL))
+_registerWriteS16 = _bind('registerWriteS16', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_short, c_short)
 
 
 def registerWriteS16(portname, devId, regId, value, index):
-    return _registerWriteS16(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteS16(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes an unsigned long (32bit) register value.
@@ -837,12 +976,11 @@ def registerWriteS16(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteU32(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned long value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteU32FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned long value, const short index);
-_registerWriteU32 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ulong, c_short)(
-    ('registerWriteU32', NKTPDLL))
+_registerWriteU32 = _bind('registerWriteU32', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ulong, c_short)
 
 
 def registerWriteU32(portname, devId, regId, value, index):
-    return _registerWriteU32(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteU32(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes a signed long (32bit) register value.
@@ -856,12 +994,11 @@ def registerWriteU32(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteS32(const char *portname, const unsigned char devId, const unsigned char regId, const signed long value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteS32FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const signed long value, const short index);
-_registerWriteS32 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_long, c_short)(
-    ('registerWriteS32', NKTPDLL))
+_registerWriteS32 = _bind('registerWriteS32', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_long, c_short)
 
 
 def registerWriteS32(portname, devId, regId, value, index):
-    return _registerWriteS32(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteS32(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes an unsigned long long (64bit) register value.
@@ -875,12 +1012,11 @@ def registerWriteS32(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteU64(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned long long value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteU64FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned long long value, const short index);
-_registerWriteU64 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ulonglong, c_short)(
-    ('registerWriteU64', NKTPDLL))
+_registerWriteU64 = _bind('registerWriteU64', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ulonglong, c_short)
 
 
 def registerWriteU64(portname, devId, regId, value, index):
-    return _registerWriteU64(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteU64(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes a signed long long (64bit) register value.
@@ -894,12 +1030,11 @@ def registerWriteU64(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteS64(const char *portname, const unsigned char devId, const unsigned char regId, const signed long long value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteS64FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const signed long long value, const short index);
-_registerWriteS64 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_longlong, c_short)(
-    ('registerWriteS64', NKTPDLL))
+_registerWriteS64 = _bind('registerWriteS64', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_longlong, c_short)
 
 
 def registerWriteS64(portname, devId, regId, value, index):
-    return _registerWriteS64(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteS64(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes a float (32bit) register value.
@@ -913,12 +1048,11 @@ def registerWriteS64(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteF32(const char *portname, const unsigned char devId, const unsigned char regId, const float value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteF32FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const float value, const short index);
-_registerWriteF32 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_float, c_short)(
-    ('registerWriteF32', NKTPDLL))
+_registerWriteF32 = _bind('registerWriteF32', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_float, c_short)
 
 
 def registerWriteF32(portname, devId, regId, value, index):
-    return _registerWriteF32(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteF32(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes a double (64bit) register value.
@@ -932,12 +1066,11 @@ def registerWriteF32(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteF64(const char *portname, const unsigned char devId, const unsigned char regId, const double value, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteF64FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const double value, const short index);
-_registerWriteF64 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_double, c_short)(
-    ('registerWriteF64', NKTPDLL))
+_registerWriteF64 = _bind('registerWriteF64', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_double, c_short)
 
 
 def registerWriteF64(portname, devId, regId, value, index):
-    return _registerWriteF64(portname.encode('ascii'), devId, regId, value, index)
+    return _registerWriteF64(_encoded(portname), devId, regId, value, index)
 
 
 # \brief Writes a string register value.
@@ -953,13 +1086,13 @@ def registerWriteF64(portname, devId, regId, value, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteAscii(const char *portname, const unsigned char devId, const unsigned char regId, const char* writeStr, const char writeEOL, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteAsciiFuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const char* writeStr, const char writeEOL, const short index);
-_registerWriteAscii = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte,
-                                c_char_p, c_ubyte, c_short)(('registerWriteAscii', NKTPDLL))
+_registerWriteAscii = _bind('registerWriteAscii', c_ubyte, c_char_p, c_ubyte, c_ubyte,
+                                c_char_p, c_ubyte, c_short)
 
 
 def registerWriteAscii(portname, devId, regId, strValue, wrEOL, index):
     _asciiValue = create_string_buffer(strValue.encode('ascii'))
-    return _registerWriteAscii(portname.encode('ascii'), devId, regId, _asciiValue, wrEOL, index)
+    return _registerWriteAscii(_encoded(portname), devId, regId, _asciiValue, wrEOL, index)
 
 
 # *******************************************************************************************************
@@ -984,16 +1117,17 @@ def registerWriteAscii(portname, devId, regId, strValue, wrEOL, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteRead(const char *portname, const unsigned char devId, const unsigned char regId, const void *writeData, const unsigned char writeSize, void *readData, unsigned char *readSize, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadFuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const void *writeData, const unsigned char writeSize, void *readData, unsigned char *readSize, const short index);
-_registerWriteRead = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_char), c_ubyte, POINTER(c_char), POINTER(c_ubyte), c_short)(('registerWriteRead', NKTPDLL))
+_registerWriteRead = _bind('registerWriteRead', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_char), c_ubyte, POINTER(c_char), POINTER(c_ubyte), c_short)
 
 
 def registerWriteRead(portname, devId, regId, writeData, writeSize, index):
-    _readSize = c_ubyte(255)
-    _readData = create_string_buffer(_readSize.value)
-    result = _registerWriteRead(portname.encode(
-        'ascii'), devId, regId, writeData, writeSize, _readData, _readSize, index)
-    return result, _readData.raw[:_readSize.value]
+    _readSize = _out.size
+    _readSize.value = 255
+    _readData = _out.data
+    result = _registerWriteRead(_encoded(
+        portname), devId, regId, writeData, writeSize, _readData, _readSize, index)
+    return result, string_at(_readData, _readSize.value if not result else 0)
 
 
 # \brief Writes and Reads an unsigned char (8bit) register value.
@@ -1008,14 +1142,13 @@ def registerWriteRead(portname, devId, regId, writeData, writeSize, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadU8(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned char writeValue, unsigned char *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadU8FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned char writeValue, unsigned char *readValue, const short index);
-_registerWriteReadU8 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ubyte, POINTER(
-    c_ubyte), c_short)(('registerWriteReadU8', NKTPDLL))
+_registerWriteReadU8 = _bind('registerWriteReadU8', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ubyte, POINTER(
+    c_ubyte), c_short)
 
 
 def registerWriteReadU8(portname, devId, regId, writeValue, index):
-    _readValue = c_ubyte(0)
-    result = _registerWriteReadU8(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.u8
+    result = _registerWriteReadU8(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1031,14 +1164,13 @@ def registerWriteReadU8(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadS8(const char *portname, const unsigned char devId, const unsigned char regId, const signed char writeValue, signed char *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadS8FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const signed char writeValue, signed char *readValue, const short index);
-_registerWriteReadS8 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ubyte, POINTER(
-    c_byte), c_short)(('registerWriteReadS8', NKTPDLL))
+_registerWriteReadS8 = _bind('registerWriteReadS8', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_byte, POINTER(
+    c_byte), c_short)
 
 
 def registerWriteReadS8(portname, devId, regId, writeValue, index):
-    _readValue = c_byte(0)
-    result = _registerWriteReadS8(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.s8
+    result = _registerWriteReadS8(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1054,14 +1186,13 @@ def registerWriteReadS8(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadU16(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned short writeValue, unsigned short *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadU16FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned short writeValue, unsigned short *readValue, const short index);
-_registerWriteReadU16 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ubyte, POINTER(
-    c_ushort), c_short)(('registerWriteReadU16', NKTPDLL))
+_registerWriteReadU16 = _bind('registerWriteReadU16', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ushort, POINTER(
+    c_ushort), c_short)
 
 
 def registerWriteReadU16(portname, devId, regId, writeValue, index):
-    _readValue = c_ushort(0)
-    result = _registerWriteReadU16(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.u16
+    result = _registerWriteReadU16(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1077,14 +1208,13 @@ def registerWriteReadU16(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadS16(const char *portname, const unsigned char devId, const unsigned char regId, const signed short writeValue, signed short *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadS16FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const signed short writeValue, signed short *readValue, const short index);
-_registerWriteReadS16 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ubyte, POINTER(
-    c_short), c_short)(('registerWriteReadS16', NKTPDLL))
+_registerWriteReadS16 = _bind('registerWriteReadS16', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_short, POINTER(
+    c_short), c_short)
 
 
 def registerWriteReadS16(portname, devId, regId, writeValue, index):
-    _readValue = c_short(0)
-    result = _registerWriteReadS16(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.s16
+    result = _registerWriteReadS16(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1100,14 +1230,13 @@ def registerWriteReadS16(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadU32(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned long writeValue, unsigned long *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadU32FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned long writeValue, unsigned long *readValue, const short index);
-_registerWriteReadU32 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ulong, POINTER(
-    c_ulong), c_short)(('registerWriteReadU32', NKTPDLL))
+_registerWriteReadU32 = _bind('registerWriteReadU32', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ulong, POINTER(
+    c_ulong), c_short)
 
 
 def registerWriteReadU32(portname, devId, regId, writeValue, index):
-    _readValue = c_ulong(0)
-    result = _registerWriteReadU32(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.u32
+    result = _registerWriteReadU32(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1123,14 +1252,13 @@ def registerWriteReadU32(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadS32(const char *portname, const unsigned char devId, const unsigned char regId, const signed long writeValue, signed long *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadS32FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const signed long writeValue, signed long *readValue, const short index);
-_registerWriteReadS32 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_long, POINTER(
-    c_long), c_short)(('registerWriteReadS32', NKTPDLL))
+_registerWriteReadS32 = _bind('registerWriteReadS32', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_long, POINTER(
+    c_long), c_short)
 
 
 def registerWriteReadS32(portname, devId, regId, writeValue, index):
-    _readValue = c_long(0)
-    result = _registerWriteReadS32(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.s32
+    result = _registerWriteReadS32(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1146,14 +1274,13 @@ def registerWriteReadS32(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadU64(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned long long writeValue, unsigned long long *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadU64FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const unsigned long long writeValue, unsigned long long *readValue, const short index);
-_registerWriteReadU64 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ulonglong, POINTER(
-    c_ulonglong), c_short)(('registerWriteReadU64', NKTPDLL))
+_registerWriteReadU64 = _bind('registerWriteReadU64', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_ulonglong, POINTER(
+    c_ulonglong), c_short)
 
 
 def registerWriteReadU64(portname, devId, regId, writeValue, index):
-    _readValue = c_ulonglong(0)
-    result = _registerWriteReadU64(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.u64
+    result = _registerWriteReadU64(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1169,14 +1296,13 @@ def registerWriteReadU64(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadS64(const char *portname, const unsigned char devId, const unsigned char regId, const signed long long writeValue, signed long long *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadS64FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const signed long long writeValue, signed long long *readValue, const short index);
-_registerWriteReadS64 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_longlong, POINTER(
-    c_longlong), c_short)(('registerWriteReadS64', NKTPDLL))
+_registerWriteReadS64 = _bind('registerWriteReadS64', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_longlong, POINTER(
+    c_longlong), c_short)
 
 
 def registerWriteReadS64(portname, devId, regId, writeValue, index):
-    _readValue = c_longlong(0)
-    result = _registerWriteReadS64(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.s64
+    result = _registerWriteReadS64(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1192,14 +1318,13 @@ def registerWriteReadS64(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadF32(const char *portname, const unsigned char devId, const unsigned char regId, const float writeValue, float *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadF32FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const float writeValue, float *readValue, const short index);
-_registerWriteReadF32 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_float, POINTER(
-    c_float), c_short)(('registerWriteReadF32', NKTPDLL))
+_registerWriteReadF32 = _bind('registerWriteReadF32', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_float, POINTER(
+    c_float), c_short)
 
 
 def registerWriteReadF32(portname, devId, regId, writeValue, index):
-    _readValue = c_float(0)
-    result = _registerWriteReadF32(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.f32
+    result = _registerWriteReadF32(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1215,14 +1340,13 @@ def registerWriteReadF32(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadF64(const char *portname, const unsigned char devId, const unsigned char regId, const double writeValue, double *readValue, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadF64FuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const double writeValue, double *readValue, const short index);
-_registerWriteReadF64 = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_double, POINTER(
-    c_double), c_short)(('registerWriteReadF64', NKTPDLL))
+_registerWriteReadF64 = _bind('registerWriteReadF64', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_double, POINTER(
+    c_double), c_short)
 
 
 def registerWriteReadF64(portname, devId, regId, writeValue, index):
-    _readValue = c_double(0)
-    result = _registerWriteReadF64(portname.encode(
-        'ascii'), devId, regId, writeValue, _readValue, index)
+    _readValue = _out.f64
+    result = _registerWriteReadF64(_encoded(portname), devId, regId, writeValue, _readValue, index)
     return result, _readValue.value
 
 
@@ -1241,17 +1365,18 @@ def registerWriteReadF64(portname, devId, regId, writeValue, index):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerWriteReadAscii(const char *portname, const unsigned char devId, const unsigned char regId, const char* writeStr, const char writeEOL, char *readStr, unsigned char *maxLen, const short index);
 # typedef RegisterResultTypes (__cdecl *RegisterWriteReadAsciiFuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const char* writeStr, const char writeEOL, char *readStr, unsigned char *maxLen, const short index);
-_registerWriteReadAscii = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_char), POINTER(c_ubyte), c_short)(('registerWriteReadAscii', NKTPDLL))
+_registerWriteReadAscii = _bind('registerWriteReadAscii', c_ubyte, c_char_p, c_ubyte, c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_char), POINTER(c_ubyte), c_short)
 
 
 def registerWriteReadAscii(portname, devId, regId, strValue, wrEOL, index):
     _asciiValue = create_string_buffer(strValue.encode('ascii'))
-    _readSize = c_ubyte(255)
-    _readData = create_string_buffer(_readSize.value)
-    result = _registerWriteReadAscii(portname.encode(
-        'ascii'), devId, regId, _asciiValue, wrEOL, _readData, _readSize, index)
-    return result, _readData.value
+    _readSize = _out.size
+    _readSize.value = 255
+    _readData = _out.data
+    result = _registerWriteReadAscii(_encoded(
+        portname), devId, regId, _asciiValue, wrEOL, _readData, _readSize, index)
+    return result, _string(result, _readData, _readSize)
 
 # *******************************************************************************************************
 # * Dedicated - Device functions
@@ -1271,13 +1396,13 @@ def registerWriteReadAscii(portname, devId, regId, strValue, wrEOL, index):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetType(const char *portname, const unsigned char devId, unsigned char *devType);
 # typedef DeviceResultTypes (__cdecl *DeviceGetTypeFuncPtr)(const char *portname, const unsigned char devId, unsigned char *devType);
-_deviceGetType = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_ubyte))(('deviceGetType', NKTPDLL))
+_deviceGetType = _bind('deviceGetType', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_ubyte))
 
 
 def deviceGetType(portname, devId):
-    _readValue = c_ubyte(0)
-    result = _deviceGetType(portname.encode('ascii'), devId, _readValue)
+    _readValue = _out.u8
+    result = _deviceGetType(_encoded(portname), devId, _readValue)
     return result, _readValue.value
 
 
@@ -1292,16 +1417,17 @@ def deviceGetType(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetPartNumberStr(const char *portname, const unsigned char devId, char *partnumber, unsigned char *maxLen);
 # typedef DeviceResultTypes (__cdecl *DeviceGetPartNumberStrFuncPtr)(const char *portname, const unsigned char devId, char *partnumber, unsigned char *maxLen);
-_deviceGetPartNumberStr = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_char), POINTER(c_ubyte))(('deviceGetPartNumberStr', NKTPDLL))
+_deviceGetPartNumberStr = _bind('deviceGetPartNumberStr', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_char), POINTER(c_ubyte))
 
 
 def deviceGetPartNumberStr(portname, devId):
-    _readSize = c_ubyte(255)
-    _readStr = create_string_buffer(_readSize.value)
+    _readSize = _out.size
+    _readSize.value = 255
+    _readStr = _out.data
     result = _deviceGetPartNumberStr(
-        portname.encode('ascii'), devId, _readStr, _readSize)
-    return result, _readStr.value
+        _encoded(portname), devId, _readStr, _readSize)
+    return result, _string(result, _readStr, _readSize)
 
 
 # \brief Returns the PCB version for a given device (module address).
@@ -1314,13 +1440,13 @@ def deviceGetPartNumberStr(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetPCBVersion(const char *portname, const unsigned char devId, unsigned char *PCBVersion);
 # typedef DeviceResultTypes (__cdecl *DeviceGetPCBVersionFuncPtr)(const char *portname, const unsigned char devId, unsigned char *PCBVersion);
-_deviceGetPCBVersion = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_ubyte))(('deviceGetPCBVersion', NKTPDLL))
+_deviceGetPCBVersion = _bind('deviceGetPCBVersion', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_ubyte))
 
 
 def deviceGetPCBVersion(portname, devId):
-    _readValue = c_ubyte(0)
-    result = _deviceGetPCBVersion(portname.encode('ascii'), devId, _readValue)
+    _readValue = _out.u8
+    result = _deviceGetPCBVersion(_encoded(portname), devId, _readValue)
     return result, _readValue.value
 
 
@@ -1334,13 +1460,13 @@ def deviceGetPCBVersion(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetStatusBits(const char *portname, const unsigned char devId, unsigned long *statusBits);
 # typedef DeviceResultTypes (__cdecl *DeviceGetStatusBitsFuncPtr)(const char *portname, const unsigned char devId, unsigned long *statusBits);
-_deviceGetStatusBits = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_ushort))(('deviceGetStatusBits', NKTPDLL))
+_deviceGetStatusBits = _bind('deviceGetStatusBits', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_ushort))
 
 
 def deviceGetStatusBits(portname, devId):
-    _readValue = c_ulong(0)
-    result = _deviceGetStatusBits(portname.encode('ascii'), devId, _readValue)
+    _readValue = _out.u16
+    result = _deviceGetStatusBits(_encoded(portname), devId, _readValue)
     return result, _readValue.value
 
 
@@ -1354,13 +1480,13 @@ def deviceGetStatusBits(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetErrorCode(const char *portname, const unsigned char devId, unsigned short *errorCode);
 # typedef DeviceResultTypes (__cdecl *DeviceGetErrorCodeFuncPtr)(const char *portname, const unsigned char devId, unsigned short *errorCode);
-_deviceGetErrorCode = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_ushort))(('deviceGetErrorCode', NKTPDLL))
+_deviceGetErrorCode = _bind('deviceGetErrorCode', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_ushort))
 
 
 def deviceGetErrorCode(portname, devId):
-    _readValue = c_ushort(0)
-    result = _deviceGetErrorCode(portname.encode('ascii'), devId, _readValue)
+    _readValue = _out.u16
+    result = _deviceGetErrorCode(_encoded(portname), devId, _readValue)
     return result, _readValue.value
 
 
@@ -1374,14 +1500,14 @@ def deviceGetErrorCode(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetBootloaderVersion(const char *portname, const unsigned char devId, unsigned short *version);
 # typedef DeviceResultTypes (__cdecl *DeviceGetBootloaderVersionFuncPtr)(const char *portname, const unsigned char devId, unsigned short *version);
-_deviceGetBootloaderVersion = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_ushort))(('deviceGetBootloaderVersion', NKTPDLL))
+_deviceGetBootloaderVersion = _bind('deviceGetBootloaderVersion', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_ushort))
 
 
 def deviceGetBootloaderVersion(portname, devId):
-    _readValue = c_ushort(0)
+    _readValue = _out.u16
     result = _deviceGetBootloaderVersion(
-        portname.encode('ascii'), devId, _readValue)
+        _encoded(portname), devId, _readValue)
     return result, _readValue.value
 
 
@@ -1396,16 +1522,17 @@ def deviceGetBootloaderVersion(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetBootloaderVersionStr(const char *portname, const unsigned char devId, char *versionStr, unsigned char *maxLen);
 # typedef DeviceResultTypes (__cdecl *DeviceGetBootloaderVersionStrFuncPtr)(const char *portname, const unsigned char devId, char *versionStr, unsigned char *maxLen);
-_deviceGetBootloaderVersionStr = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_char), POINTER(c_ubyte))(('deviceGetBootloaderVersionStr', NKTPDLL))
+_deviceGetBootloaderVersionStr = _bind('deviceGetBootloaderVersionStr', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_char), POINTER(c_ubyte))
 
 
 def deviceGetBootloaderVersionStr(portname, devId):
-    _readSize = c_ubyte(255)
-    _readStr = create_string_buffer(_readSize.value)
+    _readSize = _out.size
+    _readSize.value = 255
+    _readStr = _out.data
     result = _deviceGetBootloaderVersionStr(
-        portname.encode('ascii'), devId, _readStr, _readSize)
-    return result, _readStr.value
+        _encoded(portname), devId, _readStr, _readSize)
+    return result, _string(result, _readStr, _readSize)
 
 
 # \brief Returns the firmware version for a given device (module address).
@@ -1418,15 +1545,15 @@ def deviceGetBootloaderVersionStr(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetFirmwareVersion(const char *portname, const unsigned char devId, unsigned short *version);
 # typedef DeviceResultTypes (__cdecl *DeviceGetFirmwareVersionFuncPtr)(const char *portname, const unsigned char devId, unsigned short *version);
-_deviceGetFirmwareVersion = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_ushort))(('deviceGetFirmwareVersion', NKTPDLL))
+_deviceGetFirmwareVersion = _bind('deviceGetFirmwareVersion', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_ushort))
 
 
 def deviceGetFirmwareVersion(portname, devId):
-    _readValue = c_ushort(0)
+    _readValue = _out.u16
     result = _deviceGetFirmwareVersion(
-        portname.encode('ascii'), devId, _readValue)
-    return result, _readValue
+        _encoded(portname), devId, _readValue)
+    return result, _readValue.value
 
 
 # \brief Returns the firmware version (string) for a given device (module address).
@@ -1440,16 +1567,17 @@ def deviceGetFirmwareVersion(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetFirmwareVersionStr(const char *portname, const unsigned char devId, char *versionStr, unsigned char *maxLen);
 # typedef DeviceResultTypes (__cdecl *DeviceGetFirmwareVersionStrFuncPtr)(const char *portname, const unsigned char devId, char *versionStr, unsigned char *maxLen);
-_deviceGetFirmwareVersionStr = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_char), POINTER(c_ubyte))(('deviceGetFirmwareVersionStr', NKTPDLL))
+_deviceGetFirmwareVersionStr = _bind('deviceGetFirmwareVersionStr', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_char), POINTER(c_ubyte))
 
 
 def deviceGetFirmwareVersionStr(portname, devId):
-    _readSize = c_ubyte(255)
-    _readStr = create_string_buffer(_readSize.value)
+    _readSize = _out.size
+    _readSize.value = 255
+    _readStr = _out.data
     result = _deviceGetFirmwareVersionStr(
-        portname.encode('ascii'), devId, _readStr, _readSize)
-    return result, _readStr.value
+        _encoded(portname), devId, _readStr, _readSize)
+    return result, _string(result, _readStr, _readSize)
 
 
 # \brief Returns the Module serialnumber (string) for a given device (module address).
@@ -1463,16 +1591,17 @@ def deviceGetFirmwareVersionStr(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetModuleSerialNumberStr(const char *portname, const unsigned char devId, char *serialNumber, unsigned char *maxLen);
 # typedef DeviceResultTypes (__cdecl *DeviceGetModuleSerialNumberStrFuncPtr)(const char *portname, const unsigned char devId, char *serialNumber, unsigned char *maxLen);
-_deviceGetModuleSerialNumberStr = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_char), POINTER(c_ubyte))(('deviceGetModuleSerialNumberStr', NKTPDLL))
+_deviceGetModuleSerialNumberStr = _bind('deviceGetModuleSerialNumberStr', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_char), POINTER(c_ubyte))
 
 
 def deviceGetModuleSerialNumberStr(portname, devId):
-    _readSize = c_ubyte(255)
-    _readStr = create_string_buffer(_readSize.value)
+    _readSize = _out.size
+    _readSize.value = 255
+    _readStr = _out.data
     result = _deviceGetModuleSerialNumberStr(
-        portname.encode('ascii'), devId, _readStr, _readSize)
-    return result, _readStr.value
+        _encoded(portname), devId, _readStr, _readSize)
+    return result, _string(result, _readStr, _readSize)
 
 
 # \brief Returns the PCB serialnumber (string) for a given device (module address).
@@ -1486,16 +1615,17 @@ def deviceGetModuleSerialNumberStr(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetPCBSerialNumberStr(const char *portname, const unsigned char devId, char *serialNumber, unsigned char *maxLen);
 # typedef DeviceResultTypes (__cdecl *DeviceGetPCBSerialNumberStrFuncPtr)(const char *portname, const unsigned char devId, char *serialNumber, unsigned char *maxLen);
-_deviceGetPCBSerialNumberStr = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_char), POINTER(c_ubyte))(('deviceGetPCBSerialNumberStr', NKTPDLL))
+_deviceGetPCBSerialNumberStr = _bind('deviceGetPCBSerialNumberStr', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_char), POINTER(c_ubyte))
 
 
 def deviceGetPCBSerialNumberStr(portname, devId):
-    _readSize = c_ubyte(255)
-    _readStr = create_string_buffer(_readSize.value)
+    _readSize = _out.size
+    _readSize.value = 255
+    _readStr = _out.data
     result = _deviceGetPCBSerialNumberStr(
-        portname.encode('ascii'), devId, _readStr, _readSize)
-    return result, _readStr.value
+        _encoded(portname), devId, _readStr, _readSize)
+    return result, _string(result, _readStr, _readSize)
 
 
 # *******************************************************************************************************
@@ -1513,12 +1643,12 @@ def deviceGetPCBSerialNumberStr(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceCreate(const char *portname, const unsigned char devId, const char waitReady);
 # typedef DeviceResultTypes (__cdecl *DeviceCreateFuncPtr)(const char *portname, const unsigned char devId, const char waitReady);
-_deviceCreate = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte,
-                          c_ubyte)(('deviceCreate', NKTPDLL))
+_deviceCreate = _bind('deviceCreate', c_ubyte, c_char_p, c_ubyte,
+                          c_ubyte)
 
 
 def deviceCreate(portname, devId, waitReady):
-    return _deviceCreate(portname.encode('ascii'), devId, waitReady)
+    return _deviceCreate(_encoded(portname), devId, waitReady)
 
 
 # \brief Checks if a specific device already exists in the internal devicelist.
@@ -1531,13 +1661,13 @@ def deviceCreate(portname, devId, waitReady):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceExists(const char *portname, const unsigned char devId, unsigned char *exists);
 # typedef DeviceResultTypes (__cdecl *DeviceExistsFuncPtr)(const char *portname, const unsigned char devId, unsigned char *exists);
-_deviceExists = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte,
-                          POINTER(c_ubyte))(('deviceExists', NKTPDLL))
+_deviceExists = _bind('deviceExists', c_ubyte, c_char_p, c_ubyte,
+                          POINTER(c_ubyte))
 
 
 def deviceExists(portname, devId):
-    _exists = c_ubyte(0)
-    result = _deviceExists(portname.encode('ascii'), devId, _exists)
+    _exists = _out.u8
+    result = _deviceExists(_encoded(portname), devId, _exists)
     return result, _exists.value
 
 
@@ -1548,12 +1678,11 @@ def deviceExists(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceRemove(const char *portname, const unsigned char devId);
 # typedef DeviceResultTypes (__cdecl *DeviceRemoveFuncPtr)(const char *portname, const unsigned char devId);
-_deviceRemove = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte)(
-    ('deviceRemove', NKTPDLL))
+_deviceRemove = _bind('deviceRemove', c_ubyte, c_char_p, c_ubyte)
 
 
 def deviceRemove(portname, devId):
-    return _deviceRemove(portname.encode('ascii'), devId)
+    return _deviceRemove(_encoded(portname), devId)
 
 
 # \brief Remove all devices from the internal devicelist. No confirmation given, the list is simply cleared.
@@ -1562,11 +1691,11 @@ def deviceRemove(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceRemoveAll(const char *portname);
 # typedef DeviceResultTypes (__cdecl *DeviceRemoveAllFuncPtr)(const char *portname);
-_deviceRemoveAll = CFUNCTYPE(c_ubyte, c_char_p)(('deviceRemoveAll', NKTPDLL))
+_deviceRemoveAll = _bind('deviceRemoveAll', c_ubyte, c_char_p)
 
 
 def deviceRemoveAll(portname):
-    return _deviceRemoveAll(portname.encode('ascii'))
+    return _deviceRemoveAll(_encoded(portname))
 
 
 # \brief Returns a list with device types (module types) from the internal devicelist.
@@ -1580,17 +1709,16 @@ def deviceRemoveAll(portname):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetAllTypes(const char *portname, unsigned char *types, unsigned char *maxTypes);
 # typedef DeviceResultTypes (__cdecl *DeviceGetAllTypesFuncPtr)(const char *portname, unsigned char *types, unsigned char *maxTypes);
-_deviceGetAllTypes = CFUNCTYPE(c_ubyte, c_char_p, POINTER(
-    c_char), POINTER(c_ubyte))(('deviceGetAllTypes', NKTPDLL))
+_deviceGetAllTypes = _bind('deviceGetAllTypes', c_ubyte, c_char_p, POINTER(
+    c_char), POINTER(c_ubyte))
 
 
 def deviceGetAllTypes(portname):
-    _maxTypes = c_ubyte(255)
-    _types = create_string_buffer(_maxTypes.value)
-    result = _deviceGetAllTypes(portname.encode('ascii'), _types, _maxTypes)
-    if result != 0:
-        _maxTypes = c_ubyte(0)
-    return result, _types.raw[:_maxTypes.value]
+    _maxTypes = _out.size
+    _maxTypes.value = 255
+    _types = _out.data
+    result = _deviceGetAllTypes(_encoded(portname), _types, _maxTypes)
+    return result, string_at(_types, _maxTypes.value if not result else 0)
 
 
 # \brief Returns the internal device mode for a specific device id (module address).
@@ -1602,13 +1730,13 @@ def deviceGetAllTypes(portname):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetMode(const char *portname, const unsigned char devId, unsigned char *devMode);
 # typedef DeviceResultTypes (__cdecl *DeviceGetModeFuncPtr)(const char *portname, const unsigned char devId, unsigned char *devMode);
-_deviceGetMode = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_ubyte))(('deviceGetMode', NKTPDLL))
+_deviceGetMode = _bind('deviceGetMode', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_ubyte))
 
 
 def deviceGetMode(portname, devId):
-    _devMode = c_ubyte(0)
-    result = _deviceGetMode(portname.encode('ascii'), devId, _devMode)
+    _devMode = _out.u8
+    result = _deviceGetMode(_encoded(portname), devId, _devMode)
     return result, _devMode.value
 
 
@@ -1623,13 +1751,13 @@ def deviceGetMode(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceGetLive(const char *portname, const unsigned char devId, unsigned char *liveMode);
 # typedef DeviceResultTypes (__cdecl *DeviceGetLiveFuncPtr)(const char *portname, const unsigned char devId, unsigned char *liveMode);
-_deviceGetLive = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_ubyte))(('deviceGetLive', NKTPDLL))
+_deviceGetLive = _bind('deviceGetLive', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_ubyte))
 
 
 def deviceGetLive(portname, devId):
-    _liveMode = c_ubyte(0)
-    result = _deviceGetLive(portname.encode('ascii'), devId, _liveMode)
+    _liveMode = _out.u8
+    result = _deviceGetLive(_encoded(portname), devId, _liveMode)
     return result, _liveMode.value
 
 
@@ -1644,12 +1772,11 @@ def deviceGetLive(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT DeviceResultTypes deviceSetLive(const char *portname, const unsigned char devId, const unsigned char liveMode);
 # typedef DeviceResultTypes (__cdecl *DeviceSetLiveFuncPtr)(const char *portname, const unsigned char devId, const unsigned char liveMode);
-_deviceSetLive = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte)(
-    ('deviceSetLive', NKTPDLL))
+_deviceSetLive = _bind('deviceSetLive', c_ubyte, c_char_p, c_ubyte, c_ubyte)
 
 
 def deviceSetLive(portname, devId, liveMode):
-    return _deviceSetLive(portname.encode('ascii'), devId, liveMode)
+    return _deviceSetLive(_encoded(portname), devId, liveMode)
 
 
 # *******************************************************************************************************
@@ -1667,12 +1794,12 @@ def deviceSetLive(portname, devId, liveMode):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerCreate(const char *portname, const unsigned char devId, const unsigned char regId, const RegisterPriorityTypes priority, const RegisterDataTypes dataType);
 # typedef RegisterResultTypes (__cdecl *RegisterCreateFuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, const RegisterPriorityTypes priority, const RegisterDataTypes dataType);
-_registerCreate = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte,
-                            c_ubyte, c_ubyte, c_ubyte)(('registerCreate', NKTPDLL))
+_registerCreate = _bind('registerCreate', c_ubyte, c_char_p, c_ubyte,
+                            c_ubyte, c_ubyte, c_ubyte)
 
 
 def registerCreate(portname, devId, regId, priority, dataType):
-    return _registerCreate(portname.encode('ascii'), devId, regId, priority, dataType)
+    return _registerCreate(_encoded(portname), devId, regId, priority, dataType)
 
 
 # \brief Checks if a specific register already exists in the internal registerlist.
@@ -1686,13 +1813,13 @@ def registerCreate(portname, devId, regId, priority, dataType):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerExists(const char *portname, const unsigned char devId, const unsigned char regId, unsigned char *exists);
 # typedef RegisterResultTypes (__cdecl *RegisterExistsFuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId, unsigned char *exists);
-_registerExists = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
-    c_ubyte))(('registerExists', NKTPDLL))
+_registerExists = _bind('registerExists', c_ubyte, c_char_p, c_ubyte, c_ubyte, POINTER(
+    c_ubyte))
 
 
 def registerExists(portname, devId, regId):
-    _exists = c_ubyte(0)
-    result = _registerExists(portname.encode('ascii'), devId, regId, _exists)
+    _exists = _out.u8
+    result = _registerExists(_encoded(portname), devId, regId, _exists)
     return result, _exists.value
 
 
@@ -1704,12 +1831,11 @@ def registerExists(portname, devId, regId):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerRemove(const char *portname, const unsigned char devId, const unsigned char regId);
 # typedef RegisterResultTypes (__cdecl *RegisterRemoveFuncPtr)(const char *portname, const unsigned char devId, const unsigned char regId);
-_registerRemove = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, c_ubyte)(
-    ('registerRemove', NKTPDLL))
+_registerRemove = _bind('registerRemove', c_ubyte, c_char_p, c_ubyte, c_ubyte)
 
 
 def registerRemove(portname, devId, regId):
-    return _registerRemove(portname.encode('ascii'), devId, regId)
+    return _registerRemove(_encoded(portname), devId, regId)
 
 
 # \brief Remove all registers from the internal registerlist. No confirmation given, the list is simply cleared.
@@ -1719,12 +1845,11 @@ def registerRemove(portname, devId, regId):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerRemoveAll(const char *portname, const unsigned char devId);
 # typedef RegisterResultTypes (__cdecl *RegisterRemoveAllFuncPtr)(const char *portname, const unsigned char devId);
-_registerRemoveAll = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte)(
-    ('registerRemoveAll', NKTPDLL))
+_registerRemoveAll = _bind('registerRemoveAll', c_ubyte, c_char_p, c_ubyte)
 
 
 def registerRemoveAll(portname, devId):
-    return _registerRemoveAll(portname.encode('ascii'), devId)
+    return _registerRemoveAll(_encoded(portname), devId)
 
 
 # \brief Returns a list with register ids (register addresses) from the internal registerlist.
@@ -1737,17 +1862,16 @@ def registerRemoveAll(portname, devId):
 #
 # extern "C" NKTPDLL_EXPORT RegisterResultTypes registerGetAll(const char *portname, const unsigned char devId, unsigned char *regs, unsigned char *maxRegs);
 # typedef RegisterResultTypes (__cdecl *RegisterGetAllFuncPtr)(const char *portname, const unsigned char devId, unsigned char *regs, unsigned char *maxRegs);
-_registerGetAll = CFUNCTYPE(c_ubyte, c_char_p, c_ubyte, POINTER(
-    c_char), POINTER(c_ubyte))(('registerGetAll', NKTPDLL))
+_registerGetAll = _bind('registerGetAll', c_ubyte, c_char_p, c_ubyte, POINTER(
+    c_char), POINTER(c_ubyte))
 
 
 def registerGetAll(portname, devId):
-    _maxRegs = c_ubyte(255)
-    _regs = create_string_buffer(_maxTypes.value)
-    result = _registerGetAll(portname.encode('ascii'), devId, _regs, _maxRegs)
-    if result != 0:
-        _maxRegs = c_ubyte(0)
-    return result, _regs.raw[:_maxRegs.value]
+    _maxRegs = _out.size
+    _maxRegs.value = 255
+    _regs = _out.data
+    result = _registerGetAll(_encoded(portname), devId, _regs, _maxRegs)
+    return result, string_at(_regs, _maxRegs.value if not result else 0)
 
 
 # *******************************************************************************************************
@@ -1777,8 +1901,7 @@ portStatusCallbackFuncPtr = CFUNCTYPE(
 #
 # extern "C" NKTPDLL_EXPORT void setCallbackPtrPortInfo(PortStatusCallbackFuncPtr callback);
 # typedef void (__cdecl *SetCallbackPtrPortInfoFuncPtr)(PortStatusCallbackFuncPtr callback);
-_setCallbackPtrPortInfo = CFUNCTYPE(None, c_void_p)(
-    ('setCallbackPtrPortInfo', NKTPDLL))
+_setCallbackPtrPortInfo = _bind('setCallbackPtrPortInfo', None, c_void_p)
 
 
 def setCallbackPtrPortInfo(PortStatusCallback):
@@ -1805,8 +1928,7 @@ deviceStatusCallbackFuncPtr = CFUNCTYPE(
 #
 # extern "C" NKTPDLL_EXPORT void setCallbackPtrDeviceInfo(DeviceStatusCallbackFuncPtr callback);
 # typedef void (__cdecl *SetCallbackPtrDeviceInfoFuncPtr)(DeviceStatusCallbackFuncPtr callback);
-_setCallbackPtrDeviceInfo = CFUNCTYPE(None, c_void_p)(
-    ('setCallbackPtrDeviceInfo', NKTPDLL))
+_setCallbackPtrDeviceInfo = _bind('setCallbackPtrDeviceInfo', None, c_void_p)
 
 
 def setCallbackPtrDeviceInfo(DeviceStatusCallback):
@@ -1837,14 +1959,138 @@ registerStatusCallbackFuncPtr = CFUNCTYPE(
 #
 # extern "C" NKTPDLL_EXPORT void setCallbackPtrRegisterInfo(RegisterStatusCallbackFuncPtr callback);
 # typedef void (__cdecl *SetCallbackPtrRegisterInfoFuncPtr)(RegisterStatusCallbackFuncPtr callback);
-_setCallbackPtrRegisterInfo = CFUNCTYPE(None, c_void_p)(
-    ('setCallbackPtrRegisterInfo', NKTPDLL))
+_setCallbackPtrRegisterInfo = _bind('setCallbackPtrRegisterInfo', None, c_void_p)
 
 
 def setCallbackPtrRegisterInfo(RegisterStatusCallback):
     _setCallbackPtrRegisterInfo(RegisterStatusCallback)
 
 
+# Replace the DLL wrappers with the pure-Python implementation
+if NKTP_BACKEND == 'interbus':
+    from nkt_tools.interbus import *  # noqa: F401,F403
+
+
+# *****************************************************************************
+# Typed dispatch - one read, write and write/read entry for all data types
+# *****************************************************************************
+
+class DataType(IntEnum):
+    """
+    Data types of the register functions, numbered as RegisterDataTypes.
+
+    Convert a name once with ``DataType['U16']`` and pass the member to
+    :func:`read`, :func:`write` and :func:`writeRead`.
+    """
+
+    Raw = 1
+    U8 = 2
+    S8 = 3
+    U16 = 4
+    S16 = 5
+    U32 = 6
+    S32 = 7
+    F32 = 8
+    U64 = 9
+    S64 = 10
+    F64 = 11
+    Ascii = 12
+
+
+# DataType > register function, kept pointing at the layered functions by
+# _buildTables. The lists are updated in place, so callers may hold them.
+readTable = [None] * (max(DataType) + 1)
+writeTable = [None] * (max(DataType) + 1)
+writeReadTable = [None] * (max(DataType) + 1)
+
+
+def _sized(function):
+    """Adapt registerWrite(Read) to take the content as its value."""
+    def call(portname, devId, regId, value, index):
+        data = bytes(value)
+        return function(portname, devId, regId,
+                        create_string_buffer(data, len(data)), len(data),
+                        index)
+    return call
+
+
+def _text(function):
+    """Adapt registerWrite(Read)Ascii to write the string without EOL."""
+    def call(portname, devId, regId, value, index):
+        return function(portname, devId, regId, value, 0, index)
+    return call
+
+
+def _buildTables():
+    """Point the dispatch tables at the current register functions."""
+    functions = globals()
+    for dtype in DataType:
+        suffix = '' if dtype is DataType.Raw else dtype.name
+        readTable[dtype] = functions['registerRead' + suffix]
+        write = functions['registerWrite' + suffix]
+        writeRead = functions['registerWriteRead' + suffix]
+        if dtype is DataType.Raw:
+            write, writeRead = _sized(write), _sized(writeRead)
+        elif dtype is DataType.Ascii:
+            write, writeRead = _text(write), _text(writeRead)
+        writeTable[dtype] = write
+        writeReadTable[dtype] = writeRead
+
+
+_buildTables()
+
+
+def read(portname, devId, regId, dtype, index=-1):
+    """
+    Read a register of any data type.
+
+    Parameters
+    ----------
+    portname : str
+        Port, e.g. 'COM4'.
+    devId : int
+        Module address.
+    regId : int
+        Register address.
+    dtype : DataType
+        Data type of the value.
+    index : int, optional
+        Byte index of the value in the register. -1 by default.
+
+    Returns
+    -------
+    tuple
+        (RegisterResultTypes, value), bytes for Raw and Ascii.
+    """
+    return readTable[dtype](portname, devId, regId, index)
+
+
+def write(portname, devId, regId, dtype, value, index=-1):
+    """
+    Write a register of any data type.
+
+    `value` is bytes for Raw and str for Ascii, written without EOL.
+
+    Returns
+    -------
+    int
+        RegisterResultTypes.
+    """
+    return writeTable[dtype](portname, devId, regId, value, index)
+
+
+def writeRead(portname, devId, regId, dtype, value, index=-1):
+    """
+    Write a register of any data type and read it back.
+
+    Returns
+    -------
+    tuple
+        (RegisterResultTypes, value read back).
+    """
+    return writeReadTable[dtype](portname, devId, regId, value, index)
+
+
 #print("ports = getAllPorts()")
 #ports = getAllPorts()
 #print("ports:" + ports)
@@ -0,0 +1,107 @@
+"""
+Layers wrapped around the port functions of :mod:`nkt_tools.NKTP_DLL`.
+
+All device classes call the register and device functions through the
+``nkt`` module at call time, so replacing these module attributes routes
+every device API through the installed layers. A layer is a callable
+``layer(name, function)`` returning the wrapped function, or `function`
+itself to leave that name alone.
+
+Layers are stacked by their order, the lowest order next to the backend.
+"""
+import threading
+
+import nkt_tools.NKTP_DLL as nkt
+
+
+# Order of the layers shipped with nkt_tools, from the backend outwards
+REPLAY = 0
+DISPATCH = 10
+TRACE = 20
+SINGLEFLIGHT = 30
+CACHE = 40
+LIVE = 45
+INSTRUMENT = 50
+
+_lock = threading.Lock()
+_originals = {}  # name > function of the backend
+_layers = []  # (order, sequence, layer)
+_sequence = 0
+
+orders = frozenset()
+"""frozenset : Orders of the installed layers."""
+
+
+def port_functions():
+    """Return the names of all functions taking a portname first."""
+    return sorted(name for name in dir(nkt)
+                  if name.startswith(('register', 'device'))
+                  and callable(getattr(nkt, name))
+                  and not isinstance(getattr(nkt, name), type))
+
+
+def original(name):
+    """Return the backend function `name` without any layer."""
+    return _originals.get(name) or getattr(nkt, name)
+
+
+def _rebuild():
+    global orders
+    if not _originals:
+        _originals.update((name, getattr(nkt, name))
+                          for name in port_functions())
+    for name, function in _originals.items():
+        for _, _, layer in sorted(_layers, key=lambda entry: entry[:2]):
+            function = layer(name, function)
+        setattr(nkt, name, function)
+    nkt._buildTables()
+    orders = frozenset(order for order, _, _ in _layers)
+
+
+def install(layer, order):
+    """
+    Wrap the port functions of NKTP_DLL with `layer`.
+
+    Parameters
+    ----------
+    layer : callable
+        layer(name, function) > wrapped function.
+    order : int
+        Position in the stack, lower is closer to the backend.
+    """
+    global _sequence
+    with _lock:
+        _sequence += 1
+        _layers.append((order, _sequence, layer))
+        _rebuild()
+
+
+def install_once(layer, order):
+    """
+    Install `layer` unless it is installed, checked under the same lock.
+
+    Returns
+    -------
+    bool
+        True if the layer was installed by this call.
+    """
+    global _sequence
+    with _lock:
+        if any(entry[2] is layer for entry in _layers):
+            return False
+        _sequence += 1
+        _layers.append((order, _sequence, layer))
+        _rebuild()
+        return True
+
+
+def remove(layer):
+    """Remove `layer` again. Removing a layer not installed is a no-op."""
+    with _lock:
+        _layers[:] = [entry for entry in _layers if entry[2] is not layer]
+        _rebuild()
+
+
+def installed(layer):
+    """Return True if `layer` is installed."""
+    return any(entry[2] is layer for entry in _layers)
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""Register maps compiled from the register files by
+nkt_tools.registers, do not edit."""
+
+# module type: (description,
+#               ((address, index, name, attr, unit, dtype, scale, section), ...),
+#               {status bit: meaning}, {error code: meaning})
+MAPS = {
+    0x00: ('No module detected', (
+    ), {}, {}),
+    0x20: ('Koheras AdjustiK/BoostiK (K81-1 to K83-1)', (
+        (0x23, -1, 'Setpoint', 'setpoint', 'mA or 0.01 mW', 'U16', 1.0, 'controls'),
+        (0x25, -1, 'FL setpoint', 'fl_setpoint', '°C or nm', 'U16', 0.001, 'controls'),
+        (0x28, -1, 'Wavelength offset', 'wavelength_offset', 'nm', 'U16', 1.0, 'controls'),
+        (0x30, -1, 'Emission off/on', 'emission_off_on', 'Bolean', 'U8', 1.0, 'controls'),
+        (0x65, -1, 'Module serialnumber', 'module_serialnumber', '', 'Ascii', 1.0, 'controls'),
+    ), {0: 'Emission', 1: 'Remote', 2: 'Interlock', 3: 'Key switch', 4: 'Relay', 5: 'General system enable', 7: 'System disabled by module'}, {0: 'No error'}),
+    0x21: ('Koheras BasiK Module (K80-1)', (
+        (0x10, 24, 'Wavelength-WLOFFSET', 'wavelength_wloffset', 'nm', 'U16', 0.001, 'readings'),
+        (0x10, 26, 'WLOFFSET', 'wloffset', 'nm', 'U16', 1.0, 'readings'),
+        (0x11, -1, 'FL temperature', 'fl_temperature', '°C', 'U16', 0.001, 'readings'),
+        (0x15, -1, 'Pump current', 'pump_current', 'mA', 'U16', 1.0, 'readings'),
+        (0x18, -1, 'Output power', 'output_power', 'mW', 'U16', 0.01, 'readings'),
+        (0x19, -1, 'Module temperature', 'module_temperature', '°C', 'U16', 0.1, 'readings'),
+        (0x1B, -1, 'Module input voltage', 'module_input_voltage', 'V', 'U16', 0.001, 'readings'),
+        (0x23, -1, 'Setpoint', 'setpoint', 'mA or 0.01 mW', 'U16', 1.0, 'controls'),
+        (0x25, -1, 'FL setpoint', 'fl_setpoint', '°C or nm', 'U16', 0.001, 'controls'),
+        (0x30, -1, 'Emission', 'emission', '0=Off;1=On', 'U8', 1.0, 'controls'),
+        (0x31, -1, 'Current/power mode', 'current_power_mode', '0=Current;1=Power', 'U8', 1.0, 'controls'),
+        (0x32, -1, 'Piezo modulation', 'piezo_modulation', '0=Off;1=On', 'U8', 1.0, 'controls'),
+        (0x33, -1, 'RIN suppression', 'rin_suppression', '0=Off;1=On', 'U8', 1.0, 'controls'),
+        (0x34, -1, 'Temperature/wavelength mode', 'temperature_wavelength_mode', '0=Temp;1=Wavelength', 'U8', 1.0, 'controls'),
+        (0x35, -1, 'Temperature compensation mode', 'temperature_compensation_mode', '0=Off;1=On', 'U8', 1.0, 'controls'),
+        (0x36, -1, 'Acknowledge mode', 'acknowledge_mode', '0=Off;1=On', 'U8', 1.0, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+    ), {0: 'EMISSIONBIT', 1: 'CUPOMODEBIT', 2: 'PIEZOBIT', 3: 'HFBIT', 4: 'WLBIT', 5: 'FLSTABBIT', 6: 'PUSTABBIT', 7: 'SYSENBIT'}, {0: 'No error'}),
+    0x33: ('Koheras BASIK module (K1x2)', (
+        (0x17, -1, 'Output power', 'output_power', 'mW', 'U16', 0.01, 'readings'),
+        (0x1C, -1, 'Module temperature', 'module_temperature', '°C', 'S16', 0.1, 'readings'),
+        (0x1E, -1, 'Supply voltage', 'supply_voltage', 'V', 'U16', 0.001, 'readings'),
+        (0x72, -1, 'Wavelength offset readout', 'wavelength_offset_readout', 'pm', 'S32', 0.1, 'readings'),
+        (0x90, -1, 'Output power monitor (dBm)', 'output_power_monitor_dbm', 'dBm', 'S16', 0.01, 'readings'),
+        (0x22, -1, 'Output power setpoint', 'output_power_setpoint', 'mW', 'U16', 0.01, 'controls'),
+        (0x2A, -1, 'Wavelength offset', 'wavelength_offset', 'pm', 'S16', 0.1, 'controls'),
+        (0x2B, -1, 'Wavelength DDS Full scale adjust', 'wavelength_dds_full_scale_adjust', '%', 'S16', 0.1, 'controls'),
+        (0x2C, -1, 'Amplitude DDS Full scale adjust', 'amplitude_dds_full_scale_adjust', '%', 'S16', 0.1, 'controls'),
+        (0x2F, -1, 'Wavelength DC offset', 'wavelength_dc_offset', '%', 'S16', 0.1, 'controls'),
+        (0x30, -1, 'Emission', 'emission', '0=off/1=on', 'U8', 1.0, 'controls'),
+        (0x31, -1, 'Setup bits', 'setup_bits', 'hex', 'U16', 1.0, 'controls'),
+        (0x32, -1, 'Standard wavelength', 'standard_wavelength', 'nm', 'U32', 0.0001, 'controls'),
+        (0x3A, -1, 'Emission delay', 'emission_delay', 'sec', 'U8', 0.1, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+        (0x8D, -1, 'User area', 'user_area', '', 'Ascii', 1.0, 'controls'),
+        (0xA0, -1, 'Output power setpoint (dBm)', 'output_power_setpoint_dbm', 'dBm', 'S16', 0.01, 'controls'),
+        (0xB4, -1, 'Trigger bits', 'trigger_bits', 'hex', 'U8', 1.0, 'controls'),
+        (0xB5, -1, 'Wavelength Modulation enable', 'wavelength_modulation_enable', 'off/on', 'U8', 1.0, 'controls'),
+        (0xB6, -1, 'Amplitude Modulation enable', 'amplitude_modulation_enable', 'off/on', 'U8', 1.0, 'controls'),
+        (0xB7, -1, 'DDS Setup', 'dds_setup', 'hex', 'U8', 1.0, 'controls'),
+        (0xB8, 0, 'Wavelength DDS Freq0', 'wavelength_dds_freq0', 'Hz', 'F32', 1.0, 'controls'),
+        (0xB8, 4, 'Wavelength DDS Freq1', 'wavelength_dds_freq1', 'Hz', 'F32', 1.0, 'controls'),
+        (0xBA, 0, 'Amplitude DDS Freq0', 'amplitude_dds_freq0', 'Hz', 'F32', 1.0, 'controls'),
+        (0xBA, 4, 'Amplitude DDS Freq1', 'amplitude_dds_freq1', 'Hz', 'F32', 1.0, 'controls'),
+    ), {0: 'Emission', 1: 'Interlock off', 4: 'Module disabled', 5: 'Supply voltage low', 6: 'Module temp range', 11: 'Waiting for temperature to drop', 14: 'Wavelength stabilized (X15 only)', 15: 'Error code present'}, {0: 'No error', 2: 'Interlock', 3: 'Low voltage', 7: 'Module temperature range', 8: 'Module disabled'}),
+    0x34: ('Koheras ADJUSTIK/ACOUSTIK (K822/K852)', (
+        (0x11, -1, 'Supply voltage', 'supply_voltage', 'V', 'U16', 0.001, 'readings'),
+        (0x22, 0, 'Wavelength mod. frequency (0)', 'wavelength_mod_frequency_0', 'Hz', 'U32', 0.001, 'controls'),
+        (0x22, 4, 'Wavelength mod. frequency (1)', 'wavelength_mod_frequency_1', 'Hz', 'U32', 0.001, 'controls'),
+        (0x24, -1, 'Wavelength mod. level', 'wavelength_mod_level', '%', 'U16', 0.1, 'controls'),
+        (0x25, -1, 'Wavelength mod. offset', 'wavelength_mod_offset', '%', 'S16', 0.1, 'controls'),
+        (0x26, 0, 'Amplitude mod. frequency (0)', 'amplitude_mod_frequency_0', 'Hz', 'U32', 0.001, 'controls'),
+        (0x26, 4, 'Amplitude mod. frequency (1)', 'amplitude_mod_frequency_1', 'Hz', 'U32', 0.001, 'controls'),
+        (0x28, -1, 'Amplitude mod. max power', 'amplitude_mod_max_power', '%', 'U16', 0.1, 'controls'),
+        (0x29, -1, 'Amplitude mod. modulation depth', 'amplitude_mod_modulation_depth', '%', 'U16', 0.1, 'controls'),
+        (0x2D, -1, 'Broadcast wavelength offset', 'broadcast_wavelength_offset', 'pm', 'S16', 0.1, 'controls'),
+        (0x2E, -1, 'Broadcast power (dBm)', 'broadcast_power_dbm', 'dBm', 'S16', 0.01, 'controls'),
+        (0x2F, -1, 'Broadcast power (mW)', 'broadcast_power_mw', 'mW', 'U16', 0.01, 'controls'),
+        (0x30, -1, 'Broadcast emission', 'broadcast_emission', '0/1', 'U8', 1.0, 'controls'),
+        (0x31, -1, 'Broadcast setup', 'broadcast_setup', 'hex', 'U16', 1.0, 'controls'),
+        (0x32, -1, 'Interlock', 'interlock', 'hex', 'U16', 1.0, 'controls'),
+        (0x34, -1, 'Watchdog', 'watchdog', 'sec', 'U8', 1.0, 'controls'),
+        (0x36, -1, 'Multichannel imitation', 'multichannel_imitation', 'dec', 'U16', 1.0, 'controls'),
+        (0x3B, -1, 'Modulation setup', 'modulation_setup', 'hex', 'U16', 1.0, 'controls'),
+        (0x3E, -1, 'Broadcast wavelength mod. on/off', 'broadcast_wavelength_mod_on_off', '0/1', 'U8', 1.0, 'controls'),
+        (0x3F, -1, 'Broadcast amplitude mod. on/off', 'broadcast_amplitude_mod_on_off', '0/1', 'U8', 1.0, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+        (0xB0, 0, 'IP address (0)', 'ip_address_0', '', 'U8', 1.0, 'controls'),
+        (0xB0, 1, 'IP address (1)', 'ip_address_1', '', 'U8', 1.0, 'controls'),
+        (0xB0, 2, 'IP address (2)', 'ip_address_2', '', 'U8', 1.0, 'controls'),
+        (0xB0, 3, 'IP address (3)', 'ip_address_3', '', 'U8', 1.0, 'controls'),
+        (0xB3, 0, 'MAC address (0)', 'mac_address_0', '', 'U8', 1.0, 'controls'),
+        (0xB3, 1, 'MAC address (1)', 'mac_address_1', '', 'U8', 1.0, 'controls'),
+        (0xB3, 2, 'MAC address (2)', 'mac_address_2', '', 'U8', 1.0, 'controls'),
+        (0xB3, 3, 'MAC address (3)', 'mac_address_3', '', 'U8', 1.0, 'controls'),
+        (0xB3, 4, 'MAC address (4)', 'mac_address_4', '', 'U8', 1.0, 'controls'),
+        (0xB3, 5, 'MAC address (5)', 'mac_address_5', '', 'U8', 1.0, 'controls'),
+        (0xB4, -1, 'System port', 'system_port', '', 'U16', 1.0, 'controls'),
+        (0xB5, -1, 'Host port', 'host_port', '', 'U16', 1.0, 'controls'),
+        (0xB7, 0, 'Host IP address (0)', 'host_ip_address_0', '', 'U8', 1.0, 'controls'),
+        (0xB7, 1, 'Host IP address (1)', 'host_ip_address_1', '', 'U8', 1.0, 'controls'),
+        (0xB7, 2, 'Host IP address (2)', 'host_ip_address_2', '', 'U8', 1.0, 'controls'),
+        (0xB7, 3, 'Host IP address (3)', 'host_ip_address_3', '', 'U8', 1.0, 'controls'),
+    ), {0: 'Emission on', 1: 'Interlock relays off', 2: 'Interlock power failure', 3: 'Interlock loop off', 4: 'Re-addressing problem', 5: 'SD card problem', 6: 'Module communication problem', 7: 'No backplane', 8: 'Illegal MAC address', 9: 'Supply voltage low', 10: 'Temperature out of range', 15: 'Error code present'}, {0: 'No errors', 2: 'Interlock', 3: 'Low voltage', 4: 'Memory problem', 5: 'Watchdog', 6: 'Bad LED', 7: 'Board temperature range', 11: 'Broken fuse', 101: 'I/O expander problem'}),
+    0x36: ('Koheras BASIK MIKRO (K0x2)', (
+        (0x17, -1, 'Output power', 'output_power', 'mW', 'U16', 0.01, 'readings'),
+        (0x1C, -1, 'Module temperature', 'module_temperature', '°C', 'S16', 0.1, 'readings'),
+        (0x1E, -1, 'Supply voltage', 'supply_voltage', 'V', 'U16', 0.001, 'readings'),
+        (0x72, -1, 'Wavelength offset readout', 'wavelength_offset_readout', 'pm', 'S32', 0.1, 'readings'),
+        (0x90, -1, 'Output power monitor (dBm)', 'output_power_monitor_dbm', 'dBm', 'S16', 0.01, 'readings'),
+        (0x22, -1, 'Output power setpoint', 'output_power_setpoint', 'mW', 'U16', 0.01, 'controls'),
+        (0x2A, -1, 'Wavelength offset', 'wavelength_offset', 'pm', 'S16', 0.1, 'controls'),
+        (0x30, -1, 'Emission', 'emission', '0=off/1=on', 'U8', 1.0, 'controls'),
+        (0x31, -1, 'Setup bits', 'setup_bits', 'hex', 'U16', 1.0, 'controls'),
+        (0x32, -1, 'Standard wavelength', 'standard_wavelength', 'nm', 'U32', 0.0001, 'controls'),
+        (0x3A, -1, 'Emission delay', 'emission_delay', 'sec', 'U8', 0.1, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+        (0x8D, -1, 'User area', 'user_area', '', 'Ascii', 1.0, 'controls'),
+        (0xA0, -1, 'Output power setpoint (dBm)', 'output_power_setpoint_dbm', 'dBm', 'S16', 0.01, 'controls'),
+    ), {0: 'Emission', 1: 'Interlock off', 4: 'Module disabled', 5: 'Supply voltage low', 6: 'Module temp range', 11: 'Waiting for temperature to drop', 15: 'Error code present'}, {0: 'No error', 2: 'Interlock', 3: 'Low voltage', 7: 'Module temperature range', 8: 'Module disabled'}),
+    0x60: ('SuperK Extreme (S4x2), Fianium', (
+        (0x11, -1, 'Inlet temperature', 'inlet_temperature', '°C', 'S16', 0.1, 'readings'),
+        (0x30, -1, 'Emission', 'emission', '0=Off;3=On', 'U8', 1.0, 'controls'),
+        (0x31, -1, 'Setup bits', 'setup_bits', '0=Current mode;1=Power mode', 'U16', 1.0, 'controls'),
+        (0x32, -1, 'Interlock', 'interlock', '(>0=reset interlock)', 'U16', 1.0, 'controls'),
+        (0x34, -1, 'Pulse-Picker ratio', 'pulse_picker_ratio', 'Times', 'U16', 1.0, 'controls'),
+        (0x36, -1, 'Watchdog interval', 'watchdog_interval', 'Seconds', 'U8', 1.0, 'controls'),
+        (0x37, -1, 'Power level', 'power_level', '%', 'U16', 0.1, 'controls'),
+        (0x38, -1, 'Current level', 'current_level', '%', 'U16', 0.1, 'controls'),
+        (0x39, -1, 'NIM delay', 'nim_delay', 'dec', 'U16', 1.0, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+        (0x6B, -1, 'System type', 'system_type', '', 'U8', 1.0, 'controls'),
+        (0x6C, -1, 'User text', 'user_text', '', 'Ascii', 1.0, 'controls'),
+    ), {0: 'Emission on', 1: 'Interlock off', 2: 'Interlock power failure', 3: 'Interlock loop off', 4: 'External disable', 5: 'Supply voltage low', 6: 'Module temp range', 14: 'USB log error code present', 15: 'Error code present'}, {0: 'No error'}),
+    0x61: ('SuperK Front panel 2011', (
+        (0x72, -1, 'Display text', 'display_text', '-', 'Ascii', 1.0, 'readings'),
+        (0x3D, -1, 'Panel lock', 'panel_lock', 'Byte', 'U8', 1.0, 'controls'),
+        (0x8D, -1, 'Error flash', 'error_flash', '0=off;1=on', 'U8', 1.0, 'controls'),
+    ), {}, {}),
+    0x65: ('SuperK Booster 2011', (
+        (0x80, -1, 'Booster emission runtime', 'booster_emission_runtime', 's', 'U32', 1.0, 'readings'),
+    ), {0: 'Emission', 1: 'Interlock off', 2: 'Interlock loop in', 3: 'Interlock loop out', 4: 'Module disabled', 5: 'Supply voltage low', 6: 'Module temp range', 7: 'Heat sink temp high'}, {}),
+    0x66: ('RF Driver (A901) & SuperK Select (A203)', (
+        (0x30, -1, 'RF Power', 'rf_power', '0=Off;1=On', 'U8', 1.0, 'controls'),
+        (0x31, -1, 'Setup bits', 'setup_bits', '', 'U16', 1.0, 'controls'),
+        (0x34, -1, 'Minimum wavelength', 'minimum_wavelength', 'nm', 'U32', 0.001, 'controls'),
+        (0x35, -1, 'Maximum wavelength', 'maximum_wavelength', 'nm', 'U32', 0.001, 'controls'),
+        (0x38, -1, 'Crystal temperature', 'crystal_temperature', '°C', 'S16', 0.1, 'controls'),
+        (0x3B, -1, 'FSK mode', 'fsk_mode', '-', 'U8', 1.0, 'controls'),
+        (0x3C, -1, 'Daughter board enable/disable', 'daughter_board_enable_disable', 'dec', 'U8', 1.0, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+        (0x90, -1, 'Wavelength #0', 'wavelength_0', 'nm', 'U32', 0.001, 'controls'),
+        (0x91, -1, 'Wavelength #1', 'wavelength_1', 'nm', 'U32', 0.001, 'controls'),
+        (0x92, -1, 'Wavelength #2', 'wavelength_2', 'nm', 'U32', 0.001, 'controls'),
+        (0x93, -1, 'Wavelength #3', 'wavelength_3', 'nm', 'U32', 0.001, 'controls'),
+        (0x94, -1, 'Wavelength #4', 'wavelength_4', 'nm', 'U32', 0.001, 'controls'),
+        (0x95, -1, 'Wavelength #5', 'wavelength_5', 'nm', 'U32', 0.001, 'controls'),
+        (0x96, -1, 'Wavelength #6', 'wavelength_6', 'nm', 'U32', 0.001, 'controls'),
+        (0x97, -1, 'Wavelength #7', 'wavelength_7', 'nm', 'U32', 0.001, 'controls'),
+        (0xB0, -1, 'Amplitude #0', 'amplitude_0', '%', 'U16', 0.1, 'controls'),
+        (0xB1, -1, 'Amplitude #1', 'amplitude_1', '%', 'U16', 0.1, 'controls'),
+        (0xB2, -1, 'Amplitude #2', 'amplitude_2', '%', 'U16', 0.1, 'controls'),
+        (0xB3, -1, 'Amplitude #3', 'amplitude_3', '%', 'U16', 0.1, 'controls'),
+        (0xB4, -1, 'Amplitude #4', 'amplitude_4', '%', 'U16', 0.1, 'controls'),
+        (0xB5, -1, 'Amplitude #5', 'amplitude_5', '%', 'U16', 0.1, 'controls'),
+        (0xB6, -1, 'Amplitude #6', 'amplitude_6', '%', 'U16', 0.1, 'controls'),
+        (0xB7, -1, 'Amplitude #7', 'amplitude_7', '%', 'U16', 0.1, 'controls'),
+        (0xC0, -1, 'Modulation gain #0', 'modulation_gain_0', '%', 'U16', 0.1, 'controls'),
+        (0xC1, -1, 'Modulation gain #1', 'modulation_gain_1', '%', 'U16', 0.1, 'controls'),
+        (0xC2, -1, 'Modulation gain #2', 'modulation_gain_2', '%', 'U16', 0.1, 'controls'),
+        (0xC3, -1, 'Modulation gain #3', 'modulation_gain_3', '%', 'U16', 0.1, 'controls'),
+        (0xC4, -1, 'Modulation gain #4', 'modulation_gain_4', '%', 'U16', 0.1, 'controls'),
+        (0xC5, -1, 'Modulation gain #5', 'modulation_gain_5', '%', 'U16', 0.1, 'controls'),
+        (0xC6, -1, 'Modulation gain #6', 'modulation_gain_6', '%', 'U16', 0.1, 'controls'),
+        (0xC7, -1, 'Modulation gain #7', 'modulation_gain_7', '%', 'U16', 0.1, 'controls'),
+    ), {0: 'Emission', 5: 'Supply voltage low', 6: 'Module temp range', 13: 'AODS communication timeout', 14: 'Needs crystal info', 15: 'Error code present'}, {0: 'No error'}),
+    0x67: ('SuperK Select (A203)', (
+        (0x10, -1, 'Monitor input1', 'monitor_input1', '%', 'U16', 0.1, 'readings'),
+        (0x11, -1, 'Monitor input2', 'monitor_input2', '%', 'U16', 0.1, 'readings'),
+        (0x32, -1, 'Monitor input1 gain', 'monitor_input1_gain', 'dec', 'U8', 1.0, 'controls'),
+        (0x33, -1, 'Monitor input2 gain', 'monitor_input2_gain', 'dec', 'U8', 1.0, 'controls'),
+        (0x34, -1, 'RF switch', 'rf_switch', 'dec', 'U8', 1.0, 'controls'),
+        (0x35, -1, 'Monitor switch', 'monitor_switch', 'dec', 'U8', 1.0, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '-', 'Ascii', 1.0, 'controls'),
+    ), {1: 'Interlock off', 2: 'Interlock loop in', 3: 'Interlock loop out', 5: 'Supply voltage low', 6: 'Module temp range', 8: 'Shutter sensor1', 9: 'Shutter sensor2', 10: 'New crystal1 temperature', 11: 'New crystal2 temperature', 15: 'Error code present'}, {}),
+    0x68: ('SuperK Varia (A301)', (
+        (0x13, -1, 'Monitor input', 'monitor_input', '%', 'U16', 0.1, 'readings'),
+        (0x32, -1, 'Filter setpoint #1 (ND)', 'filter_setpoint_1_nd', '%', 'U16', 0.1, 'controls'),
+        (0x33, -1, 'Filter setpoint #2 (SWP)', 'filter_setpoint_2_swp', 'nm', 'U16', 0.1, 'controls'),
+        (0x34, -1, 'Filter setpoint #3 (LWP)', 'filter_setpoint_3_lwp', 'nm', 'U16', 0.1, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+    ), {1: 'Interlock off', 2: 'Interlock loop in', 3: 'Interlock loop out', 5: 'Supply voltage low', 6: 'Module temp range', 8: 'Shutter sensor 1', 9: 'Shutter sensor 2', 12: 'Filter1 moving', 13: 'Filter2 moving', 14: 'Filter3 moving', 15: 'Error code present'}, {0: 'No error'}),
+    0x6B: ('SuperK EXTEND-UV (A351)', (
+        (0x31, -1, 'Wavelength', 'wavelength', 'nm', 'U16', 0.1, 'controls'),
+        (0x32, -1, 'Maximum wavelength', 'maximum_wavelength', 'nm', 'U16', 0.1, 'controls'),
+        (0x33, -1, 'Minimum wavelength', 'minimum_wavelength', 'nm', 'U16', 0.1, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+    ), {1: 'Interlock off', 2: 'Interlock loop in', 3: 'Interlock loop out', 5: 'Supply voltage low', 8: 'Shutter sensor 1', 9: 'Shutter sensor 2', 10: 'Shutter sensor 3', 12: 'Stepper 1 moving', 13: 'Stepper 2 moving', 15: 'Error code present'}, {}),
+    0x70: ('BoostiK OEM amplifier (N83)', (
+        (0x10, -1, 'Heat sink temperature #1', 'heat_sink_temperature_1', '°C', 'S16', 0.1, 'readings'),
+        (0x12, -1, 'Supply voltage', 'supply_voltage', 'V', 'U16', 0.001, 'readings'),
+        (0x15, -1, 'Output power', 'output_power', 'W', 'U16', 0.001, 'readings'),
+        (0x17, -1, 'Amplifier temperature', 'amplifier_temperature', '°C', 'S16', 0.1, 'readings'),
+        (0x19, -1, 'Pump2 current', 'pump2_current', 'A', 'U16', 0.001, 'readings'),
+        (0x21, -1, 'Pump2 current setpoint', 'pump2_current_setpoint', 'A', 'U16', 0.001, 'controls'),
+        (0x22, -1, 'Output power setpoint', 'output_power_setpoint', 'dBm', 'S16', 0.1, 'controls'),
+        (0x30, -1, 'State', 'state', '0=Off;1=Current;2=Power', 'U8', 1.0, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+    ), {0: 'Emission', 1: 'Interlock off', 2: 'Reserved', 3: 'Reserved', 4: 'Module disabled', 5: 'Supply voltage low', 6: 'Heat sink temp range', 7: 'Pump temp high', 8: 'Input power low', 9: 'Output power low', 10: 'EDFA temperature high', 11: 'Pump temperature high', 12: 'Pump bias alarm', 15: 'Error code present'}, {0: 'No error'}),
+    0x74: ('SuperK Compact (S024)', (
+        (0x1A, -1, 'Supply voltage', 'supply_voltage', 'V', 'U16', 0.001, 'readings'),
+        (0x1B, -1, 'Heat sink temperature', 'heat_sink_temperature', '°C', 'S16', 0.1, 'readings'),
+        (0x71, -1, 'Optical pulse frequency', 'optical_pulse_frequency', 'kHz', 'U32', 0.001, 'readings'),
+        (0x75, -1, 'Actual internal trig frequency', 'actual_internal_trig_frequency', 'kHz', 'U32', 1e-05, 'readings'),
+        (0x78, -1, 'Display text', 'display_text', '-', 'Ascii', 1.0, 'readings'),
+        (0x7A, -1, 'Power readout', 'power_readout', '%', 'U8', 1.0, 'readings'),
+        (0x24, -1, 'Trig level setpoint', 'trig_level_setpoint', 'V', 'U16', 0.001, 'controls'),
+        (0x26, -1, 'Display backlight setpoint', 'display_backlight_setpoint', '%', 'U8', 1.0, 'controls'),
+        (0x30, -1, 'Emission', 'emission', '(0=off/1=on)', 'U8', 1.0, 'controls'),
+        (0x31, -1, 'Trig mode', 'trig_mode', 'dec', 'U8', 1.0, 'controls'),
+        (0x32, -1, 'Interlock', 'interlock', '(>0=switch interlock on)', 'U16', 1.0, 'controls'),
+        (0x33, -1, 'Internal pulse frequency', 'internal_pulse_frequency', 'kHz', 'U32', 0.001, 'controls'),
+        (0x34, -1, 'Burst pulses', 'burst_pulses', '-', 'U16', 1.0, 'controls'),
+        (0x35, -1, 'Watchdog interval', 'watchdog_interval', 'Seconds', 'U8', 1.0, 'controls'),
+        (0x36, -1, 'Internal pulse frequency limit', 'internal_pulse_frequency_limit', 'kHz', 'U32', 0.001, 'controls'),
+        (0x3E, -1, 'Power level', 'power_level', '%', 'U8', 1.0, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '-', 'Ascii', 1.0, 'controls'),
+        (0x8D, -1, 'User area', 'user_area', '-', 'Ascii', 1.0, 'controls'),
+    ), {0: 'Emission', 1: 'Interlock off', 2: 'Interlock power failure', 3: 'Interlock loop off', 5: 'Supply voltage low', 6: 'Module temp range', 7: 'Pump temp high', 8: 'Pulse overrun', 9: 'Trig signal level', 10: 'Trig edge', 15: 'Error code present'}, {}),
+    0x7D: ('S2x1 SuperK EVO', (
+        (0x17, -1, 'Base temperature', 'base_temperature', '°C', 'S16', 0.1, 'readings'),
+        (0x1D, -1, '24V supply', 'register_24v_supply', 'V', 'U16', 0.001, 'readings'),
+        (0x94, -1, 'External power feedback', 'external_power_feedback', 'V', 'U16', 0.001, 'readings'),
+        (0x21, -1, 'Output power setpoint', 'output_power_setpoint', '%', 'U16', 0.1, 'controls'),
+        (0x27, -1, 'Current setpoint', 'current_setpoint', '%', 'U16', 0.1, 'controls'),
+        (0x30, -1, 'Emission off/on', 'emission_off_on', '(0-2)', 'U8', 1.0, 'controls'),
+        (0x31, -1, 'Setup bits', 'setup_bits', '-', 'U8', 1.0, 'controls'),
+        (0x32, -1, 'Interlock', 'interlock', '-', 'U16', 1.0, 'controls'),
+        (0x36, -1, 'Watchdog timer', 'watchdog_timer', 's', 'U8', 1.0, 'controls'),
+        (0x3B, -1, 'NIM delay', 'nim_delay', '-', 'U16', 1.0, 'controls'),
+        (0x65, -1, 'Module serial number', 'module_serial_number', '', 'Ascii', 1.0, 'controls'),
+        (0x8D, -1, 'User area', 'user_area', '', 'Ascii', 1.0, 'controls'),
+        (0xB0, 0, 'IP address (0)', 'ip_address_0', '', 'U8', 1.0, 'controls'),
+        (0xB0, 1, 'IP address (1)', 'ip_address_1', '', 'U8', 1.0, 'controls'),
+        (0xB0, 2, 'IP address (2)', 'ip_address_2', '', 'U8', 1.0, 'controls'),
+        (0xB0, 3, 'IP address (3)', 'ip_address_3', '', 'U8', 1.0, 'controls'),
+        (0xB1, 0, 'Gateway (0)', 'gateway_0', '', 'U8', 1.0, 'controls'),
+        (0xB1, 1, 'Gateway (1)', 'gateway_1', '', 'U8', 1.0, 'controls'),
+        (0xB1, 2, 'Gateway (2)', 'gateway_2', '', 'U8', 1.0, 'controls'),
+        (0xB1, 3, 'Gateway (3)', 'gateway_3', '', 'U8', 1.0, 'controls'),
+        (0xB2, 0, 'Subnet mask (0)', 'subnet_mask_0', '', 'U8', 1.0, 'controls'),
+        (0xB2, 1, 'Subnet mask (1)', 'subnet_mask_1', '', 'U8', 1.0, 'controls'),
+        (0xB2, 2, 'Subnet mask (2)', 'subnet_mask_2', '', 'U8', 1.0, 'controls'),
+        (0xB2, 3, 'Subnet mask (3)', 'subnet_mask_3', '', 'U8', 1.0, 'controls'),
+        (0xB3, 0, 'MAC address (0)', 'mac_address_0', '', 'U8', 1.0, 'controls'),
+        (0xB3, 1, 'MAC address (1)', 'mac_address_1', '', 'U8', 1.0, 'controls'),
+        (0xB3, 2, 'MAC address (2)', 'mac_address_2', '', 'U8', 1.0, 'controls'),
+        (0xB3, 3, 'MAC address (3)', 'mac_address_3', '', 'U8', 1.0, 'controls'),
+        (0xB3, 4, 'MAC address (4)', 'mac_address_4', '', 'U8', 1.0, 'controls'),
+        (0xB3, 5, 'MAC address (5)', 'mac_address_5', '', 'U8', 1.0, 'controls'),
+        (0xB4, -1, 'Port', 'port', '', 'U16', 1.0, 'controls'),
+    ), {0: 'Emission', 1: 'Interlock off', 2: 'Interlock power failure', 3: 'Remote interlock', 5: 'Supply voltage low', 6: 'Module temp range', 14: 'Log error', 15: 'Error code present'}, {0: 'No error'}),
+}
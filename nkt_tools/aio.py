@@ -0,0 +1,92 @@
+"""
+asyncio counterparts of the device APIs.
+
+All device classes derive from :class:`AsyncMixin`. Besides the blocking
+properties and methods they offer awaitable versions, which run the
+blocking call on the dispatcher thread of the device port (see
+:mod:`nkt_tools.dispatch`), so one event loop can drive many devices at
+once while calls to the same port stay serialized:
+
+* ``await device.aread_<property>()`` reads a property,
+* ``await device.aset_<name>(value)`` calls ``set_<name>(value)`` if the
+  class has such a method, else assigns the property `<name>`,
+* ``await device.a<method>(...)`` calls any other method.
+
+Example
+-------
+>>> import asyncio
+>>> from nkt_tools.extreme import Extreme
+>>> async def main(lasers):
+...     return await asyncio.gather(*[laser.aread_power_level()
+...                                   for laser in lasers])
+>>> asyncio.run(main([Extreme('COM4'), Extreme('COM5')]))
+[50.0, 42.5]
+"""
+import functools
+
+from nkt_tools import dispatch
+
+
+async def run(portname, function, *args, **kwargs):
+    """
+    Run a blocking function on the dispatcher thread of `portname`.
+
+    Parameters
+    ----------
+    portname : str
+        Port the function talks to.
+    function : callable
+        Blocking function, e.g. nkt.registerReadU16.
+    *args, **kwargs
+        Arguments of the function.
+
+    Returns
+    -------
+    object
+        The return value of the function.
+    """
+    import asyncio  # Only for coroutines, keeps importing the devices fast
+    if kwargs:
+        function = functools.partial(function, **kwargs)
+    future = dispatch.dispatcher(portname).submit(
+        dispatch.current_priority(), function, *args)
+    return await asyncio.wrap_future(future)
+
+
+def _is_property(attr):
+    """Return True for properties and other data descriptors."""
+    return hasattr(type(attr), '__set__')
+
+
+class AsyncMixin:
+    """Awaitable ``aread_*``, ``aset_*`` and ``a*`` versions of a device API."""
+
+    __slots__ = ()
+
+    async def aread(self, name):
+        """Read property `name` without blocking the event loop."""
+        return await run(self.portname, getattr, self, name)
+
+    async def awrite(self, name, value):
+        """Assign property `name` without blocking the event loop."""
+        return await run(self.portname, setattr, self, name, value)
+
+    async def acall(self, name, *args, **kwargs):
+        """Call method `name` without blocking the event loop."""
+        return await run(self.portname, getattr(self, name), *args, **kwargs)
+
+    def __getattr__(self, name):
+        # Only reached for attributes which do not exist
+        cls = type(self)
+        if name.startswith('aread_'):
+            if _is_property(getattr(cls, name[6:], None)):
+                return functools.partial(self.aread, name[6:])
+        elif name.startswith('aset_'):
+            if callable(getattr(cls, 'set_' + name[5:], None)):
+                return functools.partial(self.acall, 'set_' + name[5:])
+            if _is_property(getattr(cls, name[5:], None)):
+                return functools.partial(self.awrite, name[5:])
+        elif name.startswith('a') and callable(getattr(cls, name[1:], None)):
+            return functools.partial(self.acall, name[1:])
+        raise AttributeError("'%s' object has no attribute '%s'"
+                             % (cls.__name__, name))
@@ -13,6 +13,12 @@ from enum import IntEnum, IntFlag
 from typing import TypeVar
 
 import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import cache
+from nkt_tools.aio import AsyncMixin
+from nkt_tools.dispatch import CONTROL, SAFETY, priority
+from nkt_tools.fields import check_written
+from nkt_tools.live import LiveMixin
+from nkt_tools.session import pool
 
 
 T = TypeVar("T")
@@ -49,9 +55,17 @@ def interpret_device_read(response: tuple[int, T]) -> T:
     return response[1]
 
 
-class General:
+class General(AsyncMixin, LiveMixin):
     """Base communication with all NKT Photonics modules."""
 
+    cache_policies = {}
+    """dict : register > policy of the static registers, see
+    :mod:`nkt_tools.cache`."""
+
+    verify_writes = False
+    """bool : Read every register written back in the same call, with
+    registerWriteRead, and raise ValueError if the module holds another value."""
+
     def __init__(self, COM, address, *args, **kwargs):
         """
         Initialize the module.
@@ -64,18 +78,47 @@ class General:
             Module address
         """
         self.device = COM, address
+        # The port stays open while the module lives, shared with other
+        # modules on the same port. Released on garbage collection.
+        self._session = pool.acquire(COM)
+        cache.set_policies(COM, address, self.cache_policies)
+        cache.enable()
+
+    portname = property(lambda self: self.device[0])
+    """`str`, read-only: COM port of the module."""
+
+    def _write(self, dtype, register, value, index=-1):
+        """Write a register, checked in the same call if :attr:`verify_writes`."""
+        code = nkt.DataType[dtype]
+        if not self.verify_writes:
+            return interpret_write_response(nkt.write(*self.device, register, code, value, index))
+        read_back = interpret_read_response(nkt.writeRead(*self.device, register, code, value, index))
+        check_written(register, dtype, value, read_back)
+
+    def _update(self, dtype, register, set=0, unset=0):
+        """
+        Set and clear bits of a register, writing only if they change.
 
-    def __del__(self):
-        """Close the Ports on deletion."""
-        return self.closePorts()
+        One read and, if any bit changes, one (verified) write. Returns the new
+        content.
+        """
+        code = nkt.DataType[dtype]
+        value = interpret_read_response(nkt.read(*self.device, register, code, -1))
+        updated = (value | set) & ~unset
+        if updated != value:
+            self._write(dtype, register, updated)
+        return updated
 
     def closePorts(self):
-        """Close the Port and return PortResultTypes."""
-        # TODO what is the error message, if the port is not present
-        # never raise an error?
-        error = nkt.closePorts("")
-        if error:  # closes all ports because of empty string
+        """
+        Release the port of this module and return PortResultTypes.
+
+        The port is only closed once no other module uses it anymore.
+        """
+        error = self._session.release()
+        if error:
             raise ConnectionError(nkt.PortResultTypes(error))
+        return error
 
     def setPorts(self, COM=None, autoMode=True, liveMode=True):
         """
@@ -139,6 +182,8 @@ class BASIK(General):
     - Standard module address is 0x1, but may change if several are present.
     """
 
+    cache_policies = {0x32: cache.FOREVER}  # Central wavelength
+
     # DEFINITION OF DIFFERENT BYTES
 
     # define the status bits in 0x66
@@ -286,9 +331,9 @@ class BASIK(General):
 
     @emission_enabled.setter
     def emission_enabled(self, emission):
-        # U8 0x30
-        response = nkt.registerWriteU8(*self.device, 0x30, 1 if emission else 0, -1)
-        return interpret_write_response(response=response)
+        # U8 0x30. Switching off jumps ahead of queued calls if dispatched
+        with priority(CONTROL if emission else SAFETY):
+            return self._write('U8', 0x30, 1 if emission else 0, -1)
 
     @property
     def setup(self) -> Setup:
@@ -298,13 +343,11 @@ class BASIK(General):
 
     @setup.setter
     def setup(self, value: Setup):
-        response = nkt.registerWriteU16(*self.device, 0x31, value, -1)
-        return interpret_write_response(response=response)
+        return self._write('U16', 0x31, value, -1)
 
     def update_setup(self, set: Setup | int = 0, unset: Setup | int = 0):
         """Update the setup, setting those defined in `set` and unsetting those in `unset`."""
-        setup = self.setup
-        self.setup = (setup | set) & ~unset
+        return BASIK.Setup(self._update('U16', 0x31, set, unset))
 
     @property
     def power_setpoint(self) -> float:
@@ -316,7 +359,7 @@ class BASIK(General):
     @power_setpoint.setter
     def power_setpoint(self, value: float) -> None:
         setpoint = int(value * 100)
-        return interpret_write_response(nkt.registerWriteU16(*self.device, 0x22, setpoint, -1))
+        return self._write('U16', 0x22, setpoint, -1)
 
     @property
     def wavelength_setpoint(self):
@@ -330,19 +373,14 @@ class BASIK(General):
         setpoint = round((value - self.central_wavelength) * 1e4)
         test = self.wlRange[0] * 10 <= setpoint and setpoint <= self.wlRange[1] * 10
         assert test, f"Wavelength range is {self.wlRange}"
-        return interpret_write_response(nkt.registerWriteS16(*self.device, 0x2A, setpoint, -1))
+        return self._write('S16', 0x2A, setpoint, -1)
 
     @property
     def central_wavelength(self) -> float:
         """Get central wavelength in nm."""
-        # U32 0x32. Wavelength in 1/10 pm if offset is zero
-        try:
-            return self._central_wavelength
-        except AttributeError:
-            value = interpret_read_response(nkt.registerReadU32(*self.device, 0x32, -1))
-            value /= 1e4
-            self._central_wavelength = value
-            return value
+        # U32 0x32. Wavelength in 1/10 pm if offset is zero. Cached forever
+        value = interpret_read_response(nkt.registerReadU32(*self.device, 0x32, -1))
+        return value / 1e4
 
     @property
     def wavelength(self) -> float:
@@ -389,22 +427,22 @@ class BASIK(General):
         """Control the first wavelength modulation frequency in Hz."""
         # twice F32 0xB8. Array of two 32 bit float values between which can be
         # switched. Unit is Hz. index is 0 for the first, 4 for the second frequency.
-        return interpret_read_response(nkt.registerReadF32(*self.device, 0xB8, index=0))
+        return interpret_read_response(nkt.registerReadF32(*self.device, 0xB8, 0))
 
     @wavelength_modulation_frequency1.setter
     def wavelength_modulation_frequency1(self, value: float) -> None:
         assert 0 <= value and value <= 1e5, "Frequency is out of range [8mHz, 100kHz]."
-        return interpret_write_response(nkt.registerWriteF32(*self.device, 0xB8, value, 0))
+        return self._write('F32', 0xB8, value, 0)
 
     @property
     def wavelength_modulation_frequency2(self) -> float:
         """Control the second wavelength modulation frequency in Hz."""
-        return interpret_read_response(nkt.registerReadF32(*self.device, 0xB8, index=4))
+        return interpret_read_response(nkt.registerReadF32(*self.device, 0xB8, 4))
 
     @wavelength_modulation_frequency2.setter
     def wavelength_modulation_frequency2(self, value: float) -> None:
         assert 0 <= value and value <= 1e5, "Frequency is out of range [8mHz, 100kHz]."
-        return interpret_write_response(nkt.registerWriteF32(*self.device, 0xB8, value, 4))
+        return self._write('F32', 0xB8, value, 4)
 
     @property
     def wavelength_modulation_level(self) -> int:
@@ -414,7 +452,7 @@ class BASIK(General):
     @wavelength_modulation_level.setter
     def wavelength_modulation_level(self, value: int) -> None:
         assert 0 <= value and value <= 1000, "Level is out of range [0,1000]."
-        return interpret_write_response(nkt.registerWriteU16(*self.device, 0x2B, value, -1))
+        return self._write('U16', 0x2B, value, -1)
 
     @property
     def wavelength_modulation_offset(self) -> int:
@@ -426,7 +464,7 @@ class BASIK(General):
         # this feature requires setupBits 3 & 4 (DC Coupling and internal
         # modulation)
         assert abs(value) <= 1000, "Level is out of range [-1000,1000]."
-        return interpret_write_response(nkt.registerWriteS16(*self.device, 0x2F, value, -1))
+        return self._write('S16', 0x2F, value, -1)
 
     # Amplitude Modulation
     def getAmplitudeModulationFrequency(self, index=0):
@@ -441,7 +479,7 @@ class BASIK(General):
         # for sawtooth only up to 200 Hz
         assert 0 <= frequency and frequency <= 1e5, "Frequency is out of range [8mHz, 100kHz]."
         assert index in [0, 4], "Index is 0 or 4."
-        return interpret_write_response(nkt.registerWriteF32(*self.device, 0xBA, frequency, index))
+        return self._write('F32', 0xBA, frequency, index)
 
     def getAmplitudeModulationLevel(self):
         """Get the relative amplitude modulation level in promille."""
@@ -451,7 +489,7 @@ class BASIK(General):
     def setAmplitudeModulationLevel(self, level):
         """Set the relative amplitude modulation level in promille."""
         assert 0 <= level and level <= 1000, "Level is out of range [0,1000]."
-        return interpret_write_response(nkt.registerWriteU16(*self.device, 0x2C, level, -1))
+        return self._write('U16', 0x2C, level, -1)
 
     @property
     def modulation_setup(self) -> Modulation:
@@ -464,12 +502,11 @@ class BASIK(General):
 
     @modulation_setup.setter
     def modulation_setup(self, value: Modulation) -> None:
-        interpret_write_response(nkt.registerWriteU16(*self.device, 0xB7, value, -1))
+        self._write('U16', 0xB7, value, -1)
 
     def update_modulation_setup(self, set=0, unset=0):
         """Update the modulation setup, setting those in set and unsetting those in unset."""
-        setup = self.modulation_setup
-        self.modulation_setup = (setup | set) & ~unset
+        return BASIK.Modulation(self._update('U16', 0xB7, set, unset))
 
     @property
     def wavelength_modulation_enabled(self) -> bool:
@@ -479,7 +516,7 @@ class BASIK(General):
     @wavelength_modulation_enabled.setter
     def wavelength_modulation_enabled(self, value: bool) -> None:
         # 1 enabled, 0 disabled
-        return interpret_write_response(nkt.registerWriteU8(*self.device, 0xB5, int(value), -1))
+        return self._write('U8', 0xB5, int(value), -1)
 
     @property
     def amplitude_modulation_enabled(self) -> bool:
@@ -490,7 +527,7 @@ class BASIK(General):
     @amplitude_modulation_enabled.setter
     def amplitude_modulation_enabled(self, value: bool) -> None:
         # 1 enabled, 0 disabled
-        return interpret_write_response(nkt.registerWriteU8(*self.device, 0xB6, int(value), -1))
+        return self._write('U8', 0xB6, int(value), -1)
 
     @property
     def trigger_setup(self) -> Trigger:
@@ -501,4 +538,4 @@ class BASIK(General):
 
     @trigger_setup.setter
     def trigger_setup(self, value):
-        return interpret_write_response(nkt.registerWriteU8(*self.device, 0xB4, value, -1))
+        return self._write('U8', 0xB4, value, -1)
@@ -0,0 +1,216 @@
+"""
+Read or write many registers in one call.
+
+Reading the state of a device one property at a time pays for the port
+name encoding, a fresh ctypes buffer and, on a closed port, opening and
+closing the port on every register. :func:`read_many` keeps the port open
+for the whole batch and reads every register into the same buffer.
+:func:`write_many` writes a batch of registers the same way.
+
+Example
+-------
+>>> from nkt_tools.batch import read_many
+>>> state = read_many('COM4', [(15, 0x11, 'S16'),
+...                            (15, 0x37, 'U16'),
+...                            (15, 0x66, 'U16')])
+>>> state['value']
+array([245, 500,   2])
+"""
+import struct
+
+import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import _hooks, dispatch
+from nkt_tools.session import pool
+
+
+FORMATS = {
+    'U8': struct.Struct('<B'),
+    'S8': struct.Struct('<b'),
+    'U16': struct.Struct('<H'),
+    'S16': struct.Struct('<h'),
+    'U32': struct.Struct('<I'),
+    'S32': struct.Struct('<i'),
+    'U64': struct.Struct('<Q'),
+    'S64': struct.Struct('<q'),
+    'F32': struct.Struct('<f'),
+    'F64': struct.Struct('<d'),
+}
+"""dict : register data type > little-endian struct of the value.
+
+'Ascii' (zero terminated string) and 'Raw' (bytes) are accepted as well."""
+
+NUMPY_TYPES = {'U8': 'u1', 'S8': 'i1', 'U16': 'u2', 'S16': 'i2', 'U32': 'u4',
+               'S32': 'i4', 'U64': 'u8', 'S64': 'i8', 'F32': 'f4', 'F64': 'f8',
+               'Ascii': 'O', 'Raw': 'O'}
+
+_RAW_ORDERS = frozenset({_hooks.CACHE})  # Layers batched reads may skip
+
+
+def _raw_reader(portname):
+    """
+    Return read(devId, regId, index) > (result, content) for one port.
+
+    On the DLL backend the content is read into the buffer of the calling
+    thread without any layer, as long as no layer but the cache is
+    installed. Otherwise, e.g. with live registers, the dispatcher, tracing
+    or instrumentation, every read goes through the layered registerRead,
+    decided on every read, so layers installed while a poller runs apply
+    too.
+    """
+    if nkt.NKTP_BACKEND != 'dll':
+        def read(devId, regId, index):
+            return nkt.registerRead(portname, devId, regId, index)
+        return read
+
+    raw = nkt.port_handle(portname).read_raw
+
+    def read(devId, regId, index):
+        if _hooks.orders <= _RAW_ORDERS:
+            return raw(devId, regId, index)
+        return nkt.registerRead(portname, devId, regId, index)
+    return read
+
+
+def decode(dtype, data):
+    """
+    Convert the raw bytes of a register to a value of `dtype`.
+
+    Registers shorter than the type are zero extended, as the DLL does.
+
+    Parameters
+    ----------
+    dtype : str
+        'U8', 'S16', 'F32' etc., 'Ascii' or 'Raw'.
+    data : bytes or memoryview
+        Register content.
+
+    Returns
+    -------
+    int, float or bytes
+    """
+    if dtype == 'Raw':
+        return bytes(data)
+    if dtype == 'Ascii':
+        return bytes(data).split(b'\x00', 1)[0]
+    codec = FORMATS[dtype]
+    if len(data) >= codec.size:
+        return codec.unpack_from(data)[0]
+    return codec.unpack(bytes(data).ljust(codec.size, b'\x00'))[0]
+
+
+def _default(dtype):
+    return b'' if dtype in ('Ascii', 'Raw') else 0
+
+
+def read_many(portname, items, columns=False):
+    """
+    Read several registers of one port while keeping the port open.
+
+    Parameters
+    ----------
+    portname : str
+        Name of the port, e.g. 'COM4'.
+    items : iterable of tuple
+        (devId, regId, dtype) or (devId, regId, dtype, index) per register.
+        dtype is one of 'U8', 'S8', 'U16', 'S16', 'U32', 'S32', 'U64',
+        'S64', 'F32', 'F64', 'Ascii' or 'Raw'. index defaults to -1.
+    columns : bool, optional
+        Return a dict of lists instead of a NumPy array. Also used when
+        NumPy is not installed. False by default.
+
+    Returns
+    -------
+    numpy.ndarray or dict
+        One record per item with the fields 'devId', 'regId', 'result'
+        (RegisterResultTypes) and 'value'. The value is 0 (or empty) for
+        failed reads. Its dtype is the common type of all items, object if
+        strings are read.
+    """
+    items = [(item[0], item[1], item[2], item[3] if len(item) > 3 else -1)
+             for item in items]
+    for item in items:
+        if item[2] not in NUMPY_TYPES:
+            raise ValueError('Unknown register data type %r' % (item[2],))
+
+    read = _raw_reader(portname)
+    results = []
+    values = []
+
+    def read_all():
+        for devId, regId, dtype, index in items:
+            result, data = read(devId, regId, index)
+            results.append(result)
+            values.append(_default(dtype) if result else decode(dtype, data))
+
+    with pool.acquire(portname):
+        if dispatch.enabled():  # One job, other calls wait for the batch
+            dispatch.dispatcher(portname).call(dispatch.current_priority(),
+                                               read_all)
+        else:
+            read_all()
+
+    table = {'devId': [item[0] for item in items],
+             'regId': [item[1] for item in items],
+             'result': results,
+             'value': values}
+    if columns:
+        return table
+    try:
+        import numpy as np
+    except ImportError:
+        return table
+
+    value_type = np.result_type(*[NUMPY_TYPES[item[2]] for item in items]
+                                or ['f8'])
+    array = np.empty(len(items), dtype=[('devId', 'u1'), ('regId', 'u1'),
+                                        ('result', 'u1'),
+                                        ('value', value_type)])
+    for name, column in table.items():
+        array[name] = column
+    return array
+
+
+def write_many(portname, items, verify=False):
+    """
+    Write several registers of one port while keeping the port open.
+
+    The writes go through the register functions with all layers (e.g.
+    the cache drops the values written) as one job of the dispatcher.
+
+    Parameters
+    ----------
+    portname : str
+        Name of the port, e.g. 'COM4'.
+    items : iterable of tuple
+        (devId, regId, dtype, value) or (devId, regId, dtype, value, index)
+        per register, see :func:`read_many` for the data types.
+    verify : bool, optional
+        Write with registerWriteRead, reading every register back in the
+        same call. False by default.
+
+    Returns
+    -------
+    list
+        RegisterResultTypes per item, or (RegisterResultTypes, content read
+        back) if verified.
+    """
+    items = list(items)
+    for item in items:
+        if item[2] not in NUMPY_TYPES:
+            raise ValueError('Unknown register data type %r' % (item[2],))
+    items = [(item[0], item[1], nkt.DataType[item[2]], item[3],
+              item[4] if len(item) > 4 else -1) for item in items]
+    table = nkt.writeReadTable if verify else nkt.writeTable
+    results = []
+
+    def write_all():
+        for devId, regId, code, value, index in items:
+            results.append(table[code](portname, devId, regId, value, index))
+
+    with pool.acquire(portname):
+        if dispatch.enabled():
+            dispatch.dispatcher(portname).call(dispatch.current_priority(),
+                                               write_all)
+        else:
+            write_all()
+    return results
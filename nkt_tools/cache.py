@@ -0,0 +1,189 @@
+"""
+Read cache for registers which rarely or never change.
+
+Serial numbers, system types or crystal ranges are fixed for the lifetime
+of a session, but the device classes read them over the bus on every
+access. This module caches successful reads of the register and device
+functions of :mod:`~nkt_tools.NKTP_DLL` per register, with a policy per
+register:
+
+* :data:`FOREVER`: read once, then always answered from the cache,
+* a number: answered from the cache for that many seconds,
+* :data:`NEVER` (default): always read from the bus.
+
+Writing a register drops its cached value, and the last session of a port
+closing (see :mod:`nkt_tools.session`) drops the values of the port, as
+its modules may be swapped or power cycled before it opens again. The
+module type, version and serial number registers every module has are
+cached forever (:data:`DEFAULT_POLICIES`), the device classes add their
+own static registers through their ``cache_policies``.
+
+Importing the module does not install the cache. The device classes with
+static registers enable it when they are created, other callers call
+:func:`enable`.
+
+Example
+-------
+>>> from nkt_tools import cache
+>>> cache.enable()
+>>> cache.set_policies('COM4', 15, {0x11: 1.0})  # Temperature, 1 s
+>>> cache.stats()
+{'hits': 12, 'misses': 3, 'entries': 3}
+"""
+import threading
+import time
+
+from nkt_tools import _hooks
+
+
+FOREVER = float('inf')
+"""float: Policy of registers which never change."""
+NEVER = 0
+"""int: Policy of registers which are always read from the bus."""
+
+DEFAULT_POLICIES = {
+    0x61: FOREVER,  # Module type
+    0x62: FOREVER,  # PCB version
+    0x64: FOREVER,  # Firmware version
+    0x65: FOREVER,  # Serial number
+    0x6D: FOREVER,  # Bootloader version
+    0x6E: FOREVER,  # PCB serial number
+    0x8E: FOREVER,  # Part number
+}
+"""dict : register > policy, for the registers of all modules."""
+
+# Device functions reading a single register
+DEVICE_REGISTERS = {
+    'deviceGetType': 0x61,
+    'deviceGetPCBVersion': 0x62,
+    'deviceGetFirmwareVersion': 0x64,
+    'deviceGetFirmwareVersionStr': 0x64,
+    'deviceGetModuleSerialNumberStr': 0x65,
+    'deviceGetBootloaderVersion': 0x6D,
+    'deviceGetBootloaderVersionStr': 0x6D,
+    'deviceGetPCBSerialNumberStr': 0x6E,
+    'deviceGetPartNumberStr': 0x8E,
+}
+
+_lock = threading.Lock()
+_policies = {}  # (portname, devId) > {regId: policy}
+_entries = {}  # (portname, devId, regId) > {(function, args): (expiry, response)}
+_hits = 0
+_misses = 0
+
+
+def set_policies(portname, devId, policies):
+    """
+    Set the cache policy of registers of one module.
+
+    Parameters
+    ----------
+    portname : str
+        Port of the module.
+    devId : int
+        Module address.
+    policies : dict
+        register > :data:`FOREVER`, :data:`NEVER` or time to live in seconds.
+    """
+    with _lock:
+        _policies.setdefault((portname, devId), {}).update(policies)
+        for regId in policies:
+            _entries.pop((portname, devId, regId), None)
+
+
+def policy(portname, devId, regId):
+    """Return the policy of a register."""
+    return _policies.get((portname, devId), {}).get(
+        regId, DEFAULT_POLICIES.get(regId, NEVER))
+
+
+def invalidate(portname=None, devId=None, regId=None):
+    """Drop the cached values of all registers matching the given arguments."""
+    with _lock:
+        for key in list(_entries):
+            if all(value is None or value == part
+                   for value, part in zip((portname, devId, regId), key)):
+                del _entries[key]
+
+
+def stats():
+    """
+    Return the cache counters.
+
+    Returns
+    -------
+    dict
+        'hits' and 'misses' of reads of cached registers, 'entries' number
+        of registers currently cached.
+    """
+    with _lock:
+        return {'hits': _hits, 'misses': _misses, 'entries': len(_entries)}
+
+
+def reset_stats():
+    """Set the hit and miss counters to zero."""
+    global _hits, _misses
+    with _lock:
+        _hits = _misses = 0
+
+
+def _cached(function, name, portname, devId, regId, args):
+    global _hits, _misses
+    ttl = policy(portname, devId, regId)
+    if not ttl:
+        return function(portname, devId, *args)
+    key = (portname, devId, regId)
+    now = time.monotonic()
+    entry = _entries.get(key, {}).get((name, args))
+    if entry is not None and entry[0] > now:
+        with _lock:
+            _hits += 1
+        return entry[1]
+    with _lock:
+        _misses += 1
+    response = function(portname, devId, *args)
+    result = response[0] if isinstance(response, tuple) else response
+    if not result:
+        with _lock:
+            _entries.setdefault(key, {})[(name, args)] = (now + ttl, response)
+    return response
+
+
+def _layer(name, function):
+    if name.startswith('registerWrite'):  # Also registerWriteRead
+        def write(portname, devId, regId, *args):
+            with _lock:
+                _entries.pop((portname, devId, regId), None)
+            return function(portname, devId, regId, *args)
+        write.__name__ = name
+        return write
+    if name.startswith('registerRead'):
+        def read(portname, devId, regId, *args):
+            return _cached(function, name, portname, devId, regId,
+                           (regId,) + args)
+        read.__name__ = name
+        return read
+    if name in DEVICE_REGISTERS:
+        regId = DEVICE_REGISTERS[name]
+
+        def device_read(portname, devId):
+            return _cached(function, name, portname, devId, regId, ())
+        device_read.__name__ = name
+        return device_read
+    return function
+
+
+def enable():
+    """Answer reads of cached registers from the cache."""
+    _hooks.install_once(_layer, _hooks.CACHE)
+
+
+def disable():
+    """Read every register from the bus again and drop all cached values."""
+    _hooks.remove(_layer)
+    invalidate()
+
+
+def enabled():
+    """Return True if the cache is in use."""
+    return _hooks.installed(_layer)
@@ -0,0 +1,363 @@
+"""
+Find all NKT modules on all ports in a single pass.
+
+Every device class can search the bus on its own, but each search scans all
+ports again. :func:`discover` scans every port once, with one thread per
+port, and returns a :class:`Registry` which hands out ready device objects.
+
+The result is stored in a cache file (:data:`CACHE_FILE`). As long as the
+ports of the system do not change, the next :func:`discover` only reads type
+and serial number of the cached modules and rescans the bus if any of them
+differs. Modules added to a bus are not seen then, use
+``discover(use_cache=False)`` after changing the setup.
+
+Example
+-------
+>>> from nkt_tools.discovery import discover
+>>> from nkt_tools.varia import Varia
+>>> registry = discover()
+>>> for module in registry:
+...     print(module)
+>>> varia = registry.get(Varia)
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import importlib
+import inspect
+import json
+import os
+import warnings
+
+import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import cache
+from nkt_tools.session import _split_ports, pool
+
+
+ModuleInfo = namedtuple('ModuleInfo',
+                        ['port', 'address', 'type', 'serial', 'firmware'],
+                        defaults=(None,))
+"""Module found on the bus: port name, module address, type, serial and
+firmware version."""
+
+CACHE_FILE = os.environ.get(
+    'NKTP_DISCOVERY_CACHE',
+    os.path.join(os.path.expanduser('~'), '.nkt_tools', 'discovery.json'))
+"""str : Cache file of :func:`discover`, set NKTP_DISCOVERY_CACHE to move it."""
+
+DEVICE_CLASSES = {
+    0x33: ('nkt_tools.basik', 'BASIK'),
+    0x60: ('nkt_tools.extreme', 'Extreme'),
+    0x66: ('nkt_tools.rfdriver', 'RFDriver'),
+    0x67: ('nkt_tools.select', 'Select'),
+    0x68: ('nkt_tools.varia', 'Varia'),
+}
+"""dict : module type > (module, class name) of the matching device class."""
+
+
+def device_class(module_type):
+    """Return the device class handling `module_type`, None if unknown."""
+    try:
+        module, name = DEVICE_CLASSES[module_type]
+    except KeyError:
+        return None
+    return getattr(importlib.import_module(module), name)
+
+
+def _module_type(cls):
+    for module_type in DEVICE_CLASSES:
+        if device_class(module_type) is cls:
+            return module_type
+    raise TypeError('%s is not a known NKT device class' % cls.__name__)
+
+
+def scan_port(portname):
+    """
+    Scan one port and return the modules found on it.
+
+    The port is opened with automatic bus scanning and left open.
+
+    Parameters
+    ----------
+    portname : str
+        Name of the port, e.g. 'COM4'.
+
+    Returns
+    -------
+    list of ModuleInfo
+        Modules on the port, ordered by address. Empty if the port could not
+        be opened.
+    """
+    cache.invalidate(portname)  # Modules may have been swapped
+    if nkt.openPorts(portname, 1, 0):
+        return []
+    result, types = nkt.deviceGetAllTypes(portname)
+    if result:
+        return []
+    modules = []
+    for address, module_type in enumerate(types):
+        if not module_type:
+            continue
+        result, firmware = nkt.deviceGetFirmwareVersion(portname, address)
+        modules.append(ModuleInfo(portname, address, module_type,
+                                  _read_serial(portname, address),
+                                  None if result else firmware))
+    return modules
+
+
+def _read_serial(portname, address):
+    result, serial = nkt.deviceGetModuleSerialNumberStr(portname, address)
+    return None if result else serial.decode('ascii', 'replace')
+
+
+def _check_port(portname, modules):
+    """Return True if the cached `modules` still answer on `portname`."""
+    cache.invalidate(portname)  # Ask the modules, not the read cache
+    if portname not in _split_ports(nkt.getOpenPorts()):
+        if nkt.openPorts(portname, 0, 0):
+            return False
+    for module in modules:
+        nkt.deviceCreate(portname, module.address, 1)
+        result, module_type = nkt.deviceGetType(portname, module.address)
+        if result or module_type != module.type:
+            return False
+        if _read_serial(portname, module.address) != module.serial:
+            return False
+    return True
+
+
+def load_cache(path=None):
+    """
+    Read the modules stored by :func:`save_cache`.
+
+    Parameters
+    ----------
+    path : str, optional
+        Cache file, :data:`CACHE_FILE` by default.
+
+    Returns
+    -------
+    tuple or None
+        (scanned ports, list of ModuleInfo), None if there is no valid cache.
+    """
+    try:
+        with open(path or CACHE_FILE) as file:
+            stored = json.load(file)
+        return (stored['ports'],
+                [ModuleInfo(*module) for module in stored['modules']])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_cache(ports, modules, path=None):
+    """
+    Store the result of a bus scan.
+
+    Parameters
+    ----------
+    ports : list of str
+        All ports which were scanned, including those without modules.
+    modules : list of ModuleInfo
+        Modules found on these ports.
+    path : str, optional
+        Cache file, :data:`CACHE_FILE` by default.
+    """
+    path = path or CACHE_FILE
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w') as file:
+            json.dump({'ports': sorted(ports),
+                       'modules': [list(module) for module in modules]},
+                      file, indent=1)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass  # A read-only home only costs a scan on the next start
+
+
+class Registry:
+    """
+    Modules found by :func:`discover`.
+
+    Iterating a registry yields :data:`ModuleInfo` tuples. The ports holding
+    modules stay open for as long as the registry lives.
+    """
+
+    def __init__(self, modules, sessions=()):
+        self._modules = tuple(modules)
+        self._sessions = tuple(sessions)
+
+    modules = property(lambda self: self._modules)
+    """`tuple` of ModuleInfo, read-only: All modules found."""
+
+    ports = property(lambda self: tuple(sorted({m.port for m in self})))
+    """`tuple` of str, read-only: Ports with at least one module."""
+
+    def __iter__(self):
+        return iter(self._modules)
+
+    def __len__(self):
+        return len(self._modules)
+
+    def __repr__(self):
+        return '<Registry %d modules on %s>' % (len(self), ', '.join(self.ports))
+
+    def find(self, type=None, port=None, address=None, serial=None):
+        """
+        Return the modules matching all given criteria.
+
+        Parameters
+        ----------
+        type : int or class, optional
+            Module type, e.g. 0x68, or a device class such as Varia.
+        port : str, optional
+            Port name.
+        address : int, optional
+            Module address.
+        serial : str, optional
+            Module serial number.
+
+        Returns
+        -------
+        list of ModuleInfo
+        """
+        if inspect.isclass(type):
+            type = _module_type(type)
+        criteria = {'type': type, 'port': port, 'address': address,
+                    'serial': serial}
+        criteria = {key: value for key, value in criteria.items()
+                    if value is not None}
+        return [module for module in self
+                if all(getattr(module, key) == value
+                       for key, value in criteria.items())]
+
+    def get(self, cls, **criteria):
+        """
+        Create the device object for the single module matching `cls`.
+
+        Parameters
+        ----------
+        cls : class
+            Device class, e.g. Varia.
+        **criteria
+            Further criteria passed to :meth:`find` (port, address, serial).
+
+        Returns
+        -------
+        object
+            Instance of `cls` connected to the module, without a bus search.
+
+        Raises
+        ------
+        LookupError
+            If no matching module was found.
+        RuntimeError
+            If several modules match. Narrow the search with `port`,
+            `address` or `serial`.
+        """
+        modules = self.find(cls, **criteria)
+        if not modules:
+            raise LookupError('No %s found' % cls.__name__)
+        if len(modules) > 1:
+            raise RuntimeError('Multiple %s found: %s. Supply port, address '
+                               'or serial to avoid conflict'
+                               % (cls.__name__, modules))
+        return self.create(modules[0])
+
+    def create(self, module):
+        """
+        Create the device object for `module`.
+
+        Parameters
+        ----------
+        module : ModuleInfo
+            Module of this registry.
+
+        Returns
+        -------
+        object
+            Instance of the device class registered for the module type,
+            else a :class:`~nkt_tools.generic.GenericModule` built from the
+            register file of the type.
+
+        Raises
+        ------
+        TypeError
+            If there is neither a device class nor a register file for the
+            module type.
+        """
+        cls = device_class(module.type)
+        if cls is None:
+            from nkt_tools import registers
+            if module.type not in registers.module_types():
+                raise TypeError('No device class for module type 0x%0.2X'
+                                % module.type)
+            from nkt_tools.generic import GenericModule
+            return GenericModule(module.port, module.address, module.type)
+        if cls.__name__ == 'BASIK':
+            return cls(module.port, module.address)
+        return cls(portname=module.port, module_address=module.address)
+
+    def devices(self):
+        """Return device objects for all modules with a device class."""
+        return [self.create(module) for module in self
+                if module.type in DEVICE_CLASSES]
+
+
+def _cached_modules(ports):
+    """Return the cached modules if they are valid for `ports`, else None."""
+    stored = load_cache()
+    if stored is None or sorted(stored[0]) != sorted(ports):
+        return None
+    modules = stored[1]
+    if not modules:  # Devices may have been switched off, look again
+        return None
+    by_port = {}
+    for module in modules:
+        by_port.setdefault(module.port, []).append(module)
+    if by_port:
+        with ThreadPoolExecutor(max_workers=len(by_port)) as executor:
+            if not all(executor.map(_check_port, by_port, by_port.values())):
+                return None
+    return modules
+
+
+def discover(portnames=None, use_cache=True, **deprecated):
+    """
+    Scan all ports once, in parallel, and index the modules found.
+
+    Ports without modules are closed again afterwards.
+
+    Parameters
+    ----------
+    portnames : str, optional
+        Comma separated ports to scan. All ports of the system by default.
+    use_cache : bool, optional
+        Reuse the modules of the last scan if they still answer with the
+        same type and serial number. True by default. False forces a scan.
+        Also accepted as ``cache``, deprecated.
+
+    Returns
+    -------
+    Registry
+        The modules found.
+    """
+    if 'cache' in deprecated:
+        warnings.warn('discover(cache=...) is deprecated, use use_cache',
+                      DeprecationWarning, stacklevel=2)
+        use_cache = deprecated.pop('cache')
+    if deprecated:
+        raise TypeError('discover() got an unexpected keyword argument %r'
+                        % next(iter(deprecated)))
+    if portnames is None:
+        portnames = nkt.getAllPorts()
+    ports = _split_ports(portnames)
+    modules = _cached_modules(ports) if use_cache else None
+    if modules is None:
+        modules = []
+        if ports:
+            with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+                for found in executor.map(scan_port, ports):
+                    modules.extend(found)
+        save_cache(ports, modules)
+    sessions = [pool.acquire(port) for port in sorted({m.port for m in modules})]
+    pool.close_idle()
+    return Registry(modules, sessions)
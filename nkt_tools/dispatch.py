@@ -0,0 +1,197 @@
+"""
+Serialize all calls to a port through one dispatcher thread per port.
+
+The DLL answers ApplicationBusy (RegisterResultTypes 15) when two threads
+use a port at the same time, e.g. a telemetry poller and an experiment
+thread sharing a laser. After :func:`enable`, every register and device
+function of :mod:`nkt_tools.NKTP_DLL`, and with them all device classes,
+runs on the dispatcher thread of its port. Waiting calls are served by
+priority, so safety writes like emission off jump ahead of bulk telemetry.
+
+Example
+-------
+>>> from nkt_tools import dispatch
+>>> dispatch.enable()
+>>> with dispatch.priority(dispatch.TELEMETRY):
+...     temperature = laser.inlet_temperature
+>>> dispatch.metrics('COM4')
+{'depth': 0, 'calls': 1, 'wait_mean': 1.2e-05, 'wait_max': 1.2e-05}
+"""
+from concurrent.futures import Future
+import contextlib
+import itertools
+import queue
+import threading
+import time
+
+from nkt_tools import _hooks
+
+
+SAFETY = 0
+"""int: Priority of safety writes such as emission off or interlock."""
+CONTROL = 10
+"""int: Default priority."""
+TELEMETRY = 20
+"""int: Priority of background polling."""
+
+_context = threading.local()
+_dispatchers = {}  # portname > Dispatcher
+_dispatchers_lock = threading.Lock()
+
+
+def current_priority():
+    """Return the priority of calls made by this thread."""
+    return getattr(_context, 'priority', CONTROL)
+
+
+def dispatching():
+    """Return True if called on a dispatcher thread."""
+    return getattr(_context, 'dispatching', False)
+
+
+@contextlib.contextmanager
+def priority(level):
+    """
+    Run the calls of this thread inside the block with priority `level`.
+
+    Lower values are served first, see :data:`SAFETY`, :data:`CONTROL` and
+    :data:`TELEMETRY`. Blocks can be nested, the innermost level applies.
+    """
+    previous = current_priority()
+    _context.priority = level
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+
+class Dispatcher:
+    """Worker thread executing the calls to one port in priority order."""
+
+    def __init__(self, portname):
+        self.portname = portname
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()  # FIFO within one priority
+        self._calls = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='nkt dispatcher %s' % portname)
+        self._thread.start()
+
+    def _run(self):
+        _context.dispatching = True
+        while True:
+            _, _, queued, future, function, args = self._queue.get()
+            if future is None:  # Stopped
+                return
+            wait = time.perf_counter() - queued
+            self._calls += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(function(*args))
+                except BaseException as error:
+                    future.set_exception(error)
+
+    def submit(self, level, function, *args):
+        """Queue function(*args) and return a Future of its result."""
+        future = Future()
+        self._queue.put((level, next(self._sequence), time.perf_counter(),
+                         future, function, args))
+        return future
+
+    def call(self, level, function, *args):
+        """Run function(*args) on the dispatcher thread and return its result."""
+        if threading.current_thread() is self._thread:
+            return function(*args)  # Nested call, e.g. a layer calling out
+        return self.submit(level, function, *args).result()
+
+    def stop(self):
+        """Finish the queued calls, then end the thread."""
+        self._queue.put((float('inf'), next(self._sequence), 0, None, None, ()))
+        self._thread.join()
+
+    @property
+    def depth(self):
+        """`int`, read-only: Number of calls waiting."""
+        return self._queue.qsize()
+
+    def metrics(self):
+        """
+        Return queue depth and wait time statistics.
+
+        Returns
+        -------
+        dict
+            'depth' calls waiting now, 'calls' calls served, 'wait_mean' and
+            'wait_max' time in seconds calls spent in the queue.
+        """
+        return {'depth': self.depth,
+                'calls': self._calls,
+                'wait_mean': self._wait_total / self._calls if self._calls
+                else 0.0,
+                'wait_max': self._wait_max}
+
+
+def dispatcher(portname):
+    """Return the dispatcher of `portname`, starting it if necessary."""
+    try:
+        return _dispatchers[portname]
+    except KeyError:
+        with _dispatchers_lock:
+            if portname not in _dispatchers:
+                _dispatchers[portname] = Dispatcher(portname)
+            return _dispatchers[portname]
+
+
+def _layer(name, function):
+    def dispatched(portname, *args):
+        return dispatcher(portname).call(current_priority(), function,
+                                         portname, *args)
+    dispatched.__name__ = name
+    dispatched.__doc__ = function.__doc__
+    return dispatched
+
+
+def enable():
+    """Route all register and device functions through the dispatchers."""
+    _hooks.install_once(_layer, _hooks.DISPATCH)
+
+
+def disable():
+    """Call the backend directly again and stop all dispatcher threads."""
+    _hooks.remove(_layer)
+    with _dispatchers_lock:
+        dispatchers = list(_dispatchers.values())
+        _dispatchers.clear()
+    for worker in dispatchers:
+        worker.stop()
+
+
+def enabled():
+    """Return True if calls are routed through the dispatchers."""
+    return _hooks.installed(_layer)
+
+
+def metrics(portname=None):
+    """
+    Return the metrics of one or all dispatchers.
+
+    Parameters
+    ----------
+    portname : str, optional
+        Port of the dispatcher. All ports by default.
+
+    Returns
+    -------
+    dict
+        :meth:`Dispatcher.metrics` of `portname`, or portname > metrics.
+    """
+    if portname is not None:
+        worker = _dispatchers.get(portname)
+        if worker is None:
+            return {'depth': 0, 'calls': 0, 'wait_mean': 0.0, 'wait_max': 0.0}
+        return worker.metrics()
+    return {name: worker.metrics() for name, worker in _dispatchers.items()}
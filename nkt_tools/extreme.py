@@ -8,9 +8,53 @@ the user is actively turning the laser on (vs. laser.emission = True). Less
 dangerous properties follow the dedicated setter method format for consistency.
 """
 import nkt_tools.NKTP_DLL as nkt
-
-
-class Extreme:
+from nkt_tools import cache
+from nkt_tools.aio import AsyncMixin
+from nkt_tools.discovery import discover
+from nkt_tools.dispatch import SAFETY, priority
+from nkt_tools.fields import RegisterDevice, RegisterField, check_written
+from nkt_tools.live import LiveMixin
+from nkt_tools.session import pool
+
+
+SYSTEM_TYPES = ['SuperK Extreme', 'SuperK Fianium']
+"""list : System type names by the content of register 0x6B."""
+
+NIM_DELAY_STEP = 9e-12
+"""float : Step size of the NIM delay, 9 ps."""
+
+INTERLOCK_REASONS = ['Interlock off (interlock circuit open)',
+                     'Front panel interlock/key switch off',
+                     'Door switch open',
+                     'External module interlock',
+                     'Application interlock',
+                     'Internal module interlock',
+                     'Interlock power failure',
+                     'Interlock disabled by light source']
+"""list : Interlock status message based on manual, by MSB of 0x32."""
+
+
+def _emission_state(value):
+    if value == 3:
+        return True
+    elif value == 0:
+        return False
+    print('Unknown Emissions State Detected')
+    return 'Unknown'
+
+
+def _interlock_status(value):
+    LSB = value & 0xFF  # What manual calls first byte
+    MSB = value >> 8  # What manual calls second byte
+    if LSB == 0:
+        return (LSB, 'Interlocked: %s' % INTERLOCK_REASONS[MSB])
+    elif LSB == 1:
+        return (LSB, 'Waiting for interlock reset')
+    elif LSB == 2:
+        return (LSB, 'Interlock is OK')
+
+
+class Extreme(AsyncMixin, LiveMixin, RegisterDevice):
     status_messages = {
         0: 'Emission on',
         1: 'Interlock relays off',
@@ -57,7 +101,7 @@ class Extreme:
         4: 'External feedback mode (Power Lock)'
             }
 
-    def __init__(self, portname=None):
+    def __init__(self, portname=None, module_address=15):
         """
         Searches for connected NKT lasers and defines instrument parameters.
 
@@ -70,6 +114,8 @@ class Extreme:
         portname : str, optional
             Enter if portname for laser is known/multiple lasers are connected.
             If not supplied, system searches for laser. None by default.
+        module_address : int, optional
+            Module address of the laser. 15 by default.
 
         Raises
         ------
@@ -79,58 +125,43 @@ class Extreme:
         """
         print('Searching for connected NKT Laser...')
         self._portname = None  # COM port for laser. Auto found if not given.
-        self._module_address = 15  # module address = 15 for Extreme/Fianium
+        self._module_address = module_address  # 15 for Extreme/Fianium
         self._device_type = None  # Should be 0x60 for Extreme/Fianium
-        self._system_type = None  # 0 == Extreme; 1 == Fianium
-        self._inlet_temperature = None
-        self._emission_state = None
-        self._setup_status = None
-        self._interlock_status = None
-        self._pulse_picker_ratio = None
-        self._watchdog_interval = None
-        self._power_level = None
-        self._current_level = None
-        self._nim_delay = None
-
+        self._session = None  # Keeps the port open while the object lives
+        extreme_found = False
 
         if portname:  # Allow user to init specific NKT Laser on portname
             self._portname = portname
             self._device_type = 96  # Could put check here
+            extreme_found = True
 
         else:  # Search for connection w/ laser
-            # Open available ports
-            nkt.openPorts(nkt.getAllPorts(), 1, 1)
-
-            # Get open NKT ports
-            portlist = nkt.getOpenPorts().split(',')
-            extreme_found = False
-
-            for portName in portlist:  # Sweep open nkt ports
-                # get binary devList of connected nkt devices
-                comm_result, devList = nkt.deviceGetAllTypes(portName)
-                # Get byte at location 15 (device address for extreme/fianium)
-                device_type = devList[self.module_address]
-
-                # Double check device_type matches extreme/fianium laser
-                if hex(device_type) == '0x60':  # 96 == 0x60 in hex
-                    if extreme_found:  # If extreme found on other port, error
-                        err_msg = ('''Multiple NKT Lasers found on computer.
-                        COM port 1 = %s
-                        COM port 2 = %s
-                        Please initialize Extreme class with designated \
-                        portname to avoid conflict'''
-                                   % (self.portname, portName))
-
-                        raise RuntimeError(err_msg)
-
-                    else:  # If this is first laser found,
-                        extreme_found = True
-                        self._portname = portName
-                        self._device_type = device_type
-
-        # Close all ports
-        closeResult = nkt.closePorts('')
-        if extreme_found:
+            # Scan all ports, or check the modules cached by the last scan.
+            # The registry keeps the ports open until the session below.
+            registry = discover()
+            modules = registry.find(type=0x60, address=self.module_address)
+
+            for module in modules:  # Sweep extreme/fianium lasers found
+                if extreme_found:  # If extreme found on other port, error
+                    err_msg = ('''Multiple NKT Lasers found on computer.
+                    COM port 1 = %s
+                    COM port 2 = %s
+                    Please initialize Extreme class with designated \
+                    portname to avoid conflict'''
+                               % (self.portname, module.port))
+
+                    raise RuntimeError(err_msg)
+
+                else:  # If this is first laser found,
+                    extreme_found = True
+                    self._portname = module.port
+                    self._device_type = module.type
+
+        if extreme_found:  # Keep laser port open, cache static registers
+            self._session = pool.acquire(self.portname)
+            cache.set_policies(self.portname, self.module_address,
+                               self.cache_policies)
+            cache.enable()
             print('NKT Extreme/Fianium Found:')
             print('Comport: ', self.portname, 'Device type: ', "0x%0.2X"
                   % self.device_type, 'at address:', self.module_address)
@@ -152,9 +183,9 @@ class Extreme:
     Autofound during init if not given. User can supply when creating object.
     """
 
-    @property
-    def system_type(self):
-        """
+    system_type = RegisterField(
+        0x6B, 'U8', readonly=True, cache=cache.FOREVER,
+        convert=SYSTEM_TYPES.__getitem__, doc="""
         `str`, read-only:
         Access register 0x6B to determine Extreme/Fianium
 
@@ -165,68 +196,31 @@ class Extreme:
         0 = SuperK Extreme. 8-bit unsigned integer.
         0 = SuperK Extreme
         1 = SuperK Fianium
-        """
-        # Determine whether system is Extreme or Fianium
-        register_address = 0x6B
-        _, type_index = nkt.registerReadU8(self.portname,
-                                           self.module_address,
-                                           register_address, -1)
-
-        if not type_index:  # Errors should default to Extreme
-            type_index = 0
-        type_list = ["SuperK Extreme", "SuperK Fianium"]
-        self._system_type = type_list[type_index]
-        return self._system_type
+        """)
 
-    @property
-    def inlet_temperature(self):
-        """
+    inlet_temperature = RegisterField(0x11, 'S16', scale=0.1, readonly=True,
+                                      doc="""
         `float`, read-only:
         Accesses register 0x11 to return inlet temperature w/ 0.1 C precision.
 
-        Updates the value of non-public attr when called.
-
         Return
         ------
         float
             Inlet temperature w/ 0.1 C precision.
-        """
-        register_address = 0x11
-        comm_result, value = nkt.registerReadS16(self.portname,
-                                                 self.module_address,
-                                                 register_address, -1)
-        self._inlet_temperature = value / 10
-        return self._inlet_temperature
-
-    @property
-    def emission_state(self):
-        """
-        Accesses register 0x30 to return emission state of laser.
+        """)
 
-        Updates the value of non-public attr when called.
+    emission_state = RegisterField(0x30, 'U8', readonly=True,
+                                   convert=_emission_state, doc="""
+        Accesses register 0x30 to return emission state of laser.
 
         Return
         ------
         bool
-            True = emission off; False = emission on
-        """
-        register_address = 0x30
-        comm_result, value = nkt.registerReadU8(self.portname,
-                                                self.module_address,
-                                                register_address, -1)
-        if value == 3:
-            self._emission_state = True
-        elif value == 0:
-            self._emission_state = False
-        else:
-            self._emission_state = 'Unknown'
-            print('Unknown Emissions State Detected')
+            True = emission on; False = emission off
+        """)
 
-        return self._emission_state
-
-    @property
-    def setup_status(self):
-        """
+    setup_status = RegisterField(0x16, 'U8', readonly=True,
+                                 convert=setup_options.__getitem__, doc="""
         Reads value of register 0x16 and returns corresponding status message.
 
         See Extreme.setup_options for possible outcomes. Use Extreme.set_mode()
@@ -236,20 +230,11 @@ class Extreme:
         -------
         str
             Current setup status of laser based on manual values.
-        """
-        register_address = 0x16
-        comm_result, setup_key = nkt.registerReadU8(self.portname,
-                                                    self.module_address,
-                                                    register_address, -1)
-        self._setup_status = Extreme.setup_options[setup_key]
-        return self._setup_status
-
-    @property
-    def interlock_status(self):
-        """
-        Print interlock status to terminal.
+        """)
 
-        Reads register 0x32 and converts bytes into strings based on manual.
+    interlock_status = RegisterField(0x32, 'U16', readonly=True,
+                                     convert=_interlock_status, doc="""
+        Interlock status of register 0x32, converted based on manual.
 
         Manual:
         Reading the interlock register returns the current interlock status,
@@ -277,37 +262,9 @@ class Extreme:
         ------
         tuple(int, str)
             (LSB, Desription) returns result according to table in manual.
-        """
-        register_address = 0x32
-        comm_result, reading = nkt.registerRead(self.portname,
-                                                self.module_address,
-                                                register_address, -1)
-
-        LSB = reading[0]  # What manual calls first byte
-        MSB = reading[1]  # What manual calls second byte
-        # Interlock status message based on manual
-        output_options = ['Interlock off (interlock circuit open)',
-                          'Front panel interlock/key switch off',
-                          'Door switch open',
-                          'External module interlock',
-                          'Application interlock',
-                          'Internal module interlock',
-                          'Interlock power failure',
-                          'Interlock disabled by light source']
-        if LSB == 0:
-            reason = output_options[MSB]
-            self._interlock_status = (LSB, 'Interlocked: %s' % reason)
-
-        elif LSB == 1:
-            self._interlock_status = (LSB, 'Waiting for interlock reset')
-
-        elif LSB == 2:
-            self._interlock_status = (LSB, 'Interlock is OK')
-        return self._interlock_status
-
-    @property
-    def pulse_picker_ratio(self):
-        """
+        """)
+
+    pulse_picker_ratio = RegisterField(0x34, 'U16', readonly=True, doc="""
         Get pulse picker ratio by reading register 0x34.
 
         Manual:
@@ -321,17 +278,9 @@ class Extreme:
         ------
         ratio : int
             Pulse picker divide ratio
-        """
-        register_address = 0x34
-        comm_result, ratio = nkt.registerReadU16(self.portname,
-                                                 self.module_address,
-                                                 register_address, -1)
-        self._pulse_picker_ratio = ratio
-        return self._pulse_picker_ratio
-
-    @property
-    def watchdog_interval(self):
-        """
+        """)
+
+    watchdog_interval = RegisterField(0x36, 'U8', readonly=True, doc="""
         Get the watchdog interval by reading register 0x36.
 
         Manual:
@@ -343,19 +292,11 @@ class Extreme:
 
         Return
         ------
-        ratio : int
-            Pulse picker divide ratio
-        """
-        register_address = 0x36
-        comm_result, interval = nkt.registerReadU8(self.portname,
-                                                   self.module_address,
-                                                   register_address, -1)
-        self._watchdog_interval = interval
-        return self._watchdog_interval
-
-    @property
-    def power_level(self):
-        """
+        interval : int
+            Watchdog interval in seconds.
+        """)
+
+    power_level = RegisterField(0x37, 'U16', scale=0.1, readonly=True, doc="""
         Get power level setpoint with 0.1% precision.
 
         Read register 0x37 and converts from permille to percent.
@@ -364,17 +305,10 @@ class Extreme:
         ------
         power_level : float
             Power level setpoint in percent w/ 0.1% precision.
-        """
-        register_address = 0x37
-        comm_result, power = nkt.registerReadU16(self.portname,
-                                                 self.module_address,
-                                                 register_address, -1)
-        self._power_level = power / 10
-        return self._power_level
-
-    @property
-    def current_level(self):
-        """
+        """)
+
+    current_level = RegisterField(0x38, 'U16', scale=0.1, readonly=True,
+                                  doc="""
         Get current level setpoint with 0.1% precision.
 
         Read register 0x38 and converts from permille to percent.
@@ -383,20 +317,13 @@ class Extreme:
         ------
         current_level : float
             Current level setpoint in percent w/ 0.1% precision.
-        """
-        register_address = 0x38
-        comm_result, current = nkt.registerReadU16(self.portname,
-                                                   self.module_address,
-                                                   register_address, -1)
-        self._current_level = current / 10
-        return self._current_level
-
-    @property
-    def nim_delay(self):
-        """
+        """)
+
+    nim_delay = RegisterField(0x39, 'U16', scale=NIM_DELAY_STEP, readonly=True,
+                              doc="""
         Get NIM trigger delay time.
 
-        Reads register 0x38 and converts from int value to delay in seconds.
+        Reads register 0x39 and converts from int value to delay in seconds.
 
         Manual:
         On systems with NIM trigger output, the delay of this trigger signal
@@ -408,16 +335,9 @@ class Extreme:
         ------
         nim_delay : float
             Delay time given in seconds.
-        """
-        register_address = 0x38
-        step = 9e-12  # Step size for delay is 9 ps
-        comm_result, delay = nkt.registerReadU16(self.portname,
-                                                self.module_address,
-                                                register_address, -1)
-        self._nim_delay = delay * step
-        return self._nim_delay
-
-    def set_emission(self, state):
+        """)
+
+    def set_emission(self, state, verify=None):
         """
         Change emission state of laser to on/off
 
@@ -427,22 +347,23 @@ class Extreme:
         ----------
         state : bool
             True turns laser on, false turns emission off
+        verify : bool, optional
+            Read the register back in the same call and raise ValueError if
+            it differs. :attr:`verify_writes` by default.
         """
-        register_address = 0x30
         if state is True:
-            nkt.registerWriteU8(self.portname, self.module_address,
-                                register_address, 0x03, -1)
+            Extreme.emission_state.write(self, 0x03, verify)
         elif state is False:
-            nkt.registerWriteU8(self.portname, self.module_address,
-                                register_address, 0x00, -1)
+            with priority(SAFETY):  # Ahead of queued calls if dispatched
+                Extreme.emission_state.write(self, 0x00, verify)
 
-    def set_mode(self, setup_key):
+    def set_mode(self, setup_key, verify=None):
         """
         Sets the "setup" of the laser according to options in manual.
 
         Checks value provided is withing Extreme.setup_options.keys(),
-        then writes to register 0x16. Get current status w/
-        Extreme.setup_status
+        then writes to register 0x16 and reads it back in the same call.
+        Get current status w/ Extreme.setup_status
 
         Manual:
         With the Setup register, the operation mode of the SuperK EXTREME
@@ -460,12 +381,17 @@ class Extreme:
         ----------
         setup_key : int
             Interger corresponding to a key inside Extreme.setup_options
+        verify : bool, optional
+            Read the register back in the same call and raise ValueError if
+            it differs. :attr:`verify_writes` by default.
         """
-        register_address = 0x16
         if setup_key in Extreme.setup_options.keys():
-            nkt.registerWriteU8(self.portname, self.module_address,
-                                register_address, setup_key, -1)
-            print('Mode set to: ', self.setup_status)
+            result, mode = Extreme.setup_status.write_read(self, setup_key)
+            if result:
+                raise ConnectionError(nkt.RegisterResultTypes(result))
+            if self.verify_writes if verify is None else verify:
+                check_written(0x16, 'U8', setup_key, mode)
+            print('Mode set to: ', Extreme.setup_status.decode(mode))
         else:
             print('Warning: Invalid Key Provided')
             print('Mode remains as: ', self.setup_status)
@@ -487,16 +413,17 @@ class Extreme:
         value: int
             0 trips interlock. >0 resets interlock.
 
+        Writes are not verified, the register reads back the interlock
+        status instead of the value written.
         """
-        register_address = 0x32
         if value > 0:
             value = 1
         else:
             value = 0
-        nkt.registerWriteU8(self.portname, self.module_address,
-                            register_address, value, -1)
+        with priority(SAFETY):  # Ahead of queued calls if dispatched
+            Extreme.interlock_status.write(self, value, verify=False)
 
-    def set_pulse_picker_ratio(self, ratio):
+    def set_pulse_picker_ratio(self, ratio, verify=None):
         """
         Sets pulse picker ratio by writing register 0x34.
 
@@ -509,15 +436,16 @@ class Extreme:
         ----------
         ratio : int
             Interger corresponding to a key inside Extreme.setup_options
+        verify : bool, optional
+            Read the register back in the same call and raise ValueError if
+            it differs. :attr:`verify_writes` by default.
         """
-        register_address = 0x34
         if type(ratio) is int:
-            nkt.registerWriteU16(self.portname, self.module_address,
-                                 register_address, ratio, -1)
+            Extreme.pulse_picker_ratio.write(self, ratio, verify)
         else:
             raise ValueError('ratios needs to be int')
 
-    def set_watchdog_interval(self, timeout):
+    def set_watchdog_interval(self, timeout, verify=None):
         """
         Set the watchdog interval by calling registerWriteU8 on 0x36.
 
@@ -532,15 +460,16 @@ class Extreme:
         ----------
         timeout : int
             time (seconds) the system will toleratre for communication loss.
+        verify : bool, optional
+            Read the register back in the same call and raise ValueError if
+            it differs. :attr:`verify_writes` by default.
         """
-        register_address = 0x36
         if type(timeout) is int:
-            nkt.registerWriteU8(self.portname, self.module_address,
-                                register_address, timeout, -1)
+            Extreme.watchdog_interval.write(self, timeout, verify)
         else:
             raise ValueError('timeout needs to be int')
 
-    def set_power(self, power):
+    def set_power(self, power, verify=None):
         """
         Set power level setpoint with 0.1% precision.
 
@@ -550,19 +479,19 @@ class Extreme:
         ----------
         power : float
             Power level setpoint in percent w/ 0.1% precision. (0 <= P <= 100)
+        verify : bool, optional
+            Read the register back in the same call and raise ValueError if
+            it differs. :attr:`verify_writes` by default.
         """
-        register_address = 0x37
-        setpoint = int(power * 10)
         if (power >= 0) and (power <= 100):
-            nkt.registerWriteU16(self.portname, self.module_address,
-                                 register_address, setpoint, -1)
+            Extreme.power_level.write(self, power, verify)
         else:
             self.set_emission(False)
             self.set_power(0)
             raise ValueError("Power must be between 0 and 100%\n"
                              "Setting output to 0.")
 
-    def set_current(self, current):
+    def set_current(self, current, verify=None):
         """
         Set current level setpoint with 0.1% precision.
 
@@ -572,24 +501,24 @@ class Extreme:
         ----------
         current : float
             Current level setpoint in percent w/ 0.1% precision (0 <= I <= 100)
+        verify : bool, optional
+            Read the register back in the same call and raise ValueError if
+            it differs. :attr:`verify_writes` by default.
         """
-        register_address = 0x38
-        setpoint = int(current*10)
         if (current >= 0) and (current <= 100):
-            nkt.registerWriteU16(self.portname, self.module_address,
-                                 register_address, setpoint, -1)
+            Extreme.current_level.write(self, current, verify)
         else:
             self.set_emission(False)
             self.set_current(0)
             raise ValueError("Current must be between 0 and 100%\n"
                              "Setting output to 0.")
 
-    def set_nim_delay(self, nim_delay):
+    def set_nim_delay(self, nim_delay, verify=None):
         """
         Set NIM trigger delay time.
 
-        Writes register 0x38 and converts from delay time in seconds to
-        corresponding int value using setpoint = int(nim_delay/9e-12)
+        Writes register 0x39 and converts from delay time in seconds to
+        corresponding int value using setpoint = round(nim_delay/9e-12)
 
         Manual:
         On systems with NIM trigger output, the delay of this trigger signal
@@ -601,13 +530,13 @@ class Extreme:
         ----------
         nim_delay : float
             Delay time given in seconds. (0 <= nim_delay <= 9.207e-9)
+        verify : bool, optional
+            Read the register back in the same call and raise ValueError if
+            it differs. :attr:`verify_writes` by default.
         """
-        register_address = 0x38
-        step = 9e-12  # Step size for delay is 9 ps
-        int_delay = int(nim_delay/step)
+        int_delay = Extreme.nim_delay.encode(nim_delay)
         if (int_delay >= 0) and (int_delay <= 1023):
-            nkt.registerWriteU16(self.portname, self.module_address,
-                                 register_address, int_delay, -1)
+            Extreme.nim_delay.write(self, nim_delay, verify)
         else:
             print('NIM Delay Value Out of Range (0 <= Delay <= 9.207e-9)')
 
@@ -638,16 +567,17 @@ class Extreme:
         return (bits)
 
     def test_read_funcs(self):
-        outputs = (self.system_type,
-                   self.inlet_temperature,
-                   self.emission_state,
-                   self.setup_status,
-                   str(self.interlock_status),
-                   self.pulse_picker_ratio,
-                   self.watchdog_interval,
-                   self.power_level,
-                   self.current_level,
-                   self.nim_delay)
+        snapshot = self.snapshot()
+        outputs = (snapshot.system_type,
+                   snapshot.inlet_temperature,
+                   snapshot.emission_state,
+                   snapshot.setup_status,
+                   str(snapshot.interlock_status),
+                   snapshot.pulse_picker_ratio,
+                   snapshot.watchdog_interval,
+                   snapshot.power_level,
+                   snapshot.current_level,
+                   snapshot.nim_delay)
         output_msg = ("""
         System type = %s
         Inlet Temperature = %s
@@ -0,0 +1,463 @@
+"""
+Register properties declared once per register.
+
+The device classes declare each register as a :class:`RegisterField` with
+its address, data type, scale and cache policy::
+
+    class Varia(AsyncMixin, LiveMixin, RegisterDevice):
+        nd_setpoint = RegisterField(0x32, 'U16', scale=0.1)
+
+A field is a property reading (and writing, unless `readonly`) its register
+through the dispatch tables of :mod:`~nkt_tools.NKTP_DLL`, which point at the
+typed register functions with the layers wrapped around them (dispatcher,
+cache, live registers), so these apply to every field alike.
+:class:`RegisterDevice` collects the fields of a class, merges their cache
+policies into ``cache_policies`` and reads any set of fields in one batch
+with :meth:`~RegisterDevice.read_fields`.
+
+:meth:`RegisterDevice.snapshot` returns all fields of a device at once as a
+frozen dataclass: the fields the cache holds are answered by the cache, all
+others are read in one batch. :func:`snapshot_many` takes the snapshots of
+several devices, overlapping the ports::
+
+    >>> laser.snapshot()
+    ExtremeSnapshot(time=1760781600.2, failed=(),
+                    system_type='SuperK Extreme', inlet_temperature=24.5,
+                    emission_state=False, ...)
+
+Writes are verified on request: :meth:`RegisterField.write` with `verify`,
+or every write of a device with ``verify_writes = True``, uses
+registerWriteRead to read the register back in the same call and raises
+ValueError if the module holds another value than written.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import dataclasses
+import threading
+import time
+
+import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import cache
+from nkt_tools.batch import FORMATS, read_many
+
+_read = nkt.readTable  # Updated in place when layers are installed
+_write = nkt.writeTable
+_write_read = nkt.writeReadTable
+
+_snapshot_lock = threading.Lock()
+_snapshot_types = {}  # device class > snapshot dataclass
+
+
+def check_written(address, dtype, written, read_back):
+    """
+    Raise ValueError unless `read_back` is the content `written`.
+
+    Floats are compared at the precision of the register, strings as the
+    bytes read back.
+    """
+    if dtype in ('F32', 'F64'):
+        codec = FORMATS[dtype]
+        written = codec.unpack(codec.pack(written))[0]
+    elif dtype == 'Ascii' and isinstance(written, str):
+        written = written.encode('ascii')
+    if read_back != written:
+        raise ValueError('Register 0x%02X holds %r after writing %r'
+                         % (address, read_back, written))
+
+
+def write_register(device, address, dtype, content, index=-1, verify=None):
+    """
+    Write the `content` of a register of `device`, verified on request.
+
+    Parameters
+    ----------
+    device : RegisterDevice
+        Device to write to.
+    address : int
+        Register address.
+    dtype : str
+        'U8', 'S16', 'U32', 'F32' etc., 'Ascii' or 'Raw'.
+    content
+        Register content, e.g. the setpoint in permille.
+    index : int, optional
+        Byte index of the value in the register. -1 by default.
+    verify : bool, optional
+        Write with registerWriteRead and check the content read back.
+        ``device.verify_writes`` by default.
+
+    Returns
+    -------
+    int
+        RegisterResultTypes of the write, or the content read back if
+        verified.
+    """
+    code = nkt.DataType[dtype]
+    if verify is None:
+        verify = device.verify_writes
+    if not verify:
+        return _write[code](device._portname, device._module_address,
+                            address, content, index)
+    result, read_back = _write_read[code](device._portname,
+                                          device._module_address, address,
+                                          content, index)
+    if result:
+        raise ConnectionError(nkt.RegisterResultTypes(result))
+    check_written(address, dtype, content, read_back)
+    return read_back
+
+
+class RegisterField(property):
+    """
+    Property backed by one register.
+
+    Parameters
+    ----------
+    address : int
+        Register address.
+    dtype : str
+        'U8', 'S16', 'U32', 'F32' etc., 'Ascii' or 'Raw'.
+    scale : float, optional
+        Factor from the register content to the value. 1 by default.
+    readonly : bool, optional
+        Read-only property. Values can still be written with :meth:`write`,
+        e.g. from a setter method checking the range. False by default.
+    convert : callable, optional
+        Applied to the scaled content on reads, e.g. to look up a status
+        message.
+    cache : float, optional
+        Cache policy of the register, see :mod:`nkt_tools.cache`.
+    index : int, optional
+        Byte index of the value in the register. -1 by default.
+    doc : str, optional
+        Docstring of the property.
+    """
+
+    def __init__(self, address, dtype, scale=1, readonly=False, convert=None,
+                 cache=None, index=-1, doc=None):
+        self.address = address
+        self.dtype = dtype
+        self.scale = scale
+        self.convert = convert
+        self.cache = cache
+        self.index = index
+        self._code = nkt.DataType[dtype]
+        # Dividing by 10 instead of multiplying by 0.1 keeps 24.5 exact
+        inverse = 1 / scale
+        self._divisor = (round(inverse) if abs(inverse - round(inverse)) < 1e-6
+                         else None)
+        super().__init__(self._getter(), None if readonly else self._setter(),
+                         None, doc)
+
+    def _getter(self):
+        code, address, index = self._code, self.address, self.index
+        decode, divisor = self.decode, self._divisor
+        if self.scale == 1 and self.convert is None:
+            def fget(device):
+                return _read[code](device._portname, device._module_address,
+                                   address, index)[1]
+        elif self.convert is None and divisor is not None:
+            def fget(device):
+                return _read[code](device._portname, device._module_address,
+                                   address, index)[1] / divisor
+        else:
+            def fget(device):
+                return decode(_read[code](device._portname,
+                                          device._module_address,
+                                          address, index)[1])
+        return fget
+
+    def _setter(self):
+        def fset(device, value):
+            self.write(device, value)
+        return fset
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def decode(self, content):
+        """Return the value of register `content`."""
+        if self.scale != 1:
+            if self._divisor is not None:
+                content = content / self._divisor
+            else:
+                content = content * self.scale
+        if self.convert is not None:
+            content = self.convert(content)
+        return content
+
+    def encode(self, value):
+        """Return the register content of `value`, rounded for integers."""
+        if self.scale != 1:
+            if self._divisor is not None:
+                value = value * self._divisor
+            else:
+                value = value / self.scale
+        if self.dtype[0] in 'US':
+            value = round(value)
+        return value
+
+    def write(self, device, value, verify=None):
+        """
+        Write `value` to the register of `device`.
+
+        Parameters
+        ----------
+        device : RegisterDevice
+            Device to write to.
+        value
+            Value, converted with :meth:`encode`.
+        verify : bool, optional
+            Read the register back in the same call, with registerWriteRead,
+            and check it holds the value written. ``device.verify_writes``
+            by default.
+
+        Returns
+        -------
+        int or value
+            RegisterResultTypes of the write, the value read back if
+            verified.
+
+        Raises
+        ------
+        ConnectionError
+            If a verified write failed.
+        ValueError
+            If the module holds another value after a verified write, e.g.
+            clamped to its range.
+        """
+        if verify is None:
+            verify = device.verify_writes
+        result = write_register(device, self.address, self.dtype,
+                                self.encode(value), self.index, verify)
+        return self.decode(result) if verify else result
+
+    def write_read(self, device, value):
+        """
+        Write `value` and read the register back, in one call.
+
+        Returns
+        -------
+        tuple
+            (RegisterResultTypes, content read back). Decode the content
+            with :meth:`decode`.
+        """
+        return _write_read[self._code](device._portname,
+                                       device._module_address, self.address,
+                                       self.encode(value), self.index)
+
+    def update(self, device, set=0, unset=0, verify=None):
+        """
+        Set and clear bits of the register, writing only if they change.
+
+        Reads the register once, through the layers, so a cached or live
+        value costs no exchange, and writes it with :meth:`write` if any bit
+        changes.
+
+        Parameters
+        ----------
+        device : RegisterDevice
+            Device to update.
+        set : int, optional
+            Bits to set.
+        unset : int, optional
+            Bits to clear.
+        verify : bool, optional
+            See :meth:`write`.
+
+        Returns
+        -------
+        int
+            New content of the register.
+        """
+        result, content = _read[self._code](device._portname,
+                                            device._module_address,
+                                            self.address, self.index)
+        if result:
+            raise ConnectionError(nkt.RegisterResultTypes(result))
+        updated = (content | set) & ~unset
+        if updated != content:
+            write_register(device, self.address, self.dtype, updated,
+                           self.index, verify)
+        return updated
+
+    def __repr__(self):
+        return '<RegisterField %s 0x%02X %s>' % (getattr(self, 'name', '?'),
+                                                 self.address, self.dtype)
+
+
+class RegisterDevice:
+    """
+    Base of the device classes declaring their registers as fields.
+
+    The cache policies of the fields are merged into ``cache_policies``.
+    """
+
+    __slots__ = ()
+
+    cache_policies = {}
+
+    verify_writes = False
+    """bool : Read every field written back in the same call and raise if
+    the module holds another value, see :meth:`RegisterField.write`."""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        policies = dict(cls.cache_policies)
+        policies.update((field.address, field.cache)
+                        for field in cls.fields().values()
+                        if field.cache is not None)
+        cls.cache_policies = policies
+
+    @classmethod
+    def fields(cls):
+        """Return all :class:`RegisterField` of the class, by name."""
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            fields.update((name, attr) for name, attr in vars(klass).items()
+                          if isinstance(attr, RegisterField))
+        return fields
+
+    def read_fields(self, *names):
+        """
+        Read several fields in one batch with :func:`~.batch.read_many`.
+
+        Parameters
+        ----------
+        *names : str
+            Fields to read, all fields of the class if none are given.
+
+        Returns
+        -------
+        dict
+            field name > value, as read through the properties.
+        """
+        fields = self.fields()
+        names = names or tuple(fields)
+        table = read_many(self._portname,
+                          [(self._module_address, fields[name].address,
+                            fields[name].dtype, fields[name].index)
+                           for name in names], columns=True)
+        return {name: fields[name].decode(value)
+                for name, value in zip(names, table['value'])}
+
+    def snapshot(self):
+        """
+        Read all fields at once into a frozen dataclass.
+
+        Fields with a cache policy are read through the cache, when it is
+        enabled, so static registers cost no exchange after the first
+        snapshot. All other fields are read in one batch with
+        :func:`~.batch.read_many`.
+
+        Returns
+        -------
+        dataclass
+            ``<class name>Snapshot`` with the fields 'time' (seconds since
+            the epoch before the reads), 'failed' (names of the fields that
+            could not be read, their value is None) and the value of every
+            field, by name.
+        """
+        snapshot_type = _snapshot_type(type(self))
+        fields = self.fields()
+        values = {}
+        failed = set()
+        batched = []
+        now = time.time()
+        caching = cache.enabled()
+        for name, field in fields.items():
+            if caching and cache.policy(self._portname, self._module_address,
+                                        field.address) != cache.NEVER:
+                result, content = _read[field._code](
+                    self._portname, self._module_address, field.address,
+                    field.index)
+                if result:
+                    failed.add(name)
+                else:
+                    values[name] = field.decode(content)
+            else:
+                batched.append(name)
+        if batched:
+            table = read_many(self._portname,
+                              [(self._module_address, fields[name].address,
+                                fields[name].dtype, fields[name].index)
+                               for name in batched], columns=True)
+            for name, result, content in zip(batched, table['result'],
+                                             table['value']):
+                if result:
+                    failed.add(name)
+                else:
+                    values[name] = fields[name].decode(content)
+        return snapshot_type(time=now,
+                             failed=tuple(name for name in fields
+                                          if name in failed),
+                             **{name: values.get(name) for name in fields})
+
+
+def _annotation(field):
+    """Return the type of the values of `field`."""
+    if field.convert is not None:
+        return object
+    if field.dtype in ('Ascii', 'Raw'):
+        return bytes
+    if field.dtype[0] == 'F' or field.scale != 1:
+        return float
+    return int
+
+
+def _snapshot_type(cls, annotation=_annotation):
+    """
+    Return the frozen, slotted snapshot dataclass of a device class.
+
+    `annotation(field)` returns the type of the values of a field of
+    ``cls.fields()``.
+    """
+    try:
+        return _snapshot_types[cls]
+    except KeyError:
+        pass
+    with _snapshot_lock:
+        if cls not in _snapshot_types:
+            fields = [('time', float), ('failed', tuple)]
+            fields.extend((name, annotation(field))
+                          for name, field in cls.fields().items())
+            snapshot_type = dataclasses.make_dataclass(
+                cls.__name__ + 'Snapshot', fields, frozen=True,
+                namespace={'__slots__': tuple(name for name, _ in fields)})
+            snapshot_type.__module__ = cls.__module__
+            _snapshot_types[cls] = snapshot_type
+        return _snapshot_types[cls]
+
+
+def snapshot_many(devices):
+    """
+    Take the :meth:`~RegisterDevice.snapshot` of several devices.
+
+    The devices of each port are read one after the other, the ports in
+    parallel, so a snapshot of devices on n ports takes about as long as
+    the port with the most registers.
+
+    Parameters
+    ----------
+    devices : iterable of RegisterDevice or GenericModule
+        Devices to read.
+
+    Returns
+    -------
+    list
+        The snapshots, in the order of `devices`.
+    """
+    devices = list(devices)
+    by_port = {}
+    for number, device in enumerate(devices):
+        by_port.setdefault(device._portname, []).append(number)
+    snapshots = [None] * len(devices)
+
+    def read_port(numbers):
+        for number in numbers:
+            snapshots[number] = devices[number].snapshot()
+
+    if len(by_port) == 1:
+        read_port(range(len(devices)))
+    elif by_port:
+        with ThreadPoolExecutor(max_workers=len(by_port)) as executor:
+            list(executor.map(read_port, by_port.values()))
+    return snapshots
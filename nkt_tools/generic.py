@@ -0,0 +1,299 @@
+"""
+Device class for every module type with a register file.
+
+:class:`GenericModule` detects the type of a module and hands out an object
+whose properties are the registers listed in the register file of that type
+(see :mod:`nkt_tools.registers`), named after the register::
+
+    >>> from nkt_tools.generic import GenericModule
+    >>> compact = GenericModule('COM4', 1)
+    >>> compact
+    <SuperK Compact (S024) 0x74 at COM4:1>
+    >>> compact.heat_sink_temperature
+    24.5
+    >>> compact.power_level = 80
+
+The class of each module type is built once, on first use, with one
+:class:`Field` descriptor per register holding the precompiled struct of
+the value. Readings are read-only, controls and parameters can be assigned.
+:meth:`GenericModule.snapshot` reads all registers in one batch and
+:meth:`GenericModule.apply` assigns several of them.
+"""
+from ctypes import create_string_buffer
+import time
+
+import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import registers
+from nkt_tools.aio import AsyncMixin
+from nkt_tools.batch import read_many
+from nkt_tools.fields import _snapshot_type
+from nkt_tools.live import LiveMixin
+from nkt_tools.session import pool
+
+
+class Field:
+    """
+    Descriptor of one register value of a :class:`GenericModule`.
+
+    Reads and writes the register through the raw register functions of
+    :mod:`~nkt_tools.NKTP_DLL`, converting with the struct and scale of its
+    :class:`~nkt_tools.registers.Register`.
+    """
+
+    __slots__ = ('register', 'address', 'index', 'codec', 'divisor',
+                 'writable')
+
+    def __init__(self, register):
+        self.register = register
+        self.address = register.address
+        self.index = register.index
+        self.codec = register.struct
+        # Dividing by 10 instead of multiplying by 0.1 keeps 24.5 exact
+        self.divisor = round(1 / register.scale) if register.scale < 1 else 1
+        self.writable = register.section != 'readings'
+
+    def decode(self, data):
+        """Return the value of the register content `data`."""
+        if self.codec is None:
+            return data.split(b'\x00', 1)[0].decode('latin-1')
+        size = self.codec.size
+        value = self.codec.unpack(data[:size].ljust(size, b'\x00'))[0]
+        return value / self.divisor if self.divisor != 1 else value
+
+    def encode(self, value):
+        """Return the register content of `value`."""
+        if self.codec is None:
+            return str(value).encode('latin-1')
+        if self.register.dtype == 'F32':
+            return self.codec.pack(value)
+        return self.codec.pack(round(value * self.divisor))
+
+    def __get__(self, device, owner=None):
+        if device is None:
+            return self
+        result, data = nkt.registerRead(device.portname,
+                                        device.module_address, self.address,
+                                        self.index)
+        if result:
+            raise ConnectionError(nkt.RegisterResultTypes(result))
+        return self.decode(data)
+
+    def __set__(self, device, value):
+        if not self.writable:
+            raise AttributeError('%s is a reading' % self.register.attr)
+        data = self.encode(value)
+        result = nkt.registerWrite(device.portname, device.module_address,
+                                   self.address,
+                                   create_string_buffer(data, len(data)),
+                                   len(data), self.index)
+        if result:
+            raise ConnectionError(nkt.RegisterResultTypes(result))
+
+    def annotation(self):
+        """Return the type of the values, for snapshots."""
+        if self.codec is None:
+            return str
+        if self.divisor != 1 or self.register.dtype in ('F32', 'F64'):
+            return float
+        return int
+
+    def __repr__(self):
+        register = self.register
+        return '<Field %s 0x%02X %s [%s]>' % (register.attr, register.address,
+                                             register.dtype, register.unit)
+
+
+_classes = {}  # module type > GenericModule subclass
+
+
+def module_class(module_type):
+    """
+    Return the GenericModule subclass of `module_type`.
+
+    Raises
+    ------
+    KeyError
+        If there is no register map of `module_type`.
+    """
+    cls = _classes.get(module_type)
+    if cls is None:
+        regmap = registers.load(module_type)
+        namespace = {'__slots__': (), 'register_map': regmap,
+                     '__doc__': regmap.description}
+        namespace.update((register.attr, Field(register))
+                         for register in regmap)
+        cls = type('GenericModule_0x%02X' % module_type, (GenericModule,),
+                   namespace)
+        _classes[module_type] = cls
+    return cls
+
+
+class GenericModule(AsyncMixin, LiveMixin):
+    """
+    Any NKT module, with the registers of its register file as properties.
+
+    ``GenericModule(portname, module_address)`` reads the module type and
+    returns an instance of the class built for that type.
+    """
+
+    __slots__ = ('_portname', '_module_address', '_session')
+
+    register_map = None
+    """RegisterMap: Registers of the module type, set on the subclasses."""
+
+    def __new__(cls, portname, module_address, module_type=None):
+        if cls.register_map is None:
+            if module_type is None:
+                with pool.acquire(portname):
+                    result, module_type = nkt.deviceGetType(portname,
+                                                            module_address)
+                if result:
+                    raise ConnectionError(nkt.DeviceResultTypes(result))
+            cls = module_class(module_type)
+        return object.__new__(cls)
+
+    def __init__(self, portname, module_address, module_type=None):
+        """
+        Connect to the module at `module_address` on `portname`.
+
+        Parameters
+        ----------
+        portname : str
+            Port of the module, e.g. 'COM4'.
+        module_address : int
+            Module address.
+        module_type : int, optional
+            Module type, e.g. from :func:`nkt_tools.discovery.discover`.
+            Read from the module if not given.
+
+        Raises
+        ------
+        ConnectionError
+            If the port could not be opened or the module did not answer.
+        KeyError
+            If there is no register file for the module type.
+        """
+        self._portname = portname
+        self._module_address = module_address
+        self._session = pool.acquire(portname)
+
+    portname = property(lambda self: self._portname)
+    """`str`, read-only: Port of the module."""
+
+    module_address = property(lambda self: self._module_address)
+    """`int`, read-only: Module address."""
+
+    device_type = property(lambda self: self.register_map.type)
+    """`int`, read-only: Module type."""
+
+    @classmethod
+    def fields(cls):
+        """Return the :class:`Field` of every register, by name."""
+        return {register.attr: getattr(cls, register.attr)
+                for register in cls.register_map}
+
+    @property
+    def status(self):
+        """
+        Status bits set in register 0x66.
+
+        Returns
+        -------
+        list of str
+            Meanings of the bits set, from the register file.
+        """
+        result, word = nkt.registerReadU16(self.portname, self.module_address,
+                                           registers.STATUS_REGISTER, -1)
+        if result:
+            raise ConnectionError(nkt.RegisterResultTypes(result))
+        return self.register_map.status(word)
+
+    @property
+    def error(self):
+        """
+        Error code of register 0x67 with its meaning.
+
+        Returns
+        -------
+        tuple
+            (code, meaning), meaning is None for codes not in the register
+            file.
+        """
+        result, code = nkt.registerReadU8(self.portname, self.module_address,
+                                          registers.ERROR_REGISTER, -1)
+        if result:
+            raise ConnectionError(nkt.RegisterResultTypes(result))
+        return code, self.register_map.error_codes.get(code)
+
+    def snapshot(self):
+        """
+        Read all registers of the module in one batch.
+
+        Registers holding several values, e.g. an IP address, are read once.
+
+        Returns
+        -------
+        dataclass
+            Frozen ``<class name>Snapshot``, one type per module type, with
+            'time' (seconds since the epoch before the reads), 'failed'
+            (names of the registers that could not be read, their value is
+            None) and the value of every register, by name, as
+            :meth:`RegisterDevice.snapshot
+            <nkt_tools.fields.RegisterDevice.snapshot>`.
+        """
+        snapshot_type = _snapshot_type(type(self), Field.annotation)
+        fields = self.fields()
+        now = time.time()
+        addresses = list(dict.fromkeys(field.address
+                                       for field in fields.values()))
+        table = read_many(self.portname,
+                          [(self.module_address, address, 'Raw')
+                           for address in addresses], columns=True)
+        contents = {address: data if not result else None
+                    for address, result, data in zip(addresses,
+                                                     table['result'],
+                                                     table['value'])}
+        values = {}
+        for name, field in fields.items():
+            data = contents[field.address]
+            if data is not None and field.index > 0:
+                data = data[field.index:]
+            values[name] = None if data is None else field.decode(data)
+        return snapshot_type(time=now,
+                             failed=tuple(name for name, value
+                                          in values.items() if value is None),
+                             **values)
+
+    def apply(self, values):
+        """
+        Assign several registers, in the order given.
+
+        Parameters
+        ----------
+        values : dict
+            register name > value, e.g. registers of a :meth:`snapshot`
+            taken with :func:`dataclasses.asdict`.
+
+        Raises
+        ------
+        AttributeError
+            If a name is not a writable register. Nothing is written then.
+        ConnectionError
+            If a write failed. The registers before it are written.
+        """
+        fields = self.fields()
+        for name in values:
+            if name not in fields or not fields[name].writable:
+                raise AttributeError('%s has no writable register %r'
+                                     % (type(self).__name__, name))
+        for name, value in values.items():
+            fields[name].__set__(self, value)
+
+    def close(self):
+        """Release the port of the module."""
+        self._session.release()
+
+    def __repr__(self):
+        return '<%s 0x%02X at %s:%d>' % (self.register_map.description,
+                                         self.device_type, self.portname,
+                                         self.module_address)
@@ -0,0 +1,348 @@
+"""
+Call counters and latency histograms of the register and device functions.
+
+After :func:`enable`, every call of a register or device function of
+:mod:`~nkt_tools.NKTP_DLL` is counted per register, keyed by (port, devId,
+regId): calls, reads and writes, bytes read and written, result codes other
+than 0, and the latency in an HDR-style histogram (log-linear buckets with
+1/16 relative precision from 1 ns to minutes). Disabled, the functions are
+not wrapped at all and cost nothing extra.
+
+Batched reads (:func:`~nkt_tools.batch.read_many`, device snapshots,
+``read_channels``, the telemetry and shared memory pollers) leave their
+fast path while the layer is installed and are counted per register like
+any other read.
+
+By default the layer sits outside all others (:data:`~nkt_tools._hooks.
+INSTRUMENT`), so it sees the calls the device classes make, including those
+answered by the cache. ``enable(bus=True)`` installs it next to the
+backend instead, to count the transactions reaching the bus and their round
+trip time without waiting for the dispatcher.
+
+Example
+-------
+>>> from nkt_tools import instrument
+>>> instrument.enable()
+>>> channels = driver.get_channels(verbose=0)
+>>> stats = instrument.snapshot()[('COM4', 6, 0x90)]
+>>> stats['calls'], stats['p99']
+(1, 0.00131)
+>>> print(instrument.prometheus())  # Text exposition format
+"""
+import threading
+import time
+
+from nkt_tools import _hooks
+from nkt_tools.batch import FORMATS
+from nkt_tools.cache import DEVICE_REGISTERS
+
+
+SUB_BUCKET_BITS = 4
+"""int : Buckets per power of two are 2**SUB_BUCKET_BITS."""
+
+BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2,
+           2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+"""tuple : Upper bounds in seconds of the buckets exported by
+:func:`prometheus`."""
+
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_SIZE = (65 - SUB_BUCKET_BITS) * _SUB_BUCKETS  # Covers any 64 bit value
+
+# Registers of the device functions not cached, see cache.DEVICE_REGISTERS
+_DEVICE_REGISTERS = dict(DEVICE_REGISTERS, deviceGetStatusBits=0x66,
+                         deviceGetErrorCode=0x67)
+
+_lock = threading.Lock()
+_stats = {}  # (portname, devId, regId) > Stats
+_order = None  # Order of the installed layer
+
+
+class Histogram:
+    """
+    Latency histogram with log-linear buckets, as HDR histograms.
+
+    Values are nanoseconds. Below 2**SUB_BUCKET_BITS every value has its
+    own bucket, above that each power of two is split into
+    2**SUB_BUCKET_BITS buckets, so the bucket of a value is within 1/16 of
+    it.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * _SIZE
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def index(value):
+        """Return the bucket of `value` nanoseconds."""
+        if value < _SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        return (shift + 1) * _SUB_BUCKETS + (value >> shift) - _SUB_BUCKETS
+
+    @staticmethod
+    def upper(index):
+        """Return the highest value in nanoseconds of bucket `index`."""
+        if index < _SUB_BUCKETS:
+            return index
+        shift = index // _SUB_BUCKETS - 1
+        return ((index % _SUB_BUCKETS + _SUB_BUCKETS + 1) << shift) - 1
+
+    def record(self, value):
+        """Add a latency of `value` nanoseconds."""
+        self.counts[self.index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """Return the latency in nanoseconds below which `q` of all are."""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(self.upper(index), self.max)
+        return self.max
+
+    def cumulative(self, bounds):
+        """Return the number of values up to each bound in nanoseconds."""
+        counts = []
+        seen = 0
+        index = 0
+        for bound in bounds:
+            while index < _SIZE and self.upper(index) <= bound:
+                seen += self.counts[index]
+                index += 1
+            counts.append(seen)
+        return counts
+
+
+class Stats:
+    """Counters and latency histogram of one register."""
+
+    __slots__ = ('calls', 'reads', 'writes', 'bytes_read', 'bytes_written',
+                 'errors', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.reads = 0
+        self.writes = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.errors = {}  # result code > count
+        self.latency = Histogram()
+
+    def as_dict(self):
+        """Return the counters, with latencies in seconds."""
+        latency = self.latency
+        return {'calls': self.calls, 'reads': self.reads,
+                'writes': self.writes, 'bytes_read': self.bytes_read,
+                'bytes_written': self.bytes_written,
+                'errors': dict(self.errors),
+                'mean': latency.total / latency.count * 1e-9
+                if latency.count else 0.0,
+                'p50': latency.quantile(0.5) * 1e-9,
+                'p90': latency.quantile(0.9) * 1e-9,
+                'p99': latency.quantile(0.99) * 1e-9,
+                'max': latency.max * 1e-9}
+
+
+def _entry(key):
+    with _lock:
+        return _stats.setdefault(key, Stats())
+
+
+def _sizes(name):
+    """
+    Return the bytes (read, written) by function `name`.
+
+    Each is None if the function does not read (write), the size of the
+    data type, or a function (args, response) > size for strings and raw
+    data.
+    """
+    for prefix in ('registerWriteRead', 'registerWrite', 'registerRead'):
+        if name.startswith(prefix):
+            dtype = name[len(prefix):] or 'Raw'
+            break
+    else:  # Device functions, size of the strings and bytes returned
+        return (lambda args, response: len(response[1])
+                if isinstance(response[1], (bytes, str)) else 0), None
+    read = write = None
+    if prefix != 'registerWrite':
+        read = FORMATS[dtype].size if dtype in FORMATS else (
+            lambda args, response: len(response[1]))
+    if prefix != 'registerRead':
+        if dtype in FORMATS:
+            write = FORMATS[dtype].size
+        elif dtype == 'Ascii':  # devId, regId, strValue, wrEOL, index
+            def write(args, response):
+                return len(args[2]) + bool(args[3])
+        else:  # devId, regId, writeData, writeSize, index
+            def write(args, response):
+                return args[3]
+    return read, write
+
+
+def _layer(name, function):
+    if not name.startswith(('register', 'device')):
+        return function
+    read, write = _sizes(name)
+    clock = time.perf_counter_ns
+    register = name.startswith(('registerRead', 'registerWrite'))
+    regId = _DEVICE_REGISTERS.get(name, -1)
+    table, lock = _stats, _lock
+
+    def instrumented(portname, *args):
+        start = clock()
+        response = function(portname, *args)
+        elapsed = clock() - start
+        if register:
+            key = (portname, args[0], args[1])
+        else:
+            key = (portname, args[0] if args else -1, regId)
+        stats = table.get(key) or _entry(key)
+        result = response[0] if type(response) is tuple else response
+        # Histogram.index, inlined
+        if elapsed < _SUB_BUCKETS:
+            index = elapsed
+        else:
+            shift = elapsed.bit_length() - SUB_BUCKET_BITS - 1
+            index = (shift << SUB_BUCKET_BITS) + (elapsed >> shift)
+        with lock:
+            stats.calls += 1
+            latency = stats.latency
+            latency.counts[index] += 1
+            latency.count += 1
+            latency.total += elapsed
+            if elapsed > latency.max:
+                latency.max = elapsed
+            if result and type(result) is int:
+                stats.errors[result] = stats.errors.get(result, 0) + 1
+            else:
+                if read is not None and type(response) is tuple:
+                    stats.reads += 1
+                    stats.bytes_read += (read if type(read) is int
+                                         else read(args, response))
+                if write is not None:
+                    stats.writes += 1
+                    stats.bytes_written += (write if type(write) is int
+                                            else write(args, response))
+        return response
+    instrumented.__name__ = name
+    instrumented.__doc__ = function.__doc__
+    return instrumented
+
+
+def enable(bus=False):
+    """
+    Count and time every register and device function.
+
+    Parameters
+    ----------
+    bus : bool, optional
+        Instrument the calls reaching the backend, below the cache and the
+        dispatcher, instead of the calls made by the device classes.
+    """
+    global _order
+    order = _hooks.REPLAY if bus else _hooks.INSTRUMENT
+    if _order != order:
+        disable()
+        _hooks.install(_layer, order)
+        _order = order
+
+
+def disable():
+    """Stop counting, the recorded statistics are kept."""
+    global _order
+    _hooks.remove(_layer)
+    _order = None
+
+
+def enabled():
+    """Return True if the functions are instrumented."""
+    return _hooks.installed(_layer)
+
+
+def reset():
+    """Drop all recorded statistics."""
+    with _lock:
+        _stats.clear()
+
+
+def snapshot():
+    """
+    Return the statistics of all registers.
+
+    Returns
+    -------
+    dict
+        (portname, devId, regId) > dict with 'calls', 'reads', 'writes',
+        'bytes_read', 'bytes_written', 'errors' (result code > count) and
+        the latencies 'mean', 'p50', 'p90', 'p99' and 'max' in seconds.
+        Port functions of a whole port have devId -1, device functions not
+        reading one register regId -1.
+    """
+    with _lock:
+        return {key: stats.as_dict() for key, stats in _stats.items()}
+
+
+def _labels(portname, devId, regId):
+    portname = portname.replace('\\', '\\\\').replace('"', '\\"')
+    return 'port="%s",device="%d",register="%s"' % (
+        portname, devId, '0x%02X' % regId if regId >= 0 else '')
+
+
+def prometheus(prefix='nkt'):
+    """
+    Return the statistics in the Prometheus text exposition format.
+
+    Exports the counters per register with the labels port, device and
+    register, and the latency as a histogram with the bounds of
+    :data:`BUCKETS`, approximated by the buckets of :class:`Histogram`.
+    """
+    bounds = [round(bound * 1e9) for bound in BUCKETS]
+    lines = []
+    counters = (('calls', 'Register and device function calls.'),
+                ('reads', 'Successful reads.'),
+                ('writes', 'Successful writes.'),
+                ('bytes_read', 'Bytes read.'),
+                ('bytes_written', 'Bytes written.'))
+    with _lock:
+        items = sorted(_stats.items(), key=lambda item: item[0])
+        labels = {key: _labels(*key) for key, _ in items}
+        for counter, text in counters:
+            name = '%s_%s_total' % (prefix, counter)
+            lines.append('# HELP %s %s' % (name, text))
+            lines.append('# TYPE %s counter' % name)
+            lines.extend('%s{%s} %d' % (name, labels[key],
+                                        getattr(stats, counter))
+                         for key, stats in items)
+        name = '%s_errors_total' % prefix
+        lines.append('# HELP %s Calls failing with a result code.' % name)
+        lines.append('# TYPE %s counter' % name)
+        for key, stats in items:
+            lines.extend('%s{%s,result="%d"} %d' % (name, labels[key], code,
+                                                    count)
+                         for code, count in sorted(stats.errors.items()))
+        name = '%s_latency_seconds' % prefix
+        lines.append('# HELP %s Call latency.' % name)
+        lines.append('# TYPE %s histogram' % name)
+        for key, stats in items:
+            latency = stats.latency
+            for bound, count in zip(BUCKETS, latency.cumulative(bounds)):
+                lines.append('%s_bucket{%s,le="%g"} %d'
+                             % (name, labels[key], bound, count))
+            lines.append('%s_bucket{%s,le="+Inf"} %d'
+                         % (name, labels[key], latency.count))
+            lines.append('%s_sum{%s} %.9f' % (name, labels[key],
+                                              latency.total * 1e-9))
+            lines.append('%s_count{%s} %d' % (name, labels[key],
+                                              latency.count))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,830 @@
+"""
+Pure-Python Interbus transport exposing the :mod:`nkt_tools.NKTP_DLL` API.
+
+NKTPDLL.dll is only available on Windows. This module talks the Interbus
+telegram protocol described in chapter 2 of the SDK instruction manual
+directly over a serial port (or pty), so the device classes also run on Linux
+and macOS. Select it by setting the ``NKTP_BACKEND`` environment variable to
+``interbus`` before :mod:`nkt_tools.NKTP_DLL` is imported::
+
+    NKTP_BACKEND=interbus python my_experiment.py
+
+The functions below mirror the signatures and return values of their DLL
+counterparts, including the :func:`~nkt_tools.NKTP_DLL.RegisterResultTypes`
+and :func:`~nkt_tools.NKTP_DLL.DeviceResultTypes` codes. Serial ports are
+opened with pyserial, which is imported on first use.
+
+Telegram layout (all bytes before byte stuffing)::
+
+    [SOT][Dest][Source][Type][Reg][0..240 data bytes][CRC MSB][CRC LSB][EOT]
+"""
+import contextlib
+import struct
+import threading
+import time
+
+__all__ = [
+    'getAllPorts', 'getOpenPorts', 'openPorts', 'closePorts',
+    'getPortStatus', 'getPortErrorMsg',
+    'registerRead', 'registerReadU8', 'registerReadS8', 'registerReadU16',
+    'registerReadS16', 'registerReadU32', 'registerReadS32',
+    'registerReadU64', 'registerReadS64', 'registerReadF32',
+    'registerReadF64', 'registerReadAscii',
+    'registerWrite', 'registerWriteU8', 'registerWriteS8',
+    'registerWriteU16', 'registerWriteS16', 'registerWriteU32',
+    'registerWriteS32', 'registerWriteU64', 'registerWriteS64',
+    'registerWriteF32', 'registerWriteF64', 'registerWriteAscii',
+    'registerWriteRead', 'registerWriteReadU8', 'registerWriteReadS8',
+    'registerWriteReadU16', 'registerWriteReadS16', 'registerWriteReadU32',
+    'registerWriteReadS32', 'registerWriteReadU64', 'registerWriteReadS64',
+    'registerWriteReadF32', 'registerWriteReadF64', 'registerWriteReadAscii',
+    'deviceGetType', 'deviceGetPartNumberStr', 'deviceGetPCBVersion',
+    'deviceGetStatusBits', 'deviceGetErrorCode',
+    'deviceGetBootloaderVersion', 'deviceGetFirmwareVersion',
+    'deviceGetModuleSerialNumberStr', 'deviceGetPCBSerialNumberStr',
+    'deviceCreate', 'deviceExists', 'deviceRemove', 'deviceRemoveAll',
+    'deviceGetAllTypes', 'deviceGetLive', 'deviceSetLive',
+    'registerCreate', 'registerExists', 'registerRemove',
+    'registerRemoveAll', 'registerGetAll', 'setCallbackPtrRegisterInfo',
+]
+
+# Framing and special characters (SDK manual section 2.2 and 2.3)
+SOT = 0x0D  # Start of telegram
+EOT = 0x0A  # End of telegram
+SOE = 0x5E  # Start of substitution word
+ECC = 0x40  # Added to a special character when it is substituted
+
+# Message types (SDK manual section 2.2)
+NACK = 0
+CRC_ERROR = 1
+BUSY = 2
+ACK = 3
+READ = 4
+WRITE = 5
+WRITE_SET = 6
+WRITE_CLEAR = 7
+DATAGRAM = 8
+WRITE_TOGGLE = 9
+
+BAUDRATE = 115200
+TIMEOUT = 0.1  # Response timeout in seconds for normal telegrams
+SCAN_TIMEOUT = 0.05  # Response timeout in seconds while scanning addresses
+SCAN_ADDRESSES = range(1, 161)  # Module addresses are 1..160
+HOST_ADDRESSES = range(0xA1, 0x100)  # Source addresses cycled by the host
+MAX_DATA = 240  # Maximum number of data bytes in one telegram
+LIVE_INTERVAL = 0.02  # Seconds between two polls of the live registers
+LIVE_LOW_EVERY = 10  # Low priority live registers are polled every n-th time
+
+links = {}
+"""dict : portname > callable returning an opened link, used instead of a
+serial port for that name, e.g. by :mod:`nkt_tools.simulator`."""
+
+# Interbus responses translated to RegisterResultTypes
+_RESPONSE_RESULTS = {NACK: 4, CRC_ERROR: 5, BUSY: 3, ACK: 0, DATAGRAM: 0}
+# RegisterResultTypes translated to DeviceResultTypes
+_DEVICE_RESULTS = {0: 0, 6: 1, 12: 3, 13: 4, 14: 5, 15: 6}
+# RegisterResultTypes translated to RegisterStatusTypes of live registers
+_REGISTER_STATUS = {0: 0, 3: 1, 4: 2, 5: 3, 6: 4}
+
+
+def _make_crc_table():
+    """Build the lookup table for CRC-CCITT (XModem), polynomial 0x1021."""
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+
+_CRC_TABLE = _make_crc_table()
+
+
+def crc16(data, crc=0):
+    """
+    Calculate the Interbus CRC-CCITT (XModem) of `data`.
+
+    Passing a received message including its two CRC bytes returns 0 if the
+    message was received without transmission errors.
+
+    Parameters
+    ----------
+    data : bytes-like
+        Message bytes without framing or byte stuffing.
+    crc : int, optional
+        Start value, 0 for a new message.
+
+    Returns
+    -------
+    int
+        16 bit CRC value.
+    """
+    table = _CRC_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFF00) ^ table[(crc >> 8) ^ byte]
+    return crc
+
+
+def stuff(message):
+    """Replace special characters in `message` with two byte substitutes."""
+    # SOE has to be substituted first, the other substitutes start with SOE
+    return (bytes(message).replace(b'\x5e', b'\x5e\x9e')
+            .replace(b'\x0a', b'\x5e\x4a')
+            .replace(b'\x0d', b'\x5e\x4d'))
+
+
+def unstuff(message):
+    """Restore special characters from their two byte substitutes."""
+    # SOE has to be restored last, otherwise a restored SOE could pair up
+    # with the following byte and be read as a substitute again
+    return (bytes(message).replace(b'\x5e\x4a', b'\x0a')
+            .replace(b'\x5e\x4d', b'\x0d')
+            .replace(b'\x5e\x9e', b'\x5e'))
+
+
+def encode_telegram(dest, source, msg_type, register, data=b''):
+    """
+    Build a complete, framed telegram.
+
+    Parameters
+    ----------
+    dest : int
+        Destination (module) address.
+    source : int
+        Source (host) address.
+    msg_type : int
+        Interbus message type, e.g. :data:`READ` or :data:`WRITE`.
+    register : int
+        Register address.
+    data : bytes-like, optional
+        Up to 240 data bytes.
+
+    Returns
+    -------
+    bytes
+        Telegram including SOT, EOT, CRC and byte stuffing.
+    """
+    message = bytes((dest, source, msg_type, register)) + bytes(data)
+    crc = crc16(message)
+    return (b'\x0d' + stuff(message + bytes((crc >> 8, crc & 0xFF)))
+            + b'\x0a')
+
+
+def decode_telegram(telegram):
+    """
+    Split a received telegram into its fields.
+
+    Parameters
+    ----------
+    telegram : bytes-like
+        Received bytes. Anything before the last SOT and the trailing EOT are
+        ignored.
+
+    Returns
+    -------
+    tuple(int, int, int, int, bytes) or None
+        (dest, source, msg_type, register, data) or None if the telegram is
+        too short or fails the CRC check.
+    """
+    telegram = bytes(telegram)
+    start = telegram.rfind(b'\x0d')
+    message = unstuff(telegram[start + 1:].rstrip(b'\x0a'))
+    if len(message) < 6 or crc16(message):
+        return None
+    return (message[0], message[1], message[2], message[3],
+            message[4:-2])
+
+
+class InterbusPort:
+    """
+    One serial link to an Interbus, shared by all modules on that port.
+
+    Telegrams are serialized with a lock, so a port can be used from several
+    threads. The source address is cycled for every telegram so that stale
+    responses (e.g. from a previous timeout) are never paired with the wrong
+    request.
+    """
+
+    def __init__(self, portname, link=None, timeout=TIMEOUT):
+        """
+        Create the port. The link is opened with :meth:`open`.
+
+        Parameters
+        ----------
+        portname : str
+            Serial device, e.g. 'COM4', '/dev/ttyUSB0' or a pty.
+        link : serial.Serial-like, optional
+            Already opened link providing write(), read_until() and close().
+            Opened from :data:`links` or with pyserial from `portname` if
+            not given.
+        timeout : float, optional
+            Response timeout in seconds.
+        """
+        self.portname = portname
+        self.timeout = timeout
+        self.types = bytearray(256)  # Module type per address, 0 == none
+        self.live = bytearray(256)  # Live mode per address
+        self.registers = {}  # (devId, regId) > [priority, dataType, last]
+        self._monitor = None  # Thread polling the live registers
+        self._link = link
+        self._lock = threading.RLock()
+        self._host = iter(())
+        # Preallocated message buffer: header, max data and CRC
+        self._message = bytearray(4 + MAX_DATA + 2)
+        self._error = ''
+
+    @property
+    def is_open(self):
+        """`bool`, read-only: True if the serial link is open."""
+        return self._link is not None
+
+    def open(self):
+        """Open the serial link. Return True on success."""
+        if self._link is not None:
+            return True
+        if self.portname in links:
+            self._link = links[self.portname]()
+            return True
+        try:
+            import serial
+            self._link = serial.Serial(self.portname, BAUDRATE,
+                                       timeout=self.timeout)
+        except (ImportError, OSError, ValueError) as error:
+            self._error = str(error)
+            return False
+        return True
+
+    def close(self):
+        """Close the serial link."""
+        with self._lock:
+            if self._link is not None:
+                self._link.close()
+                self._link = None
+
+    def monitor(self):
+        """
+        Poll the live registers and report changes until the port closes.
+
+        Stands in for the live monitoring of the DLL: high priority registers
+        of devices in live mode are read every :data:`LIVE_INTERVAL`, low
+        priority ones every :data:`LIVE_LOW_EVERY` polls. A change of value
+        or status is passed to the callback of
+        :func:`setCallbackPtrRegisterInfo`.
+
+        One monitor runs per port, started by :func:`registerCreate`. It
+        ends, under the port lock, once no live register is left.
+        """
+        import ctypes
+        portname = self.portname.encode('ascii')
+        cycle = 0
+        while True:
+            with self._lock:
+                if not (self.is_open and self.registers):
+                    if self._monitor is threading.current_thread():
+                        self._monitor = None
+                    return
+                registers = list(self.registers.items())
+            for key, entry in registers:
+                devId, regId = key
+                priority, dataType, last = entry
+                if not self.live[devId] or (not priority
+                                            and cycle % LIVE_LOW_EVERY):
+                    continue
+                result, data = self.transact(devId, READ, regId)
+                state = (_REGISTER_STATUS.get(result, 5), data)
+                callback = _register_callback
+                if state == last or not self.is_open:
+                    continue
+                entry[2] = state
+                if callback:
+                    buffer = ctypes.create_string_buffer(data, len(data) or 1)
+                    callback(portname, devId, regId, state[0], dataType,
+                             len(data), ctypes.addressof(buffer))
+            cycle += 1
+            time.sleep(LIVE_INTERVAL)
+
+    def _next_host(self):
+        try:
+            return next(self._host)
+        except StopIteration:
+            self._host = iter(HOST_ADDRESSES)
+            return next(self._host)
+
+    def transact(self, dest, msg_type, register, data=b'', timeout=None):
+        """
+        Send one telegram and wait for the matching response.
+
+        Parameters
+        ----------
+        dest : int
+            Module address.
+        msg_type : int
+            Interbus message type.
+        register : int
+            Register address.
+        data : bytes-like, optional
+            Data bytes to send (max 240).
+        timeout : float, optional
+            Response timeout in seconds, :attr:`timeout` by default.
+
+        Returns
+        -------
+        tuple(int, bytes)
+            (RegisterResultTypes code, response data bytes).
+        """
+        size = 4 + len(data)
+        if size - 4 > MAX_DATA:
+            return 8, b''
+        with self._lock:
+            link = self._link
+            if link is None:
+                return 10, b''
+            source = self._next_host()
+            message = self._message
+            message[0] = dest
+            message[1] = source
+            message[2] = msg_type
+            message[3] = register
+            message[4:size] = data
+            crc = crc16(memoryview(message)[:size])
+            message[size] = crc >> 8
+            message[size + 1] = crc & 0xFF
+            link.timeout = self.timeout if timeout is None else timeout
+            try:
+                link.write(b'\x0d' + stuff(message[:size + 2]) + b'\x0a')
+                while True:
+                    telegram = link.read_until(b'\x0a')
+                    if not telegram.endswith(b'\x0a'):
+                        return 6, b''  # RegResultTimeout
+                    response = decode_telegram(telegram)
+                    if response is None:
+                        return 5, b''  # RegResultCRCErr
+                    if response[0] == source and response[1] == dest:
+                        break
+            except OSError as error:
+                self._error = str(error)
+                return 7, b''  # RegResultComError
+        return _RESPONSE_RESULTS.get(response[2], 2), response[4]
+
+    def scan(self, addresses=SCAN_ADDRESSES, timeout=SCAN_TIMEOUT):
+        """Read the module type register (0x61) of every address."""
+        for address in addresses:
+            result, data = self.transact(address, READ, 0x61,
+                                         timeout=timeout)
+            self.types[address] = data[0] if result == 0 and data else 0
+        return bytes(self.types)
+
+
+_open_ports = {}  # portname > InterbusPort
+_open_ports_lock = threading.Lock()
+
+
+def _transact(port, devId, msg_type, regId, data=b''):
+    """
+    One telegram and its response.
+
+    `port` is an :class:`InterbusPort` or a portname. A closed port is opened
+    for this transaction only (dedicated transaction).
+    """
+    if isinstance(port, InterbusPort):
+        return port.transact(devId, msg_type, regId, data)
+    with _held(port) as port:
+        if port is None:
+            return 14, b''  # RegResultPortOpenError
+        return port.transact(devId, msg_type, regId, data)
+
+
+@contextlib.contextmanager
+def _held(portname):
+    """
+    Yield the port for several transactions, None if it cannot be opened.
+
+    A closed port is opened once for the whole block instead of once per
+    telegram.
+    """
+    port = _open_ports.get(portname)
+    if port is not None:
+        yield port
+        return
+    port = InterbusPort(portname)
+    if not port.open():
+        yield None
+        return
+    try:
+        yield port
+    finally:
+        port.close()
+
+
+def _read(port, devId, regId, index):
+    result, data = _transact(port, devId, READ, regId)
+    if index > 0:
+        data = data[index:]
+    return result, data
+
+
+def _write(port, devId, regId, data, index):
+    if index < 0:
+        return _transact(port, devId, WRITE, regId, data)[0]
+    if not isinstance(port, InterbusPort):  # Read and write on one opening
+        with _held(port) as held:
+            if held is None:
+                return 14  # RegResultPortOpenError
+            return _write(held, devId, regId, data, index)
+    # Interbus has no index, splice into the current content
+    result, current = _transact(port, devId, READ, regId)
+    if result:
+        return result
+    data = current[:index].ljust(index, b'\x00') + bytes(data) \
+        + current[index + len(data):]
+    return _transact(port, devId, WRITE, regId, data)[0]
+
+
+def _write_read(portname, devId, regId, data, index):
+    """Write and read back, with a closed port opened only once."""
+    with _held(portname) as port:
+        if port is None:
+            return 14, b''  # RegResultPortOpenError
+        result = _write(port, devId, regId, data, index)
+        if result:
+            return result, b''
+        return _read(port, devId, regId, index)
+
+
+# *****************************************************************************
+# Port functions
+# *****************************************************************************
+
+def getAllPorts():
+    """Return a comma separated string with all existing serial ports."""
+    try:
+        from serial.tools import list_ports
+        names = [port.device for port in list_ports.comports()]
+    except ImportError:
+        names = []
+    names += [name for name in links if name not in names]
+    names += [name for name in _open_ports if name not in names]
+    return ','.join(names)
+
+
+def getOpenPorts():
+    """Return a comma separated string with all already opened ports."""
+    return ','.join(_open_ports)
+
+
+def openPorts(portnames, autoMode, liveMode):
+    """
+    Open the provided portname(s), or all available ports if empty.
+
+    With `autoMode` the bus is scanned for modules and ports without modules
+    are closed again, like the DLL does. With `liveMode` as well, the
+    modules found are put in live mode (:func:`deviceSetLive`), so the
+    registers created with :func:`registerCreate` are polled by the port
+    monitor, see :meth:`InterbusPort.monitor`.
+
+    Returns
+    -------
+    int
+        :func:`~nkt_tools.NKTP_DLL.PortResultTypes` code.
+    """
+    names = [name for name in (portnames or getAllPorts()).split(',')
+             if name]
+    if not names:
+        return 2  # OPPortNotFound
+    found = False
+    for name in names:
+        with _open_ports_lock:
+            port = _open_ports.get(name) or InterbusPort(name)
+            if not port.open():
+                continue
+            _open_ports[name] = port
+        if autoMode:
+            types = port.scan()
+            if any(types):
+                found = True
+                if liveMode:
+                    for address, type_ in enumerate(types):
+                        if type_:
+                            port.live[address] = 1
+            else:
+                closePorts(name)
+        else:
+            found = True
+    if found:
+        return 0  # OPSuccess
+    return 3 if autoMode else 1  # OPNoDevices / OPFailed
+
+
+def closePorts(portnames):
+    """Close the provided portname(s), or all opened ports if empty."""
+    with _open_ports_lock:
+        names = [name for name in portnames.split(',') if name] \
+            or list(_open_ports)
+        for name in names:
+            port = _open_ports.pop(name, None)
+            if port is not None:
+                port.close()
+    return 0  # OPSuccess
+
+
+def getPortStatus(portname):
+    """Return (PortResultTypes, PortStatusTypes) for the port."""
+    port = _open_ports.get(portname)
+    return 0, 10 if port is not None else 9  # PortReady / PortClosed
+
+
+def getPortErrorMsg(portname):
+    """Return (PortResultTypes, last error message) for the port."""
+    port = _open_ports.get(portname)
+    return 0, port._error if port is not None else ''
+
+
+# *****************************************************************************
+# Dedicated - Register read, write and write/read functions
+# *****************************************************************************
+
+def registerRead(portname, devId, regId, index):
+    """Read a register, returning (RegisterResultTypes, bytes)."""
+    result, data = _read(portname, devId, regId, index)
+    return result, data if result == 0 else b''
+
+
+def registerReadAscii(portname, devId, regId, index):
+    """Read an ascii register, returning (RegisterResultTypes, bytes)."""
+    result, data = _read(portname, devId, regId, index)
+    return result, data.split(b'\x00', 1)[0] if result == 0 else b''
+
+
+def registerWrite(portname, devId, regId, writeData, writeSize, index):
+    """Write `writeSize` bytes of `writeData` to a register."""
+    return _write(portname, devId, regId, bytes(writeData[:writeSize]), index)
+
+
+def registerWriteAscii(portname, devId, regId, strValue, wrEOL, index):
+    """Write an ascii string, NUL terminated if `wrEOL` is set."""
+    data = strValue.encode('ascii') + (b'\x00' if wrEOL else b'')
+    return _write(portname, devId, regId, data, index)
+
+
+def registerWriteRead(portname, devId, regId, writeData, writeSize, index):
+    """Write `writeSize` bytes and read the register back."""
+    return _write_read(portname, devId, regId, bytes(writeData[:writeSize]),
+                       index)
+
+
+def registerWriteReadAscii(portname, devId, regId, strValue, wrEOL, index):
+    """Write an ascii string and read the register back."""
+    data = strValue.encode('ascii') + (b'\x00' if wrEOL else b'')
+    result, data = _write_read(portname, devId, regId, data, index)
+    return result, data.split(b'\x00', 1)[0] if result == 0 else b''
+
+
+def _typed_functions(fmt):
+    """Create the read, write and write/read functions for a struct format."""
+    codec = struct.Struct('<' + fmt)
+    size = codec.size
+    default = codec.unpack(bytes(size))[0]
+
+    def unpack(result, data):
+        if result:
+            return result, default
+        # Short registers are zero extended (little-endian)
+        return result, codec.unpack_from(data[:size].ljust(size, b'\x00'))[0]
+
+    def read(portname, devId, regId, index):
+        return unpack(*_read(portname, devId, regId, index))
+
+    def write(portname, devId, regId, value, index):
+        try:
+            data = codec.pack(value)
+        except struct.error:
+            return 8  # RegResultTypeError
+        return _write(portname, devId, regId, data, index)
+
+    def write_read(portname, devId, regId, writeValue, index):
+        try:
+            data = codec.pack(writeValue)
+        except struct.error:
+            return 8, default  # RegResultTypeError
+        return unpack(*_write_read(portname, devId, regId, data, index))
+
+    return read, write, write_read
+
+
+registerReadU8, registerWriteU8, registerWriteReadU8 = _typed_functions('B')
+registerReadS8, registerWriteS8, registerWriteReadS8 = _typed_functions('b')
+registerReadU16, registerWriteU16, registerWriteReadU16 = \
+    _typed_functions('H')
+registerReadS16, registerWriteS16, registerWriteReadS16 = \
+    _typed_functions('h')
+registerReadU32, registerWriteU32, registerWriteReadU32 = \
+    _typed_functions('I')
+registerReadS32, registerWriteS32, registerWriteReadS32 = \
+    _typed_functions('i')
+registerReadU64, registerWriteU64, registerWriteReadU64 = \
+    _typed_functions('Q')
+registerReadS64, registerWriteS64, registerWriteReadS64 = \
+    _typed_functions('q')
+registerReadF32, registerWriteF32, registerWriteReadF32 = \
+    _typed_functions('f')
+registerReadF64, registerWriteF64, registerWriteReadF64 = \
+    _typed_functions('d')
+
+
+# *****************************************************************************
+# Dedicated - Device functions
+# *****************************************************************************
+
+def _device_read(read, portname, devId, regId, index=-1):
+    result, value = read(portname, devId, regId, index)
+    return _DEVICE_RESULTS.get(result, 2), value
+
+
+def deviceGetType(portname, devId):
+    """Return (DeviceResultTypes, module type) from register 0x61."""
+    return _device_read(registerReadU8, portname, devId, 0x61)
+
+
+def deviceGetPartNumberStr(portname, devId):
+    """Return (DeviceResultTypes, part number) from register 0x8E."""
+    return _device_read(registerReadAscii, portname, devId, 0x8E)
+
+
+def deviceGetPCBVersion(portname, devId):
+    """Return (DeviceResultTypes, PCB version) from register 0x62."""
+    return _device_read(registerReadU8, portname, devId, 0x62)
+
+
+def deviceGetStatusBits(portname, devId):
+    """Return (DeviceResultTypes, status bits) from register 0x66."""
+    return _device_read(registerReadU16, portname, devId, 0x66)
+
+
+def deviceGetErrorCode(portname, devId):
+    """Return (DeviceResultTypes, error code) from register 0x67."""
+    return _device_read(registerReadU8, portname, devId, 0x67)
+
+
+def deviceGetBootloaderVersion(portname, devId):
+    """Return (DeviceResultTypes, bootloader version) from register 0x6D."""
+    return _device_read(registerReadU16, portname, devId, 0x6D)
+
+
+def deviceGetFirmwareVersion(portname, devId):
+    """Return (DeviceResultTypes, firmware version) from register 0x64."""
+    return _device_read(registerReadU16, portname, devId, 0x64)
+
+
+def deviceGetModuleSerialNumberStr(portname, devId):
+    """Return (DeviceResultTypes, serial number) from register 0x65."""
+    return _device_read(registerReadAscii, portname, devId, 0x65)
+
+
+def deviceGetPCBSerialNumberStr(portname, devId):
+    """Return (DeviceResultTypes, PCB serial number) from register 0x6E."""
+    return _device_read(registerReadAscii, portname, devId, 0x6E)
+
+
+def deviceCreate(portname, devId, waitReady):
+    """Probe a single address on an open port and add it to the devicelist."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 4  # DevResultPortNotFound
+    result, device_type = registerReadU8(portname, devId, 0x61, -1)
+    if result:
+        return _DEVICE_RESULTS.get(result, 2)
+    port.types[devId] = device_type
+    return 0
+
+
+def deviceExists(portname, devId):
+    """Return (DeviceResultTypes, exists) for the internal devicelist."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 4, 0
+    return 0, int(port.types[devId] != 0)
+
+
+def deviceRemove(portname, devId):
+    """Remove a device from the internal devicelist."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 4
+    port.types[devId] = 0
+    return 0
+
+
+def deviceRemoveAll(portname):
+    """Remove all devices from the internal devicelist."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 4
+    port.types[:] = bytes(256)
+    return 0
+
+
+def deviceGetAllTypes(portname):
+    """
+    Return the module type found at each address of an open port.
+
+    Returns
+    -------
+    tuple(int, bytes)
+        (DeviceResultTypes, types) where types[address] is the module type
+        or 0 if no module was found at that address.
+    """
+    port = _open_ports.get(portname)
+    if port is None:
+        return 4, b''  # DevResultPortNotFound
+    return 0, bytes(port.types[:255])
+
+
+def deviceGetLive(portname, devId):
+    """Return (DeviceResultTypes, live mode) of a device."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 4, 0
+    return 0, port.live[devId]
+
+
+def deviceSetLive(portname, devId, liveMode):
+    """Switch monitoring of the live registers of a device on or off."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 4
+    port.live[devId] = 1 if liveMode else 0
+    return 0
+
+
+# *****************************************************************************
+# Register functions (live registers)
+# *****************************************************************************
+
+_register_callback = None
+
+
+def registerCreate(portname, devId, regId, priority, dataType):
+    """
+    Add a register to the live registers polled on an open port.
+
+    Returns
+    -------
+    int
+        :func:`~nkt_tools.NKTP_DLL.RegisterResultTypes` code.
+    """
+    port = _open_ports.get(portname)
+    if port is None:
+        return 10  # RegResultPortClosed
+    with port._lock:
+        port.registers[(devId, regId)] = [priority, dataType, None]
+        if port._monitor is None or not port._monitor.is_alive():
+            port._monitor = threading.Thread(
+                target=port.monitor, daemon=True,
+                name='interbus live %s' % portname)
+            port._monitor.start()
+    return 0
+
+
+def registerExists(portname, devId, regId):
+    """Return (RegisterResultTypes, exists) for a live register."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 10, 0
+    return 0, int((devId, regId) in port.registers)
+
+
+def registerRemove(portname, devId, regId):
+    """Remove a live register."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 10
+    with port._lock:
+        port.registers.pop((devId, regId), None)
+    return 0
+
+
+def registerRemoveAll(portname, devId):
+    """Remove all live registers of a device."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 10
+    with port._lock:
+        for key in [key for key in port.registers if key[0] == devId]:
+            del port.registers[key]
+    return 0
+
+
+def registerGetAll(portname, devId):
+    """Return (RegisterResultTypes, live register ids) of a device."""
+    port = _open_ports.get(portname)
+    if port is None:
+        return 10, b''
+    return 0, bytes(regId for device, regId in sorted(port.registers)
+                    if device == devId)
+
+
+def setCallbackPtrRegisterInfo(RegisterStatusCallback):
+    """Set the function called with the changes of live registers."""
+    global _register_callback
+    _register_callback = RegisterStatusCallback
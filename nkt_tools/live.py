@@ -0,0 +1,259 @@
+"""
+Subscriptions to live registers.
+
+Instead of reading a property over and over, subscribe to it::
+
+    laser.subscribe('inlet_temperature', print, priority='high')
+
+The registers behind the property are created as live registers
+(:func:`~nkt_tools.NKTP_DLL.registerCreate`), which the DLL monitors on
+its own and reports through the register callback
+(:func:`~nkt_tools.NKTP_DLL.setCallbackPtrRegisterInfo`). The callback only
+stores the new register content and queues the change, since it must not
+call the DLL. A delivery thread then evaluates the property and calls the
+subscribers. While a register is live, every read of it, by the device
+classes or directly through :mod:`~nkt_tools.NKTP_DLL`, is answered from
+the last reported content without a bus transaction. When the DLL reports
+a register failing instead, e.g. a module lost from the bus, the content
+is dropped and reads go to the bus again, returning the error, until the
+next value is reported.
+"""
+from collections import deque
+import ctypes
+import queue
+import threading
+import time
+import traceback
+
+import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import _hooks
+from nkt_tools.batch import decode
+from nkt_tools.session import pool
+
+
+DATA_TYPES = {'Raw': 1, 'U8': 2, 'S8': 3, 'U16': 4, 'S16': 5, 'U32': 6,
+              'S32': 7, 'F32': 8, 'U64': 9, 'S64': 10, 'F64': 11, 'Ascii': 12}
+"""dict : register data type > RegisterDataTypes code."""
+
+PRIORITIES = {'low': 0, 'high': 1}
+"""dict : priority name > RegisterPriorityTypes code."""
+
+_values = {}  # (portname, devId, regId) > last reported register content
+_updates = queue.SimpleQueue()  # Keys of changed registers
+_subscriptions = {}  # (portname, devId, regId) > list of Subscription
+_lock = threading.RLock()
+_context = threading.local()
+_delivery = None
+
+
+def _register_info(portname, devId, regId, status, regType, length, data):
+    # Called by the DLL, which must not be called back from here
+    key = (portname.decode('ascii'), devId, regId)
+    if status == 0:
+        _values[key] = ctypes.string_at(data, length) if length else b''
+    else:  # Link lost, reads go to the bus again and report the error
+        _values.pop(key, None)
+    _updates.put(key)
+
+
+_callback = nkt.registerStatusCallbackFuncPtr(_register_info)
+
+
+def _data_type(name):
+    """Return the data type read or written by function `name`."""
+    suffix = name.replace('registerWriteRead', '').replace(
+        'registerWrite', '').replace('registerRead', '')
+    return suffix or 'Raw'
+
+
+def _layer(name, function):
+    if name.startswith(('registerWrite', 'registerWriteRead')):
+        def write(portname, devId, regId, *args):
+            # Stale until the next report, read the bus meanwhile
+            _values.pop((portname, devId, regId), None)
+            return function(portname, devId, regId, *args)
+        write.__name__ = name
+        return write
+    if not name.startswith('registerRead'):
+        return function
+    dtype = _data_type(name)
+
+    def read(portname, devId, regId, index):
+        probe = getattr(_context, 'probe', None)
+        if probe is not None:
+            probe.append((portname, devId, regId, dtype))
+        data = _values.get((portname, devId, regId))
+        if data is None:
+            return function(portname, devId, regId, index)
+        if index > 0:
+            data = data[index:]
+        return 0, decode(dtype, data)
+    read.__name__ = name
+    return read
+
+
+def _deliver():
+    while True:
+        key = _updates.get()
+        for subscription in list(_subscriptions.get(key, ())):
+            subscription._update()
+
+
+def _registers(device, name):
+    """Read property `name` once, return its value and the registers read."""
+    _context.probe = []
+    try:
+        value = getattr(device, name)
+        return value, _context.probe
+    finally:
+        _context.probe = None
+
+
+class Subscription:
+    """
+    Live updates of one device property.
+
+    Use :meth:`cancel` (or the subscription as a context manager) to stop.
+    """
+
+    def __init__(self, device, name, callback, registers, value, history):
+        self.device = device
+        self.name = name
+        self.callback = callback
+        self.registers = registers
+        self.latest = value
+        """Last value of the property."""
+        self.history = deque([(time.time(), value)], maxlen=history)
+        """`deque` of (time, value): The last values received."""
+        self._sessions = []
+
+    def _update(self):
+        try:
+            value = getattr(self.device, self.name)
+            self.latest = value
+            self.history.append((time.time(), value))
+            if self.callback is not None:
+                self.callback(value)
+        except Exception:
+            traceback.print_exc()
+
+    def cancel(self):
+        """Stop the updates and remove registers nobody else watches."""
+        with _lock:
+            for key in self.registers:
+                subscribers = _subscriptions.get(key, [])
+                if self in subscribers:
+                    subscribers.remove(self)
+                if not subscribers and _subscriptions.pop(key, None) is not None:
+                    nkt.registerRemove(*key)
+                    _values.pop(key, None)
+                    if not any(other[:2] == key[:2]
+                               for other in _subscriptions):
+                        nkt.deviceSetLive(key[0], key[1], 0)
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+
+    def __repr__(self):
+        return '<Subscription %s.%s = %r>' % (type(self.device).__name__,
+                                              self.name, self.latest)
+
+
+def subscribe(device, name, callback=None, priority='low', history=100):
+    """
+    Follow property `name` of `device` through live registers.
+
+    Parameters
+    ----------
+    device : object
+        Device object, e.g. an Extreme.
+    name : str
+        Property to follow, e.g. 'inlet_temperature'.
+    callback : callable, optional
+        Called as callback(value) on a delivery thread whenever a register
+        of the property changes. Calls back into the device are fine.
+    priority : str or int, optional
+        'low' (default) or 'high' monitoring priority, or the
+        RegisterPriorityTypes code.
+    history : int, optional
+        Number of values kept in :attr:`Subscription.history`. 100 by default.
+
+    Returns
+    -------
+    Subscription
+
+    Raises
+    ------
+    ValueError
+        If the property reads no register.
+    ConnectionError
+        If a live register could not be created.
+    """
+    global _delivery
+    priority = PRIORITIES.get(priority, priority)
+    with _lock:
+        nkt.setCallbackPtrRegisterInfo(_callback)
+        _hooks.install_once(_layer, _hooks.LIVE)
+        if _delivery is None:
+            _delivery = threading.Thread(target=_deliver, daemon=True,
+                                         name='nkt live delivery')
+            _delivery.start()
+
+        value, registers = _registers(device, name)
+        if not registers:
+            raise ValueError('%s.%s reads no register'
+                             % (type(device).__name__, name))
+        keys = list(dict.fromkeys(register[:3] for register in registers))
+        subscription = Subscription(device, name, callback, keys, value,
+                                    history)
+        try:
+            for portname, devId, regId, dtype in registers:
+                if not any(session.portname == portname
+                           for session in subscription._sessions):
+                    subscription._sessions.append(pool.acquire(portname))
+                nkt.deviceCreate(portname, devId, 1)
+                nkt.deviceSetLive(portname, devId, 1)
+                result = nkt.registerCreate(portname, devId, regId, priority,
+                                            DATA_TYPES[dtype])
+                if result:
+                    raise ConnectionError(nkt.RegisterResultTypes(result))
+                _subscriptions.setdefault((portname, devId, regId), [])
+            for key in keys:
+                _subscriptions[key].append(subscription)
+        except Exception:
+            subscription.cancel()
+            raise
+    return subscription
+
+
+class LiveMixin:
+    """Adds :meth:`subscribe` to the device classes."""
+
+    __slots__ = ()
+
+    def subscribe(self, name, callback=None, priority='low', history=100):
+        """
+        Follow a property through live registers, see :func:`subscribe`.
+
+        Parameters
+        ----------
+        name : str
+            Property to follow, e.g. 'inlet_temperature'.
+        callback : callable, optional
+            Called as callback(value) whenever the property changes.
+        priority : str, optional
+            'low' (default) or 'high' monitoring priority.
+        history : int, optional
+            Number of values kept. 100 by default.
+
+        Returns
+        -------
+        Subscription
+        """
+        return subscribe(self, name, callback, priority, history)
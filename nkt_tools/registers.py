@@ -0,0 +1,316 @@
+"""
+Register maps of all module types, compiled from the NKT register files.
+
+The register files in ``manuals/Register Files`` list the readings, controls,
+status bits and error codes of every module type. :func:`parse` turns one of
+these files into a :class:`RegisterMap` of :class:`Register` descriptors,
+with the data type, struct, scale and unit of every register.
+
+Parsing the text files on every start would cost more than the rest of the
+import, so the maps are compiled once into the Python module
+``nkt_tools/_register_maps.py`` which :func:`load` reads. Recompile it after
+changing the register files with::
+
+    python -m nkt_tools.registers "manuals/Register Files"
+
+Example
+-------
+>>> from nkt_tools import registers
+>>> extreme = registers.load(0x60)
+>>> register = extreme['inlet_temperature']
+>>> register.address, register.dtype, register.scale, register.unit
+(17, 'S16', 0.1, '°C')
+>>> extreme.status_bits[0]
+'Emission on'
+"""
+from collections import namedtuple
+import glob
+import os
+import re
+import sys
+
+from nkt_tools.batch import FORMATS
+
+
+TYPES = {'U8': 'U8', 'I8': 'S8', 'H8': 'U8',
+         'U16': 'U16', 'I16': 'S16', 'H16': 'U16',
+         'U32': 'U32', 'I32': 'S32', 'H32': 'U32',
+         'F32': 'F32', 'string': 'Ascii'}
+"""dict : type in the register files > data type of the register functions.
+
+Hex types (H8, H16) are read as unsigned integers."""
+
+SECTIONS = {'Readings': 'readings', 'Controls': 'controls',
+            'Parameters': 'parameters'}
+
+STATUS_REGISTER = 0x66
+ERROR_REGISTER = 0x67
+
+MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      '_register_maps.py')
+"""str : Compiled register maps, written by :func:`compile_files`."""
+
+
+class Register(namedtuple('Register', ['address', 'index', 'name', 'attr',
+                                       'unit', 'dtype', 'scale', 'section'])):
+    """
+    One value of a register map.
+
+    Attributes
+    ----------
+    address : int
+        Register address.
+    index : int
+        Byte position of the value in the register, -1 for the whole
+        register.
+    name : str
+        Name in the register file.
+    attr : str
+        `name` as identifier, unique within the map.
+    unit : str
+        Unit, or the meaning of the values for switches.
+    dtype : str
+        'U8', 'S16', 'F32' etc. or 'Ascii'.
+    scale : float
+        Factor from the register content to `unit`.
+    section : str
+        'readings', 'controls' or 'parameters'.
+    """
+
+    __slots__ = ()
+
+    @property
+    def struct(self):
+        """`struct.Struct` of the value, None for strings."""
+        return FORMATS.get(self.dtype)
+
+    @property
+    def size(self):
+        """Size of the value in bytes, None for strings."""
+        codec = FORMATS.get(self.dtype)
+        return codec.size if codec is not None else None
+
+
+class RegisterMap:
+    """
+    Registers, status bits and error codes of one module type.
+
+    Registers are looked up by attribute name with ``regmap['attr']`` and
+    by address with :meth:`find`.
+    """
+
+    __slots__ = ('type', 'description', 'registers', 'status_bits',
+                 'error_codes', '_by_attr')
+
+    def __init__(self, module_type, description, registers, status_bits,
+                 error_codes):
+        self.type = module_type
+        """int: Module type."""
+        self.description = description
+        """str: Module name in the register file."""
+        self.registers = tuple(registers)
+        """tuple of Register: In the order of the register file."""
+        self.status_bits = dict(status_bits)
+        """dict: bit > meaning of the status register 0x66."""
+        self.error_codes = dict(error_codes)
+        """dict: code > meaning of the error register 0x67."""
+        self._by_attr = {register.attr: register for register in registers}
+
+    def __getitem__(self, attr):
+        return self._by_attr[attr]
+
+    def __contains__(self, attr):
+        return attr in self._by_attr
+
+    def __iter__(self):
+        return iter(self.registers)
+
+    def __len__(self):
+        return len(self.registers)
+
+    def find(self, address, index=-1):
+        """Return the register at `address` and byte `index` or None."""
+        for register in self.registers:
+            if register.address == address and register.index == index:
+                return register
+        return None
+
+    def status(self, word):
+        """Return the meanings of the bits set in status `word`."""
+        return [name for bit, name in sorted(self.status_bits.items())
+                if word >> bit & 1]
+
+    def __repr__(self):
+        return '<RegisterMap 0x%02X %s, %d registers>' % (
+            self.type, self.description, len(self.registers))
+
+
+def identifier(name):
+    """Return register `name` as a lower case Python identifier."""
+    attr = re.sub(r'[^0-9a-z]+', '_', name.lower()).strip('_')
+    if not attr or attr[0].isdigit():
+        attr = 'register_' + attr
+    return attr
+
+
+def _address(text):
+    """Return (address, byte index) of e.g. '11' or 'B0.2'."""
+    address, _, element = text.partition('.')
+    return int(address, 16), int(element) if element else -1
+
+
+def parse(path):
+    """
+    Read one register file.
+
+    Parameters
+    ----------
+    path : str
+        Register file, e.g. 'manuals/Register Files/60.txt'.
+
+    Returns
+    -------
+    RegisterMap
+
+    Raises
+    ------
+    ValueError
+        If the file is not a register file or has an unknown data type.
+    """
+    with open(path, encoding='latin-1') as file:
+        lines = [line.rstrip('\r\n').rstrip('\t ').split('\t')
+                 for line in file]
+    if not lines or lines[0][0] != 'Module type':
+        raise ValueError('%s is not a register file' % path)
+    module_type = int(lines[0][1], 16)
+    description = lines[1][0].strip()
+
+    registers, status_bits, error_codes = [], {}, {}
+    attrs = set()
+    section = None
+    for number, fields in enumerate(lines[2:], 3):
+        head = fields[0].strip()
+        if not head:
+            continue
+        if head == '#':
+            section = None
+        elif section is None:
+            section = SECTIONS.get(head, head)
+        elif section in ('Status bits', 'Error code'):
+            if len(fields) > 1 and fields[1].strip() not in ('', '-'):
+                table = (status_bits if section == 'Status bits'
+                         else error_codes)
+                table[int(head)] = fields[1].strip()
+        else:
+            fields += [''] * (5 - len(fields))
+            name, unit, dtype, scale = (field.strip() for field in fields[1:5])
+            if dtype not in TYPES:
+                raise ValueError('%s, line %d: unknown type %r'
+                                 % (path, number, dtype))
+            address, element = _address(head)
+            codec = FORMATS.get(TYPES[dtype])
+            index = element * codec.size if element >= 0 and codec else element
+            attr = identifier(name)
+            if attr in attrs:
+                attr = '%s_%02x' % (attr, address)
+            attrs.add(attr)
+            registers.append(Register(address, index, name, attr, unit,
+                                      TYPES[dtype], float(scale or 1),
+                                      section))
+    return RegisterMap(module_type, description, registers, status_bits,
+                       error_codes)
+
+
+def parse_directory(directory):
+    """
+    Read all register files of `directory`.
+
+    Returns
+    -------
+    dict
+        module type > :class:`RegisterMap`.
+    """
+    maps = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.txt'))):
+        if re.fullmatch(r'[0-9A-Fa-f]+\.txt', os.path.basename(path)):
+            regmap = parse(path)
+            maps[regmap.type] = regmap
+    return maps
+
+
+def compile_files(directory, output=None):
+    """
+    Compile all register files of `directory` into a Python module.
+
+    Parameters
+    ----------
+    directory : str
+        Folder of the register files.
+    output : str, optional
+        Module written, :data:`MODULE` by default.
+
+    Returns
+    -------
+    dict
+        module type > :class:`RegisterMap`.
+    """
+    maps = parse_directory(directory)
+    lines = ['# -*- coding: utf-8 -*-',
+             '"""Register maps compiled from the register files by',
+             'nkt_tools.registers, do not edit."""',
+             '',
+             '# module type: (description,',
+             '#               ((address, index, name, attr, unit, dtype, '
+             'scale, section), ...),',
+             '#               {status bit: meaning}, {error code: meaning})',
+             'MAPS = {']
+    for module_type, regmap in maps.items():
+        lines.append('    0x%02X: (%r, (' % (module_type, regmap.description))
+        for register in regmap.registers:
+            fields = ', '.join(repr(field) for field in register[1:])
+            lines.append('        (0x%02X, %s),' % (register.address, fields))
+        lines.append('    ), %r, %r),' % (regmap.status_bits,
+                                           regmap.error_codes))
+    lines.append('}')
+    output = output or MODULE
+    with open(output + '.tmp', 'w', encoding='utf-8') as file:
+        file.write('\n'.join(lines) + '\n')
+    os.replace(output + '.tmp', output)
+    _maps.clear()
+    return maps
+
+
+_maps = {}  # module type > RegisterMap, built from the compiled module
+
+
+def load(module_type):
+    """
+    Return the compiled register map of `module_type`.
+
+    Raises
+    ------
+    KeyError
+        If there is no register file of `module_type`.
+    """
+    regmap = _maps.get(module_type)
+    if regmap is None:
+        from nkt_tools._register_maps import MAPS
+        description, registers, status_bits, error_codes = MAPS[module_type]
+        regmap = RegisterMap(module_type, description,
+                             [Register(*register) for register in registers],
+                             status_bits, error_codes)
+        _maps[module_type] = regmap
+    return regmap
+
+
+def module_types():
+    """Return all module types with a compiled register map."""
+    from nkt_tools._register_maps import MAPS
+    return sorted(MAPS)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        sys.exit('usage: python -m nkt_tools.registers <register file folder>')
+    for regmap in compile_files(sys.argv[1]).values():
+        print(regmap)
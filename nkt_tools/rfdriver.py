@@ -1,8 +1,16 @@
 """Python module to control NKT RF Driver."""
 import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import cache
+from nkt_tools.aio import AsyncMixin
+from nkt_tools.batch import FORMATS, NUMPY_TYPES, read_many, write_many
+from nkt_tools.discovery import discover
+from nkt_tools.fields import (RegisterDevice, RegisterField, check_written,
+                              write_register)
+from nkt_tools.live import LiveMixin
+from nkt_tools.session import pool
 
 
-class RFDriver:
+class RFDriver(AsyncMixin, LiveMixin, RegisterDevice):
     status_messages = {
         0: 'Emission',
         1: '-',
@@ -46,9 +54,8 @@ class RFDriver:
     =========  ===================
 
     """
-    
 
-    def __init__(self, portname=None):
+    def __init__(self, portname=None, module_address=None):
         """
         Searches for connected NKT RF driver and defines instrument parameters.
 
@@ -59,6 +66,9 @@ class RFDriver:
         portname : str, optional
             Enter if portname for RF driver is known/multiple lasers are connected.
             If not supplied, system searches for RF driver. None by default.
+        module_address : int, optional
+            Module address of the RF driver on `portname`, e.g. from
+            :func:`nkt_tools.discovery.discover`. None by default.
 
         Raises
         ------
@@ -70,55 +80,45 @@ class RFDriver:
         self._portname = None  # COM port name. Autosearches if not provided.
         self._module_address = None  # 16 for RF driver. Auto searches in init.
         self._device_type = None  # This should update to 0x66 if init is right
+        self._session = None  # Keeps the port open while the object lives
+        self._channels = None  # Channel registers last read or written
+        self._channel_arrays = False  # One read returns all eight channels
 
         if portname:  # Allow user to init specific NKT Laser on portname
             self._portname = portname
+            self._session = pool.acquire(portname)
+            if module_address is not None:  # Known module, e.g. discovered
+                self._module_address = module_address
+                self._device_type = 0x66
 
         else:  # User didn't specify port
-            # Open available ports
-            nkt.openPorts(nkt.getAllPorts(), 1, 1)
-
-            # Get open NKT ports
-            portlist = nkt.getOpenPorts().split(',')
+            # Scan all ports, or check the modules cached by the last scan.
+            # The registry keeps the ports open until the session below.
+            registry = discover()
+            modules = registry.find(type=0x66)
             RF_driver_found = False
 
-            for portName in portlist:
-                if portName == '':
+            # Address for RF driver depends on specific hardware.
+            # Address=16+Rotary switch #(0..9)
+            for module in modules:
+                if not 16 <= module.address <= 25:
                     continue
-                # get binary devList of connected nkt devices
-                comm_result, devList = nkt.deviceGetAllTypes(portName)
-
-                # Address for RF driver depends on specific hardware.
-                # Search possible addresses (16-25) searching for connection.
-                for n in range(9):
-                    trial_address = 16 + n  # Address=16+Rotary switch #(0..9)
-                    try:
-                        device_type = devList[trial_address]
-                    except (IndexError):
-                        print('No RF driver on port: ', portName)
-                        break
-
-                    # Check if device_type matches RF driver (0x68)
-                    if hex(device_type) == '0x66':  # Check for RF driver in hex
-                        if RF_driver_found:  # If RF driver found on other port, error
-                            err_msg = ('''Multiple RF drivers found on computer.
-                            COM port 1 = %s
-                            COM port 2 = %s
-                            Please initialize RF driver class with designated \
-                            portname to avoid conflict'''
-                                       % (self.portname, portName))
-
-                            raise RuntimeError(err_msg)
-
-                        else:  # If first laser found,
-                            RF_driver_found = True
-                            self._portname = portName
-                            self._module_address = trial_address
-                            self._device_type = device_type
-                            break
-
-            # Close all ports
-            closeResult = nkt.closePorts('')
+                if RF_driver_found:  # If RF driver found on other port, error
+                    err_msg = ('''Multiple RF drivers found on computer.
+                    COM port 1 = %s
+                    COM port 2 = %s
+                    Please initialize RF driver class with designated \
+                    portname to avoid conflict'''
+                               % (self.portname, module.port))
+
+                    raise RuntimeError(err_msg)
+
+                RF_driver_found = True
+                self._portname = module.port
+                self._module_address = module.address
+                self._device_type = module.type
+                self._session = pool.acquire(self.portname)
+
             if RF_driver_found:
                 print('NKT RF driver Found:')
                 print('Comport: ', self.portname, 'Device type: ', "0x%0.2X"
@@ -127,6 +127,11 @@ class RFDriver:
             else:
                 print('No RF driver Found')
 
+        if self.module_address is not None:  # Cache static registers
+            cache.set_policies(self.portname, self.module_address,
+                               self.cache_policies)
+            cache.enable()
+
     portname = property(lambda self: self._portname)
     """`str`, read-only: COM port for laser.
     Autofound during init if not given. User can supply when creating object.
@@ -139,73 +144,41 @@ class RFDriver:
     """`int`, read-only: This should update to 104 (0x66) if init is right.
     Assigned and checked during object init."""
 
-    @property
-    def rf_power(self):
-        register_address = 0x30
-        comm_result, reading = nkt.registerReadU8(self.portname, self.module_address, register_address, -1)
-        return reading
-
-    @rf_power.setter
-    def rf_power(self, state):
-        register_address = 0x30
-        nkt.registerWriteU8(self.portname, self.module_address, register_address, state, -1)
-
-    @property
-    def setup_bits(self):
-        register_address = 0x31
-        comm_result, reading = nkt.registerReadU8(self.portname, self.module_address, register_address, -1)
-        return reading
-
-    @setup_bits.setter
-    def setup_bits(self, value):
-        register_address = 0x31
-        nkt.registerWriteU8(self.portname, self.module_address, register_address, value, -1)
-
-    @property
-    def min_wavelength(self):
-        register_address = 0x34
-        comm_result, reading = nkt.registerReadU32(self.portname, self.module_address, register_address, -1)
-        return reading
-
-    @property
-    def max_wavelength(self):
-        register_address = 0x35
-        comm_result, reading = nkt.registerReadU32(self.portname, self.module_address, register_address, -1)
-        return reading
-
-    @property
-    def crystal_temperature(self):
-        register_address = 0x38
-        comm_result, reading = nkt.registerReadS16(self.portname, self.module_address, register_address, -1)
-        return reading / 10.0
-
-    @property
-    def fsk_mode(self):
-        register_address = 0x3B
-        comm_result, reading = nkt.registerReadU8(self.portname, self.module_address, register_address, -1)
-        return reading
-
-    @fsk_mode.setter
-    def fsk_mode(self, mode):
-        register_address = 0x3B
-        nkt.registerWriteU8(self.portname, self.module_address, register_address, mode, -1)
-
-    @property
-    def daughter_board(self):
-        register_address = 0x3C
-        comm_result, reading = nkt.registerReadU8(self.portname, self.module_address, register_address, -1)
-        return reading
-
-    @daughter_board.setter
-    def daughter_board(self, value):
-        register_address = 0x3C
-        nkt.registerWriteU8(self.portname, self.module_address, register_address, value, -1)
-
-    @property
-    def connected_crystal(self):
-        register_address = 0x75
-        comm_result, reading = nkt.registerReadU8(self.portname, self.module_address, register_address, -1)
-        return reading
+    rf_power = RegisterField(0x30, 'U8', doc="""
+        RF power on/off (register 0x30), 0 = off, 1 = on.
+        """)
+
+    setup_bits = RegisterField(0x31, 'U16', doc="""
+        Setup bits (register 0x31).
+        """)
+
+    min_wavelength = RegisterField(0x34, 'U32', readonly=True,
+                                   cache=cache.FOREVER, doc="""
+        Minimum wavelength of the connected crystal in pm (register 0x34).
+        """)
+
+    max_wavelength = RegisterField(0x35, 'U32', readonly=True,
+                                   cache=cache.FOREVER, doc="""
+        Maximum wavelength of the connected crystal in pm (register 0x35).
+        """)
+
+    crystal_temperature = RegisterField(0x38, 'S16', scale=0.1, readonly=True,
+                                        doc="""
+        Crystal temperature in °C with 0.1 °C precision (register 0x38).
+        """)
+
+    fsk_mode = RegisterField(0x3B, 'U8', doc="""
+        FSK mode (register 0x3B).
+        """)
+
+    daughter_board = RegisterField(0x3C, 'U8', doc="""
+        Daughter board enable/disable (register 0x3C).
+        """)
+
+    connected_crystal = RegisterField(0x75, 'U8', readonly=True,
+                                      cache=cache.FOREVER, doc="""
+        Crystal connected to the RF driver (register 0x75).
+        """)
 
     def get_wavelength(self, channel):
         if 0 <= channel < 8:
@@ -214,14 +187,15 @@ class RFDriver:
             return reading
         raise ValueError("Invalid channel index")
 
-    def set_wavelength(self, channel, wavelength):
+    def set_wavelength(self, channel, wavelength, verify=None):
         if not (0 <= channel < 8):
             raise ValueError("Invalid channel index")
         if wavelength > 4000:
             raise ValueError("Wavelength must be in nm")
         register_address = 0x90 + channel
-        setpoint = int(wavelength * 1e3)
-        nkt.registerWriteU32(self.portname, self.module_address, register_address, setpoint, -1)
+        setpoint = round(wavelength * 1e3)
+        self._channels = None
+        write_register(self, register_address, 'U32', setpoint, -1, verify)
 
     def get_amplitude(self, channel):
         if 0 <= channel < 8:
@@ -230,14 +204,15 @@ class RFDriver:
             return reading / 10.0
         raise ValueError("Invalid channel index")
 
-    def set_amplitude(self, channel, amplitude):
+    def set_amplitude(self, channel, amplitude, verify=None):
         if not (0 <= channel < 8):
             raise ValueError("Invalid channel index")
         if not (0 <= amplitude <= 100):
             raise ValueError("Power must be between 0 and 100%")
         register_address = 0xB0 + channel
-        setpoint = int(amplitude * 10)
-        nkt.registerWriteU16(self.portname, self.module_address, register_address, setpoint, -1)
+        setpoint = round(amplitude * 10)
+        self._channels = None
+        write_register(self, register_address, 'U16', setpoint, -1, verify)
 
     def get_modulation(self, channel):
         if 0 <= channel < 8:
@@ -246,42 +221,185 @@ class RFDriver:
             return reading / 10.0
         raise ValueError("Invalid channel index")
 
-    def set_modulation(self, channel, modulation):
+    def set_modulation(self, channel, modulation, verify=None):
         if 0 <= channel < 8:
             register_address = 0xC0 + channel
-            nkt.registerWriteU16(self.portname, self.module_address, register_address, modulation, -1)
+            setpoint = round(modulation * 10)
+            self._channels = None
+            write_register(self, register_address, 'U16', setpoint, -1, verify)
         else:
             raise ValueError("Invalid channel index")
     
+    CHANNELS = 8
+    """int : Number of channels."""
+
+    CHANNEL_REGISTERS = ((0x90, 'U32', 1000), (0xB0, 'U16', 10),
+                         (0xC0, 'U16', 10))
+    """tuple : (register of channel 0, data type, content per unit) of the
+    wavelengths (nm), amplitudes (%) and modulations. The single channel
+    setters scale and round (half to even) the same way."""
+
+    def _read_channel_registers(self):
+        """Return the contents of the three channel arrays, as NumPy arrays."""
+        import numpy as np
+        arrays = self._channel_arrays
+        registers = [base + channel
+                     for base, _, _ in self.CHANNEL_REGISTERS
+                     for channel in range(1 if arrays else self.CHANNELS)]
+        table = read_many(self.portname,
+                          [(self.module_address, register, 'Raw')
+                           for register in registers], columns=True)
+        for result in table['result']:
+            if result:
+                raise ConnectionError(nkt.RegisterResultTypes(result))
+        values = table['value']
+        contents = []
+        supported = True
+        for number, (_, dtype, _) in enumerate(self.CHANNEL_REGISTERS):
+            size = FORMATS[dtype].size
+            if arrays:
+                data = values[number]
+            else:
+                first = values[number * self.CHANNELS]
+                supported = supported and len(first) >= size * self.CHANNELS
+                data = b''.join(value[:size].ljust(size, b'\x00') for value in
+                                values[number * self.CHANNELS:
+                                       (number + 1) * self.CHANNELS])
+            data = data[:size * self.CHANNELS].ljust(size * self.CHANNELS,
+                                                     b'\x00')
+            contents.append(np.frombuffer(data, '<' + NUMPY_TYPES[dtype])
+                            .astype(np.int64))
+        if not arrays and supported:
+            self._channel_arrays = True  # Three reads from now on
+        return contents
+
+    def read_channels(self):
+        """
+        Read wavelength, amplitude and modulation of all channels at once.
+
+        All channel registers are read in one batch
+        (:func:`~nkt_tools.batch.read_many`): 24 reads, or three once the
+        module answered a read of the first register of each array with all
+        eight channels.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+            (wavelengths in nm, amplitudes in %, modulations), one value per
+            channel, as :meth:`write_channels` takes them.
+
+        Raises
+        ------
+        ConnectionError
+            If a register could not be read.
+        """
+        contents = self._read_channel_registers()
+        self._channels = [content.copy() for content in contents]
+        return tuple(content / scale for content, (_, _, scale)
+                     in zip(contents, self.CHANNEL_REGISTERS))
+
+    def write_channels(self, wavelengths=None, amplitudes=None,
+                       modulations=None, verify=None):
+        """
+        Set wavelength, amplitude and modulation of several channels at once.
+
+        Only channels differing from the registers last read or written by
+        this object are written, all in one batch
+        (:func:`~nkt_tools.batch.write_many`). Before the first
+        :meth:`read_channels`, and after a single channel setter, every
+        value given is written.
+
+        Parameters
+        ----------
+        wavelengths, amplitudes, modulations : array_like, optional
+            One value per channel in nm, % and as :meth:`get_modulation`.
+            None leaves all channels, NaN one channel unchanged.
+        verify : bool, optional
+            Read the registers back in the same calls and raise ValueError
+            if one differs. :attr:`verify_writes` by default.
+
+        Returns
+        -------
+        int
+            Number of registers written.
+
+        Raises
+        ------
+        ConnectionError
+            If a write failed.
+        """
+        import numpy as np
+        targets = []
+        for name, values in (('wavelengths', wavelengths),
+                             ('amplitudes', amplitudes),
+                             ('modulations', modulations)):
+            if values is not None:
+                values = np.asarray(values, dtype=float)
+                if values.shape != (self.CHANNELS,):
+                    raise ValueError('%s needs one value per channel'
+                                     % name)
+            targets.append(values)
+        if wavelengths is not None and np.any(targets[0] > 4000):
+            raise ValueError("Wavelength must be in nm")
+        if amplitudes is not None and np.any((targets[1] < 0)
+                                             | (targets[1] > 100)):
+            raise ValueError("Power must be between 0 and 100%")
+
+        known = self._channels
+        items = []
+        positions = []
+        for number, values in enumerate(targets):
+            if values is None:
+                continue
+            base, dtype, scale = self.CHANNEL_REGISTERS[number]
+            contents = np.rint(values * scale)
+            for channel in np.flatnonzero(~np.isnan(contents)):
+                content = int(contents[channel])
+                if known is not None and known[number][channel] == content:
+                    continue
+                items.append((self.module_address, base + channel, dtype,
+                              content))
+                positions.append((number, channel))
+        if not items:
+            return 0
+
+        if verify is None:
+            verify = self.verify_writes
+        self._channels = None  # Unknown until all writes succeeded
+        results = write_many(self.portname, items, verify)
+        for (_, register, dtype, content), result in zip(items, results):
+            code = result[0] if verify else result
+            if code:
+                raise ConnectionError(nkt.RegisterResultTypes(code))
+            if verify:
+                check_written(register, dtype, content, result[1])
+        if known is not None:
+            for (number, channel), item in zip(positions, items):
+                known[number][channel] = item[3]
+            self._channels = known
+        return len(items)
+
     def get_channels(self, return_ch_status=True, verbose=1):
         """
         Read the current channels and print which ones are on and at what settings.
         Adapted from the NKT_laser_control project.
         """
+        wavelengths, amplitudes, _ = self.read_channels()
         channels_status = {'ON': [], 'OFF': []}
-        for channel in range(0, 8):
-            wavelength_address = f"0x9{channel}"
-            wavelength_address = int(wavelength_address, 16)
-
-            amplitude_address = f"0xB{channel}"
-            amplitude_address = int(amplitude_address, 16)
-
-            result1 = nkt.registerReadU32(self.portname, self.module_address, wavelength_address, 0)
-            result2 = nkt.registerReadU16(self.portname, self.module_address, amplitude_address, -1)
-
-            if result2[1] != 0:
-                wavelength_nm = result1[1]/1000
-                amplitude = result2[1]/10
+        for channel in range(self.CHANNELS):
+            if amplitudes[channel] != 0:
+                wavelength_nm = float(wavelengths[channel])
+                amplitude = float(amplitudes[channel])
                 if verbose > 0:
                     print(f'Channel {channel} is ON, wavelength: {wavelength_nm} nm, amplitude: {amplitude} %.')
                 channels_status['ON'].append([channel, wavelength_nm, amplitude])
             else:
                 channels_status['OFF'].append(channel)
         if verbose > 0:
-            print(f'Channels {channels_status['OFF']} are OFF')
+            print(f"Channels {channels_status['OFF']} are OFF")
         if return_ch_status:
             return channels_status
-    
+
     def print_status(self):
         """
         Read system status in bytes, translate to str, print.
@@ -308,13 +426,14 @@ class RFDriver:
         return (bits)
     
     def read_all_properties(self):
-        print("RF Power:", self.rf_power)
-        print("Setup Bits:", self.setup_bits)
-        print("Min Wavelength:", self.min_wavelength)
-        print("Max Wavelength:", self.max_wavelength)
-        print("Crystal Temperature:", self.crystal_temperature)
-        print("Connected Crystal:", self.connected_crystal)
-        print("FSK Mode:", self.fsk_mode)
+        snapshot = self.snapshot()
+        print("RF Power:", snapshot.rf_power)
+        print("Setup Bits:", snapshot.setup_bits)
+        print("Min Wavelength:", snapshot.min_wavelength)
+        print("Max Wavelength:", snapshot.max_wavelength)
+        print("Crystal Temperature:", snapshot.crystal_temperature)
+        print("Connected Crystal:", snapshot.connected_crystal)
+        print("FSK Mode:", snapshot.fsk_mode)
 
 if __name__ == "__main__":
     # rf_driver = RFDriver("COM3", 0x06)
@@ -1,8 +1,14 @@
 """Python module to control NKT Select."""
 import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import cache
+from nkt_tools.aio import AsyncMixin
+from nkt_tools.discovery import discover
+from nkt_tools.fields import RegisterDevice, RegisterField
+from nkt_tools.live import LiveMixin
+from nkt_tools.session import pool
 
 
-class Select:
+class Select(AsyncMixin, LiveMixin, RegisterDevice):
     status_messages = {
         0: '-',
         1: 'Interlock off',
@@ -46,9 +52,8 @@ class Select:
     =========  ===================
 
     """
-    
 
-    def __init__(self, portname=None):
+    def __init__(self, portname=None, module_address=None):
         """
         Searches for connected NKT Select and defines instrument parameters.
 
@@ -59,6 +64,9 @@ class Select:
         portname : str, optional
             Enter if portname for Select is known/multiple lasers are connected.
             If not supplied, system searches for Select. None by default.
+        module_address : int, optional
+            Module address of the Select on `portname`, e.g. from
+            :func:`nkt_tools.discovery.discover`. None by default.
 
         Raises
         ------
@@ -70,55 +78,43 @@ class Select:
         self._portname = None  # COM port name. Autosearches if not provided.
         self._module_address = None  # 16 for Select. Auto searches in init.
         self._device_type = None  # This should update to 0x67 if init is right
+        self._session = None  # Keeps the port open while the object lives
 
         if portname:  # Allow user to init specific NKT Laser on portname
             self._portname = portname
+            self._session = pool.acquire(portname)
+            if module_address is not None:  # Known module, e.g. discovered
+                self._module_address = module_address
+                self._device_type = 0x67
 
         else:  # User didn't specify port
-            # Open available ports
-            nkt.openPorts(nkt.getAllPorts(), 1, 1)
-
-            # Get open NKT ports
-            portlist = nkt.getOpenPorts().split(',')
+            # Scan all ports, or check the modules cached by the last scan.
+            # The registry keeps the ports open until the session below.
+            registry = discover()
+            modules = registry.find(type=0x67)
             Select_found = False
 
-            for portName in portlist:
-                if portName == '':
+            # Address for Select depends on specific hardware.
+            # Address=16+Rotary switch #(0..9)
+            for module in modules:
+                if not 16 <= module.address <= 25:
                     continue
-                # get binary devList of connected nkt devices
-                comm_result, devList = nkt.deviceGetAllTypes(portName)
-
-                # Address for Select depends on specific hardware.
-                # Search possible addresses (16-25) searching for connection.
-                for n in range(9):
-                    trial_address = 16 + n  # Address=16+Rotary switch #(0..9)
-                    try:
-                        device_type = devList[trial_address]
-                    except (IndexError):
-                        print('No Select on port: ', portName)
-                        break
-
-                    # Check if device_type matches Select (0x68)
-                    if hex(device_type) == '0x67':  # Check for Select in hex
-                        if Select_found:  # If Select found on other port, error
-                            err_msg = ('''Multiple Selects found on computer.
-                            COM port 1 = %s
-                            COM port 2 = %s
-                            Please initialize Select class with designated \
-                            portname to avoid conflict'''
-                                       % (self.portname, portName))
-
-                            raise RuntimeError(err_msg)
-
-                        else:  # If first laser found,
-                            Select_found = True
-                            self._portname = portName
-                            self._module_address = trial_address
-                            self._device_type = device_type
-                            break
-
-            # Close all ports
-            closeResult = nkt.closePorts('')
+                if Select_found:  # If Select found on other port, error
+                    err_msg = ('''Multiple Selects found on computer.
+                    COM port 1 = %s
+                    COM port 2 = %s
+                    Please initialize Select class with designated \
+                    portname to avoid conflict'''
+                               % (self.portname, module.port))
+
+                    raise RuntimeError(err_msg)
+
+                Select_found = True
+                self._portname = module.port
+                self._module_address = module.address
+                self._device_type = module.type
+                self._session = pool.acquire(self.portname)
+
             if Select_found:
                 print('NKT Select Found:')
                 print('Comport: ', self.portname, 'Device type: ', "0x%0.2X"
@@ -127,6 +123,11 @@ class Select:
             else:
                 print('No Select Found')
 
+        if self.module_address is not None:  # Cache static registers
+            cache.set_policies(self.portname, self.module_address,
+                               self.cache_policies)
+            cache.enable()
+
     portname = property(lambda self: self._portname)
     """`str`, read-only: COM port for laser.
     Autofound during init if not given. User can supply when creating object.
@@ -139,132 +140,65 @@ class Select:
     """`int`, read-only: This should update to 104 (0x67) if init is right.
     Assigned and checked during object init."""
 
-    # @property
-    # def monitor_1_readout(self):
-    #     """
-    #     Readout from optional optical power monitor no. 1 in tenths of percent (permille, ‰).
-
-    #     Calls registerREad16U on register 0x10. Converts reading from in to
-    #     float. Requires the optional monitor to be attached for this register
-    #     content to be valid.
-
-    #     Returns
-    #     -------
-    #     float
-    #         Output power given in percent with 0.1% precision.
-    #     """
-    #     register_address = 0x10
-    #     comm_result, reading = nkt.registerReadU16(self.portname,
-    #                                                self.module_address,
-    #                                                register_address, -1)
-    #     output_power = reading / 10
-    #     return output_power
-
-    # @property
-    # def monitor_1_gain(self):
-    #     """
-    #     Gain setting for optional optical power monitor no.1. 
-    #     There are eight gain levels, numbered 0..7, with 0 being thet lowest gain level. 
-    #     Each level increase doubles the sensitivity.
-
-    #     Note
-    #     ----
-    #     Monitor gain settings should not be altered when the SuperK light source is 
-    #     running in external feedback mode (Power Lock).
-
-    #     Parameters
-    #     ----------
-    #     value : float
-    #         Gain.
-    #     """
-    #     register_address = 0x32
-    #     comm_result, reading = nkt.registerReadU8(self.portname,
-    #                                                self.module_address,
-    #                                                register_address, -1)
-    #     return reading
-
-
-
-    @property
-    def monitor_1_readout(self):
-        register_address = 0x10
-        comm_result, reading = nkt.registerReadU16(self.portname, self.module_address, register_address, -1)
-        return reading / 10
-    
-    @property
-    def monitor_2_readout(self):
-        register_address = 0x11
-        comm_result, reading = nkt.registerReadU16(self.portname, self.module_address, register_address, -1)
-        return reading / 10
-    
-    @property
-    def monitor_1_gain(self):
-        register_address = 0x32
-        comm_result, reading = nkt.registerReadU8(self.portname, self.module_address, register_address, -1)
-        return reading
-    
-    @monitor_1_gain.setter
-    def monitor_1_gain(self, gain):
-        register_address = 0x32
-        nkt.registerWriteU8(self.portname, self.module_address, register_address, gain, -1)
-    
-    @property
-    def monitor_2_gain(self):
-        register_address = 0x33
-        comm_result, reading = nkt.registerReadU8(self.portname, self.module_address, register_address, -1)
-        return reading
-    
-    @monitor_2_gain.setter
-    def monitor_2_gain(self, gain):
-        register_address = 0x33
-        nkt.registerWriteU8(self.portname, self.module_address, register_address, gain, -1)
-    
-    @property
-    def rf_switch(self):
-        register_address = 0x34
-        comm_result, reading = nkt.registerReadU8(self.portname, self.module_address, register_address, -1)
-        return reading
-    
-    @rf_switch.setter
-    def rf_switch(self, state):
-        register_address = 0x34
-        nkt.registerWriteU8(self.portname, self.module_address, register_address, state, -1)
-    
-    @property
-    def monitor_switch(self):
-        register_address = 0x35
-        comm_result, reading = nkt.registerReadU8(self.portname, self.module_address, register_address, -1)
-        return reading
-    
-    @monitor_switch.setter
-    def monitor_switch(self, state):
-        register_address = 0x35
-        nkt.registerWriteU8(self.portname, self.module_address, register_address, state, -1)
-    
-    @property
-    def crystal_1_min_wavelength(self):
-        register_address = 0x90
-        comm_result, reading = nkt.registerReadU32(self.portname, self.module_address, register_address, -1)
-        return reading / 1e3
-    
-    @property
-    def crystal_1_max_wavelength(self):
-        register_address = 0x91
-        comm_result, reading = nkt.registerReadU32(self.portname, self.module_address, register_address, -1)
-        return reading / 1e3
-    
-    @property
-    def crystal_2_min_wavelength(self):
-        register_address = 0xA0
-        comm_result, reading = nkt.registerReadU32(self.portname, self.module_address, register_address, -1)
-        return reading / 1e3
-    
-    @property
-    def crystal_2_max_wavelength(self):
-        register_address = 0xA1
-        comm_result, reading = nkt.registerReadU32(self.portname, self.module_address, register_address, -1)
-        return reading / 1e3
-    
+    monitor_1_readout = RegisterField(0x10, 'U16', scale=0.1, readonly=True,
+                                      doc="""
+        Readout from optional optical power monitor no. 1 in percent.
+
+        Reads register 0x10, given in tenths of percent (permille, ‰).
+        Requires the optional monitor to be attached.
+        """)
+
+    monitor_2_readout = RegisterField(0x11, 'U16', scale=0.1, readonly=True,
+                                      doc="""
+        Readout from optional optical power monitor no. 2 in percent.
+
+        Reads register 0x11, given in tenths of percent (permille, ‰).
+        """)
+
+    monitor_1_gain = RegisterField(0x32, 'U8', doc="""
+        Gain setting for optional optical power monitor no. 1 (register 0x32).
+
+        There are eight gain levels, numbered 0..7, with 0 being the lowest
+        gain level. Each level increase doubles the sensitivity.
+
+        Note
+        ----
+        Monitor gain settings should not be altered when the SuperK light
+        source is running in external feedback mode (Power Lock).
+        """)
+
+    monitor_2_gain = RegisterField(0x33, 'U8', doc="""
+        Gain setting for optional optical power monitor no. 2 (register 0x33).
+        """)
+
+    rf_switch = RegisterField(0x34, 'U8', doc="""
+        RF switch setting (register 0x34).
+        """)
+
+    monitor_switch = RegisterField(0x35, 'U8', doc="""
+        Monitor switch setting (register 0x35).
+        """)
+
+    crystal_1_min_wavelength = RegisterField(
+        0x90, 'U32', scale=0.001, readonly=True, cache=cache.FOREVER, doc="""
+        Minimum wavelength of crystal 1 in nm (register 0x90).
+        """)
+
+    crystal_1_max_wavelength = RegisterField(
+        0x91, 'U32', scale=0.001, readonly=True, cache=cache.FOREVER, doc="""
+        Maximum wavelength of crystal 1 in nm (register 0x91).
+        """)
+
+    crystal_2_min_wavelength = RegisterField(
+        0xA0, 'U32', scale=0.001, readonly=True, cache=cache.FOREVER, doc="""
+        Minimum wavelength of crystal 2 in nm (register 0xA0).
+        """)
+
+    crystal_2_max_wavelength = RegisterField(
+        0xA1, 'U32', scale=0.001, readonly=True, cache=cache.FOREVER, doc="""
+        Maximum wavelength of crystal 2 in nm (register 0xA1).
+        """)
+
     def print_status(self):
         """
         Read system status in bytes, translate to str, print.
@@ -292,16 +226,17 @@ class Select:
         return (bits)
     
     def read_all_properties(self):
-        print('Monitor 1 Readout =', self.monitor_1_readout)
-        print('Monitor 2 Readout =', self.monitor_2_readout)
-        print('Monitor 1 Gain =', self.monitor_1_gain)
-        print('Monitor 2 Gain =', self.monitor_2_gain)
-        print('RF Switch =', self.rf_switch)
-        print('Monitor Switch =', self.monitor_switch)
-        print('Crystal 1 Min Wavelength =', self.crystal_1_min_wavelength)
-        print('Crystal 1 Max Wavelength =', self.crystal_1_max_wavelength)
-        print('Crystal 2 Min Wavelength =', self.crystal_2_min_wavelength)
-        print('Crystal 2 Max Wavelength =', self.crystal_2_max_wavelength)
+        snapshot = self.snapshot()
+        print('Monitor 1 Readout =', snapshot.monitor_1_readout)
+        print('Monitor 2 Readout =', snapshot.monitor_2_readout)
+        print('Monitor 1 Gain =', snapshot.monitor_1_gain)
+        print('Monitor 2 Gain =', snapshot.monitor_2_gain)
+        print('RF Switch =', snapshot.rf_switch)
+        print('Monitor Switch =', snapshot.monitor_switch)
+        print('Crystal 1 Min Wavelength =', snapshot.crystal_1_min_wavelength)
+        print('Crystal 1 Max Wavelength =', snapshot.crystal_1_max_wavelength)
+        print('Crystal 2 Min Wavelength =', snapshot.crystal_2_min_wavelength)
+        print('Crystal 2 Max Wavelength =', snapshot.crystal_2_max_wavelength)
 
 if __name__ == "__main__":
     # select = Select("COM3", 0x67)
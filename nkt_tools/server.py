@@ -0,0 +1,1028 @@
+"""
+Device server owning the ports, and its client.
+
+A :class:`Server` is the one process talking to the NKT ports. It holds
+the device objects, by default of all modules found by
+:func:`~nkt_tools.discovery.discover`, and serves their properties and
+methods to any number of :class:`Client` processes over a Unix socket (a
+TCP port on systems without one). Scripts then neither repeat the
+discovery nor fight over the DLL::
+
+    $ python -m nkt_tools.server            # Runs until interrupted
+
+    >>> from nkt_tools.server import Client
+    >>> client = Client()
+    >>> laser = client.device('Extreme')
+    >>> laser.inlet_temperature
+    24.5
+    >>> laser.set_power(50)
+    >>> client.batch([('Extreme', 'get', 'power_level'),
+    ...               ('Varia', 'get', 'short_setpoint')])
+    [50.0, 550.0]
+    >>> client.subscribe('Extreme', 'inlet_temperature', print, interval=1)
+
+The calls of one request run as one job of the dispatcher of each port
+involved (see :mod:`nkt_tools.dispatch`), ports in parallel. Identical
+reads arriving while one is in progress, from any client, are coalesced
+into that read, and so are register reads (see
+:mod:`nkt_tools.singleflight`). Subscriptions are polled by the server,
+which pushes a value whenever it changes; clients subscribed to the same
+property share the reads.
+
+Access
+------
+The Unix socket is created in a directory only the user can enter
+(mode 0o700) and is itself only accessible to the user. A TCP server
+instead requires the token in :data:`TOKEN_FILE`, created readable only
+by the user on the first start, as the first message of every
+connection. :class:`Client` reads and sends it. Connections without it
+are closed before any request is served.
+
+Protocol
+--------
+Every message is a JSON object, sent as its UTF-8 length (4 bytes, little
+endian) and the UTF-8 text. Requests carry an 'id', which the reply
+repeats, and an 'op':
+
+* ``{"op": "hello", "token": token}``: first request on TCP, reply
+  ``{}``. A wrong token is answered with a PermissionError and the
+  connection closed.
+* ``{"op": "devices"}``: reply ``{"devices": {name: {"class", "port",
+  "address", "properties", "methods"}}}``.
+* ``{"op": "batch", "calls": [[device, kind, name, args, kwargs], ...],
+  "priority": 10}``: kind is 'get' (read property `name`), 'set' (assign
+  args[0] to it) or 'call' (call method `name`), args and kwargs are
+  optional. Reply ``{"results": [{"value": value} or {"error": type,
+  "message": text}, ...]}``, in order.
+* ``{"op": "subscribe", "device", "name", "interval"}``: reply
+  ``{"subscription": number}``, then unrequested messages ``{"subscription":
+  number, "time": seconds, "value": value}`` with the first value and
+  every change.
+* ``{"op": "unsubscribe", "subscription": number}``: reply ``{}``.
+
+Failed requests are answered ``{"error": type, "message": text}``. Values
+are sent as JSON: tuples and arrays become lists, bytes become strings.
+"""
+from concurrent.futures import Future
+import builtins
+import heapq
+import hmac
+import inspect
+import itertools
+import json
+import os
+import queue
+import secrets
+import socket
+import struct
+import threading
+import time
+import traceback
+
+from nkt_tools import dispatch, singleflight
+
+
+DEFAULT_ADDRESS = os.environ.get(
+    'NKTP_SERVER',
+    os.path.join(os.path.expanduser('~'), '.nkt_tools', 'server.sock')
+    if hasattr(socket, 'AF_UNIX') else '127.0.0.1:48400')
+"""str : Socket path of the server, or host:port on systems without Unix
+sockets. Set NKTP_SERVER to move it."""
+
+TOKEN_FILE = os.environ.get(
+    'NKTP_SERVER_TOKEN',
+    os.path.join(os.path.expanduser('~'), '.nkt_tools', 'server.token'))
+"""str : File of the token TCP clients authenticate with. Set
+NKTP_SERVER_TOKEN to move it."""
+
+COALESCED = ('get_', 'read_')
+"""tuple : Prefixes of the methods coalesced like property reads, as they
+only read."""
+
+PRIORITIES = {'safety': dispatch.SAFETY, 'control': dispatch.CONTROL,
+              'telemetry': dispatch.TELEMETRY}
+"""dict : Priority names accepted in batch requests."""
+
+MAX_MESSAGE = 1 << 24
+"""int : Largest message in bytes accepted, larger ones close the
+connection."""
+
+_length = struct.Struct('<I')
+_UNIX = getattr(socket, 'AF_UNIX', None)
+
+
+def _family(address):
+    """Return the socket family and address of `address`."""
+    if isinstance(address, tuple):
+        return socket.AF_INET, address
+    if not hasattr(socket, 'AF_UNIX') or (
+            ':' in address and not os.path.isabs(address)):
+        host, port = address.rsplit(':', 1)
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, address
+
+
+def _private_directory(path):
+    """Create the directory of `path` only accessible to the user."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    return directory
+
+
+def read_token(path=None, create=False):
+    """
+    Return the token of TCP connections.
+
+    Parameters
+    ----------
+    path : str, optional
+        Token file, :data:`TOKEN_FILE` by default.
+    create : bool, optional
+        Create the file with a new random token, readable only by the
+        user, if it does not exist. False by default.
+
+    Returns
+    -------
+    str
+    """
+    path = path or TOKEN_FILE
+    if create and not os.path.exists(path):
+        _private_directory(path)
+        try:
+            descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                                 0o600)
+        except FileExistsError:
+            pass  # Another server created it meanwhile
+        else:
+            with os.fdopen(descriptor, 'w') as file:
+                file.write(secrets.token_hex(32))
+    with open(path) as file:
+        return file.read().strip()
+
+
+def _encode(value):
+    """JSON fallback for the values of the device APIs."""
+    if hasattr(value, 'tolist'):  # NumPy arrays and scalars
+        return value.tolist()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('ascii', 'replace')
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, 'name') and hasattr(value, 'value'):  # Enums
+        return value.name
+    raise TypeError('%s is not serializable' % type(value).__name__)
+
+
+def _send(connection, lock, message):
+    data = json.dumps(message, default=_encode,
+                      separators=(',', ':')).encode('utf-8')
+    with lock:
+        connection.sendall(_length.pack(len(data)) + data)
+
+
+def _receive(stream):
+    """Return the next message of `stream`, None at its end."""
+    header = stream.read(_length.size)
+    if len(header) < _length.size:
+        return None
+    size, = _length.unpack(header)
+    if size > MAX_MESSAGE:
+        raise ValueError('Message of %d bytes is too large' % size)
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return json.loads(data.decode('utf-8'))
+
+
+def _failure(error):
+    return {'error': type(error).__name__, 'message': str(error)}
+
+
+def _address(device):
+    address = getattr(device, 'module_address', None)
+    if address is None and hasattr(device, 'device'):  # BASIK
+        address = device.device[1]
+    return address
+
+
+def _api(device):
+    """Return the public (properties, methods) of a device class."""
+    properties, methods = [], []
+    for name in dir(type(device)):
+        if name.startswith('_') or name == 'subscribe':
+            continue
+        attr = getattr(type(device), name)
+        if hasattr(type(attr), '__set__'):  # Properties and fields
+            properties.append(name)
+        elif callable(attr) and not (isinstance(attr, type)
+                                     or inspect.iscoroutinefunction(attr)):
+            methods.append(name)
+    return properties, methods
+
+
+def device_names(devices):
+    """
+    Name device objects for the server.
+
+    Devices are named by their class, e.g. 'Extreme', and by class, port
+    and address if a class occurs more than once, e.g. 'Varia@COM4/16'.
+
+    Parameters
+    ----------
+    devices : iterable
+        Device objects.
+
+    Returns
+    -------
+    dict
+        name > device.
+    """
+    devices = list(devices)
+    classes = [type(device).__name__ for device in devices]
+    names = {}
+    for cls, device in zip(classes, devices):
+        if classes.count(cls) == 1:
+            names[cls] = device
+        else:
+            names['%s@%s/%s' % (cls, device.portname,
+                                _address(device))] = device
+    return names
+
+
+class _Subscription:
+    """A property polled for one connection."""
+
+    __slots__ = ('number', 'connection', 'device', 'name', 'interval',
+                 'last', 'due')
+
+    def __init__(self, number, connection, device, name, interval):
+        self.number = number
+        self.connection = connection
+        self.device = device
+        self.name = name
+        self.interval = interval
+        self.last = None
+        self.due = time.monotonic()
+
+    def __lt__(self, other):
+        return self.due < other.due
+
+
+class _Connection:
+    """One client connection and its subscriptions."""
+
+    def __init__(self, sock):
+        self.socket = sock
+        self.lock = threading.Lock()  # Replies and pushes interleave
+        self.subscriptions = {}
+        self.open = True
+
+    def send(self, message):
+        if self.open:
+            try:
+                _send(self.socket, self.lock, message)
+            except OSError:
+                self.open = False
+
+
+class Server:
+    """
+    Serve device objects to :class:`Client` processes.
+
+    Parameters
+    ----------
+    devices : dict or iterable, optional
+        name > device object, or device objects named by
+        :func:`device_names`. All devices found by
+        :func:`~nkt_tools.discovery.discover` by default.
+    address : str or tuple, optional
+        Unix socket path, or (host, port) or 'host:port' for TCP.
+        :data:`DEFAULT_ADDRESS` by default.
+    token : str, optional
+        Token TCP clients must send, read from :data:`TOKEN_FILE` (created
+        if missing) by default.
+
+    Attributes
+    ----------
+    stats : dict
+        'requests', 'calls', 'coalesced' (calls answered by a read already
+        in progress), 'errors' (calls failing) and 'pushed' (subscription
+        values sent).
+    """
+
+    def __init__(self, devices=None, address=None, token=None):
+        self._registry = None  # Holds the ports of discovered devices open
+        if devices is None:
+            from nkt_tools.discovery import discover
+            self._registry = discover()
+            devices = self._registry.devices()
+        if not isinstance(devices, dict):
+            devices = device_names(devices)
+        self.devices = devices
+        self.address = address or DEFAULT_ADDRESS
+        self._token = token
+        self.stats = {'requests': 0, 'calls': 0, 'coalesced': 0,
+                      'errors': 0, 'pushed': 0}
+        self._api = {}
+        for name, device in devices.items():
+            properties, methods = _api(device)
+            self._api[name] = {'class': type(device).__name__,
+                               'port': device.portname,
+                               'address': _address(device),
+                               'properties': properties,
+                               'methods': methods}
+        self._lock = threading.Lock()
+        self._inflight = {}  # Read > Future of its result
+        self._numbers = itertools.count(1)
+        self._schedule = []  # Heap of _Subscription
+        self._scheduled = threading.Condition(self._lock)
+        self._connections = set()
+        self._socket = None
+        self._threads = []
+        self._closing = False
+
+    # Calls
+
+    def _parse(self, call):
+        """Return device, kind, name, args and kwargs of a call."""
+        if not isinstance(call, list) or not 3 <= len(call) <= 5:
+            raise ValueError('A call is [device, kind, name, args, kwargs]')
+        device, kind, name = call[:3]
+        args = call[3] if len(call) > 3 else []
+        kwargs = call[4] if len(call) > 4 else {}
+        api = self._api.get(device)
+        if api is None:
+            raise LookupError('No device %r' % (device,))
+        if kind in ('get', 'set'):
+            if name not in api['properties']:
+                raise AttributeError('%s has no property %r'
+                                     % (api['class'], name))
+            if kind == 'set' and len(args) != 1:
+                raise TypeError('set takes one value')
+        elif kind == 'call':
+            if name not in api['methods']:
+                raise AttributeError('%s has no method %r'
+                                     % (api['class'], name))
+        else:
+            raise ValueError('Unknown kind %r' % (kind,))
+        return self.devices[device], kind, name, args, kwargs
+
+    @staticmethod
+    def _perform(device, kind, name, args, kwargs):
+        if kind == 'get':
+            return getattr(device, name)
+        if kind == 'set':
+            setattr(device, name, args[0])
+            return None
+        return getattr(device, name)(*args, **kwargs)
+
+    def _run(self, group, results):
+        """Run the calls of one port, on its dispatcher thread."""
+        done = 0
+        try:
+            for position, device, kind, name, args, kwargs, key, future \
+                    in group:
+                try:
+                    result = {'value': self._perform(device, kind, name, args,
+                                                     kwargs)}
+                except Exception as error:
+                    result = _failure(error)
+                results[position] = result
+                self._resolve(key, future, result)
+                done += 1
+        finally:  # Interrupted, e.g. KeyboardInterrupt: release the waiters
+            for position, _, _, _, _, _, key, future in group[done:]:
+                result = {'error': 'RuntimeError',
+                          'message': 'Call interrupted'}
+                results[position] = result
+                self._resolve(key, future, result)
+
+    def _resolve(self, key, future, result):
+        """End a coalesced read, answering the calls waiting for it."""
+        if future is None:
+            return
+        with self._lock:
+            if self._inflight.get(key) is future:  # Not dropped by a write
+                del self._inflight[key]
+        future.set_result(result)
+
+    def batch(self, calls, level=dispatch.CONTROL):
+        """
+        Run calls as the server does for a batch request.
+
+        Parameters
+        ----------
+        calls : list
+            [device, kind, name, args, kwargs] per call, see the protocol.
+        level : int, optional
+            Dispatcher priority of the calls.
+
+        Returns
+        -------
+        list of dict
+            {'value': value} or {'error': type, 'message': text} per call.
+        """
+        results = [None] * len(calls)
+        groups = {}  # portname > calls
+        waiting = []  # (position, Future) of coalesced reads
+        coalesced = 0
+        written = set()  # Devices written by earlier calls of the batch
+        for position, call in enumerate(calls):
+            try:
+                device, kind, name, args, kwargs = self._parse(call)
+            except (AttributeError, LookupError, TypeError,
+                    ValueError) as error:
+                results[position] = _failure(error)
+                continue
+            key = future = None
+            reads = kind == 'get' or (kind == 'call'
+                                      and name.startswith(COALESCED))
+            if not reads:
+                written.add(device)
+                with self._lock:  # Reads in flight return the old value
+                    for stale in [stale for stale in self._inflight
+                                  if stale[0] == id(device)]:
+                        del self._inflight[stale]
+            elif device not in written:  # Else it must see the write
+                key = (id(device), kind, name,
+                       json.dumps([args, kwargs], sort_keys=True))
+                with self._lock:
+                    future = self._inflight.get(key)
+                    if future is not None:
+                        waiting.append((position, future))
+                        coalesced += 1
+                        continue
+                    future = self._inflight[key] = Future()
+            groups.setdefault(device.portname, []).append(
+                (position, device, kind, name, args, kwargs, key, future))
+        jobs = [dispatch.dispatcher(portname).submit(level, self._run, group,
+                                                     results)
+                for portname, group in groups.items()]
+        for job in jobs:
+            job.result()
+        for position, future in waiting:
+            results[position] = future.result()
+        with self._lock:
+            self.stats['calls'] += len(calls)
+            self.stats['coalesced'] += coalesced
+            self.stats['errors'] += sum('error' in result
+                                        for result in results)
+        return results
+
+    # Subscriptions
+
+    def _subscribe(self, connection, message):
+        device, _, name, _, _ = self._parse(
+            [message.get('device'), 'get', message.get('name')])
+        interval = float(message.get('interval', 1.0))
+        if interval <= 0:
+            raise ValueError('interval must be positive')
+        subscription = _Subscription(next(self._numbers), connection,
+                                     message['device'], name, interval)
+        with self._scheduled:
+            connection.subscriptions[subscription.number] = subscription
+            heapq.heappush(self._schedule, subscription)
+            self._scheduled.notify()
+        return subscription.number
+
+    def _poll(self):
+        """Read due subscriptions in batches and push their changes."""
+        while True:
+            with self._scheduled:
+                while not self._closing and (
+                        not self._schedule
+                        or self._schedule[0].due > time.monotonic()):
+                    timeout = (self._schedule[0].due - time.monotonic()
+                               if self._schedule else None)
+                    self._scheduled.wait(timeout)
+                if self._closing:
+                    return
+                now = time.monotonic()
+                due = []
+                while self._schedule and self._schedule[0].due <= now:
+                    due.append(heapq.heappop(self._schedule))
+            due = [subscription for subscription in due
+                   if subscription.number
+                   in subscription.connection.subscriptions]
+            if not due:
+                continue
+            results = self.batch([[subscription.device, 'get',
+                                   subscription.name]
+                                  for subscription in due],
+                                 dispatch.TELEMETRY)
+            now = time.monotonic()
+            with self._scheduled:
+                for subscription, result in zip(due, results):
+                    subscription.due = max(subscription.due
+                                           + subscription.interval, now)
+                    heapq.heappush(self._schedule, subscription)
+            for subscription, result in zip(due, results):
+                if result != subscription.last:
+                    subscription.last = result
+                    subscription.connection.send(dict(
+                        result, subscription=subscription.number,
+                        time=time.time()))
+                    with self._lock:
+                        self.stats['pushed'] += 1
+
+    # Connections
+
+    def _handle(self, connection, message):
+        op = message.get('op')
+        if op == 'hello':  # Nothing to check on a Unix socket
+            return {}
+        if op == 'batch':
+            level = message.get('priority', dispatch.CONTROL)
+            level = PRIORITIES.get(level, level)
+            if not isinstance(level, int):
+                raise ValueError('Unknown priority %r' % (level,))
+            return {'results': self.batch(message.get('calls', []), level)}
+        if op == 'devices':
+            return {'devices': self._api}
+        if op == 'subscribe':
+            return {'subscription': self._subscribe(connection, message)}
+        if op == 'unsubscribe':
+            with self._lock:
+                connection.subscriptions.pop(message.get('subscription'),
+                                             None)
+            return {}
+        raise ValueError('Unknown op %r' % (op,))
+
+    def _authenticate(self, connection, stream):
+        """Return True if the connection opens with the token."""
+        message = _receive(stream)
+        if message is None:
+            return False
+        token = message.get('token')
+        if (message.get('op') == 'hello' and isinstance(token, str)
+                and hmac.compare_digest(token.encode('utf-8'),
+                                        self._token.encode('utf-8'))):
+            connection.send({'id': message.get('id')})
+            return True
+        connection.send({'id': message.get('id'), 'error': 'PermissionError',
+                         'message': 'Invalid token'})
+        return False
+
+    def _serve(self, connection):
+        stream = connection.socket.makefile('rb')
+        try:
+            if (connection.socket.family != _UNIX
+                    and not self._authenticate(connection, stream)):
+                return
+            while True:
+                message = _receive(stream)
+                if message is None:
+                    break
+                with self._lock:
+                    self.stats['requests'] += 1
+                try:
+                    reply = self._handle(connection, message)
+                except (AttributeError, LookupError, TypeError,
+                        ValueError) as error:
+                    reply = _failure(error)
+                reply['id'] = message.get('id')
+                connection.send(reply)
+        except (OSError, ValueError):
+            pass  # Client gone or garbled
+        finally:
+            connection.open = False
+            with self._lock:
+                connection.subscriptions.clear()
+                self._connections.discard(connection)
+            stream.close()
+            connection.socket.close()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._socket.accept()
+            except OSError:
+                return  # Closed
+            connection = _Connection(sock)
+            with self._lock:
+                self._connections.add(connection)
+            threading.Thread(target=self._serve, args=(connection,),
+                             daemon=True, name='nkt server connection').start()
+
+    def start(self):
+        """
+        Listen on the address and serve in background threads.
+
+        Returns
+        -------
+        Server
+            self.
+        """
+        family, address = _family(self.address)
+        if family != _UNIX and self._token is None:
+            self._token = read_token(create=True)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        if family == _UNIX:
+            _private_directory(address)
+            if os.path.exists(address):
+                try:  # Left behind by a server that did not stop
+                    probe = socket.socket(socket.AF_UNIX)
+                    probe.connect(address)
+                    probe.close()
+                    raise OSError('A server is already listening on %s'
+                                  % address)
+                except ConnectionRefusedError:
+                    os.unlink(address)
+        else:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if family == _UNIX:
+            # Only this user controls the lasers, from the bind on
+            umask = os.umask(0o177)
+            try:
+                sock.bind(address)
+            finally:
+                os.umask(umask)
+        else:
+            sock.bind(address)
+        sock.listen()
+        self._socket = sock
+        self._closing = False
+        dispatch.enable()
+        singleflight.enable()  # Reads of different properties share too
+        self._threads = [
+            threading.Thread(target=self._accept, daemon=True,
+                             name='nkt server accept'),
+            threading.Thread(target=self._poll, daemon=True,
+                             name='nkt server subscriptions')]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def serve_forever(self):
+        """Start, and serve until interrupted."""
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop serving and disconnect all clients."""
+        with self._scheduled:
+            self._closing = True
+            self._scheduled.notify()
+        if self._socket is not None:
+            family = self._socket.family
+            try:  # Wakes the accept thread, closing alone does not
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+            if family == _UNIX:
+                try:
+                    os.unlink(_family(self.address)[1])
+                except OSError:
+                    pass
+        with self._lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<Server %s, %d devices>' % (self.address, len(self.devices))
+
+
+class RemoteError(Exception):
+    """Error raised by the server, of a type without builtin counterpart."""
+
+    def __init__(self, error, message):
+        super().__init__('%s: %s' % (error, message))
+        self.error = error
+
+
+def _raise(result):
+    """Raise the error of a failed result, as builtin type if possible."""
+    cls = getattr(builtins, result['error'], None)
+    if isinstance(cls, type) and issubclass(cls, Exception):
+        raise cls(result['message'])
+    raise RemoteError(result['error'], result['message'])
+
+
+class RemoteDevice:
+    """
+    A device of the server, used like the device object itself.
+
+    Reading or assigning a property and calling a method each make one
+    request.
+    """
+
+    def __init__(self, client, name, api):
+        object.__setattr__(self, '_client', client)
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_api', api)
+
+    def __getattr__(self, name):
+        if name in self._api['properties']:
+            return self._client.get(self._name, name)
+        if name in self._api['methods']:
+            def method(*args, **kwargs):
+                return self._client.call(self._name, name, *args, **kwargs)
+            method.__name__ = name
+            return method
+        raise AttributeError("'%s' has no attribute '%s'"
+                             % (self._api['class'], name))
+
+    def __setattr__(self, name, value):
+        if name not in self._api['properties']:
+            raise AttributeError("'%s' has no property '%s'"
+                                 % (self._api['class'], name))
+        self._client.set(self._name, name, value)
+
+    def __dir__(self):
+        return self._api['properties'] + self._api['methods']
+
+    def __repr__(self):
+        return '<RemoteDevice %s: %s on %s>' % (self._name, self._api['class'],
+                                                self._api['port'])
+
+
+class ClientSubscription:
+    """Values of a property pushed by the server, see :meth:`cancel`."""
+
+    def __init__(self, client, number, callback):
+        self.client = client
+        self.number = number
+        self.callback = callback
+        self.latest = None
+        """Last value received."""
+
+    def cancel(self):
+        """Stop the updates."""
+        self.client._request({'op': 'unsubscribe',
+                              'subscription': self.number})
+        self.client._subscriptions.pop(self.number, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+
+
+class Client:
+    """
+    Connection to a :class:`Server`.
+
+    Parameters
+    ----------
+    address : str or tuple, optional
+        Address of the server, :data:`DEFAULT_ADDRESS` by default.
+    timeout : float, optional
+        Seconds to wait for a reply before raising TimeoutError. 30 by
+        default.
+    token : str, optional
+        Token of a TCP server, read from :data:`TOKEN_FILE` by default.
+
+    Raises
+    ------
+    ConnectionError
+        If no server listens on the address.
+    PermissionError
+        If a TCP server rejects the token.
+    """
+
+    def __init__(self, address=None, timeout=30.0, token=None):
+        family, address = _family(address or DEFAULT_ADDRESS)
+        self._socket = socket.socket(family, socket.SOCK_STREAM)
+        try:
+            self._socket.connect(address)
+        except (FileNotFoundError, ConnectionRefusedError) as error:
+            self._socket.close()
+            raise ConnectionError('No server on %s: %s' % (address, error))
+        self.timeout = timeout
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = {}  # id > Future
+        self._subscriptions = {}  # number > ClientSubscription
+        self._events = queue.SimpleQueue()
+        self._devices = None
+        threading.Thread(target=self._receive, daemon=True,
+                         name='nkt client receive').start()
+        threading.Thread(target=self._deliver, daemon=True,
+                         name='nkt client delivery').start()
+        if family != _UNIX:
+            try:
+                self._request({'op': 'hello',
+                               'token': token or read_token()})
+            except BaseException:
+                self.close()
+                raise
+
+    def _receive(self):
+        stream = self._socket.makefile('rb')
+        try:
+            while True:
+                message = _receive(stream)
+                if message is None:
+                    break
+                if 'subscription' in message and 'id' not in message:
+                    self._events.put(message)
+                    continue
+                future = self._pending.pop(message.get('id'), None)
+                if future is not None:
+                    future.set_result(message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            for future in list(self._pending.values()):
+                future.set_exception(ConnectionError('Server disconnected'))
+            self._pending.clear()
+            self._events.put(None)
+
+    def _deliver(self):
+        # Callbacks run here, so they may call the client themselves
+        while True:
+            message = self._events.get()
+            if message is None:
+                return
+            subscription = self._subscriptions.get(message['subscription'])
+            if subscription is None:
+                continue
+            if 'error' in message:
+                continue  # The read failed, the next success is pushed
+            subscription.latest = message['value']
+            if subscription.callback is not None:
+                try:
+                    subscription.callback(message['value'])
+                except Exception:
+                    traceback.print_exc()
+
+    def _request(self, message):
+        """Send a request and return the reply."""
+        message['id'] = number = next(self._ids)
+        future = Future()
+        self._pending[number] = future
+        try:
+            _send(self._socket, self._send_lock, message)
+            reply = future.result(self.timeout)
+        finally:
+            self._pending.pop(number, None)
+        if 'error' in reply:
+            _raise(reply)
+        return reply
+
+    def devices(self):
+        """
+        Return the devices of the server.
+
+        Returns
+        -------
+        dict
+            name > {'class', 'port', 'address', 'properties', 'methods'}.
+        """
+        if self._devices is None:
+            self._devices = self._request({'op': 'devices'})['devices']
+        return self._devices
+
+    def device(self, name):
+        """Return a :class:`RemoteDevice` of the server device `name`."""
+        api = self.devices().get(name)
+        if api is None:
+            raise LookupError('No device %r, the server has %s'
+                              % (name, ', '.join(self.devices())))
+        return RemoteDevice(self, name, api)
+
+    def batch(self, calls, priority=None):
+        """
+        Run several calls in one request.
+
+        Parameters
+        ----------
+        calls : iterable of tuple
+            (device, kind, name), (device, kind, name, args) or (device,
+            kind, name, args, kwargs), kind being 'get', 'set' or 'call'.
+        priority : str or int, optional
+            'safety', 'control' (default) or 'telemetry', or a dispatcher
+            priority.
+
+        Returns
+        -------
+        list
+            The value of every call, or a RemoteError for calls that
+            failed.
+        """
+        message = {'op': 'batch', 'calls': [list(call) for call in calls]}
+        if priority is not None:
+            message['priority'] = priority
+        values = []
+        for result in self._request(message)['results']:
+            if 'error' in result:
+                values.append(RemoteError(result['error'], result['message']))
+            else:
+                values.append(result['value'])
+        return values
+
+    def _single(self, call):
+        message = {'op': 'batch', 'calls': [call]}
+        result = self._request(message)['results'][0]
+        if 'error' in result:
+            _raise(result)
+        return result['value']
+
+    def get(self, device, name):
+        """Return property `name` of `device`."""
+        return self._single([device, 'get', name])
+
+    def set(self, device, name, value):
+        """Assign property `name` of `device`."""
+        self._single([device, 'set', name, [value]])
+
+    def call(self, device, name, *args, **kwargs):
+        """Call method `name` of `device` and return its result."""
+        return self._single([device, 'call', name, list(args), kwargs])
+
+    def subscribe(self, device, name, callback=None, interval=1.0):
+        """
+        Receive property `name` of `device` whenever it changes.
+
+        Parameters
+        ----------
+        device : str
+            Device name.
+        name : str
+            Property, e.g. 'inlet_temperature'.
+        callback : callable, optional
+            Called as callback(value) on a delivery thread with the first
+            value and every change.
+        interval : float, optional
+            Seconds between the reads of the server. 1 by default.
+
+        Returns
+        -------
+        ClientSubscription
+        """
+        reply = self._request({'op': 'subscribe', 'device': device,
+                               'name': name, 'interval': interval})
+        subscription = ClientSubscription(self, reply['subscription'],
+                                          callback)
+        self._subscriptions[subscription.number] = subscription
+        return subscription
+
+    def close(self):
+        """Disconnect from the server."""
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m nkt_tools.server',
+        description='Serve the NKT devices to client processes.')
+    parser.add_argument('--address', default=DEFAULT_ADDRESS,
+                        help='socket path or host:port (%(default)s)')
+    parser.add_argument('--ports', help='comma separated ports to scan')
+    parser.add_argument('--simulate', action='store_true',
+                        help='serve simulated modules on port SIM1 instead, '
+                        'needs NKTP_BACKEND=interbus')
+    args = parser.parse_args(argv)
+    from nkt_tools.discovery import Registry, discover, scan_port
+    if args.simulate:
+        from nkt_tools import simulator
+        simulator.simulate('SIM1', simulator.SimulatedExtreme(),
+                           simulator.SimulatedVaria(),
+                           simulator.SimulatedSelect(),
+                           simulator.SimulatedRFDriver(),
+                           simulator.SimulatedBASIK())
+        registry = Registry(scan_port('SIM1'))  # Not in the discovery cache
+    else:
+        registry = discover(args.ports)
+    server = Server(registry.devices(), args.address)
+    server._registry = registry
+    print('Serving %s on %s' % (', '.join(server.devices), server.address))
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Reference counted port sessions shared by all device objects.
+
+Register functions of the DLL can be called on a closed port, but then the
+DLL opens and closes the port for every single call, which dominates the
+latency of a read. Device objects therefore hold a :class:`PortSession` for
+their port. The first session on a port opens it, the last one released
+closes it again, so dropping one device never tears down the port of its
+siblings on the same bus.
+
+Example
+-------
+>>> import nkt_tools.NKTP_DLL as nkt
+>>> from nkt_tools.session import pool
+>>> with pool.acquire('COM4') as session:
+...     nkt.registerReadU16(session.portname, 15, 0x37, -1)
+"""
+import threading
+import weakref
+
+import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import cache
+
+
+def _split_ports(portnames):
+    """Split a comma separated port list, dropping empty names."""
+    return [name for name in portnames.split(',') if name]
+
+
+class PortSession:
+    """
+    Handle keeping one port open.
+
+    Call :meth:`release` (or use the session as a context manager) when done.
+    A session which is garbage collected is released automatically, so a
+    device object only has to keep a reference to its session.
+    """
+
+    def __init__(self, pool, portname):
+        self._portname = portname
+        self._finalizer = weakref.finalize(self, pool._release, portname)
+
+    portname = property(lambda self: self._portname)
+    """`str`, read-only: Name of the port held open by this session."""
+
+    @property
+    def released(self):
+        """`bool`, read-only: True once the session has been released."""
+        return not self._finalizer.alive
+
+    def release(self):
+        """
+        Release the session, closing the port if it was the last one.
+
+        Returns
+        -------
+        int
+            PortResultTypes of closing the port, 0 if it stays open.
+            Releasing twice is a no-op.
+        """
+        result = self._finalizer()
+        return result or 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def __repr__(self):
+        state = 'released' if self.released else 'open'
+        return '<PortSession %s (%s)>' % (self.portname, state)
+
+
+class PortPool:
+    """Open ports with the number of sessions holding each of them."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refs = {}  # portname > number of live sessions
+
+    def acquire(self, portname):
+        """
+        Open `portname` if necessary and return a session holding it open.
+
+        Ports already opened by a bus scan are reused as they are.
+
+        Parameters
+        ----------
+        portname : str
+            Name of the port, e.g. 'COM4'.
+
+        Returns
+        -------
+        PortSession
+            Session to keep alive for as long as the port is needed.
+
+        Raises
+        ------
+        ConnectionError
+            If the port could not be opened.
+        """
+        with self._lock:
+            if not self._refs.get(portname):
+                if portname not in _split_ports(nkt.getOpenPorts()):
+                    result = nkt.openPorts(portname, 0, 0)
+                    if result:
+                        raise ConnectionError(nkt.PortResultTypes(result))
+                self._refs[portname] = 0
+            self._refs[portname] += 1
+            return PortSession(self, portname)
+
+    def _release(self, portname):
+        with self._lock:
+            self._refs[portname] -= 1
+            if self._refs[portname]:
+                return 0
+            del self._refs[portname]
+            cache.invalidate(portname)  # Modules may change while closed
+            return nkt.closePorts(portname)
+
+    def refcount(self, portname):
+        """Return the number of live sessions on `portname`."""
+        return self._refs.get(portname, 0)
+
+    def close_idle(self):
+        """
+        Close every open port without a live session.
+
+        Used after a bus scan, which opens all ports, to close the ones no
+        device ended up using.
+        """
+        with self._lock:
+            idle = [name for name in _split_ports(nkt.getOpenPorts())
+                    if name not in self._refs]
+            if idle:
+                for name in idle:
+                    cache.invalidate(name)
+                nkt.closePorts(','.join(idle))
+        return idle
+
+
+pool = PortPool()
+"""PortPool: Sessions shared by all device classes of this process."""
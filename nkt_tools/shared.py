@@ -0,0 +1,291 @@
+"""
+Publish the latest register values to other processes in shared memory.
+
+One owner process polls the registers with a :class:`Publisher` and writes
+every sample into a :mod:`multiprocessing.shared_memory` segment. Any
+number of processes then read the latest sample with a :class:`Reader`
+in microseconds, without opening the port (which would fail with
+ApplicationBusy) or scanning the bus::
+
+    # Owner process
+    >>> from nkt_tools import shared, telemetry
+    >>> columns = telemetry.fields(laser, 'inlet_temperature', 'power_level',
+    ...                            ('status_bits', 0x66, 'U16'))
+    >>> publisher = shared.Publisher(columns, rate=10).start()
+
+    # Analysis processes
+    >>> reader = shared.Reader('nkt_COM4')
+    >>> reader.snapshot()
+    {'time': 51229120443870, 'count': 812, 'failed': 0,
+     'inlet_temperature': 24.5, 'power_level': 50.0, 'status_bits': 0}
+
+Segment layout
+--------------
+:data:`HEADER` (magic, sequence number, size of the layout and of a
+sample), the layout as JSON (port, rate and the columns), then one sample:
+:data:`SAMPLE` (monotonic time in ns, sample count, 'failed' bits) and the
+raw register contents of the columns, little-endian and packed.
+
+The sample is guarded by a seqlock: the publisher makes the sequence number
+odd, copies the sample in and makes it even again. A reader copies the
+sample out and retries if the number was odd or changed meanwhile, so it
+never sees a half written sample and never blocks the publisher. This
+relies on the stores becoming visible in program order, as they do on x86.
+"""
+import json
+from multiprocessing import shared_memory
+import struct
+import sys
+import threading
+import time
+
+from nkt_tools.batch import FORMATS, _raw_reader
+from nkt_tools.telemetry import Column, Poller, _read_row
+
+
+MAGIC = b'NKTSHM\x01\x00'
+"""bytes : Start of a segment, the 7th byte is the format version."""
+
+HEADER = struct.Struct('<8sQII')
+"""struct : Magic, sequence number, layout size, sample size."""
+
+SAMPLE = struct.Struct('<qQQ')
+"""struct : Monotonic time in ns, sample count and 'failed' bits, at the
+start of a sample."""
+
+_SEQUENCE = 8  # Offset of the sequence number
+_sequence = struct.Struct('<Q')
+_attach_lock = threading.Lock()
+
+
+def segment_name(portname):
+    """Return the default segment name of `portname`, e.g. 'nkt_COM4'."""
+    return 'nkt_' + ''.join(char if char.isalnum() else '_'
+                            for char in portname)
+
+
+def _attach(name):
+    """Open segment `name` without removing it when this process exits."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    # Before 3.13 every process attaching registers the segment with its
+    # resource tracker, which unlinks it at exit (or, shared with a forked
+    # owner, forgets the owner's registration if unregistered)
+    from multiprocessing import resource_tracker
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+class Publisher(Poller):
+    """
+    Poll registers of one port and publish every sample in shared memory.
+
+    Parameters
+    ----------
+    columns : iterable of Column
+        Registers to publish, all on the same port, see
+        :func:`~nkt_tools.telemetry.fields`. Numeric data types only.
+    rate : float, optional
+        Samples per second. 10 by default.
+    name : str, optional
+        Segment name, :func:`segment_name` of the port by default.
+        :meth:`start` raises FileExistsError if another publisher uses it.
+
+    Attributes
+    ----------
+    published : int
+        Samples published since :meth:`start`.
+    missed : int
+        Samples skipped since polling fell behind the rate.
+    """
+
+    def __init__(self, columns, rate=10.0, name=None):
+        super().__init__(columns, rate)
+        self.name = name or segment_name(self.portname)
+        self.published = 0
+        self.segment = None
+        layout = {'portname': self.portname, 'rate': rate,
+                  'columns': [column._asdict() for column in self.columns]}
+        self._layout = json.dumps(layout).encode('utf-8')
+        self._offsets = []
+        offset = SAMPLE.size
+        for column in self.columns:
+            self._offsets.append(offset)
+            offset += FORMATS[column.dtype].size
+        self._sample_size = offset
+        self._start = -(-(HEADER.size + len(self._layout)) // 8) * 8
+
+    def _open(self):
+        self.published = 0
+        segment = shared_memory.SharedMemory(
+            self.name, create=True, size=self._start + self._sample_size)
+        HEADER.pack_into(segment.buf, 0, MAGIC, 0, len(self._layout),
+                         self._sample_size)
+        segment.buf[HEADER.size:HEADER.size + len(self._layout)] = \
+            self._layout
+        self.segment = segment
+        return []
+
+    def _sampler(self):
+        """Return sample(), reading and publishing one sample."""
+        read = _raw_reader(self.portname)
+        staged = bytearray(self._sample_size)
+        view = memoryview(staged)
+        plan = self._plan([view[offset:] for offset in self._offsets])
+        clock = time.monotonic_ns
+        buffer = self.segment.buf
+        start, stop = self._start, self._start + self._sample_size
+        pack_sample, pack_sequence = SAMPLE.pack_into, _sequence.pack_into
+        sequence = [0]
+
+        def sample():
+            now = clock()
+            failed = _read_row(read, plan, 0)
+            self.published += 1
+            pack_sample(view, 0, now, self.published, failed)
+            pack_sequence(buffer, _SEQUENCE, sequence[0] + 1)  # Writing
+            buffer[start:stop] = view
+            sequence[0] += 2
+            pack_sequence(buffer, _SEQUENCE, sequence[0])
+        self._queued(sample)()  # Readers find one once start() returned
+        return sample
+
+    def _close(self):
+        segment, self.segment = self.segment, None
+        segment.close()
+        segment.unlink()
+
+    def __repr__(self):
+        return '<Publisher %s, %d columns at %g Hz, %d samples>' % (
+            self.name, len(self.columns), self.rate, self.published)
+
+
+class Reader:
+    """
+    Read the latest sample of a :class:`Publisher`, from any process.
+
+    Parameters
+    ----------
+    name : str
+        Segment name, e.g. ``segment_name('COM4')``.
+    timeout : float, optional
+        Seconds :meth:`snapshot` retries while the publisher is writing
+        before it raises TimeoutError. 1 by default.
+
+    Attributes
+    ----------
+    retries : int
+        Snapshots retried since the publisher was writing.
+
+    Raises
+    ------
+    FileNotFoundError
+        If no publisher created the segment.
+    ValueError
+        If the segment is not a publisher's.
+    """
+
+    def __init__(self, name, timeout=1.0):
+        self.name = name
+        self.timeout = timeout
+        self.retries = 0
+        self.segment = _attach(name)
+        buffer = self.segment.buf
+        magic, _, layout_size, sample_size = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            self.segment.close()
+            raise ValueError('%s is not an nkt_tools segment' % name)
+        layout = json.loads(bytes(
+            buffer[HEADER.size:HEADER.size + layout_size]).decode('utf-8'))
+        self.portname = layout['portname']
+        self.rate = layout['rate']
+        self.columns = [Column(**column) for column in layout['columns']]
+        self._struct = struct.Struct(
+            SAMPLE.format + ''.join(FORMATS[column.dtype].format[1:]
+                                    for column in self.columns))
+        if self._struct.size != sample_size:
+            self.segment.close()
+            raise ValueError('%s has an unexpected sample size' % name)
+        self._start = -(-(HEADER.size + layout_size) // 8) * 8
+        self._names = ['time', 'count', 'failed'] + [
+            column.name for column in self.columns]
+        self._scales = [(index + 3, column.scale)
+                        for index, column in enumerate(self.columns)
+                        if column.scale != 1]
+
+    def read(self):
+        """
+        Return the latest sample as raw values.
+
+        Returns
+        -------
+        tuple
+            time (monotonic ns), count, failed bits and the register content
+            of every column.
+        """
+        buffer = self.segment.buf
+        unpack_sequence = _sequence.unpack_from
+        unpack = self._struct.unpack_from
+        start = self._start
+        deadline = None
+        while True:
+            before = unpack_sequence(buffer, _SEQUENCE)[0]
+            if not before & 1:
+                values = unpack(buffer, start)
+                if unpack_sequence(buffer, _SEQUENCE)[0] == before:
+                    return values
+            self.retries += 1
+            if deadline is None:
+                deadline = time.monotonic() + self.timeout
+            elif time.monotonic() > deadline:
+                raise TimeoutError('%s is not released by its publisher'
+                                   % self.name)
+            time.sleep(0)  # Let the publisher finish
+
+    def snapshot(self, scaled=True):
+        """
+        Return the latest sample.
+
+        Parameters
+        ----------
+        scaled : bool, optional
+            Multiply the register contents by the column scale. True by
+            default.
+
+        Returns
+        -------
+        dict
+            'time' (monotonic ns, comparable with :func:`time.monotonic_ns`
+            of this process), 'count' (samples published), 'failed' (bit n
+            set if column n could not be read) and column name > value.
+        """
+        values = list(self.read())
+        if scaled:
+            for index, scale in self._scales:
+                # Dividing by 10 rather than multiplying by 0.1, as fields
+                inverse = 1 / scale
+                if abs(inverse - round(inverse)) < 1e-6:
+                    values[index] = values[index] / round(inverse)
+                else:
+                    values[index] = values[index] * scale
+        return dict(zip(self._names, values))
+
+    def close(self):
+        """Detach from the segment, it stays for the other readers."""
+        if self.segment is not None:
+            self.segment.close()
+            self.segment = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<Reader %s, %d columns>' % (self.name, len(self.columns))
@@ -0,0 +1,515 @@
+"""
+Simulated NKT modules answering Interbus telegrams in-process.
+
+Each simulator holds the registers of one module and implements their
+behaviour, e.g. the emission register 0x30 of the Extreme, which only turns
+on with the interlock reset, or the filter moving status bits of the Varia,
+which clear after a travel time proportional to the setpoint change.
+A :class:`SimulatedBus` holds the modules of one port and answers the
+telegrams of the interbus backend (:mod:`nkt_tools.interbus`) in place of a
+serial port, after a configurable latency and with injected errors, so the
+device classes run unmodified without hardware, on any OS::
+
+    NKTP_BACKEND=interbus python
+
+    >>> from nkt_tools import simulator
+    >>> from nkt_tools.extreme import Extreme
+    >>> bus = simulator.SimulatedBus([simulator.SimulatedExtreme()],
+    ...                              latency=0.002, busy=0.01)
+    >>> bus.attach('SIM1')
+    >>> laser = Extreme('SIM1')
+    >>> laser.set_emission(True)
+
+Registers a simulator does not implement are seeded with zeros from the
+register maps of :mod:`nkt_tools.registers`, so every register known for
+the module type can be read and written. Other registers are nacked, and
+addresses without a module do not answer.
+"""
+from collections import Counter, deque
+import random
+import threading
+import time
+
+import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import interbus, registers
+from nkt_tools.batch import FORMATS
+
+# Errors injected by SimulatedBus
+BUSY = 'busy'
+TIMEOUT = 'timeout'
+CRC = 'crc'
+ERRORS = (BUSY, TIMEOUT, CRC)
+
+_SIZES = {dtype: codec.size for dtype, codec in FORMATS.items()}
+
+
+class SimulatedModule:
+    """
+    Registers of one module with the general registers of all modules.
+
+    Subclasses set :attr:`module_type` and :attr:`defaults`, and override
+    :meth:`read` and :meth:`write` for registers with behaviour.
+
+    Parameters
+    ----------
+    address : int, optional
+        Module address on the bus, :attr:`default_address` if not given.
+    serial : str, optional
+        Module serial number (register 0x65).
+    registers : dict, optional
+        {register: bytes} content replacing the defaults, e.g. to start
+        with emission on.
+    """
+
+    module_type = 0
+    default_address = 1
+    defaults = {}
+    """dict : register > (dtype, initial value) of the module type."""
+
+    def __init__(self, address=None, serial='SIM00001', registers=None):
+        self.address = self.default_address if address is None else address
+        self.registers = {}  # register > bytes
+        self._seed()
+        self.store(0x61, 'U8', self.module_type)
+        self.store(0x62, 'U8', 1)  # PCB version
+        self.store(0x64, 'U16', 0x0100)  # Firmware version
+        self.store(0x66, 'U16', 0)  # Status bits
+        self.store(0x67, 'U8', 0)  # Error code
+        self.store(0x6D, 'U16', 0x0100)  # Bootloader version
+        self.registers[0x65] = serial.encode('ascii') + b'\x00'
+        for register, (dtype, value) in self.defaults.items():
+            self.store(register, dtype, value)
+        self.registers.update(registers or {})
+
+    def _seed(self):
+        try:
+            regmap = registers.load(self.module_type)
+        except KeyError:
+            return
+        for register in regmap:
+            size = register.index + _SIZES.get(register.dtype, 1) \
+                if register.index >= 0 else _SIZES.get(register.dtype, 1)
+            current = self.registers.get(register.address, b'')
+            self.registers[register.address] = current.ljust(size, b'\x00')
+
+    def value(self, register, dtype):
+        """Return the content of `register` as `dtype`."""
+        codec = FORMATS[dtype]
+        return codec.unpack(self.registers[register][:codec.size]
+                            .ljust(codec.size, b'\x00'))[0]
+
+    def store(self, register, dtype, value):
+        """Set the content of `register` to `value` of `dtype`."""
+        self.registers[register] = FORMATS[dtype].pack(value)
+
+    def read(self, register):
+        """Return the content of `register`, None if there is none."""
+        return self.registers.get(register)
+
+    def write(self, register, data):
+        """
+        Write `data` to `register`.
+
+        Returns
+        -------
+        bool
+            False to nack the write, e.g. for an unknown register or a value
+            the module rejects.
+        """
+        if register not in self.registers:
+            return False
+        self.registers[register] = bytes(data)
+        return True
+
+    def __repr__(self):
+        return '<%s at %d>' % (type(self).__name__, self.address)
+
+
+class SimulatedExtreme(SimulatedModule):
+    """
+    SuperK Extreme/Fianium (type 0x60).
+
+    Emission (0x30) turns on with 3 only while the interlock (0x32) is OK,
+    writing 0 to the interlock trips it and turns emission off, writing more
+    than 0 resets it. The status bits (0x66) follow emission and interlock.
+    Power and current level (0x37, 0x38) are limited to 1000 permille.
+    """
+
+    module_type = 0x60
+    default_address = 15
+    defaults = {
+        0x11: ('S16', 245),  # Inlet temperature, 24.5 C
+        0x16: ('U8', 1),  # Setup, constant power
+        0x32: ('U16', 0x0002),  # Interlock OK
+        0x34: ('U16', 1),  # Pulse picker ratio
+        0x37: ('U16', 500),  # Power level
+        0x38: ('U16', 1000),  # Current level
+    }
+
+    def read(self, register):
+        if register == 0x66:
+            interlock_off = self.value(0x32, 'U16') & 0xFF != 2
+            return FORMATS['U16'].pack(bool(self.value(0x30, 'U8'))
+                                       | interlock_off << 1)
+        return super().read(register)
+
+    def write(self, register, data):
+        if register == 0x30:
+            if data[:1] not in (b'\x00', b'\x03'):
+                return False
+            if self.value(0x32, 'U16') & 0xFF != 2:
+                data = b'\x00'  # Accepted, but no emission while interlocked
+        elif register == 0x32:
+            if any(data):
+                self.store(0x32, 'U16', 0x0002)
+            else:
+                self.store(0x32, 'U16', 0x0000)
+                self.store(0x30, 'U8', 0)
+            return True
+        elif register == 0x16:
+            if not data or data[0] > 4:
+                return False
+        elif register in (0x37, 0x38):
+            data = FORMATS['U16'].pack(min(
+                FORMATS['U16'].unpack(bytes(data[:2]).ljust(2, b'\x00'))[0],
+                1000))
+        return super().write(register, data)
+
+
+class SimulatedVaria(SimulatedModule):
+    """
+    SuperK Varia (type 0x68).
+
+    Writing a filter setpoint (ND 0x32, long 0x33 and short 0x34) sets the
+    filter moving status bit (12, 13 and 14) until the filter has traveled
+    the setpoint change at `speed`.
+
+    Parameters
+    ----------
+    speed : float, optional
+        Filter speed in setpoint units (0.1 nm or 0.1 %) per second.
+    """
+
+    module_type = 0x68
+    default_address = 0x10
+    defaults = {
+        0x13: ('U16', 455),  # Monitor input, 45.5 %
+        0x32: ('U16', 1000),  # ND setpoint, 100 %
+        0x33: ('U16', 5500),  # Long wave pass, 550 nm
+        0x34: ('U16', 5000),  # Short wave pass, 500 nm
+    }
+    FILTERS = (0x32, 0x33, 0x34)
+
+    def __init__(self, address=None, speed=2000.0, **kwargs):
+        super().__init__(address, **kwargs)
+        self.speed = speed
+        self._arrival = [0.0, 0.0, 0.0]  # time.monotonic() per filter
+
+    def read(self, register):
+        if register == 0x66:
+            now = time.monotonic()
+            status = self.value(0x66, 'U16') & ~0x7000
+            for number, arrival in enumerate(self._arrival):
+                if now < arrival:
+                    status |= 0x1000 << number
+            return FORMATS['U16'].pack(status)
+        return super().read(register)
+
+    def write(self, register, data):
+        if register in self.FILTERS:
+            number = self.FILTERS.index(register)
+            change = abs(FORMATS['U16'].unpack(
+                bytes(data[:2]).ljust(2, b'\x00'))[0]
+                - self.value(register, 'U16'))
+            if change:
+                self._arrival[number] = (max(time.monotonic(),
+                                             self._arrival[number])
+                                         + change / self.speed)
+        return super().write(register, data)
+
+
+class SimulatedSelect(SimulatedModule):
+    """SuperK Select (type 0x67) with two crystals."""
+
+    module_type = 0x67
+    default_address = 0x11
+    defaults = {
+        0x10: ('U16', 120),  # Monitor 1 readout
+        0x11: ('U16', 80),  # Monitor 2 readout
+        0x90: ('U32', 400000),  # Crystal 1 wavelengths in pm
+        0x91: ('U32', 650000),
+        0xA0: ('U32', 640000),  # Crystal 2
+        0xA1: ('U32', 1100000),
+    }
+
+
+class SimulatedRFDriver(SimulatedModule):
+    """
+    RF driver (type 0x66) with eight channels.
+
+    The channel arrays hold the wavelengths (0x90-0x97, pm), amplitudes
+    (0xB0-0xB7) and modulation gains (0xC0-0xC7, permille). Wavelengths
+    outside the range of the crystal (0x34, 0x35) are nacked, amplitudes and
+    gains are limited to 1000. RF power (0x30) sets status bit 0.
+    """
+
+    module_type = 0x66
+    default_address = 0x12
+    defaults = {
+        0x34: ('U32', 400000),  # Minimum wavelength of the crystal, pm
+        0x35: ('U32', 650000),  # Maximum wavelength
+        0x38: ('S16', 301),  # Crystal temperature, 30.1 C
+        0x75: ('U8', 1),  # Connected crystal
+    }
+
+    def read(self, register):
+        if register == 0x66:
+            return FORMATS['U16'].pack(bool(self.value(0x30, 'U8')))
+        return super().read(register)
+
+    def write(self, register, data):
+        if 0x90 <= register <= 0x97:
+            wavelength = FORMATS['U32'].unpack(
+                bytes(data[:4]).ljust(4, b'\x00'))[0]
+            if wavelength and not (self.value(0x34, 'U32') <= wavelength
+                                   <= self.value(0x35, 'U32')):
+                return False
+        elif 0xB0 <= register <= 0xB7 or 0xC0 <= register <= 0xC7:
+            data = FORMATS['U16'].pack(min(FORMATS['U16'].unpack(
+                bytes(data[:2]).ljust(2, b'\x00'))[0], 1000))
+        return super().write(register, data)
+
+
+class SimulatedBASIK(SimulatedModule):
+    """
+    Koheras BASIK (type 0x33).
+
+    Emission (0x30) sets status bits 0 and 14 (wavelength stabilized), the
+    output power (0x17) follows the power setpoint (0x22) while emitting and
+    the wavelength offset (0x72) follows its setpoint (0x2A). The setup bits
+    (0x31) and modulation setup (0xB7) are plain registers.
+    """
+
+    module_type = 0x33
+    default_address = 1
+    defaults = {
+        0x1C: ('S16', 251),  # Temperature, 25.1 C
+        0x22: ('U16', 1000),  # Power setpoint, 10 mW
+        0x31: ('U16', 0x0008),  # Setup bits
+        0x32: ('U32', 15500000),  # Central wavelength, 1/10 pm
+        0xB7: ('U16', 0),  # Modulation setup
+    }
+
+    def read(self, register):
+        if register == 0x66:
+            emission = bool(self.value(0x30, 'U8'))
+            return FORMATS['U16'].pack(emission | emission << 14)
+        if register == 0x17:
+            return (self.registers[0x22] if self.value(0x30, 'U8')
+                    else bytes(2))
+        if register == 0x72:
+            return FORMATS['S32'].pack(self.value(0x2A, 'S16'))
+        return super().read(register)
+
+
+class _Link:
+    """Serial-like link of one opened port, see :data:`interbus.links`."""
+
+    __slots__ = ('_bus', '_response', 'timeout')
+
+    def __init__(self, bus):
+        self._bus = bus
+        self._response = b''
+        self.timeout = interbus.TIMEOUT
+
+    def write(self, telegram):
+        self._response = self._bus.answer(telegram, self.timeout)
+        return len(telegram)
+
+    def read_until(self, expected=b'\n'):
+        response, self._response = self._response, b''
+        return response
+
+    def close(self):
+        self._response = b''
+
+
+class SimulatedBus:
+    """
+    Modules on one port, answering the telegrams of the interbus backend.
+
+    Parameters
+    ----------
+    modules : iterable of SimulatedModule
+        Modules on the bus, at their addresses.
+    latency : float, optional
+        Seconds before each answer, for the transfer time and module
+        latency of a real bus. 0 by default.
+    busy, timeout, crc : float, optional
+        Probability of a telegram answered with busy, not answered or
+        answered with a CRC error. Timeouts take the response timeout of
+        the port, like on a real bus. 0 by default.
+    seed : int, optional
+        Seed of the random errors, for repeatable runs.
+
+    Attributes
+    ----------
+    telegrams : int
+        Telegrams answered, including the injected errors.
+    errors : collections.Counter
+        Injected errors by kind (:data:`BUSY`, :data:`TIMEOUT`,
+        :data:`CRC`).
+    """
+
+    def __init__(self, modules, latency=0.0, busy=0.0, timeout=0.0, crc=0.0,
+                 seed=None):
+        self.modules = {module.address: module for module in modules}
+        self.latency = latency
+        self.busy = busy
+        self.timeout = timeout
+        self.crc = crc
+        self.telegrams = 0
+        self.errors = Counter()
+        self.portname = None
+        self._random = random.Random(seed)
+        self._injected = deque()
+        self._lock = threading.Lock()
+
+    def attach(self, portname):
+        """
+        Answer the telegrams sent to `portname` from now on.
+
+        Raises
+        ------
+        RuntimeError
+            If the interbus backend is not selected.
+        """
+        if nkt.NKTP_BACKEND != 'interbus':
+            raise RuntimeError('Simulated buses need NKTP_BACKEND=interbus,'
+                               ' not %r' % nkt.NKTP_BACKEND)
+        self.detach()
+        interbus.links[portname] = self._open
+        self.portname = portname
+        return self
+
+    def detach(self):
+        """Stop answering, the port can no longer be opened."""
+        if self.portname is not None:
+            interbus.links.pop(self.portname, None)
+            self.portname = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.detach()
+
+    def _open(self):
+        return _Link(self)
+
+    def inject(self, error, count=1):
+        """Answer the next `count` telegrams with `error`, e.g. 'busy'."""
+        if error not in ERRORS:
+            raise ValueError('Unknown error %r, use one of %s'
+                             % (error, ', '.join(ERRORS)))
+        with self._lock:
+            self._injected.extend([error] * count)
+
+    def _error(self):
+        if self._injected:
+            return self._injected.popleft()
+        if self.busy or self.timeout or self.crc:
+            draw = self._random.random()
+            for error, probability in ((BUSY, self.busy),
+                                       (TIMEOUT, self.timeout),
+                                       (CRC, self.crc)):
+                if draw < probability:
+                    return error
+                draw -= probability
+        return None
+
+    def answer(self, telegram, timeout=interbus.TIMEOUT):
+        """
+        Return the response telegram to `telegram`, b'' for no response.
+
+        Parameters
+        ----------
+        telegram : bytes
+            Framed telegram sent by the host.
+        timeout : float, optional
+            Response timeout of the host, waited for an injected timeout.
+        """
+        request = interbus.decode_telegram(telegram)
+        if request is None:
+            return b''
+        dest, source, msg_type, register, data = request
+        with self._lock:
+            module = self.modules.get(dest)
+            if module is None:
+                return b''  # Nobody home, the host times out
+            if self.latency:
+                time.sleep(self.latency)
+            self.telegrams += 1
+            error = self._error()
+            if error is not None:
+                self.errors[error] += 1
+                if error == TIMEOUT:
+                    time.sleep(timeout)
+                    return b''
+                if error == BUSY:
+                    return interbus.encode_telegram(source, dest,
+                                                    interbus.BUSY, register)
+            msg_type, data = self._handle(module, msg_type, register, data)
+        response = interbus.encode_telegram(source, dest, msg_type, register,
+                                            data)
+        if error == CRC:  # Corrupt the CRC, the host sees a CRC error
+            response = response[:-2] + bytes((response[-2] ^ 0x01,)) \
+                + response[-1:]
+        return response
+
+    @staticmethod
+    def _handle(module, msg_type, register, data):
+        if msg_type == interbus.READ:
+            content = module.read(register)
+            if content is None:
+                return interbus.NACK, b''
+            return interbus.DATAGRAM, content
+        if msg_type in (interbus.WRITE_SET, interbus.WRITE_CLEAR,
+                        interbus.WRITE_TOGGLE):
+            content = module.read(register)
+            if content is None:
+                return interbus.NACK, b''
+            content = bytearray(content.ljust(len(data), b'\x00'))
+            for position, bits in enumerate(data):
+                if msg_type == interbus.WRITE_SET:
+                    content[position] |= bits
+                elif msg_type == interbus.WRITE_CLEAR:
+                    content[position] &= ~bits & 0xFF
+                else:
+                    content[position] ^= bits
+            data = bytes(content)
+        elif msg_type != interbus.WRITE:
+            return interbus.NACK, b''
+        return (interbus.ACK if module.write(register, data)
+                else interbus.NACK), b''
+
+
+def simulate(portname, *modules, **options):
+    """
+    Attach a :class:`SimulatedBus` with `modules` to `portname`.
+
+    Parameters
+    ----------
+    portname : str
+        Port the device classes are given, e.g. 'SIM1'.
+    *modules : SimulatedModule
+        Modules on the bus.
+    **options
+        latency, busy, timeout, crc and seed of :class:`SimulatedBus`.
+
+    Returns
+    -------
+    SimulatedBus
+        The attached bus, detach it again with :meth:`~SimulatedBus.detach`.
+    """
+    return SimulatedBus(modules, **options).attach(portname)
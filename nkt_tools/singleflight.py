@@ -0,0 +1,167 @@
+"""
+Share one bus transaction among concurrent identical register reads.
+
+Dashboards polling the same registers from several threads, e.g.
+``emission_state`` or the 0x66 status bits, each pay for a serial
+transaction, one after the other. After :func:`enable`, a read of a
+register while the same read (port, devId, regId, index and function) is
+in flight does not go to the bus: it waits for the read in flight and
+returns its response, or raises its exception. Writing a register ends the
+sharing of its reads in flight, reads starting after the write go to the
+bus again.
+
+The layer sits above the dispatcher (:data:`~nkt_tools._hooks.
+SINGLEFLIGHT`), so reads waiting in the dispatcher queue are shared too,
+and below the cache, which answers its registers before. Batched reads
+(:func:`~nkt_tools.batch.read_many`, device snapshots, ``read_channels``)
+go through the layer as well. A read on a dispatcher thread, e.g. inside a
+batch, never waits for a read in flight, whose call can only be queued
+behind it, and goes to the bus instead.
+
+Example
+-------
+>>> from nkt_tools import singleflight
+>>> singleflight.enable()
+>>> singleflight.stats()
+{'transactions': 1200, 'saved': 1150, 'in_flight': 0,
+ 'saved_by_register': {('COM4', 15, 0x30): 590, ('COM4', 15, 0x66): 560}}
+"""
+import threading
+
+from nkt_tools import _hooks
+from nkt_tools.cache import DEVICE_REGISTERS
+from nkt_tools.dispatch import dispatching
+
+
+# Registers of the device functions, see cache.DEVICE_REGISTERS
+_DEVICE_REGISTERS = dict(DEVICE_REGISTERS, deviceGetStatusBits=0x66,
+                         deviceGetErrorCode=0x67)
+
+_lock = threading.Lock()
+_flights = {}  # (portname, devId, regId, name, args) > _Flight
+_transactions = 0
+_saved = 0
+_saved_by_register = {}  # (portname, devId, regId) > reads saved
+
+
+class _Flight:
+    """A read in flight and its outcome."""
+
+    __slots__ = ('done', 'response', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+def _shared(function, key, portname, args):
+    global _transactions, _saved
+    with _lock:
+        flight = _flights.get(key)
+        if flight is None:
+            flight = _flights[key] = _Flight()
+            _transactions += 1
+            leader = True
+        elif dispatching():
+            # The leader's call waits behind this thread in the queue
+            _transactions += 1
+            flight = None
+            leader = False
+        else:
+            _saved += 1
+            register = key[:3]
+            _saved_by_register[register] = (
+                _saved_by_register.get(register, 0) + 1)
+            leader = False
+    if flight is None:
+        return function(portname, *args)
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.response
+    try:
+        flight.response = function(portname, *args)
+    except BaseException as error:
+        flight.error = error
+        raise
+    finally:
+        with _lock:
+            if _flights.get(key) is flight:
+                del _flights[key]
+        flight.done.set()
+    return flight.response
+
+
+def _land(portname, devId, regId):
+    """Stop sharing the reads in flight of a register being written."""
+    with _lock:
+        for key in [key for key in _flights
+                    if key[:3] == (portname, devId, regId)]:
+            del _flights[key]
+
+
+def _layer(name, function):
+    if name.startswith('registerWrite'):  # Also registerWriteRead
+        def write(portname, devId, regId, *args):
+            _land(portname, devId, regId)
+            return function(portname, devId, regId, *args)
+        write.__name__ = name
+        return write
+    if name.startswith('registerRead'):
+        def read(portname, devId, regId, *args):
+            return _shared(function, (portname, devId, regId, name, args),
+                           portname, (devId, regId) + args)
+        read.__name__ = name
+        return read
+    if name.startswith('deviceGet'):
+        regId = _DEVICE_REGISTERS.get(name, -1)
+
+        def device_read(portname, *args):
+            devId = args[0] if args else -1
+            return _shared(function, (portname, devId, regId, name, args),
+                           portname, args)
+        device_read.__name__ = name
+        return device_read
+    return function
+
+
+def stats():
+    """
+    Return the counters of shared reads.
+
+    Returns
+    -------
+    dict
+        'transactions' reads that went to the bus, 'saved' reads answered
+        by a read in flight instead, 'in_flight' reads in flight now and
+        'saved_by_register' (portname, devId, regId) > reads saved.
+    """
+    with _lock:
+        return {'transactions': _transactions, 'saved': _saved,
+                'in_flight': len(_flights),
+                'saved_by_register': dict(_saved_by_register)}
+
+
+def reset_stats():
+    """Set all counters to zero."""
+    global _transactions, _saved
+    with _lock:
+        _transactions = _saved = 0
+        _saved_by_register.clear()
+
+
+def enable():
+    """Share concurrent identical reads."""
+    _hooks.install_once(_layer, _hooks.SINGLEFLIGHT)
+
+
+def disable():
+    """Send every read to the bus again."""
+    _hooks.remove(_layer)
+
+
+def enabled():
+    """Return True if concurrent identical reads are shared."""
+    return _hooks.installed(_layer)
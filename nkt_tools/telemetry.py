@@ -0,0 +1,567 @@
+"""
+Log registers at a fixed rate into a ring buffer and spill it to disk.
+
+A :class:`Logger` polls a set of registers of one port `rate` times per
+second into the preallocated NumPy columns of a ring buffer, one row per
+sample, timestamped with :func:`time.monotonic_ns`. The register contents
+are copied into the columns as raw bytes, so the polling loop allocates no
+buffers, arrays or decoded values. Run one logger per rate to poll some
+registers faster than others.
+
+With a `path`, a background thread appends every `chunk` rows to a Parquet
+(``.parquet``, needs pyarrow) or HDF5 (``.h5``, needs h5py) file, so memory
+stays bounded at `capacity` rows however long the logger runs. Should the
+file fall a whole ring behind, the rows overwritten before they were
+written are counted in :attr:`Logger.dropped`.
+
+:class:`Poller` is the fixed rate polling loop of the logger, for other
+consumers of the samples such as :class:`nkt_tools.shared.Publisher`.
+
+Example
+-------
+>>> from nkt_tools import telemetry
+>>> columns = telemetry.fields(laser, 'inlet_temperature', 'power_level',
+...                            'current_level', ('status_bits', 0x66, 'U16'))
+>>> with telemetry.Logger(columns, rate=10, path='extreme.parquet') as log:
+...     time.sleep(3 * 24 * 3600)
+...     recent = log.latest(600)  # Last minute, scaled
+>>> data = telemetry.load('extreme.parquet')
+>>> data['inlet_temperature'][-1]
+24.5
+"""
+from collections import namedtuple
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from nkt_tools import dispatch
+from nkt_tools.batch import FORMATS, NUMPY_TYPES, _raw_reader
+from nkt_tools.session import pool
+
+
+Column = namedtuple('Column', ['name', 'portname', 'devId', 'regId', 'dtype',
+                               'scale', 'index'])
+Column.__new__.__defaults__ = (1, -1)
+Column.__doc__ = """\
+One logged register: column name, port, devId, regId, data type ('U8',
+'S16', 'F32' etc.), scale from the register content to the value (1 by
+default) and byte index (-1 by default)."""
+
+RESERVED = ('time', 'failed', 'wall_time')
+"""tuple : Column names used by the logger itself."""
+
+MAX_COLUMNS = 64
+"""int : Columns per logger, one bit each in the 'failed' column."""
+
+
+def fields(device, *names):
+    """
+    Return the columns logging fields of `device`.
+
+    Parameters
+    ----------
+    device : RegisterDevice
+        Device object, e.g. an Extreme.
+    *names : str or tuple
+        :class:`~nkt_tools.fields.RegisterField` names, or (name, regId,
+        dtype) or (name, regId, dtype, scale) for registers without a field.
+
+    Returns
+    -------
+    list of Column
+    """
+    columns = []
+    for name in names:
+        if isinstance(name, tuple):
+            columns.append(Column(name[0], device._portname,
+                                  device._module_address, *name[1:]))
+            continue
+        field = device.fields().get(name)
+        if field is None:
+            raise ValueError('%s has no register field %r'
+                             % (type(device).__name__, name))
+        columns.append(Column(name, device._portname, device._module_address,
+                              field.address, field.dtype, field.scale,
+                              field.index))
+    return columns
+
+
+class _ParquetWriter:
+    """Appends chunks as row groups of a Parquet file."""
+
+    def __init__(self, path, dtypes, metadata):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._table = pa.Table.from_pydict
+        self._schema = pa.schema(
+            [pa.field(name, pa.from_numpy_dtype(dtype))
+             for name, dtype in dtypes.items()],
+            metadata={'nkt_tools': json.dumps(metadata)})
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, chunk):
+        self._writer.write_table(self._table(chunk, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class _HDF5Writer:
+    """Appends chunks to one resizable dataset per column of an HDF5 file."""
+
+    def __init__(self, path, dtypes, metadata, chunk):
+        import h5py
+
+        self._file = h5py.File(path, 'w')
+        self._file.attrs['nkt_tools'] = json.dumps(metadata)
+        for name, dtype in dtypes.items():
+            self._file.create_dataset(name, (0,), dtype=dtype,
+                                      maxshape=(None,), chunks=(chunk,))
+
+    def write(self, chunk):
+        for name, values in chunk.items():
+            dataset = self._file[name]
+            size = dataset.shape[0]
+            dataset.resize((size + len(values),))
+            dataset[size:] = values
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def _format(path):
+    """Return 'parquet' or 'hdf5' by the extension of `path`."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.parquet', '.pq'):
+        return 'parquet'
+    if extension in ('.h5', '.hdf5'):
+        return 'hdf5'
+    raise ValueError('Unknown telemetry file type %r, use .parquet or .h5'
+                     % extension)
+
+
+def _read_row(read, plan, slot):
+    """
+    Copy the registers of `plan` into row `slot` of their columns.
+
+    Returns the 'failed' bits of the columns that could not be read.
+    """
+    failed = 0
+    for devId, regId, index, view, size, zeros, bit in plan:
+        result, data = read(devId, regId, index)
+        start = slot * size
+        length = len(data)
+        if result:
+            failed |= bit
+            view[start:start + size] = zeros
+        elif length >= size:
+            view[start:start + size] = data[:size]
+        else:  # Zero extended, as the DLL does
+            view[start:start + length] = data
+            view[start + length:start + size] = zeros[length:]
+    return failed
+
+
+class Poller:
+    """
+    Base of the classes polling registers of one port at a fixed rate.
+
+    Subclasses implement :meth:`_sampler`, and :meth:`_open` and
+    :meth:`_close` to set up and tear down around polling.
+
+    Parameters
+    ----------
+    columns : iterable of Column
+        Registers to poll, all on the same port, see :func:`fields`.
+        Numeric data types only.
+    rate : float, optional
+        Samples per second. 1 by default.
+
+    Attributes
+    ----------
+    missed : int
+        Samples skipped since polling fell behind the rate.
+    """
+
+    def __init__(self, columns, rate=1.0):
+        columns = list(columns)
+        if not columns or len(columns) > MAX_COLUMNS:
+            raise ValueError('Poll 1 to %d columns' % MAX_COLUMNS)
+        names = [column.name for column in columns]
+        if len(set(names)) < len(names) or set(names) & set(RESERVED):
+            raise ValueError('Column names must be unique and not one of %s'
+                             % (RESERVED,))
+        if len({column.portname for column in columns}) > 1:
+            raise ValueError('All columns must be on the same port')
+        for column in columns:
+            if column.dtype not in FORMATS:
+                raise ValueError('Cannot poll %r registers' % (column.dtype,))
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.columns = columns
+        self.portname = columns[0].portname
+        self.rate = rate
+        self.missed = 0
+        self._stop = threading.Event()
+        self._threads = []
+        self._session = None
+
+    def _plan(self, views):
+        """
+        Return per column what :func:`_read_row` needs, precomputed.
+
+        `views` are the byte memoryviews the columns are copied into.
+        """
+        plan = []
+        for bit, (column, view) in enumerate(zip(self.columns, views)):
+            size = FORMATS[column.dtype].size
+            plan.append((column.devId, column.regId, column.index, view,
+                         size, bytes(size), 1 << bit))
+        return plan
+
+    def _sampler(self):
+        """Return sample(), taking one sample of all columns."""
+        raise NotImplementedError
+
+    def _open(self):
+        """Prepare polling, the port is open. Return threads to start."""
+        return []
+
+    def _close(self):
+        """Clean up after polling stopped."""
+
+    def _polled(self):
+        """Finish the threads of :meth:`_open`, the last sample is taken."""
+
+    def _queued(self, sample):
+        """Return `sample` as one job of the dispatcher, if it is enabled."""
+        if not dispatch.enabled():
+            return sample
+        dispatcher = dispatch.dispatcher(self.portname)
+
+        def queued():
+            dispatcher.call(dispatch.current_priority(), sample)
+        return queued
+
+    def _poll(self, sample):
+        sample = self._queued(sample)
+        period = round(1e9 / self.rate)
+        clock = time.monotonic_ns
+        wait = self._stop.wait
+        deadline = clock()
+        while not self._stop.is_set():
+            sample()
+            deadline += period
+            now = clock()
+            if now - deadline >= period:  # Periods behind, skip those samples
+                skipped = (now - deadline) // period
+                self.missed += skipped
+                deadline += skipped * period
+            if deadline > now:  # A little late, catch up without waiting
+                wait((deadline - now) * 1e-9)
+
+    def start(self):
+        """
+        Open the port and start polling.
+
+        Returns
+        -------
+        Poller
+            self.
+        """
+        if self._threads:
+            raise RuntimeError('%s is already running' % type(self).__name__)
+        self._stop.clear()
+        self.missed = 0
+        self._session = pool.acquire(self.portname)
+        try:
+            threads = self._open()
+            try:
+                sample = self._sampler()
+            except Exception:
+                self._close()
+                raise
+        except Exception:
+            self._session.release()
+            self._session = None
+            raise
+        self._threads = [threading.Thread(
+            target=self._poll, args=(sample,), daemon=True,
+            name='nkt %s poll' % type(self).__name__)] + threads
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling and release the port."""
+        self._stop.set()
+        if self._threads:
+            self._threads[0].join()  # Polling, its last sample complete
+            self._polled()
+            for thread in self._threads[1:]:
+                thread.join()
+        self._threads = []
+        if self._session is not None:
+            self._session.release()
+            self._session = None
+            self._close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class Logger(Poller):
+    """
+    Poll registers of one port at a fixed rate into a ring buffer.
+
+    Parameters
+    ----------
+    columns : iterable of Column
+        Registers to log, all on the same port, see :func:`fields`. Numeric
+        data types only.
+    rate : float, optional
+        Samples per second. 1 by default.
+    capacity : int, optional
+        Rows kept in memory. 100000 by default.
+    path : str, optional
+        Parquet (.parquet) or HDF5 (.h5) file the rows are appended to. The
+        file is overwritten.
+    chunk : int, optional
+        Rows appended to the file at once, at most half the capacity. 10000
+        by default.
+
+    Attributes
+    ----------
+    written : int
+        Samples taken since :meth:`start`.
+    spilled : int
+        Samples appended to the file or dropped.
+    dropped : int
+        Samples overwritten before they could be appended to the file.
+    missed : int
+        Samples skipped since polling fell behind the rate.
+    origin : tuple
+        (:func:`time.time_ns`, :func:`time.monotonic_ns`) at :meth:`start`,
+        to convert the timestamps to wall clock time.
+    """
+
+    def __init__(self, columns, rate=1.0, capacity=100000, path=None,
+                 chunk=10000):
+        super().__init__(columns, rate)
+        if path is not None:
+            _format(path)
+            if capacity < 2 * chunk:
+                raise ValueError('capacity must hold at least two chunks')
+        self.capacity = capacity
+        self.path = path
+        self.chunk = chunk
+        self.time = np.zeros(capacity, '<i8')
+        self.failed = np.zeros(capacity, '<u8')
+        self.data = {column.name: np.zeros(capacity,
+                                           '<' + NUMPY_TYPES[column.dtype])
+                     for column in self.columns}
+        """dict : column name > ring buffer of raw register contents."""
+        self.written = 0
+        self.spilled = 0
+        self.dropped = 0
+        self.origin = None
+        self._lock = threading.Lock()
+        self._full = threading.Event()  # A chunk is ready to spill
+        self._drain = threading.Event()  # Polling ended, spill the rest
+        self._error = None
+
+    def _sampler(self):
+        """Return sample(), reading one row into the ring buffer."""
+        read = _raw_reader(self.portname)
+        plan = self._plan([memoryview(self.data[column.name].view('u1'))
+                           for column in self.columns])
+        clock = time.monotonic_ns
+        times, failures = self.time, self.failed
+        capacity, chunk, lock, full = (self.capacity, self.chunk, self._lock,
+                                       self._full)
+        spill = self.path is not None
+
+        def sample():
+            slot = self.written % capacity
+            times[slot] = clock()
+            failures[slot] = _read_row(read, plan, slot)
+            with lock:
+                self.written += 1
+            if spill and self.written - self.spilled >= chunk:
+                full.set()
+        return sample
+
+    def _rows(self, start, stop):
+        """
+        Copy rows `start` to `stop` (sample numbers) out of the ring.
+
+        Returns the copied columns and the first row not overwritten while
+        copying.
+        """
+        slots = np.arange(start, stop) % self.capacity
+        chunk = {'time': self.time[slots], 'failed': self.failed[slots]}
+        for name, column in self.data.items():
+            chunk[name] = column[slots]
+        with self._lock:  # The row being written may be the oldest one
+            valid = self.written + 1 - self.capacity
+        return chunk, valid
+
+    def _spill(self, writer):
+        try:
+            while True:
+                stopping = self._drain.is_set()
+                self._full.wait(0.5)
+                self._full.clear()
+                while True:
+                    start = self.spilled
+                    stop = min(self.written, start + self.chunk)
+                    if stop - start < (1 if stopping else self.chunk):
+                        break
+                    chunk, valid = self._rows(start, stop)
+                    if valid > start:  # Overwritten while behind
+                        skip = min(valid, stop) - start
+                        chunk = {name: values[skip:]
+                                 for name, values in chunk.items()}
+                        self.dropped += skip
+                    if len(chunk['time']):
+                        writer.write(chunk)
+                    self.spilled = stop
+                if stopping:
+                    break
+        except Exception as error:  # Reported by stop()
+            self._error = error
+        finally:
+            writer.close()
+
+    def _metadata(self):
+        return {'portname': self.portname, 'rate': self.rate,
+                'origin': list(self.origin),
+                'columns': [column._asdict() for column in self.columns]}
+
+    def _writer(self):
+        dtypes = {'time': self.time.dtype, 'failed': self.failed.dtype}
+        dtypes.update((name, column.dtype)
+                      for name, column in self.data.items())
+        if _format(self.path) == 'parquet':
+            return _ParquetWriter(self.path, dtypes, self._metadata())
+        return _HDF5Writer(self.path, dtypes, self._metadata(), self.chunk)
+
+    def _open(self):
+        self._error = None
+        self._drain.clear()
+        self.written = self.spilled = self.dropped = 0
+        self.origin = (time.time_ns(), time.monotonic_ns())
+        if self.path is None:
+            return []
+        return [threading.Thread(target=self._spill, args=(self._writer(),),
+                                 daemon=True, name='nkt Logger spill')]
+
+    def stop(self):
+        """
+        Stop polling, append the remaining rows to the file and close it.
+
+        Raises
+        ------
+        Exception
+            The error that stopped the file from being written, if any.
+        """
+        super().stop()
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _polled(self):
+        self._drain.set()
+        self._full.set()
+
+    def latest(self, count=None, scaled=True):
+        """
+        Return the last rows in memory.
+
+        Parameters
+        ----------
+        count : int, optional
+            Number of rows, all rows in memory by default.
+        scaled : bool, optional
+            Multiply the register contents by the column scale. True by
+            default.
+
+        Returns
+        -------
+        dict
+            'time' (monotonic ns), 'failed' (bit n set if column n could not
+            be read) and column name > array, oldest row first.
+        """
+        stop = self.written
+        start = max(0, stop - self.capacity + 1)
+        if count is not None:
+            start = max(start, stop - count)
+        rows, valid = self._rows(start, stop)
+        if valid > start:
+            rows = {name: values[valid - start:]
+                    for name, values in rows.items()}
+        if scaled:
+            _scale(rows, self.columns)
+        return rows
+
+    def __repr__(self):
+        return '<Logger %s, %d columns at %g Hz, %d samples>' % (
+            self.portname, len(self.columns), self.rate, self.written)
+
+
+def _scale(rows, columns):
+    for column in columns:
+        if column.scale == 1:
+            continue
+        # Dividing by 10 instead of multiplying by 0.1, as RegisterField
+        inverse = 1 / column.scale
+        if abs(inverse - round(inverse)) < 1e-6:
+            rows[column.name] = rows[column.name] / round(inverse)
+        else:
+            rows[column.name] = rows[column.name] * column.scale
+
+
+def load(path, scaled=True):
+    """
+    Read a file written by a :class:`Logger`.
+
+    Parameters
+    ----------
+    path : str
+        Parquet (.parquet) or HDF5 (.h5) file.
+    scaled : bool, optional
+        Multiply the register contents by the column scale. True by default.
+
+    Returns
+    -------
+    dict
+        'time' (monotonic ns), 'wall_time' (seconds since the epoch),
+        'failed' and column name > array.
+    """
+    if _format(path) == 'parquet':
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+        metadata = json.loads(table.schema.metadata[b'nkt_tools'])
+        rows = {name: table.column(name).to_numpy()
+                for name in table.column_names}
+    else:
+        import h5py
+
+        with h5py.File(path, 'r') as file:
+            metadata = json.loads(file.attrs['nkt_tools'])
+            rows = {name: file[name][()] for name in file}
+    columns = [Column(**column) for column in metadata['columns']]
+    wall, monotonic = metadata['origin']
+    rows['wall_time'] = (rows['time'] - monotonic + wall) * 1e-9
+    if scaled:
+        _scale(rows, columns)
+    return rows
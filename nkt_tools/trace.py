@@ -0,0 +1,449 @@
+"""
+Record register traffic to a binary trace and replay it without hardware.
+
+:class:`Recorder` logs every call of the register and device functions of
+:mod:`~nkt_tools.NKTP_DLL` that reaches the backend (port, arguments such as
+devId, regId, index and the value written, response and latency) to a
+compact binary trace file. :class:`Replay` answers the same calls from such
+a trace, on any OS and without a DLL, after the recorded latency multiplied
+by `scale`::
+
+    >>> from nkt_tools import trace
+    >>> with trace.Recorder('extreme.trace'):
+    ...     laser.test_read_funcs()          # Windows, laser attached
+    >>> with trace.Replay('extreme.trace', scale=0):
+    ...     laser.test_read_funcs()          # Linux CI, as fast as possible
+
+Replayed calls are matched by function and arguments, in recorded order per
+distinct call, so threads may interleave differently than when recording.
+A call repeated more often than recorded starts over at its first response.
+
+Trace format
+------------
+The file starts with :data:`MAGIC`, followed by records of the header
+``<BBBIHH`` (kind, function, port, latency in microseconds, argument size,
+response size) and the encoded arguments and response. Function and port
+names are defined once by records of kind :data:`FUNCTION` and
+:data:`PORT`, whose arguments are the name. Values are tagged: one type
+byte, then the value in the smallest fitting little-endian format.
+"""
+from array import array
+from collections import namedtuple
+import struct
+import threading
+import time
+
+import nkt_tools.NKTP_DLL as nkt
+from nkt_tools import _hooks
+
+
+MAGIC = b'NKTTRACE\x01'
+"""bytes : Start of a trace file, the last byte is the format version."""
+
+CALL = 0
+"""int : Record kind of a function call."""
+FUNCTION = 1
+"""int : Record kind defining a function name."""
+PORT = 2
+"""int : Record kind defining a port name."""
+
+_HEADER = struct.Struct('<BBBIHH')
+_MAX_LATENCY = 0xFFFFFFFF
+
+# Port functions answered by a replay, they are not layered
+PORT_FUNCTIONS = ('openPorts', 'closePorts', 'getOpenPorts', 'getAllPorts',
+                  'getPortStatus')
+
+Operation = namedtuple('Operation', ['name', 'portname', 'args', 'response',
+                                     'latency'])
+Operation.__doc__ = """\
+One recorded call: function name, port, the arguments after the port (e.g.
+devId, regId, index), the response and the latency in seconds."""
+
+
+# *****************************************************************************
+# Value encoding
+# *****************************************************************************
+
+_U8 = struct.Struct('<B')
+_S16 = struct.Struct('<h')
+_S64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_U16 = struct.Struct('<H')
+
+
+def _encode(value, out):
+    """Append the tagged encoding of `value` to bytearray `out`."""
+    if value is None:
+        out += b'N'
+    elif value is True or value is False:
+        out += b'T' if value else b'F'
+    elif isinstance(value, int):
+        if 0 <= value <= 0xFF:
+            out += b'b'
+            out.append(value)
+        elif -0x8000 <= value <= 0x7FFF:
+            out += b'h' + _S16.pack(value)
+        else:
+            out += b'q' + _S64.pack(value)
+    elif isinstance(value, float):
+        out += b'd' + _F64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        out += b's' + _U16.pack(len(data)) + data
+    elif isinstance(value, tuple):
+        out += b'(' + _U8.pack(len(value))
+        for item in value:
+            _encode(item, out)
+    else:  # bytes and ctypes buffers
+        data = bytes(value)
+        out += b'y' + _U16.pack(len(data)) + data
+    return out
+
+
+def _decode(data, offset=0):
+    """Return (value, next offset) of the value encoded at `offset`."""
+    tag = data[offset]
+    offset += 1
+    if tag == 0x62:  # b
+        return data[offset], offset + 1
+    if tag == 0x28:  # (
+        items = []
+        offset += 1
+        for _ in range(data[offset - 1]):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        return tuple(items), offset
+    if tag == 0x79 or tag == 0x73:  # y, s
+        size = _U16.unpack_from(data, offset)[0]
+        offset += 2
+        raw = bytes(data[offset:offset + size])
+        return (raw if tag == 0x79 else raw.decode('utf-8')), offset + size
+    if tag == 0x68:  # h
+        return _S16.unpack_from(data, offset)[0], offset + 2
+    if tag == 0x71:  # q
+        return _S64.unpack_from(data, offset)[0], offset + 8
+    if tag == 0x64:  # d
+        return _F64.unpack_from(data, offset)[0], offset + 8
+    if tag == 0x4E:  # N
+        return None, offset
+    if tag == 0x54 or tag == 0x46:  # T, F
+        return tag == 0x54, offset
+    raise ValueError('Unknown value tag %r in trace' % chr(tag))
+
+
+def _normalized(args):
+    """Return `args` with ctypes buffers as bytes, as they are recorded."""
+    return tuple(value if isinstance(value, (int, float, str, bytes,
+                                             type(None)))
+                 else bytes(value) for value in args)
+
+
+# *****************************************************************************
+# Writing and reading traces
+# *****************************************************************************
+
+class TraceWriter:
+    """
+    Append operations to a trace file.
+
+    Used by :class:`Recorder`, and to build synthetic traces, e.g. for
+    benchmarks. Writes are serialized with a lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.operations = 0
+        self._file = open(path, 'wb')
+        self._file.write(MAGIC)
+        self._functions = {}  # name > id
+        self._ports = {}  # portname > id
+        self._lock = threading.Lock()
+
+    def _define(self, kind, table, name):
+        ident = table[name] = len(table)
+        if ident > 0xFF:
+            raise ValueError('More than 256 %s names in one trace'
+                             % ('function' if kind == FUNCTION else 'port'))
+        data = name.encode('utf-8')
+        self._file.write(_HEADER.pack(kind, ident, 0, 0, len(data), 0) + data)
+        return ident
+
+    def write(self, name, portname, args, response, latency):
+        """
+        Append one operation.
+
+        Parameters
+        ----------
+        name : str
+            Function, e.g. 'registerReadU16'.
+        portname : str
+            Port of the call.
+        args : tuple
+            Arguments after the port.
+        response
+            Return value of the function.
+        latency : float
+            Duration of the call in seconds.
+        """
+        encoded_args = _encode(tuple(args), bytearray())
+        encoded_response = _encode(response, bytearray())
+        microseconds = min(int(latency * 1e6), _MAX_LATENCY)
+        with self._lock:
+            function = self._functions.get(name)
+            if function is None:
+                function = self._define(FUNCTION, self._functions, name)
+            port = self._ports.get(portname)
+            if port is None:
+                port = self._define(PORT, self._ports, portname)
+            self._file.write(_HEADER.pack(CALL, function, port, microseconds,
+                                          len(encoded_args),
+                                          len(encoded_response)))
+            self._file.write(encoded_args)
+            self._file.write(encoded_response)
+            self.operations += 1
+
+    def close(self):
+        """Flush and close the file."""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _records(path):
+    """Yield (function, portname, args bytes, response bytes, microseconds)."""
+    with open(path, 'rb') as file:
+        data = file.read()
+    if not data.startswith(MAGIC):
+        raise ValueError('%s is not a trace file' % path)
+    functions, ports = {}, {}
+    view = memoryview(data)
+    offset = len(MAGIC)
+    unpack = _HEADER.unpack_from
+    size = _HEADER.size
+    end = len(data)
+    while offset < end:
+        kind, function, port, latency, args_size, response_size = \
+            unpack(data, offset)
+        offset += size
+        args = view[offset:offset + args_size]
+        offset += args_size
+        response = view[offset:offset + response_size]
+        offset += response_size
+        if kind == CALL:
+            yield functions[function], ports[port], args, response, latency
+        elif kind == FUNCTION:
+            functions[function] = bytes(args).decode('utf-8')
+        elif kind == PORT:
+            ports[function] = bytes(args).decode('utf-8')
+
+
+def read(path):
+    """
+    Yield the operations of a trace file, in recorded order.
+
+    Returns
+    -------
+    generator of Operation
+    """
+    for name, portname, args, response, latency in _records(path):
+        yield Operation(name, portname, _decode(args)[0],
+                        _decode(response)[0], latency * 1e-6)
+
+
+# *****************************************************************************
+# Recording
+# *****************************************************************************
+
+class Recorder:
+    """
+    Record the calls reaching the backend to a trace file.
+
+    Installed as the layer :data:`~nkt_tools._hooks.TRACE`, just above the
+    dispatcher, so reads answered by the cache are not recorded and the
+    latency includes the wait for the dispatcher of the port.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._writer = None
+        self._hook = self._layer  # Bound once, layers are removed by identity
+
+    def _layer(self, name, function):
+        writer = self._writer
+        clock = time.perf_counter
+
+        def recorded(portname, *args):
+            start = clock()
+            response = function(portname, *args)
+            writer.write(name, portname, args, response, clock() - start)
+            return response
+        recorded.__name__ = name
+        recorded.__doc__ = function.__doc__
+        return recorded
+
+    def start(self):
+        """Open the trace file and start recording."""
+        if self._writer is None:
+            self._writer = TraceWriter(self.path)
+            _hooks.install(self._hook, _hooks.TRACE)
+        return self
+
+    def stop(self):
+        """Stop recording and close the trace file."""
+        if self._writer is not None:
+            _hooks.remove(self._hook)
+            self._writer.close()
+            self._writer = None
+
+    @property
+    def operations(self):
+        """`int`, read-only: Operations recorded so far."""
+        return self._writer.operations if self._writer is not None else 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+# *****************************************************************************
+# Replay
+# *****************************************************************************
+
+class _Responses:
+    """Recorded responses of one distinct call, served in order."""
+
+    __slots__ = ('cursor', 'latencies', 'responses')
+
+    def __init__(self):
+        self.cursor = 0
+        self.latencies = array('I')  # microseconds
+        self.responses = []
+
+
+class Replay:
+    """
+    Answer the register and device functions from a trace file.
+
+    Installed as the layer :data:`~nkt_tools._hooks.REPLAY` in place of the
+    backend, which is never called. The port functions (:data:`PORT_FUNCTIONS`)
+    are answered as well, with the ports of the trace, so device objects
+    can be created as usual.
+
+    Parameters
+    ----------
+    path : str
+        Trace file written by :class:`Recorder` or :class:`TraceWriter`.
+    scale : float, optional
+        Factor applied to the recorded latencies, 0 to answer at once. 1 by
+        default.
+
+    Raises
+    ------
+    LookupError
+        On replay, for a call which is not in the trace.
+    """
+
+    def __init__(self, path, scale=1.0):
+        self.path = path
+        self.scale = scale
+        self.calls = 0
+        """int: Calls answered from the trace."""
+        self._calls = {}  # name > {(portname, args): _Responses}
+        self._ports = []
+        self._saved = {}
+        self._hook = self._layer
+        self._load()
+
+    def _load(self):
+        # Repeated calls and responses are decoded once and shared
+        keys = {}  # (name, portname, encoded args) > _Responses
+        values = {}  # encoded response > response
+        ports = {}
+        for name, portname, args, response, latency in _records(self.path):
+            args = args.tobytes()
+            entry = keys.get((name, portname, args))
+            if entry is None:
+                entry = keys[(name, portname, args)] = _Responses()
+                table = self._calls.setdefault(name, {})
+                table[(portname, _decode(args)[0])] = entry
+                ports[portname] = None
+            response = response.tobytes()
+            try:
+                value = values[response]
+            except KeyError:
+                value = values[response] = _decode(response)[0]
+            entry.latencies.append(latency)
+            entry.responses.append(value)
+        self._ports = list(ports)
+
+    def _layer(self, name, function):
+        table = self._calls.get(name, {})
+        sleep = time.sleep
+
+        def replayed(portname, *args):
+            try:
+                entry = table[(portname, args)]
+            except (KeyError, TypeError):
+                entry = table.get((portname, _normalized(args)))
+                if entry is None:
+                    raise LookupError('%s%r is not in the trace %s'
+                                      % (name, (portname,) + args,
+                                         self.path)) from None
+            cursor = entry.cursor
+            entry.cursor = (cursor + 1) % len(entry.responses)
+            self.calls += 1
+            if self.scale:
+                sleep(entry.latencies[cursor] * 1e-6 * self.scale)
+            return entry.responses[cursor]
+        replayed.__name__ = name
+        replayed.__doc__ = function.__doc__
+        return replayed
+
+    def start(self):
+        """Answer all calls from the trace from now on."""
+        if not self._saved:
+            ports = ','.join(self._ports)
+            self._saved = {name: getattr(nkt, name)
+                           for name in PORT_FUNCTIONS}
+            nkt.openPorts = lambda portnames, autoMode, liveMode: 0
+            nkt.closePorts = lambda portnames: 0
+            nkt.getOpenPorts = lambda: ports
+            nkt.getAllPorts = lambda: ports
+            nkt.getPortStatus = lambda portname: (0, 2)  # PortOpened
+            _hooks.install(self._hook, _hooks.REPLAY)
+        return self
+
+    def stop(self):
+        """Call the backend again."""
+        if self._saved:
+            _hooks.remove(self._hook)
+            for name, function in self._saved.items():
+                setattr(nkt, name, function)
+            self._saved = {}
+
+    def rewind(self):
+        """Serve every call from its first recorded response again."""
+        for table in self._calls.values():
+            for entry in table.values():
+                entry.cursor = 0
+        self.calls = 0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def active():
+    """Return True while a recorder or a replay is installed."""
+    return any(order in (_hooks.TRACE, _hooks.REPLAY)
+               for order, _, _ in _hooks._layers)
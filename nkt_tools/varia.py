@@ -1,8 +1,13 @@
 """Python module to control NKT Varia."""
 import nkt_tools.NKTP_DLL as nkt
+from nkt_tools.aio import AsyncMixin
+from nkt_tools.discovery import discover
+from nkt_tools.fields import RegisterDevice, RegisterField
+from nkt_tools.live import LiveMixin
+from nkt_tools.session import pool
 
 
-class Varia:
+class Varia(AsyncMixin, LiveMixin, RegisterDevice):
     status_messages = {
         0: '-',
         1: 'Interlock off',
@@ -47,7 +52,7 @@ class Varia:
 
     """
 
-    def __init__(self, portname=None):
+    def __init__(self, portname=None, module_address=None):
         """
         Searches for connected NKT Varia and defines instrument parameters.
 
@@ -60,6 +65,9 @@ class Varia:
         portname : str, optional
             Enter if portname for Varia is known/multiple lasers are connected.
             If not supplied, system searches for Varia. None by default.
+        module_address : int, optional
+            Module address of the Varia on `portname`, e.g. from
+            :func:`nkt_tools.discovery.discover`. None by default.
 
         Raises
         ------
@@ -71,55 +79,43 @@ class Varia:
         self._portname = None  # COM port name. Autosearches if not provided.
         self._module_address = None  # 16-25 for Varia. Auto searches in init.
         self._device_type = None  # This should update to 0x68 if init is right
+        self._session = None  # Keeps the port open while the object lives
 
         if portname:  # Allow user to init specific NKT Laser on portname
             self._portname = portname
+            self._session = pool.acquire(portname)
+            if module_address is not None:  # Known module, e.g. discovered
+                self._module_address = module_address
+                self._device_type = 0x68
 
         else:  # User didn't specify port
-            # Open available ports
-            nkt.openPorts(nkt.getAllPorts(), 1, 1)
-
-            # Get open NKT ports
-            portlist = nkt.getOpenPorts().split(',')
+            # Scan all ports, or check the modules cached by the last scan.
+            # The registry keeps the ports open until the session below.
+            registry = discover()
+            modules = registry.find(type=0x68)
             varia_found = False
 
-            for portName in portlist:
-                if portName == '':
+            # Address for Varia depends on specific hardware.
+            # Address=16+Rotary switch #(0..9)
+            for module in modules:
+                if not 16 <= module.address <= 25:
                     continue
-                # get binary devList of connected nkt devices
-                comm_result, devList = nkt.deviceGetAllTypes(portName)
-
-                # Address for Varia depends on specific hardware.
-                # Search possible addresses (16-25) searching for connection.
-                for n in range(9):
-                    trial_address = 16 + n  # Address=16+Rotary switch #(0..9)
-                    try:
-                        device_type = devList[trial_address]
-                    except (IndexError):
-                        print('No Varia on port: ', portName)
-                        break
-
-                    # Check if device_type matches varia (0x68)
-                    if hex(device_type) == '0x68':  # Check for varia in hex
-                        if varia_found:  # If varia found on other port, error
-                            err_msg = ('''Multiple Varias found on computer.
-                            COM port 1 = %s
-                            COM port 2 = %s
-                            Please initialize Varia class with designated \
-                            portname to avoid conflict'''
-                                       % (self.portname, portName))
-
-                            raise RuntimeError(err_msg)
-
-                        else:  # If first laser found,
-                            varia_found = True
-                            self._portname = portName
-                            self._module_address = trial_address
-                            self._device_type = device_type
-                            break
-
-            # Close all ports
-            closeResult = nkt.closePorts('')
+                if varia_found:  # If Varia found on other port, error
+                    err_msg = ('''Multiple Varias found on computer.
+                    COM port 1 = %s
+                    COM port 2 = %s
+                    Please initialize Varia class with designated \
+                    portname to avoid conflict'''
+                               % (self.portname, module.port))
+
+                    raise RuntimeError(err_msg)
+
+                varia_found = True
+                self._portname = module.port
+                self._module_address = module.address
+                self._device_type = module.type
+                self._session = pool.acquire(self.portname)
+
             if varia_found:
                 print('NKT Varia Found:')
                 print('Comport: ', self.portname, 'Device type: ', "0x%0.2X"
@@ -140,9 +136,8 @@ class Varia:
     """`int`, read-only: This should update to 104 (0x68) if init is right.
     Assigned and checked during object init."""
 
-    @property
-    def monitor_input(self):
-        """
+    monitor_input = RegisterField(0x13, 'U16', scale=0.1, readonly=True,
+                                  doc="""
         Uses optional monitor to get laser power in percent.
 
         Calls registerREad16U on register 0x13. Converts reading from in to
@@ -153,17 +148,9 @@ class Varia:
         -------
         float
             Output power given in percent with 0.1% precision.
-        """
-        register_address = 0x13
-        comm_result, reading = nkt.registerReadU16(self.portname,
-                                                   self.module_address,
-                                                   register_address, -1)
-        output_power = reading / 10
-        return output_power
-
-    @property
-    def nd_setpoint(self):
-        """
+        """)
+
+    nd_setpoint = RegisterField(0x32, 'U16', scale=0.1, doc="""
         Unclear what this parameter actually controls.
 
         Writes to register 0x32.
@@ -178,23 +165,9 @@ class Varia:
         ----------
         value : float
             Setpoint for neutral density filter given in % with 0.1% precision.
-        """
-        register_address = 0x32
-        comm_result, reading = nkt.registerReadU16(self.portname,
-                                                   self.module_address,
-                                                   register_address, -1)
-        return reading/10
-
-    @nd_setpoint.setter
-    def nd_setpoint(self, value):
-        register_address = 0x32
-        value = int(value * 10)  # convert percent to permille
-        nkt.registerWriteU16(self.portname, self.module_address,
-                             register_address, value, -1)
-
-    @property
-    def long_setpoint(self):
-        """
+        """)
+
+    long_setpoint = RegisterField(0x33, 'U16', scale=0.1, doc="""
         Sets the short wave pass value with 0.1 nm precision.
 
         Converts wavelength value [nm] to int [1/10 nm] then writes to register
@@ -204,23 +177,9 @@ class Varia:
         ----------
         wavelength : float
             Lower bandpass value given in nanometers w/ 0.1 nm precision.
-        """
-        register_address = 0x33
-        comm_result, reading = nkt.registerReadU16(self.portname,
-                                                   self.module_address,
-                                                   register_address, -1)
-        return reading/10
-
-    @long_setpoint.setter
-    def long_setpoint(self, wavelength):
-        register_address = 0x33
-        value = int(wavelength * 10)  # convert nm to 1/10 nm
-        nkt.registerWriteU16(self.portname, self.module_address,
-                             register_address, value, -1)
-
-    @property
-    def short_setpoint(self):
-        """
+        """)
+
+    short_setpoint = RegisterField(0x34, 'U16', scale=0.1, doc="""
         Sets the long wave pass value with 0.1 nm precision.
 
         Converts wavelength value [nm] to int [1/10 nm] then writes to register
@@ -230,19 +189,7 @@ class Varia:
         ----------
         wavelength : float
             Upper bandpass value given in nanometers w/ 0.1 nm precision.
-        """
-        register_address = 0x34
-        comm_result, reading = nkt.registerReadU16(self.portname,
-                                                   self.module_address,
-                                                   register_address, -1)
-        return reading/10
-
-    @short_setpoint.setter
-    def short_setpoint(self, wavelength):
-        register_address = 0x34
-        value = int(wavelength * 10)  # convert nm to 1/10 nm
-        nkt.registerWriteU16(self.portname, self.module_address,
-                             register_address, value, -1)
+        """)
 
     def print_status(self):
         """
@@ -271,10 +218,11 @@ class Varia:
         return (bits)
 
     def read_all_properties(self):
-        print('Input Power = ', self.monitor_input)
-        print('ND Setpoint = ', self.nd_setpoint)
-        print('Long Setpoint = ', self.long_setpoint)
-        print('Short Setpoint = ', self.short_setpoint)
+        snapshot = self.snapshot()
+        print('Input Power = ', snapshot.monitor_input)
+        print('ND Setpoint = ', snapshot.nd_setpoint)
+        print('Long Setpoint = ', snapshot.long_setpoint)
+        print('Short Setpoint = ', snapshot.short_setpoint)
 
     def demo_nkt_registerReads(self):
         """